@@ -0,0 +1,1140 @@
+import os
+import shutil
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    cast,
+)
+
+from application_sdk.activities.common.models import ActivityStatistics
+from application_sdk.activities.common.utils import auto_heartbeater
+from application_sdk.activities.metadata_extraction.sql import (
+    BaseSQLMetadataExtractionActivities,
+    BaseSQLMetadataExtractionActivitiesState,
+)
+from application_sdk.common.dataframe_utils import is_empty_dataframe
+from application_sdk.inputs.objectstore import ObjectStoreInput
+from application_sdk.inputs.statestore import StateStoreInput
+from application_sdk.observability.logger_adaptor import get_logger
+from application_sdk.outputs.json import JsonOutput
+from application_sdk.outputs.objectstore import ObjectStoreOutput
+from application_sdk.outputs.statestore import StateStoreOutput
+from application_sdk.transformers.query import QueryBasedTransformer
+from temporalio import activity
+
+from app.activities.metadata_extraction.capabilities import (
+    get_typename_relations,
+    load_capabilities,
+    probe_capability,
+    save_capabilities,
+)
+from app.activities.metadata_extraction.catalogs import MultiCatalogExtractionMixin
+from app.activities.metadata_extraction.checkpoint import checkpoint_heartbeater
+from app.activities.metadata_extraction.pipelined import PipelinedExtractionMixin
+from app.activities.metadata_extraction.queries import (
+    NULL_COLUMNS,
+    QUERY_FILES,
+    queries,
+)
+from app.activities.metadata_extraction.resumable import ResumableExtractionMixin
+from app.activities.metadata_extraction.view_definitions import (
+    INDEX_FILE_NAME,
+    ViewDefinitionsMixin,
+    ViewKey,
+    add_view_definitions,
+    get_definitions,
+    get_view_keys,
+    read_index,
+)
+from app.clients import SQLClient
+from app.common.observability import QueryObservation, span
+from app.common.utils import (
+    filter_partitions,
+    get_capabilities_key,
+    get_extraction_state_key,
+    get_fetch_format,
+    get_metadata_flag,
+    get_partition_path,
+    get_schema_fingerprints,
+    get_template_columns,
+    is_capability_probing,
+    is_deferred_view_definitions,
+    is_incremental_extraction,
+    is_multi_catalog_extraction,
+    is_pipelined_extraction,
+    is_resumable_extraction,
+    prepare_query,
+    prune_null_columns,
+    quote_identifier,
+    quote_literal,
+    remove_view_definitions,
+)
+from app.constants import (
+    ACTIVITY_MEMORY_BUDGET_MB,
+    CAPABILITY_CACHE_TTL,
+    CAPABILITY_PROBE_TIMEOUT,
+    CAPABILITY_SLOW_PROBE_SECONDS,
+    COLUMN_EXTRACTION_QUERY,
+    PROJECTION_PRUNING,
+    RAW_OUTPUT_COMPRESSION,
+    RAW_OUTPUT_ROW_GROUP_SIZE,
+    SPILL_DIRECTORY,
+    STREAMING_BATCH_SIZE,
+    STREAMING_EXTRACTION,
+    TABLE_EXTRACTION_QUERY,
+)
+from app.inputs import ParquetInput
+from app.outputs import ParquetOutput
+from app.outputs.spill import write_buffered
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+logger = get_logger(__name__)
+activity.logger = logger
+
+# Streamed results are not globally sorted, every chunk is sorted on these
+# columns (when present) before it is written.
+CHUNK_SORT_COLUMNS = {
+    "table": ["table_catalog", "table_schema", "table_name"],
+    "column": ["table_catalog", "table_schema", "table_name", "ordinal_position"],
+}
+
+
+class SQLMetadataExtractionActivities(
+    PipelinedExtractionMixin,
+    ResumableExtractionMixin,
+    MultiCatalogExtractionMixin,
+    ViewDefinitionsMixin,
+    BaseSQLMetadataExtractionActivities,
+):
+    """
+    Presto metadata extraction activities.
+
+    Besides the SDK activities, tables and columns can be extracted for a
+    single catalog/schema partition. When ``workflow_args`` carries a
+    ``partition`` the partition query is used and the output is written to
+    ``raw/<typename>/<catalog>/<schema>``.
+
+    The optional extraction features are documented on the methods that
+    implement them. The larger ones live in, or are mixed in from, the
+    submodules of :mod:`app.activities.metadata_extraction`.
+    """
+
+    fetch_table_set_based_sql = queries.get("EXTRACT_TABLE_SET_BASED")
+    fetch_table_partition_sql = queries.get("EXTRACT_TABLE_PARTITION")
+    fetch_column_partition_sql = queries.get("EXTRACT_COLUMN_PARTITION")
+    fetch_column_system_jdbc_sql = queries.get("EXTRACT_COLUMN_SYSTEM_JDBC")
+    fetch_column_partition_system_jdbc_sql = queries.get(
+        "EXTRACT_COLUMN_PARTITION_SYSTEM_JDBC"
+    )
+    probe_system_jdbc_sql = queries.get("PROBE_SYSTEM_JDBC")
+    fetch_schema_fingerprint_sql = queries.get("EXTRACT_SCHEMA_FINGERPRINT")
+    extract_include_schemas_sql = queries.get("EXTRACT_INCLUDE_SCHEMAS")
+    extract_include_schemas_system_jdbc_sql = queries.get(
+        "EXTRACT_INCLUDE_SCHEMAS_SYSTEM_JDBC"
+    )
+    cluster_load_sql = queries.get("CLUSTER_LOAD")
+    fetch_view_definition_sql = queries.get("EXTRACT_VIEW_DEFINITION")
+    probe_information_schema_sql = queries.get("PROBE_INFORMATION_SCHEMA")
+    fetch_database_catalog_sql = queries.get("EXTRACT_DATABASE_CATALOG")
+    fetch_procedure_catalog_sql = queries.get("EXTRACT_PROCEDURE_CATALOG")
+
+    async def _get_sql_client(self, workflow_args: Dict[str, Any]) -> SQLClient:
+        state = cast(
+            BaseSQLMetadataExtractionActivitiesState,
+            await self._get_state(workflow_args),
+        )
+        if not state.sql_client or not state.sql_client.engine:
+            logger.error("SQL client or engine not initialized")
+            raise ValueError("SQL client or engine not initialized")
+        return cast(SQLClient, state.sql_client)
+
+    def get_fetch_table_sql(self, workflow_args: Dict[str, Any]) -> Optional[str]:
+        """
+        Return the monolithic table query selected for the workflow.
+        """
+        table_extraction_query = (
+            workflow_args.get("metadata", {}).get("table-extraction-query")
+            or TABLE_EXTRACTION_QUERY
+        )
+        if table_extraction_query == "correlated":
+            return self.fetch_table_sql
+        if table_extraction_query == "set-based":
+            return self.fetch_table_set_based_sql
+        raise ValueError(f"Unknown table extraction query: {table_extraction_query}")
+
+    async def use_system_jdbc_columns(self, workflow_args: Dict[str, Any]) -> bool:
+        """
+        Whether columns are extracted from ``system.jdbc.columns`` instead of
+        ``information_schema``.
+        """
+        column_extraction_query = (
+            workflow_args.get("metadata", {}).get("column-extraction-query")
+            or COLUMN_EXTRACTION_QUERY
+        )
+        if column_extraction_query == "information-schema":
+            return False
+        if column_extraction_query == "system-jdbc":
+            return True
+        if column_extraction_query != "auto":
+            raise ValueError(
+                f"Unknown column extraction query: {column_extraction_query}"
+            )
+        if not self.probe_system_jdbc_sql:
+            return False
+        sql_client = await self._get_sql_client(workflow_args)
+        return await sql_client.probe(
+            prepare_query(self.probe_system_jdbc_sql, workflow_args) or ""
+        )
+
+    async def get_skipped_catalogs(
+        self,
+        workflow_args: Dict[str, Any],
+        catalog_names: Iterable[str],
+        relations: Iterable[str],
+    ) -> Set[str]:
+        """
+        Return the catalogs that cannot answer queries on all of the given
+        ``information_schema`` relations, none unless ``"capability-probing"``
+        is enabled.
+
+        Relations not probed within ``CAPABILITY_CACHE_TTL`` seconds are
+        probed again and the connection's capabilities are saved. A relation
+        is skipped if its probe failed, timed out or took longer than
+        ``CAPABILITY_SLOW_PROBE_SECONDS``. Activities probing concurrently may
+        overwrite each other's probes, which are then repeated by a later run.
+        """
+        catalog_names = sorted(set(catalog_names))
+        relations = tuple(relations)
+        if (
+            not is_capability_probing(workflow_args)
+            or not self.probe_information_schema_sql
+            or not catalog_names
+            or not relations
+        ):
+            return set()
+
+        key = get_capabilities_key(workflow_args)
+        capabilities = load_capabilities(key)
+        sql_client = await self._get_sql_client(workflow_args)
+        now = time.time()
+        probed = False
+        for catalog_name in catalog_names:
+            catalog_capabilities = capabilities.setdefault(catalog_name, {})
+            for relation in relations:
+                capability = catalog_capabilities.get(relation)
+                if capability and not capability.is_expired(now, CAPABILITY_CACHE_TTL):
+                    continue
+                query = prepare_query(
+                    query=self.probe_information_schema_sql,
+                    workflow_args=workflow_args,
+                    catalog_name=quote_identifier(catalog_name),
+                    relation=relation,
+                )
+                capability = await probe_capability(
+                    sql_client,
+                    query or "",
+                    CAPABILITY_PROBE_TIMEOUT,
+                    observation=QueryObservation(
+                        sql_file=QUERY_FILES.get(
+                            self.probe_information_schema_sql, "unknown"
+                        ),
+                        catalog=catalog_name,
+                        trace_id=workflow_args.get("workflow_run_id"),
+                    ),
+                )
+                logger.info(
+                    f"Probed information_schema.{relation} of {catalog_name}: "
+                    f"supported={capability.supported}, "
+                    f"{capability.seconds:.2f}s"
+                )
+                catalog_capabilities[relation] = capability
+                probed = True
+        if probed:
+            save_capabilities(key, capabilities)
+
+        skipped = {
+            catalog_name
+            for catalog_name in catalog_names
+            if not all(
+                capabilities[catalog_name][relation].is_usable(
+                    CAPABILITY_SLOW_PROBE_SECONDS
+                )
+                for relation in relations
+            )
+        }
+        if skipped:
+            logger.warning(
+                f"Skipping catalogs {sorted(skipped)}, information_schema "
+                f"{', '.join(relations)} unsupported or too slow"
+            )
+        return skipped
+
+    async def fetch_query(
+        self,
+        workflow_args: Dict[str, Any],
+        query: Optional[str],
+        temp_table_regex_sql: Optional[str],
+        typename: str,
+        include_schemas_sql: Optional[str] = None,
+    ) -> Optional[ActivityStatistics]:
+        """
+        Run an extraction query, scoped to the ``partition`` in
+        ``workflow_args`` if there is one.
+
+        The workflow filters are rendered into the query, see
+        :func:`app.common.utils.prepare_query`. With
+        ``"projection-pruning"``, its constant NULL columns are removed, see
+        :func:`app.common.utils.prune_null_columns`. With
+        ``"pipelined-extraction"``, streamed batches are transformed as they
+        are fetched, see :meth:`pipelined_query_executor`.
+
+        The query records its latency, time to first row, rows and bytes
+        fetched, labelled with its SQL file, catalog and Presto query id, see
+        :mod:`app.common.observability`.
+        """
+        sql_client = await self._get_sql_client(workflow_args)
+        partition = workflow_args.get("partition")
+        catalog_name = (
+            partition["catalog_name"] if partition else sql_client.get_catalog_name()
+        )
+        if await self.get_skipped_catalogs(
+            workflow_args,
+            [catalog_name],
+            get_typename_relations(workflow_args, typename),
+        ):
+            return None
+
+        observation = QueryObservation(
+            sql_file=QUERY_FILES.get(query or "", "unknown"),
+            catalog=partition["catalog_name"] if partition else "all",
+            trace_id=workflow_args.get("workflow_run_id"),
+        )
+
+        output_suffix = f"raw/{typename}"
+        if partition:
+            output_suffix = f"{output_suffix}/{get_partition_path(partition)}"
+        prepared_query = self.prepare_extraction_query(
+            workflow_args,
+            query,
+            temp_table_regex_sql,
+            include_schemas_sql,
+            partition,
+            typename,
+        )
+
+        metadata = workflow_args.get("metadata", {})
+        if not get_metadata_flag(
+            workflow_args, "streaming-extraction", STREAMING_EXTRACTION
+        ):
+            error: Optional[Exception] = None
+            try:
+                statistics = await self.query_executor(
+                    sql_engine=sql_client.engine,
+                    sql_query=prepared_query,
+                    workflow_args=workflow_args,
+                    output_suffix=output_suffix,
+                    typename=typename,
+                )
+                observation.rows = statistics.total_record_count if statistics else 0
+                return statistics
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                if prepared_query:
+                    observation.record(error)
+
+        # deferred view definitions are only fetched once all tables are
+        # written, so their chunks cannot be transformed before
+        if is_pipelined_extraction(workflow_args) and not (
+            typename == "table" and is_deferred_view_definitions(workflow_args)
+        ):
+            query_executor = self.pipelined_query_executor
+        else:
+            query_executor = self.streaming_query_executor
+        return await query_executor(
+            sql_client=sql_client,
+            sql_query=prepared_query,
+            workflow_args=workflow_args,
+            output_suffix=output_suffix,
+            typename=typename,
+            batch_size=int(
+                metadata.get("streaming-batch-size") or STREAMING_BATCH_SIZE
+            ),
+            fetch_format=get_fetch_format(workflow_args),
+            observation=observation,
+        )
+
+    def prepare_extraction_query(
+        self,
+        workflow_args: Dict[str, Any],
+        query: Optional[str],
+        temp_table_regex_sql: Optional[str],
+        include_schemas_sql: Optional[str] = None,
+        partition: Optional[Dict[str, Any]] = None,
+        typename: Optional[str] = None,
+        catalog_name: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Render the workflow filters, and the catalog and schema of
+        ``partition`` or the ``catalog_name`` if given, into an extraction
+        query and, with ``"projection-pruning"``, prune its constant NULL
+        columns. Table queries leave the view definitions out when they are
+        deferred.
+        """
+        params = {}
+        if partition:
+            catalog_name = partition["catalog_name"]
+            params["schema_name"] = quote_literal(partition["schema_name"])
+        if catalog_name is not None:
+            params["catalog_name"] = quote_identifier(catalog_name)
+            params["catalog_name_literal"] = quote_literal(catalog_name)
+
+        prepared_query = prepare_query(
+            query=query,
+            workflow_args=workflow_args,
+            temp_table_regex_sql=temp_table_regex_sql,
+            include_schemas_sql=include_schemas_sql,
+            **params,
+        )
+        if (
+            prepared_query
+            and typename == "table"
+            and is_deferred_view_definitions(workflow_args)
+        ):
+            prepared_query = remove_view_definitions(prepared_query)
+        if prepared_query and get_metadata_flag(
+            workflow_args, "projection-pruning", PROJECTION_PRUNING
+        ):
+            prepared_query = prune_null_columns(prepared_query)
+        return prepared_query
+
+    def get_memory_budget(self, workflow_args: Dict[str, Any]) -> int:
+        """
+        Return the bytes of fetched batches an activity keeps in memory.
+        """
+        memory_budget_mb = workflow_args.get("metadata", {}).get(
+            "activity-memory-budget-mb"
+        )
+        if memory_budget_mb is None:
+            memory_budget_mb = ACTIVITY_MEMORY_BUDGET_MB
+        return int(float(memory_budget_mb) * 1024 * 1024)
+
+    def get_parquet_output(
+        self, workflow_args: Dict[str, Any], output_suffix: str, batch_size: int
+    ) -> ParquetOutput:
+        """
+        Return the raw Parquet output of an extraction, with the compression
+        and row group size selected for the workflow.
+        """
+        metadata = workflow_args.get("metadata", {})
+        return ParquetOutput(
+            output_prefix=workflow_args["output_prefix"],
+            output_path=workflow_args["output_path"],
+            output_suffix=output_suffix,
+            chunk_size=batch_size,
+            compression=metadata.get("raw-output-compression")
+            or RAW_OUTPUT_COMPRESSION,
+            row_group_size=int(
+                metadata.get("raw-output-row-group-size") or RAW_OUTPUT_ROW_GROUP_SIZE
+            ),
+        )
+
+    async def query_executor(
+        self,
+        sql_engine: Any,
+        sql_query: Optional[str],
+        workflow_args: Dict[str, Any],
+        output_suffix: str,
+        typename: str,
+    ) -> Optional[ActivityStatistics]:
+        """
+        Run a query of the SDK's non-streamed extraction, on the least loaded
+        coordinator when the query is for the engine of the workflow's
+        client, see ``SQLClient.routed_engine``.
+        """
+        sql_client = await self._get_sql_client(workflow_args)
+        if sql_engine is not sql_client.engine:
+            return await super().query_executor(
+                sql_engine, sql_query, workflow_args, output_suffix, typename
+            )
+        async with sql_client.routed_engine() as engine:
+            return await super().query_executor(
+                engine, sql_query, workflow_args, output_suffix, typename
+            )
+
+    async def streaming_query_executor(
+        self,
+        sql_client: SQLClient,
+        sql_query: Optional[str],
+        workflow_args: Dict[str, Any],
+        output_suffix: str,
+        typename: str,
+        batch_size: int,
+        fetch_format: Optional[str] = None,
+        observation: Optional[QueryObservation] = None,
+    ) -> Optional[ActivityStatistics]:
+        """
+        Stream a query into Parquet chunks of at most ``batch_size`` rows.
+
+        Every batch is sorted on the ``CHUNK_SORT_COLUMNS`` of the typename and
+        written while the next batches are fetched, buffered within the
+        memory budget of the activity. With the ``arrow`` fetch format
+        batches stay Arrow record batches from the driver to the Parquet
+        writer, ``pandas`` goes through pandas DataFrames.
+        """
+        if not sql_query:
+            logger.warning("Query is empty, skipping execution.")
+            return None
+        fetch_format = get_fetch_format(workflow_args, fetch_format)
+
+        parquet_output = self.get_parquet_output(
+            workflow_args, output_suffix, batch_size
+        )
+        await self.write_query_batches(
+            parquet_output,
+            sql_client,
+            sql_query,
+            typename,
+            batch_size,
+            fetch_format,
+            observation,
+            max_buffer_bytes=self.get_memory_budget(workflow_args),
+        )
+
+        logger.info(
+            f"Streamed {parquet_output.total_record_count} {typename} records "
+            f"in {parquet_output.chunk_count} chunks"
+        )
+        return await parquet_output.get_statistics(typename=typename)
+
+    async def write_query_batches(
+        self,
+        parquet_output: ParquetOutput,
+        sql_client: SQLClient,
+        sql_query: str,
+        typename: str,
+        batch_size: int,
+        fetch_format: str = "arrow",
+        observation: Optional[QueryObservation] = None,
+        max_buffer_bytes: Optional[int] = None,
+    ) -> None:
+        """
+        Write every batch of a query to its own sorted chunk, fetched in the
+        given format.
+        """
+        if fetch_format == "arrow":
+            await self.write_arrow_batches(
+                parquet_output,
+                sql_client,
+                sql_query,
+                typename,
+                batch_size,
+                observation,
+                max_buffer_bytes,
+            )
+        else:
+            await self.write_dataframe_batches(
+                parquet_output,
+                sql_client,
+                sql_query,
+                typename,
+                batch_size,
+                observation,
+                max_buffer_bytes,
+            )
+
+    async def write_dataframe_batches(
+        self,
+        parquet_output: ParquetOutput,
+        sql_client: SQLClient,
+        sql_query: str,
+        typename: str,
+        batch_size: int,
+        observation: Optional[QueryObservation] = None,
+        max_buffer_bytes: Optional[int] = None,
+    ) -> None:
+        """
+        Write every DataFrame batch of a query to its own sorted chunk.
+
+        Sorted batches wait to be written as Arrow tables, in memory up to
+        ``max_buffer_bytes`` and spilled to disk beyond it.
+        """
+        if max_buffer_bytes is None:
+            max_buffer_bytes = self.get_memory_budget({})
+
+        await write_buffered(
+            self.get_dataframe_tables(
+                sql_client, sql_query, typename, batch_size, observation
+            ),
+            lambda table: parquet_output.write_arrow_table(table, source="pandas"),
+            max_buffer_bytes,
+            directory=SPILL_DIRECTORY,
+            labels={"typename": typename},
+        )
+
+    async def write_arrow_batches(
+        self,
+        parquet_output: ParquetOutput,
+        sql_client: SQLClient,
+        sql_query: str,
+        typename: str,
+        batch_size: int,
+        observation: Optional[QueryObservation] = None,
+        max_buffer_bytes: Optional[int] = None,
+    ) -> None:
+        """
+        Write every Arrow record batch of a query to its own sorted chunk.
+
+        Sorted batches wait to be written in memory up to
+        ``max_buffer_bytes`` and are spilled to disk beyond it.
+        """
+        if max_buffer_bytes is None:
+            max_buffer_bytes = self.get_memory_budget({})
+
+        await write_buffered(
+            self.get_arrow_tables(
+                sql_client, sql_query, typename, batch_size, observation
+            ),
+            parquet_output.write_arrow_table,
+            max_buffer_bytes,
+            directory=SPILL_DIRECTORY,
+            labels={"typename": typename},
+        )
+
+    async def get_dataframe_tables(
+        self,
+        sql_client: SQLClient,
+        sql_query: str,
+        typename: str,
+        batch_size: int,
+        observation: Optional[QueryObservation] = None,
+    ) -> AsyncIterator["pa.Table"]:
+        """
+        Fetch a query as DataFrame batches, each sorted on the
+        ``CHUNK_SORT_COLUMNS`` of the typename and converted to an Arrow
+        table.
+        """
+        import pyarrow as pa
+
+        async for dataframe in sql_client.run_query_batches(
+            sql_query, batch_size, observation=observation
+        ):
+            columns = {column.lower(): column for column in dataframe.columns}
+            sort_columns = [
+                columns[column]
+                for column in CHUNK_SORT_COLUMNS.get(typename, [])
+                if column in columns
+            ]
+            if sort_columns:
+                dataframe = dataframe.sort_values(sort_columns, ignore_index=True)
+            yield pa.Table.from_pandas(dataframe, preserve_index=False)
+
+    async def get_arrow_tables(
+        self,
+        sql_client: SQLClient,
+        sql_query: str,
+        typename: str,
+        batch_size: int,
+        observation: Optional[QueryObservation] = None,
+    ) -> AsyncIterator["pa.Table"]:
+        """
+        Fetch a query as Arrow record batches, each sorted on the
+        ``CHUNK_SORT_COLUMNS`` of the typename.
+        """
+        import pyarrow as pa
+
+        async for batch in sql_client.run_query_arrow_batches(
+            sql_query, batch_size, observation=observation
+        ):
+            columns = {column.lower(): column for column in batch.schema.names}
+            sort_keys = [
+                (columns[column], "ascending")
+                for column in CHUNK_SORT_COLUMNS.get(typename, [])
+                if column in columns
+            ]
+            table = pa.Table.from_batches([batch])
+            if sort_keys:
+                table = table.sort_by(sort_keys)
+            yield table
+
+    async def fetch_schema_fingerprints(
+        self,
+        sql_client: SQLClient,
+        catalog_names: Iterable[str],
+        workflow_args: Dict[str, Any],
+    ) -> Dict[Tuple[str, str], str]:
+        """
+        Fingerprint every schema of the given catalogs.
+
+        Catalogs whose fingerprint query fails, or is skipped by capability
+        probing, e.g. because the connector does not expose views, get no
+        fingerprints and are always extracted.
+        """
+        catalog_names = set(catalog_names)
+        catalog_names -= await self.get_skipped_catalogs(
+            workflow_args, catalog_names, ("tables", "columns", "views")
+        )
+        fingerprints: Dict[Tuple[str, str], str] = {}
+        for catalog_name in sorted(catalog_names):
+            query = prepare_query(
+                query=self.fetch_schema_fingerprint_sql,
+                workflow_args=workflow_args,
+                catalog_name=quote_identifier(catalog_name),
+            )
+            if not query:
+                continue
+            rows: List[Dict[str, Any]] = []
+            try:
+                async for dataframe in sql_client.run_query_batches(
+                    query,
+                    STREAMING_BATCH_SIZE,
+                    observation=QueryObservation(
+                        sql_file=QUERY_FILES.get(
+                            self.fetch_schema_fingerprint_sql or "", "unknown"
+                        ),
+                        catalog=catalog_name,
+                        trace_id=workflow_args.get("workflow_run_id"),
+                    ),
+                ):
+                    rows.extend(dataframe.to_dict(orient="records"))
+            except Exception as e:
+                logger.warning(
+                    f"Could not fingerprint catalog {catalog_name}, "
+                    f"it will be extracted in full: {e}"
+                )
+                continue
+            fingerprints.update(get_schema_fingerprints(catalog_name, rows))
+        return fingerprints
+
+    async def list_partitions(
+        self, workflow_args: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """
+        List the catalog/schema partitions selected by the workflow filters,
+        sorted by catalog and schema.
+        """
+        state = cast(
+            BaseSQLMetadataExtractionActivitiesState,
+            await self._get_state(workflow_args),
+        )
+        metadata = await state.handler.prepare_metadata()
+        partitions = [
+            {
+                "catalog_name": row[state.handler.database_result_key],
+                "schema_name": row[state.handler.schema_result_key],
+            }
+            for row in metadata
+        ]
+        return filter_partitions(partitions, workflow_args)
+
+    @activity.defn
+    @auto_heartbeater
+    async def fetch_partitions(
+        self, workflow_args: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """
+        List the catalog/schema partitions selected by the workflow filters.
+
+        For incremental extraction every partition also gets a
+        ``fingerprint``, None if the schema could not be fingerprinted. With
+        capability probing, the catalogs are probed once here rather than by
+        each of their partition extractions.
+        """
+        sql_client = await self._get_sql_client(workflow_args)
+        partitions = await self.list_partitions(workflow_args)
+        logger.info(f"Found {len(partitions)} catalog/schema partitions")
+        await self.get_skipped_catalogs(
+            workflow_args,
+            {partition["catalog_name"] for partition in partitions},
+            get_typename_relations(workflow_args, "table")
+            + get_typename_relations(workflow_args, "column"),
+        )
+
+        if is_incremental_extraction(workflow_args):
+            fingerprints = await self.fetch_schema_fingerprints(
+                sql_client,
+                {partition["catalog_name"] for partition in partitions},
+                workflow_args,
+            )
+            for partition in partitions:
+                partition["fingerprint"] = fingerprints.get(
+                    (partition["catalog_name"], partition["schema_name"])
+                )
+        return partitions
+
+    @activity.defn
+    @auto_heartbeater
+    async def get_cluster_load(self, workflow_args: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Sample the running and queued queries and the active workers of the
+        cluster, see ``cluster_load.sql``.
+
+        Returns an empty sample if the runtime tables cannot be read.
+        """
+        sql_client = await self._get_sql_client(workflow_args)
+        if not self.cluster_load_sql:
+            return {}
+        rows: List[Dict[str, Any]] = []
+        try:
+            async for batch in sql_client.run_query_batches(
+                self.cluster_load_sql,
+                batch_size=1,
+                observation=QueryObservation(
+                    sql_file=QUERY_FILES.get(self.cluster_load_sql, "unknown"),
+                    trace_id=workflow_args.get("workflow_run_id"),
+                ),
+            ):
+                rows.extend(batch.to_dict(orient="records"))
+        except Exception as e:
+            logger.warning(f"Could not sample the cluster load: {e}")
+            return {}
+        return {
+            key.lower(): int(value) for row in rows[:1] for key, value in row.items()
+        }
+
+    @activity.defn
+    @auto_heartbeater
+    async def get_extraction_state(
+        self, workflow_args: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Load the incremental extraction state of the previous successful run
+        of the connection, or an empty state if there is none.
+        """
+        key = get_extraction_state_key(workflow_args)
+        try:
+            return StateStoreInput.get_state(key)
+        except Exception as e:
+            logger.info(f"No previous extraction state for {key}: {e}")
+            return {}
+
+    @activity.defn
+    @auto_heartbeater
+    async def save_extraction_state(self, workflow_args: Dict[str, Any]) -> None:
+        """
+        Persist the ``extraction_state`` of a successful run for the next run
+        of the connection.
+        """
+        key = get_extraction_state_key(workflow_args)
+        StateStoreOutput.save_state(key, workflow_args["extraction_state"])
+        logger.info(f"Saved extraction state {key}")
+
+    @activity.defn
+    @auto_heartbeater
+    async def carry_forward_partition(
+        self, workflow_args: Dict[str, Any]
+    ) -> Optional[ActivityStatistics]:
+        """
+        Copy the raw output of an unchanged partition from the previous run.
+
+        ``workflow_args`` holds the ``partition``, its ``typename``, the
+        ``previous_output_path`` and the ``previous_statistics`` of the
+        partition. Chunks missing locally are downloaded from the object
+        store, and every copied chunk is pushed to the object store under the
+        output path of the current run. Deferred view definitions are
+        referenced by content hash, so only their index is copied.
+        """
+        output_prefix = workflow_args["output_prefix"]
+        typename = workflow_args["typename"]
+        statistics = ActivityStatistics.model_validate(
+            workflow_args["previous_statistics"]
+        )
+        output_suffix = (
+            f"raw/{typename}/{get_partition_path(workflow_args['partition'])}"
+        )
+        source_path = os.path.join(workflow_args["previous_output_path"], output_suffix)
+        target_path = os.path.join(workflow_args["output_path"], output_suffix)
+        os.makedirs(source_path, exist_ok=True)
+        os.makedirs(target_path, exist_ok=True)
+
+        file_names = [
+            f"{chunk}.parquet" for chunk in range(1, statistics.chunk_count + 1)
+        ]
+        if typename == "table" and is_deferred_view_definitions(workflow_args):
+            file_names.append(INDEX_FILE_NAME)
+        for file_name in file_names:
+            source_file = os.path.join(source_path, file_name)
+            target_file = os.path.join(target_path, file_name)
+            if not os.path.exists(source_file):
+                ObjectStoreInput.download_file_from_object_store(
+                    output_prefix, source_file
+                )
+            shutil.copyfile(source_file, target_file)
+            await ObjectStoreOutput.push_file_to_object_store(
+                output_prefix, target_file
+            )
+
+        logger.info(
+            f"Carried forward {statistics.total_record_count} {typename} records "
+            f"of {output_suffix}"
+        )
+        return ActivityStatistics(
+            total_record_count=statistics.total_record_count,
+            chunk_count=statistics.chunk_count,
+            typename=typename,
+        )
+
+    @activity.defn
+    @auto_heartbeater
+    async def fetch_databases(
+        self, workflow_args: Dict[str, Any]
+    ) -> Optional[ActivityStatistics]:
+        """
+        Fetch the catalog of the connection, unless capability probing skips
+        it, or every selected catalog with ``"multi-catalog-extraction"``.
+        """
+        if is_multi_catalog_extraction(workflow_args):
+            return await self.fetch_catalogs(
+                workflow_args, self.fetch_database_catalog_sql, typename="database"
+            )
+        sql_client = await self._get_sql_client(workflow_args)
+        if await self.get_skipped_catalogs(
+            workflow_args,
+            [sql_client.get_catalog_name()],
+            get_typename_relations(workflow_args, "database"),
+        ):
+            return None
+        return await super().fetch_databases(workflow_args)
+
+    @activity.defn
+    @auto_heartbeater
+    async def fetch_schemas(
+        self, workflow_args: Dict[str, Any]
+    ) -> Optional[ActivityStatistics]:
+        """
+        Fetch the schemas selected by the workflow filters.
+        """
+        return await self.fetch_query(
+            workflow_args,
+            query=self.fetch_schema_sql,
+            temp_table_regex_sql=None,
+            typename="schema",
+            include_schemas_sql=self.extract_include_schemas_sql,
+        )
+
+    @activity.defn
+    @checkpoint_heartbeater
+    async def fetch_tables(
+        self, workflow_args: Dict[str, Any]
+    ) -> Optional[ActivityStatistics]:
+        """
+        Fetch tables, either across all catalogs or for a single partition.
+
+        Monolithic extraction is resumable with ``"resumable-extraction"``.
+        Deferred view definitions are fetched once the tables are written.
+        """
+        output_suffix = "raw/table"
+        if "partition" in workflow_args:
+            output_suffix = (
+                f"{output_suffix}/{get_partition_path(workflow_args['partition'])}"
+            )
+
+        if "partition" not in workflow_args and is_resumable_extraction(workflow_args):
+            statistics = await self.fetch_partitions_resumably(
+                workflow_args,
+                query=self.fetch_table_partition_sql,
+                temp_table_regex_sql=self.extract_temp_table_regex_table_sql,
+                typename="table",
+                include_schemas_sql=self.extract_include_schemas_sql,
+            )
+        else:
+            if "partition" in workflow_args:
+                query = self.fetch_table_partition_sql
+            else:
+                query = self.get_fetch_table_sql(workflow_args)
+
+            statistics = await self.fetch_query(
+                workflow_args,
+                query=query,
+                temp_table_regex_sql=self.extract_temp_table_regex_table_sql,
+                typename="table",
+                include_schemas_sql=self.extract_include_schemas_sql,
+            )
+
+        if is_deferred_view_definitions(workflow_args):
+            await self.fetch_view_definitions(workflow_args, output_suffix, statistics)
+        return statistics
+
+    @activity.defn
+    @checkpoint_heartbeater
+    async def fetch_columns(
+        self, workflow_args: Dict[str, Any]
+    ) -> Optional[ActivityStatistics]:
+        """
+        Fetch columns, either across all catalogs or for a single partition.
+
+        Monolithic extraction is resumable with ``"resumable-extraction"``.
+        """
+        resumable = "partition" not in workflow_args and is_resumable_extraction(
+            workflow_args
+        )
+        include_schemas_sql = self.extract_include_schemas_sql
+        if await self.use_system_jdbc_columns(workflow_args):
+            include_schemas_sql = self.extract_include_schemas_system_jdbc_sql
+            if "partition" in workflow_args or resumable:
+                query = self.fetch_column_partition_system_jdbc_sql
+            else:
+                query = self.fetch_column_system_jdbc_sql
+        elif "partition" in workflow_args or resumable:
+            query = self.fetch_column_partition_sql
+        else:
+            query = self.fetch_column_sql
+
+        if resumable:
+            return await self.fetch_partitions_resumably(
+                workflow_args,
+                query=query,
+                temp_table_regex_sql=self.extract_temp_table_regex_column_sql,
+                typename="column",
+                include_schemas_sql=include_schemas_sql,
+            )
+        return await self.fetch_query(
+            workflow_args,
+            query=query,
+            temp_table_regex_sql=self.extract_temp_table_regex_column_sql,
+            typename="column",
+            include_schemas_sql=include_schemas_sql,
+        )
+
+    @activity.defn
+    @auto_heartbeater
+    async def fetch_procedures(
+        self, workflow_args: Dict[str, Any]
+    ) -> Optional[ActivityStatistics]:
+        """
+        Fetch the procedures of the schemas selected by the workflow filters,
+        in every selected catalog with ``"multi-catalog-extraction"``.
+        """
+        if is_multi_catalog_extraction(workflow_args):
+            return await self.fetch_catalogs(
+                workflow_args, self.fetch_procedure_catalog_sql, typename="procedure"
+            )
+        return await self.fetch_query(
+            workflow_args,
+            query=self.fetch_procedure_sql,
+            temp_table_regex_sql=None,
+            typename="procedure",
+        )
+
+    def get_template_projection(
+        self, transformer: Any, typename: str
+    ) -> Tuple[Optional[Set[str]], Optional[Set[str]]]:
+        """
+        Return the raw columns the template of a typename refers to, and the
+        pruned NULL columns among them, or None for a transformer without
+        templates.
+        """
+        if not isinstance(transformer, QueryBasedTransformer):
+            return None, None
+        template_path = transformer.entity_class_definitions.get(typename.upper())
+        if not template_path:
+            return None, None
+        columns = get_template_columns(template_path)
+        return columns, columns & NULL_COLUMNS.get(typename, set())
+
+    def get_transform_args(self, workflow_args: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Return the workflow arguments the transformer is called with, with the
+        name and qualified name of the connection.
+        """
+        connection = workflow_args.get("connection", {})
+        return {
+            **workflow_args,
+            "connection_name": connection.get("connection_name", None),
+            "connection_qualified_name": connection.get(
+                "connection_qualified_name", None
+            ),
+        }
+
+    @activity.defn
+    @auto_heartbeater
+    async def transform_data(self, workflow_args: Dict[str, Any]) -> ActivityStatistics:
+        """
+        Transform raw chunks, reading only the columns the template of the
+        typename refers to. Pruned NULL columns the template refers to are
+        filled back in, and so are deferred view definitions. Every chunk is
+        traced with a ``transform_chunk`` span.
+        """
+        state = cast(
+            BaseSQLMetadataExtractionActivitiesState,
+            await self._get_state(workflow_args),
+        )
+        output_prefix, output_path, typename, workflow_id, workflow_run_id = (
+            self._validate_output_args(workflow_args)
+        )
+
+        columns, null_columns = self.get_template_projection(
+            state.transformer, typename
+        )
+
+        view_index: Optional[Dict[ViewKey, str]] = None
+        definitions: Dict[str, str] = {}
+        if typename == "table" and is_deferred_view_definitions(workflow_args):
+            view_index = {}
+            for directory in sorted(
+                {
+                    os.path.dirname(file_name)
+                    for file_name in workflow_args.get("file_names") or []
+                }
+            ):
+                view_index.update(
+                    read_index(
+                        output_prefix, os.path.join(output_path, "raw", directory)
+                    )
+                )
+
+        raw_input = ParquetInput(
+            path=os.path.join(output_path, "raw"),
+            input_prefix=output_prefix,
+            file_names=workflow_args.get("file_names"),
+            chunk_size=None,
+            columns=columns,
+            null_columns=null_columns,
+        )
+        transformed_output = JsonOutput(
+            output_prefix=output_prefix,
+            output_path=output_path,
+            output_suffix="transformed",
+            typename=typename,
+            chunk_start=workflow_args.get("chunk_start"),
+        )
+        if state.transformer:
+            transform_args = self.get_transform_args(workflow_args)
+            chunk = 0
+            async for dataframe in raw_input.get_batched_daft_dataframe():
+                if is_empty_dataframe(dataframe):
+                    continue
+                chunk += 1
+                with span(
+                    "transform_chunk",
+                    workflow_run_id,
+                    {"typename": typename, "chunk": chunk},
+                ) as attributes:
+                    records = transformed_output.total_record_count
+                    if view_index is not None:
+                        dataframe = add_view_definitions(
+                            dataframe,
+                            get_definitions(
+                                output_prefix,
+                                view_index,
+                                get_view_keys(dataframe),
+                                definitions,
+                            ),
+                        )
+                    transformed = state.transformer.transform_metadata(
+                        dataframe=dataframe, **transform_args
+                    )
+                    await transformed_output.write_daft_dataframe(transformed)
+                    attributes["rows"] = transformed_output.total_record_count - records
+        return await transformed_output.get_statistics()
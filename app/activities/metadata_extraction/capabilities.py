@@ -0,0 +1,149 @@
+"""Probed capabilities of the catalogs of a connection.
+
+Presto connectors differ in the ``information_schema`` relations they can
+list: some fail on ``routines`` or ``views``, some only answer after minutes.
+Before extracting from a catalog, every relation its queries read is probed
+with ``probe_information_schema.sql``. Whether the probe succeeded and how
+long it took are kept per connection in the state store and trusted for
+``CAPABILITY_CACHE_TTL`` seconds, so later runs skip the unsupported or slow
+catalog/relation pairs without querying them.
+"""
+
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from application_sdk.inputs.statestore import StateStoreInput
+from application_sdk.observability.logger_adaptor import get_logger
+from application_sdk.outputs.statestore import StateStoreOutput
+
+from app.clients import SQLClient
+from app.common.observability import QueryObservation
+from app.common.utils import is_deferred_view_definitions
+
+logger = get_logger(__name__)
+
+#: information_schema relations read by the extraction queries of every
+#: typename
+TYPENAME_RELATIONS = {
+    "database": ("schemata",),
+    "schema": ("schemata",),
+    "table": ("tables", "columns", "views"),
+    "column": ("columns",),
+    "procedure": ("routines",),
+}
+
+
+def get_typename_relations(
+    workflow_args: Dict[str, Any], typename: str
+) -> Tuple[str, ...]:
+    """
+    Return the ``information_schema`` relations read by the extraction query
+    of ``typename``. Table queries do not read ``views`` when view
+    definitions are deferred, see
+    :func:`app.common.utils.remove_view_definitions`.
+    """
+    relations = TYPENAME_RELATIONS.get(typename, ())
+    if typename == "table" and is_deferred_view_definitions(workflow_args):
+        relations = tuple(relation for relation in relations if relation != "views")
+    return relations
+
+
+#: Probed capabilities of every relation of every catalog
+Capabilities = Dict[str, Dict[str, "Capability"]]
+
+
+@dataclass
+class Capability:
+    """Outcome of the probe of one relation of a catalog."""
+
+    supported: bool
+    seconds: float
+    checked_at: float
+
+    def is_usable(self, slow_probe_seconds: float) -> bool:
+        """Whether the relation is supported and fast enough to be extracted."""
+        return self.supported and self.seconds <= slow_probe_seconds
+
+    def is_expired(self, now: float, ttl: float) -> bool:
+        """Whether the probe is older than ``ttl`` seconds."""
+        return now - self.checked_at > ttl
+
+
+def load_capabilities(key: str) -> Capabilities:
+    """
+    Load the capabilities stored under ``key``, or none if there are none or
+    they cannot be read.
+    """
+    try:
+        state = StateStoreInput.get_state(key)
+    except Exception as e:
+        logger.info(f"No probed capabilities for {key}: {e}")
+        return {}
+    try:
+        return {
+            catalog_name: {
+                relation: Capability(**capability)
+                for relation, capability in relations.items()
+            }
+            for catalog_name, relations in state.get("catalogs", {}).items()
+        }
+    except TypeError as e:
+        logger.warning(f"Ignoring unreadable capabilities of {key}: {e}")
+        return {}
+
+
+def save_capabilities(key: str, capabilities: Capabilities) -> None:
+    """Store capabilities under ``key``."""
+    StateStoreOutput.save_state(
+        key,
+        {
+            "catalogs": {
+                catalog_name: {
+                    relation: asdict(capability)
+                    for relation, capability in relations.items()
+                }
+                for catalog_name, relations in capabilities.items()
+            }
+        },
+    )
+
+
+async def probe_capability(
+    sql_client: SQLClient,
+    query: str,
+    timeout: float,
+    observation: Optional[QueryObservation] = None,
+) -> Capability:
+    """
+    Run a probe query, recording whether it succeeded within ``timeout``
+    seconds and how long it took.
+
+    A probe past its timeout is cancelled on the coordinator and its
+    connection closed before this returns, so a slow probe does not keep
+    running, or holding a connection, after it has been recorded as
+    unsupported.
+    """
+
+    async def run() -> None:
+        async for _ in sql_client.run_query_batches(
+            query, batch_size=1, observation=observation
+        ):
+            pass
+
+    started = time.monotonic()
+    try:
+        await asyncio.wait_for(run(), timeout)
+        supported = True
+    except asyncio.TimeoutError:
+        logger.warning(f"Capability probe timed out after {timeout}s")
+        supported = False
+    except Exception as e:
+        logger.info(f"Capability probe failed: {e}")
+        supported = False
+    return Capability(
+        supported=supported,
+        seconds=time.monotonic() - started,
+        checked_at=time.time(),
+    )
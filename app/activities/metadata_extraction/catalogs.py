@@ -0,0 +1,115 @@
+"""Multi-catalog extraction of databases and procedures.
+
+The SDK extracts the databases and procedures of the catalog of the
+connection only. With ``"multi-catalog-extraction"``, a catalog-qualified
+query runs for every catalog selected by the workflow filters instead,
+several of them concurrently on the pooled connections of the client, and
+their batches are merged into the monolithic raw output of the typename.
+"""
+
+from functools import partial
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from application_sdk.activities.common.models import ActivityStatistics
+from application_sdk.observability.logger_adaptor import get_logger
+
+from app.activities.metadata_extraction.capabilities import get_typename_relations
+from app.activities.metadata_extraction.queries import QUERY_FILES
+from app.common.observability import QueryObservation
+from app.common.utils import get_fetch_format
+from app.constants import MAX_CONCURRENT_CATALOGS, SPILL_DIRECTORY, STREAMING_BATCH_SIZE
+from app.outputs.spill import merge_tables, write_buffered
+
+if TYPE_CHECKING:
+    from app.activities.metadata_extraction import SQLMetadataExtractionActivities
+
+logger = get_logger(__name__)
+
+
+class MultiCatalogExtractionMixin:
+    """Extraction of every selected catalog for the activities."""
+
+    async def fetch_catalogs(
+        self: "SQLMetadataExtractionActivities",
+        workflow_args: Dict[str, Any],
+        query: Optional[str],
+        typename: str,
+    ) -> Optional[ActivityStatistics]:
+        """
+        Stream a catalog-qualified query for every catalog selected by the
+        workflow filters into the monolithic raw output of the typename.
+
+        At most ``max-concurrent-catalogs`` queries run at a time, each on its
+        own pooled connection of the client, and their batches are written in
+        the order they arrive, see :func:`app.outputs.spill.merge_tables`.
+        """
+        if not query:
+            logger.warning("Query is empty, skipping execution.")
+            return None
+        metadata = workflow_args.get("metadata", {})
+        batch_size = int(metadata.get("streaming-batch-size") or STREAMING_BATCH_SIZE)
+        fetch_format = get_fetch_format(workflow_args)
+        max_concurrent_catalogs = int(
+            metadata.get("max-concurrent-catalogs") or MAX_CONCURRENT_CATALOGS
+        )
+
+        sql_client = await self._get_sql_client(workflow_args)
+        catalog_names = {
+            partition["catalog_name"]
+            for partition in await self.list_partitions(workflow_args)
+        }
+        catalog_names -= await self.get_skipped_catalogs(
+            workflow_args,
+            catalog_names,
+            get_typename_relations(workflow_args, typename),
+        )
+        get_tables = (
+            self.get_arrow_tables
+            if fetch_format == "arrow"
+            else self.get_dataframe_tables
+        )
+        catalog_tables = [
+            partial(
+                get_tables,
+                sql_client,
+                self.prepare_extraction_query(
+                    workflow_args,
+                    query,
+                    temp_table_regex_sql=None,
+                    typename=typename,
+                    catalog_name=catalog_name,
+                )
+                or "",
+                typename,
+                batch_size,
+                QueryObservation(
+                    sql_file=QUERY_FILES.get(query, "unknown"),
+                    catalog=catalog_name,
+                    trace_id=workflow_args.get("workflow_run_id"),
+                ),
+            )
+            for catalog_name in sorted(catalog_names)
+        ]
+
+        parquet_output = self.get_parquet_output(
+            workflow_args, f"raw/{typename}", batch_size
+        )
+        await write_buffered(
+            merge_tables(catalog_tables, max_concurrent_catalogs),
+            (
+                parquet_output.write_arrow_table
+                if fetch_format == "arrow"
+                else lambda table: parquet_output.write_arrow_table(
+                    table, source="pandas"
+                )
+            ),
+            self.get_memory_budget(workflow_args),
+            directory=SPILL_DIRECTORY,
+            labels={"typename": typename},
+        )
+
+        logger.info(
+            f"Extracted {parquet_output.total_record_count} {typename} records "
+            f"of {len(catalog_names)} catalogs in {parquet_output.chunk_count} chunks"
+        )
+        return await parquet_output.get_statistics(typename=typename)
@@ -0,0 +1,134 @@
+"""Heartbeat checkpoints of long running extraction activities.
+
+Temporal keeps the details of the last heartbeat of an activity attempt and
+hands them to the next attempt. An activity decorated with
+:func:`checkpoint_heartbeater` saves a :class:`Checkpoint` of its progress
+with :func:`save_checkpoint`, which is sent with every later heartbeat, and
+a retried attempt loads it with :func:`load_checkpoint` to skip the work
+that was already done.
+
+``auto_heartbeater`` heartbeats without details, which would drop the
+checkpoint of the previous attempt, so checkpointed activities must not use
+it.
+"""
+
+import asyncio
+import hashlib
+import json
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import timedelta
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar, cast
+
+from application_sdk.observability.logger_adaptor import get_logger
+from temporalio import activity
+
+logger = get_logger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+# Heartbeat details of the running activity, shared with its heartbeat task
+_heartbeat_details: ContextVar[Optional[Dict[str, Any]]] = ContextVar(
+    "heartbeat_details", default=None
+)
+
+
+@dataclass
+class Checkpoint:
+    """
+    Progress of an extraction activity.
+
+    ``completed`` lists the completed units of work, e.g. partition paths.
+    The output holds chunks ``1`` to ``chunk_count`` with
+    ``total_record_count`` records; chunks written after the checkpoint are
+    overwritten when the work is resumed.
+    """
+
+    key: str
+    completed: List[str] = field(default_factory=list)
+    chunk_count: int = 0
+    total_record_count: int = 0
+
+
+def get_checkpoint_key(*parts: Any) -> str:
+    """Return a key identifying the work described by ``parts``."""
+    content = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def load_checkpoint(key: str) -> Checkpoint:
+    """
+    Return the checkpoint of the previous attempt of the activity, or an
+    empty checkpoint if there is none or it was saved for other work.
+    """
+    if not activity.in_activity():
+        return Checkpoint(key=key)
+    for details in activity.info().heartbeat_details[:1]:
+        if isinstance(details, dict) and details.get("key") == key:
+            try:
+                return Checkpoint(**details)
+            except TypeError as e:
+                logger.warning(f"Ignoring invalid checkpoint {details}: {e}")
+    return Checkpoint(key=key)
+
+
+def save_checkpoint(checkpoint: Checkpoint) -> None:
+    """
+    Heartbeat a checkpoint now and with every later heartbeat of the
+    activity.
+    """
+    details = _heartbeat_details.get()
+    if details is not None:
+        details["checkpoint"] = asdict(checkpoint)
+    if activity.in_activity():
+        activity.heartbeat(asdict(checkpoint))
+
+
+async def send_checkpoint_heartbeat(delay: float, details: Dict[str, Any]) -> None:
+    """Heartbeat the latest checkpoint every ``delay`` seconds."""
+    while True:
+        await asyncio.sleep(delay)
+        checkpoint = details.get("checkpoint")
+        if checkpoint is None:
+            activity.heartbeat()
+        else:
+            activity.heartbeat(checkpoint)
+
+
+def checkpoint_heartbeater(fn: F) -> F:
+    """
+    Heartbeat like ``auto_heartbeater``, with the latest checkpoint.
+
+    Until the activity saves a checkpoint, the checkpoint of the previous
+    attempt is sent, so an attempt that fails before its first checkpoint
+    does not lose it.
+    """
+
+    @wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any):
+        heartbeat_timeout = timedelta(seconds=120)
+        details: Dict[str, Any] = {}
+        if activity.in_activity():
+            info = activity.info()
+            heartbeat_timeout = info.heartbeat_timeout or heartbeat_timeout
+            if info.heartbeat_details:
+                details["checkpoint"] = info.heartbeat_details[0]
+
+        token = _heartbeat_details.set(details)
+        heartbeat_task = None
+        if activity.in_activity():
+            heartbeat_task = asyncio.create_task(
+                send_checkpoint_heartbeat(
+                    heartbeat_timeout.total_seconds() / 3, details
+                )
+            )
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            _heartbeat_details.reset(token)
+            if heartbeat_task:
+                heartbeat_task.cancel()
+                await asyncio.wait([heartbeat_task])
+
+    return cast(F, wrapper)
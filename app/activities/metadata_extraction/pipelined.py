@@ -0,0 +1,179 @@
+"""Pipelined extraction, transforming chunks as soon as they are written.
+
+With ``"pipelined-extraction"``, streamed extraction does not leave the raw
+chunks to transform activities scheduled after it. Fetching a batch, writing
+it as a raw chunk, transforming it and writing the transformed chunk run as
+concurrent stages of :func:`app.outputs.pipeline.run_pipeline`, so the
+transformation of a chunk overlaps with the fetch of the next ones. The
+statistics of the raw output are then returned as
+:class:`PipelinedStatistics`, which tell the workflow the chunks are already
+transformed.
+"""
+
+import asyncio
+from typing import TYPE_CHECKING, Any, Dict, Optional, cast
+
+from application_sdk.activities.common.models import ActivityStatistics
+from application_sdk.activities.metadata_extraction.sql import (
+    BaseSQLMetadataExtractionActivitiesState,
+)
+from application_sdk.observability.logger_adaptor import get_logger
+from application_sdk.outputs.json import JsonOutput
+
+from app.clients import SQLClient
+from app.common.observability import QueryObservation, span
+from app.common.utils import get_fetch_format, get_partition_chunk_prefix
+from app.constants import PIPELINE_QUEUE_SIZE
+from app.inputs import project
+from app.outputs.pipeline import run_pipeline
+
+if TYPE_CHECKING:
+    import daft
+    import pyarrow as pa
+
+    from app.activities.metadata_extraction import SQLMetadataExtractionActivities
+
+logger = get_logger(__name__)
+
+
+class PipelinedStatistics(ActivityStatistics):
+    """
+    Statistics of the raw output of an extraction whose chunks were also
+    transformed by the extraction activity, so the workflow does not
+    schedule transform activities for them.
+    """
+
+    transformed: bool = True
+
+
+class PipelinedExtractionMixin:
+    """Pipelined query executor of the metadata extraction activities."""
+
+    async def pipelined_query_executor(
+        self: "SQLMetadataExtractionActivities",
+        sql_client: SQLClient,
+        sql_query: Optional[str],
+        workflow_args: Dict[str, Any],
+        output_suffix: str,
+        typename: str,
+        batch_size: int,
+        fetch_format: Optional[str] = None,
+        observation: Optional[QueryObservation] = None,
+    ) -> Optional[ActivityStatistics]:
+        """
+        Stream a query into Parquet chunks like
+        ``SQLMetadataExtractionActivities.streaming_query_executor`` and
+        transform every chunk as soon as it is written.
+
+        Fetching, writing the raw chunk, transforming it and writing the
+        transformed chunk run as concurrent stages, with at most
+        ``pipeline-queue-size`` batches waiting between two of them, see
+        :func:`app.outputs.pipeline.run_pipeline`. Transformations run in a
+        worker thread, so they overlap with the fetch. Transformed chunks of
+        a partition are prefixed with :func:`get_partition_chunk_prefix`, so
+        partitions transformed concurrently never overwrite each other's.
+        Without a transformer, the query is only streamed.
+        """
+        if not sql_query:
+            logger.warning("Query is empty, skipping execution.")
+            return None
+        fetch_format = get_fetch_format(workflow_args, fetch_format)
+
+        state = cast(
+            BaseSQLMetadataExtractionActivitiesState,
+            await self._get_state(workflow_args),
+        )
+        transformer = state.transformer
+        if not transformer:
+            return await self.streaming_query_executor(
+                sql_client,
+                sql_query,
+                workflow_args,
+                output_suffix,
+                typename,
+                batch_size,
+                fetch_format,
+                observation,
+            )
+
+        metadata = workflow_args.get("metadata", {})
+        max_queued = int(metadata.get("pipeline-queue-size") or PIPELINE_QUEUE_SIZE)
+        workflow_run_id = workflow_args.get("workflow_run_id")
+        columns, null_columns = self.get_template_projection(transformer, typename)
+        transform_args = {
+            **self.get_transform_args(workflow_args),
+            "typename": typename,
+        }
+
+        parquet_output = self.get_parquet_output(
+            workflow_args, output_suffix, batch_size
+        )
+        partition = workflow_args.get("partition")
+        chunk_prefix = get_partition_chunk_prefix(partition) if partition else None
+
+        def get_chunk_path(chunk_start: Optional[int], chunk_count: int) -> str:
+            if chunk_prefix is None:
+                return f"{chunk_count}.json"
+            return f"{chunk_prefix}-{chunk_count}.json"
+
+        transformed_output = JsonOutput(
+            output_prefix=workflow_args["output_prefix"],
+            output_path=workflow_args["output_path"],
+            output_suffix="transformed",
+            typename=typename,
+            path_gen=get_chunk_path,
+        )
+
+        source = "arrow" if fetch_format == "arrow" else "pandas"
+        get_tables = (
+            self.get_arrow_tables
+            if fetch_format == "arrow"
+            else self.get_dataframe_tables
+        )
+        chunks = 0
+
+        async def write_raw(table: "pa.Table") -> "pa.Table":
+            await parquet_output.write_arrow_table(table, source=source)
+            return table
+
+        def transform(table: "pa.Table") -> Optional["daft.DataFrame"]:
+            import daft
+
+            nonlocal chunks
+            if table.num_rows == 0:
+                return None
+            chunks += 1
+            with span(
+                "transform_chunk",
+                workflow_run_id,
+                {"typename": typename, "chunk": chunks},
+            ) as attributes:
+                dataframe = project(daft.from_arrow(table), columns, null_columns)
+                transformed = transformer.transform_metadata(
+                    dataframe=dataframe, **transform_args
+                ).collect()
+                attributes["rows"] = len(transformed)
+            return transformed
+
+        async def write_transformed(dataframe: Optional["daft.DataFrame"]) -> None:
+            if dataframe is not None:
+                await transformed_output.write_daft_dataframe(dataframe)
+
+        loop = asyncio.get_running_loop()
+        await run_pipeline(
+            get_tables(sql_client, sql_query, typename, batch_size, observation),
+            [
+                write_raw,
+                lambda table: loop.run_in_executor(None, transform, table),
+                write_transformed,
+            ],
+            max_queued,
+        )
+
+        logger.info(
+            f"Streamed and transformed {parquet_output.total_record_count} "
+            f"{typename} records in {parquet_output.chunk_count} chunks"
+        )
+        await transformed_output.get_statistics(typename=typename)
+        statistics = await parquet_output.get_statistics(typename=typename)
+        return PipelinedStatistics(**statistics.model_dump())
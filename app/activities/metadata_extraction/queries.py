@@ -0,0 +1,28 @@
+"""SQL queries of the metadata extraction activities.
+
+The queries are read once, from ``SQL_QUERIES_PATH``, and shared by the
+activities and their submodules.
+"""
+
+from application_sdk.common.utils import read_sql_files
+from application_sdk.constants import SQL_QUERIES_PATH
+
+from app.common.utils import get_null_columns
+
+queries = read_sql_files(queries_prefix=SQL_QUERIES_PATH)
+
+# Constant NULL columns of the extraction queries of every typename. They are
+# pruned from the queries and filled back in when raw chunks are transformed.
+NULL_COLUMNS = {
+    typename: set().union(
+        *(
+            get_null_columns(query)
+            for name, query in queries.items()
+            if name.startswith(f"EXTRACT_{typename.upper()}")
+        )
+    )
+    for typename in ("database", "schema", "table", "column", "procedure")
+}
+
+# SQL file of every query, the ``sql_file`` label of its metrics and spans.
+QUERY_FILES = {query: f"{name.lower()}.sql" for name, query in queries.items()}
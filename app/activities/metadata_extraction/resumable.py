@@ -0,0 +1,119 @@
+"""Resumable monolithic extraction.
+
+With ``"resumable-extraction"``, monolithic table and column extraction runs
+the partition query of every catalog/schema in turn instead of one query
+over all of them, and heartbeats a checkpoint after each partition, see
+:mod:`app.activities.metadata_extraction.checkpoint`. A retried attempt
+resumes after the last completed partition instead of starting over.
+"""
+
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from application_sdk.activities.common.models import ActivityStatistics
+from application_sdk.observability.logger_adaptor import get_logger
+
+from app.activities.metadata_extraction.capabilities import get_typename_relations
+from app.activities.metadata_extraction.checkpoint import (
+    get_checkpoint_key,
+    load_checkpoint,
+    save_checkpoint,
+)
+from app.activities.metadata_extraction.queries import QUERY_FILES
+from app.common.observability import QueryObservation
+from app.common.utils import get_fetch_format, get_partition_path
+from app.constants import STREAMING_BATCH_SIZE
+
+if TYPE_CHECKING:
+    from app.activities.metadata_extraction import SQLMetadataExtractionActivities
+
+logger = get_logger(__name__)
+
+
+class ResumableExtractionMixin:
+    """Checkpointed partition by partition extraction of the activities."""
+
+    async def fetch_partitions_resumably(
+        self: "SQLMetadataExtractionActivities",
+        workflow_args: Dict[str, Any],
+        query: Optional[str],
+        temp_table_regex_sql: Optional[str],
+        typename: str,
+        include_schemas_sql: Optional[str] = None,
+    ) -> Optional[ActivityStatistics]:
+        """
+        Stream a partition query for every catalog/schema partition into the
+        monolithic raw output of the typename, checkpointing after every
+        partition.
+
+        The checkpoint lists the completed partitions and the chunks and
+        records written for them. A retried attempt skips the completed
+        partitions and numbers its chunks after theirs. Results of the
+        monolithic queries are not ordered, so the work is only resumed at
+        partition boundaries.
+        """
+        if not query:
+            logger.warning("Query is empty, skipping execution.")
+            return None
+        metadata = workflow_args.get("metadata", {})
+        batch_size = int(metadata.get("streaming-batch-size") or STREAMING_BATCH_SIZE)
+        fetch_format = get_fetch_format(workflow_args)
+
+        sql_client = await self._get_sql_client(workflow_args)
+        partitions = await self.list_partitions(workflow_args)
+        skipped = await self.get_skipped_catalogs(
+            workflow_args,
+            {partition["catalog_name"] for partition in partitions},
+            get_typename_relations(workflow_args, typename),
+        )
+        checkpoint = load_checkpoint(
+            get_checkpoint_key(typename, query, metadata, workflow_args["output_path"])
+        )
+        parquet_output = self.get_parquet_output(
+            workflow_args, f"raw/{typename}", batch_size
+        )
+        parquet_output.chunk_count = checkpoint.chunk_count
+        parquet_output.total_record_count = checkpoint.total_record_count
+        if checkpoint.completed:
+            logger.info(
+                f"Resuming {typename} extraction after {len(checkpoint.completed)} "
+                f"of {len(partitions)} partitions"
+            )
+
+        completed = set(checkpoint.completed)
+        for partition in partitions:
+            partition_path = get_partition_path(partition)
+            if partition_path in completed or partition["catalog_name"] in skipped:
+                continue
+            prepared_query = self.prepare_extraction_query(
+                workflow_args,
+                query,
+                temp_table_regex_sql,
+                include_schemas_sql,
+                partition,
+                typename,
+            )
+            if prepared_query:
+                await self.write_query_batches(
+                    parquet_output,
+                    sql_client,
+                    prepared_query,
+                    typename,
+                    batch_size,
+                    fetch_format,
+                    QueryObservation(
+                        sql_file=QUERY_FILES.get(query, "unknown"),
+                        catalog=partition["catalog_name"],
+                        trace_id=workflow_args.get("workflow_run_id"),
+                    ),
+                    max_buffer_bytes=self.get_memory_budget(workflow_args),
+                )
+            checkpoint.completed.append(partition_path)
+            checkpoint.chunk_count = parquet_output.chunk_count
+            checkpoint.total_record_count = parquet_output.total_record_count
+            save_checkpoint(checkpoint)
+
+        logger.info(
+            f"Extracted {parquet_output.total_record_count} {typename} records "
+            f"of {len(partitions)} partitions in {parquet_output.chunk_count} chunks"
+        )
+        return await parquet_output.get_statistics(typename=typename)
@@ -0,0 +1,273 @@
+"""Deferred view definitions, stored once per content hash.
+
+When view definitions are deferred, table extraction leaves the
+``view_definition`` column out and the definitions of the extracted views are
+fetched afterwards, one query per batch of schemas that have views. Every
+definition is written to ``view_definitions/<sha256>.sql`` under the output
+prefix, a path that only depends on its content, so a definition shared by
+many views or unchanged between runs is stored once. Next to the raw table
+chunks, ``view_definitions.json`` maps every view to the hash of its
+definition, and the transform step joins the definitions back in.
+"""
+
+import hashlib
+import json
+import os
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+
+from application_sdk.activities.common.models import ActivityStatistics
+from application_sdk.inputs.objectstore import ObjectStoreInput
+from application_sdk.observability.logger_adaptor import get_logger
+from application_sdk.outputs.objectstore import ObjectStoreOutput
+
+from app.activities.metadata_extraction.queries import QUERY_FILES
+from app.common.observability import QueryObservation
+from app.common.utils import prepare_query, quote_identifier, quote_literal_list
+from app.constants import STREAMING_BATCH_SIZE, VIEW_DEFINITION_SCHEMA_BATCH_SIZE
+from app.inputs import ParquetInput
+
+if TYPE_CHECKING:
+    import daft
+
+    from app.activities.metadata_extraction import SQLMetadataExtractionActivities
+
+logger = get_logger(__name__)
+
+#: Name of the file mapping the views of a raw table output to their hashes
+INDEX_FILE_NAME = "view_definitions.json"
+
+# Raw table columns identifying a view
+VIEW_KEY_COLUMNS = ("table_catalog", "table_schema", "table_name")
+
+ViewKey = Tuple[str, str, str]
+
+
+def get_definition_hash(definition: str) -> str:
+    """Return the content hash of a view definition."""
+    return hashlib.sha256(definition.encode()).hexdigest()
+
+
+def get_definition_path(output_prefix: str, definition_hash: str) -> str:
+    """Return the local path of a stored view definition."""
+    return os.path.join(output_prefix, "view_definitions", f"{definition_hash}.sql")
+
+
+async def store_definition(output_prefix: str, definition: str) -> str:
+    """
+    Store a view definition under its content hash, unless this worker
+    stored it already.
+
+    Returns:
+        str: The content hash of the definition.
+    """
+    definition_hash = get_definition_hash(definition)
+    path = get_definition_path(output_prefix, definition_hash)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as definition_file:
+            definition_file.write(definition)
+        await ObjectStoreOutput.push_file_to_object_store(output_prefix, path)
+    return definition_hash
+
+
+def read_definition(output_prefix: str, definition_hash: str) -> str:
+    """Read a stored view definition, downloading it if needed."""
+    path = get_definition_path(output_prefix, definition_hash)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        ObjectStoreInput.download_file_from_object_store(output_prefix, path)
+    with open(path) as definition_file:
+        return definition_file.read()
+
+
+def get_definitions(
+    output_prefix: str,
+    index: Dict[ViewKey, str],
+    keys: List[ViewKey],
+    cache: Dict[str, str],
+) -> Dict[ViewKey, str]:
+    """
+    Return the definitions of the views ``keys`` listed in an index.
+
+    Every distinct definition is read once and kept in ``cache``, keyed on
+    its content hash.
+    """
+    definitions = {}
+    for key in keys:
+        definition_hash = index.get(key)
+        if definition_hash is None:
+            continue
+        if definition_hash not in cache:
+            cache[definition_hash] = read_definition(output_prefix, definition_hash)
+        definitions[key] = cache[definition_hash]
+    return definitions
+
+
+async def write_index(
+    output_prefix: str, directory: str, index: Dict[ViewKey, str]
+) -> None:
+    """Write the view definition index of a raw table output directory."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, INDEX_FILE_NAME)
+    with open(path, "w") as index_file:
+        json.dump(
+            {"views": [[*key, value] for key, value in sorted(index.items())]},
+            index_file,
+        )
+    await ObjectStoreOutput.push_file_to_object_store(output_prefix, path)
+
+
+def read_index(output_prefix: str, directory: str) -> Dict[ViewKey, str]:
+    """
+    Read the view definition index of a raw table output directory,
+    downloading it if needed. A directory without an index has no views.
+    """
+    path = os.path.join(directory, INDEX_FILE_NAME)
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        try:
+            ObjectStoreInput.download_file_from_object_store(output_prefix, path)
+        except Exception as e:
+            logger.info(f"No view definitions for {directory}: {e}")
+            return {}
+    with open(path) as index_file:
+        views = json.load(index_file)["views"]
+    return {(catalog, schema, table): value for catalog, schema, table, value in views}
+
+
+def get_view_keys(dataframe: "daft.DataFrame") -> List[ViewKey]:
+    """Return the catalog, schema and name of the views of a raw table chunk."""
+    import daft
+
+    columns = {column.lower(): column for column in dataframe.column_names}
+    if not all(name in columns for name in (*VIEW_KEY_COLUMNS, "table_type")):
+        return []
+    views = (
+        dataframe.where(daft.col(columns["table_type"]) == "VIEW")
+        .select(*(columns[name] for name in VIEW_KEY_COLUMNS))
+        .to_pydict()
+    )
+    return list(zip(*(views[columns[name]] for name in VIEW_KEY_COLUMNS)))
+
+
+def add_view_definitions(
+    dataframe: "daft.DataFrame", definitions: Dict[ViewKey, Optional[str]]
+) -> "daft.DataFrame":
+    """
+    Replace the ``view_definition`` column of a raw table chunk with the
+    given definitions, None for tables without one.
+    """
+    import daft
+
+    columns = {column.lower(): column for column in dataframe.column_names}
+    if "view_definition" in columns:
+        dataframe = dataframe.exclude(columns["view_definition"])
+    if not definitions or not all(name in columns for name in VIEW_KEY_COLUMNS):
+        return dataframe.with_column(
+            "view_definition", daft.lit(None).cast(daft.DataType.string())
+        )
+
+    keys = list(definitions)
+    views: Dict[str, List[Any]] = {
+        columns[name]: [key[i] for key in keys]
+        for i, name in enumerate(VIEW_KEY_COLUMNS)
+    }
+    views["view_definition"] = [definitions[key] for key in keys]
+    return dataframe.join(
+        daft.from_pydict(views),
+        on=[columns[name] for name in VIEW_KEY_COLUMNS],
+        how="left",
+    )
+
+
+class ViewDefinitionsMixin:
+    """Deferred view definition fetching of the activities."""
+
+    async def fetch_view_definitions(
+        self: "SQLMetadataExtractionActivities",
+        workflow_args: Dict[str, Any],
+        output_suffix: str,
+        statistics: Optional[ActivityStatistics],
+    ) -> None:
+        """
+        Fetch the definitions of the views in the raw table chunks of
+        ``output_suffix`` and write their index next to the chunks.
+
+        Only the schemas the views are in are queried, at most
+        ``VIEW_DEFINITION_SCHEMA_BATCH_SIZE`` per query. Every definition is
+        stored under its content hash, see
+        :func:`app.activities.metadata_extraction.view_definitions.store_definition`.
+        """
+        output_prefix = workflow_args["output_prefix"]
+        output_path = workflow_args["output_path"]
+        chunk_count = statistics.chunk_count if statistics else 0
+
+        views: List[ViewKey] = []
+        if chunk_count:
+            raw_input = ParquetInput(
+                path=os.path.join(output_path, "raw"),
+                input_prefix=output_prefix,
+                file_names=[
+                    f"{os.path.relpath(output_suffix, 'raw')}/{chunk}.json"
+                    for chunk in range(1, chunk_count + 1)
+                ],
+                chunk_size=None,
+                columns={"table_catalog", "table_schema", "table_name", "table_type"},
+            )
+            async for dataframe in raw_input.get_batched_daft_dataframe():
+                views.extend(get_view_keys(dataframe))
+
+        schemas: Dict[str, Set[str]] = {}
+        for catalog_name, schema_name, _ in views:
+            schemas.setdefault(catalog_name, set()).add(schema_name)
+        for catalog_name in await self.get_skipped_catalogs(
+            workflow_args, schemas, ("views",)
+        ):
+            del schemas[catalog_name]
+
+        sql_client = await self._get_sql_client(workflow_args) if views else None
+        wanted = set(views)
+        index: Dict[ViewKey, str] = {}
+        for catalog_name, schema_names in sorted(schemas.items()):
+            schema_names = sorted(schema_names)
+            for start in range(0, len(schema_names), VIEW_DEFINITION_SCHEMA_BATCH_SIZE):
+                query = prepare_query(
+                    query=self.fetch_view_definition_sql,
+                    workflow_args=workflow_args,
+                    catalog_name=quote_identifier(catalog_name),
+                    schema_names=quote_literal_list(
+                        schema_names[start : start + VIEW_DEFINITION_SCHEMA_BATCH_SIZE]
+                    ),
+                )
+                if not query or not sql_client:
+                    continue
+                async for dataframe in sql_client.run_query_batches(
+                    query,
+                    STREAMING_BATCH_SIZE,
+                    observation=QueryObservation(
+                        sql_file=QUERY_FILES.get(
+                            self.fetch_view_definition_sql or "", "unknown"
+                        ),
+                        catalog=catalog_name,
+                        trace_id=workflow_args.get("workflow_run_id"),
+                    ),
+                ):
+                    for row in dataframe.to_dict(orient="records"):
+                        values = {key.lower(): value for key, value in row.items()}
+                        key = (
+                            values["table_catalog"],
+                            values["table_schema"],
+                            values["table_name"],
+                        )
+                        if key in wanted and values["view_definition"] is not None:
+                            index[key] = await store_definition(
+                                output_prefix, values["view_definition"]
+                            )
+
+        await write_index(
+            output_prefix, os.path.join(output_path, output_suffix), index
+        )
+        logger.info(
+            f"Fetched {len(index)} view definitions of {len(views)} views "
+            f"in {output_suffix}"
+        )
@@ -1,11 +1,105 @@
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Tuple
+
 from application_sdk.clients.sql import BaseSQLClient
+from application_sdk.common.error_codes import ClientError
+from application_sdk.observability.logger_adaptor import get_logger
+
+from app.clients.coordinators import (
+    Coordinator,
+    CoordinatorRouter,
+    get_coordinator_state,
+    get_coordinators,
+)
+from app.clients.pool import engine_pool, get_pool_key
+from app.common.observability import QueryObservation
+from app.constants import SQL_ENGINE_POOL_CONNECTIONS
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+    from sqlalchemy.engine import Connection, CursorResult, Engine
+
+logger = get_logger(__name__)
+
+# Arrow types of the Presto types found in metadata results, keyed on the
+# type name without its parameters. ``unknown`` is the type of NULL literals.
+# Values of other types are converted with the type pyarrow infers.
+ARROW_TYPES = {
+    "boolean": "bool_",
+    "tinyint": "int8",
+    "smallint": "int16",
+    "integer": "int32",
+    "bigint": "int64",
+    "real": "float32",
+    "double": "float64",
+    "varchar": "string",
+    "char": "string",
+    "unknown": "null",
+}
+
+
+def get_arrow_type(type_code: Any) -> Optional["pa.DataType"]:
+    """
+    Return the Arrow type of a column from its DB-API type code.
+
+    pyhive reports the Presto type name, e.g. ``varchar(10)``, other drivers
+    may report nothing, in which case the type is inferred from the values.
+    """
+    import pyarrow as pa
+
+    if not isinstance(type_code, str):
+        return None
+    arrow_type = ARROW_TYPES.get(type_code.split("(")[0].strip().lower())
+    return getattr(pa, arrow_type)() if arrow_type else None
+
+
+def get_query_id(cursor: Any) -> Optional[str]:
+    """
+    Return the Presto query id of a DB-API cursor, None for other drivers.
+    """
+    return getattr(cursor, "last_query_id", None)
+
+
+def cancel_query(cursor: Any) -> None:
+    """
+    Cancel the query of a DB-API cursor on the coordinator.
+
+    Closing a pyhive connection leaves its query running, only
+    ``cursor.cancel()`` stops it. Cursors of other drivers, or of queries
+    that finished, are left alone.
+    """
+    cancel = getattr(cursor, "cancel", None)
+    if cancel is None:
+        return
+    try:
+        cancel()
+    except Exception as e:
+        logger.info(f"Could not cancel query: {e}")
+
 
 class SQLClient(BaseSQLClient):
     """
     This client handles connection string generation based on authentication
     type and manages database connectivity using SQLAlchemy with Presto.
+
+    Engines come from the worker's engine pool, so all clients loaded with
+    the same credentials share one engine and its keep-alive HTTP session
+    to the coordinator.
+
+    Credentials listing further coordinators in ``extra.coordinators`` get
+    an engine per coordinator, and streamed queries, and the queries run on
+    :meth:`routed_engine`, are routed across them, see
+    :mod:`app.clients.coordinators`.
     """
 
+    _release_engines: Optional[List[weakref.finalize]] = None
+    _router: Optional[CoordinatorRouter] = None
+    _probe_results: Optional[Dict[str, bool]] = None
+
     DB_CONFIG = {
         "template": "presto://{username}@{host}:{port}/{catalog}/{schema}",
         "required": ["username", "host", "port", "catalog", "schema"],
@@ -29,17 +123,21 @@ class SQLClient(BaseSQLClient):
         }
     }
 
-    def get_sqlalchemy_connection_string(self) -> str:
+    def get_sqlalchemy_connection_string(
+        self, credentials: Optional[Dict[str, Any]] = None
+    ) -> str:
         """
-        Generate SQLAlchemy connection string for Presto.
+        Generate SQLAlchemy connection string for Presto, with the credentials
+        of the client unless others are given.
         """
-        if not self.credentials:
+        credentials = credentials or self.credentials
+        if not credentials:
             raise KeyError("Credentials not set")
 
-        username = self.credentials.get("username")
-        host = self.credentials.get("host")
-        port = self.credentials.get("port")
-        extra = self.credentials.get("extra", {})
+        username = credentials.get("username")
+        host = credentials.get("host")
+        port = credentials.get("port")
+        extra = credentials.get("extra", {})
         
         catalog = extra.get("catalog", self.DB_CONFIG["defaults"]["catalog"])
         schema = extra.get("schema", self.DB_CONFIG["defaults"]["schema"])
@@ -57,6 +155,340 @@ class SQLClient(BaseSQLClient):
             schema=schema
         )
 
+    def get_catalog_name(self) -> str:
+        """
+        Return the catalog of the connection, the ``CURRENT_CATALOG`` of its
+        queries.
+        """
+        extra = (self.credentials or {}).get("extra", {})
+        return extra.get("catalog", self.DB_CONFIG["defaults"]["catalog"])
+
+    def create_engine(self, credentials: Optional[Dict[str, Any]] = None) -> "Engine":
+        """
+        Create an engine whose Presto connections share a keep-alive HTTP session.
+
+        pyhive opens a new HTTP connection per request unless it is given a
+        ``requests_session``. Connectivity is checked by the engine pool, so
+        connections are not pinged on every checkout.
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+        from sqlalchemy import create_engine, event
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=SQL_ENGINE_POOL_CONNECTIONS)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+        engine = create_engine(
+            self.get_sqlalchemy_connection_string(credentials),
+            connect_args={"requests_session": session, **self.sql_alchemy_connect_args},
+            pool_size=SQL_ENGINE_POOL_CONNECTIONS,
+        )
+        event.listen(engine, "engine_disposed", lambda _: session.close())
+        return engine
+
+    async def load(self, credentials: Dict[str, Any]) -> None:
+        """
+        Load the client with an engine from the engine pool, and one per
+        further coordinator of the credentials.
+        """
+        await self.close()
+        self.credentials = credentials
+        self._release_engines = []
+        coordinators: List[Coordinator] = []
+        for index, (host, port) in enumerate(get_coordinators(credentials)):
+            # the engine of the connection's own coordinator is pooled under
+            # the credentials as they are
+            coordinator_credentials = credentials
+            create_engine = self.create_engine
+            if index:
+                coordinator_credentials = {**credentials, "host": host, "port": port}
+                create_engine = partial(self.create_engine, coordinator_credentials)
+            key = get_pool_key(coordinator_credentials)
+            engine = await engine_pool.acquire(key, create_engine)
+            self._release_engines.append(
+                weakref.finalize(self, engine_pool.release, engine)
+            )
+            coordinators.append(
+                Coordinator(host, port, engine, get_coordinator_state(key))
+            )
+        engine = coordinators[0].engine
+        if len(coordinators) > 1:
+            self._router = CoordinatorRouter(coordinators)
+        self.engine = engine
+        try:
+            self.connection = engine.connect()
+        except Exception as e:
+            logger.error(
+                f"{ClientError.SQL_CLIENT_AUTH_ERROR}: Error loading SQL client: {str(e)}"
+            )
+            await self.close()
+            raise ClientError(f"{ClientError.SQL_CLIENT_AUTH_ERROR}: {str(e)}")
+
+    async def close(self) -> None:
+        """
+        Close the connection and give the engine back to the engine pool.
+        """
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+        if self._release_engines:
+            for release_engine in self._release_engines:
+                release_engine()
+            self._release_engines = None
+            self._router = None
+            self.engine = None
+
+    async def probe(self, query: str) -> bool:
+        """
+        Check whether a capability probe query runs on the coordinator.
+
+        The outcome is cached, so every probe runs at most once per client.
+        """
+        if self._probe_results is None:
+            self._probe_results = {}
+        if query not in self._probe_results:
+            try:
+                async for _ in self.run_query_batches(query, batch_size=1):
+                    pass
+                self._probe_results[query] = True
+            except Exception as e:
+                logger.info(f"Capability probe failed, using the fallback: {e}")
+                self._probe_results[query] = False
+        return self._probe_results[query]
+
+    def execute_query(
+        self, query: str
+    ) -> Tuple[Optional[Coordinator], "Connection", "CursorResult[Any]"]:
+        """
+        Run a query on a connection of its own, on the coordinator chosen by
+        the router if there are several.
+
+        Returns the coordinator, None without a router, the connection to
+        close and the result.
+        """
+        from sqlalchemy import text
+
+        if self._router:
+            return self._router.execute(query)
+        if not self.engine:
+            raise ValueError("Engine is not initialized")
+        connection = self.engine.connect()
+        try:
+            return None, connection, connection.execute(text(query))
+        except Exception:
+            connection.close()
+            raise
+
+    @asynccontextmanager
+    async def routed_engine(self) -> AsyncIterator["Engine"]:
+        """
+        Yield the engine of the least loaded healthy coordinator, counting a
+        query as outstanding on it until the context exits.
+
+        Used for queries the SDK runs on an engine of its own, which cannot
+        fail over to another coordinator.
+        """
+        if not self._router:
+            if not self.engine:
+                raise ValueError("Engine is not initialized")
+            yield self.engine
+            return
+        coordinator = self._router.get_candidates()[0]
+        self._router.acquire(coordinator)
+        try:
+            yield coordinator.engine
+        finally:
+            self._router.release(coordinator)
+
+    def close_query(
+        self,
+        coordinator: Optional[Coordinator],
+        connection: "Connection",
+        result: Optional["CursorResult[Any]"] = None,
+        cancel: bool = False,
+    ) -> None:
+        """
+        Close the connection of a query started by :meth:`execute_query` and
+        release its coordinator, cancelling the query first if ``cancel``.
+        """
+        try:
+            if cancel and result is not None:
+                cancel_query(result.cursor)
+            connection.close()
+        finally:
+            if coordinator is not None and self._router:
+                self._router.release(coordinator)
+
+    async def start_query(
+        self, query: str
+    ) -> Tuple[Optional[Coordinator], "Connection", "CursorResult[Any]"]:
+        """
+        Run :meth:`execute_query` in the default executor.
+
+        Cancelling the caller, e.g. at a deadline, does not stop the
+        executor thread. The query it submits is waited for, then cancelled
+        on the coordinator and its connection closed, before the
+        cancellation propagates.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.run_in_executor(None, self.execute_query, query)
+        try:
+            return await asyncio.shield(started)
+        except asyncio.CancelledError:
+            await asyncio.wait([started])
+            if not started.cancelled() and started.exception() is None:
+                await loop.run_in_executor(
+                    None, partial(self.close_query, *started.result(), cancel=True)
+                )
+            raise
+
+    async def fetch_rows(
+        self, result: "CursorResult[Any]", fetchmany: Any, batch_size: int
+    ) -> List[Any]:
+        """
+        Run ``fetchmany`` of a query in the default executor.
+
+        pyhive polls the coordinator until rows arrive, so cancelling the
+        caller cancels the query, which ends the poll, and waits for the
+        executor thread before the cancellation propagates.
+        """
+        loop = asyncio.get_running_loop()
+        fetching = loop.run_in_executor(None, fetchmany, batch_size)
+        try:
+            return await asyncio.shield(fetching)
+        except asyncio.CancelledError:
+            await loop.run_in_executor(None, cancel_query, result.cursor)
+            await asyncio.wait([fetching])
+            if not fetching.cancelled():
+                fetching.exception()
+            raise
+
+    async def run_query_batches(
+        self,
+        query: str,
+        batch_size: int,
+        observation: Optional[QueryObservation] = None,
+    ) -> AsyncIterator["pd.DataFrame"]:
+        """
+        Stream the results of a query as DataFrames of at most batch_size rows.
+
+        The query runs on its own connection, see :meth:`execute_query`, and
+        rows are pulled with fetchmany, so only one batch is held in memory at a time. Closing
+        the iterator early, or cancelling it, cancels the query and closes
+        its connection, see :meth:`start_query` and :meth:`fetch_rows`.
+        Latency, rows and bytes are recorded with ``observation``, see
+        :class:`app.common.observability.QueryObservation`.
+        """
+        import pandas as pd
+
+        if not self.engine:
+            raise ValueError("Engine is not initialized")
+
+        observation = observation or QueryObservation()
+        error: Optional[Exception] = None
+        loop = asyncio.get_running_loop()
+        coordinator: Optional[Coordinator] = None
+        connection: Optional["Connection"] = None
+        result: Optional["CursorResult[Any]"] = None
+        finished = False
+        try:
+            coordinator, connection, result = await self.start_query(query)
+            observation.query_id = get_query_id(result.cursor)
+            column_names = list(result.keys())
+            while True:
+                rows = await self.fetch_rows(result, result.fetchmany, batch_size)
+                if not rows:
+                    break
+                dataframe = pd.DataFrame.from_records(rows, columns=column_names)
+                observation.add_batch(
+                    len(dataframe), int(dataframe.memory_usage(deep=True).sum())
+                )
+                yield dataframe
+            finished = True
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            if connection is not None:
+                await loop.run_in_executor(
+                    None,
+                    partial(
+                        self.close_query,
+                        coordinator,
+                        connection,
+                        result,
+                        cancel=not finished,
+                    ),
+                )
+            observation.record(error)
+
+    async def run_query_arrow_batches(
+        self,
+        query: str,
+        batch_size: int,
+        observation: Optional[QueryObservation] = None,
+    ) -> AsyncIterator["pa.RecordBatch"]:
+        """
+        Stream the results of a query as Arrow record batches of at most
+        batch_size rows.
+
+        Like :meth:`run_query_batches`, but rows are read from the DB-API
+        cursor and transposed straight into Arrow arrays typed from the
+        cursor description, without building SQLAlchemy rows or pandas
+        object columns. Batches can be handed to daft or pyarrow without
+        another copy.
+        """
+        import pyarrow as pa
+
+        if not self.engine:
+            raise ValueError("Engine is not initialized")
+
+        observation = observation or QueryObservation()
+        error: Optional[Exception] = None
+        loop = asyncio.get_running_loop()
+        coordinator: Optional[Coordinator] = None
+        connection: Optional["Connection"] = None
+        result: Optional["CursorResult[Any]"] = None
+        finished = False
+        try:
+            coordinator, connection, result = await self.start_query(query)
+            cursor = result.cursor
+            observation.query_id = get_query_id(cursor)
+            column_names = [column[0] for column in cursor.description]
+            arrow_types = [get_arrow_type(column[1]) for column in cursor.description]
+            while True:
+                rows = await self.fetch_rows(result, cursor.fetchmany, batch_size)
+                if not rows:
+                    break
+                batch = pa.RecordBatch.from_arrays(
+                    [
+                        pa.array(values, type=arrow_type)
+                        for values, arrow_type in zip(zip(*rows), arrow_types)
+                    ],
+                    names=column_names,
+                )
+                observation.add_batch(batch.num_rows, batch.nbytes)
+                yield batch
+            finished = True
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            if connection is not None:
+                await loop.run_in_executor(
+                    None,
+                    partial(
+                        self.close_query,
+                        coordinator,
+                        connection,
+                        result,
+                        cancel=not finished,
+                    ),
+                )
+            observation.record(error)
+
     @classmethod
     def get_autofill_options(cls):
         """
@@ -0,0 +1,206 @@
+"""Routing of queries across the coordinators of a Presto cluster.
+
+Several coordinators behind different endpoints can serve the same catalogs.
+A connection lists the coordinators besides its own ``host`` and ``port`` in
+``extra.coordinators``, and every streamed query goes to the healthy
+coordinator with the fewest queries outstanding from the worker process.
+A coordinator that fails a query and then its health check is taken out of
+rotation, and the query fails over to the remaining coordinators. It is
+health checked again, in the background, after
+``COORDINATOR_RETRY_INTERVAL`` seconds and rejoins the rotation once it
+passes.
+
+Queries run through the SDK's ``query_executor``, i.e. non streamed
+extraction, go to the least loaded coordinator too, but without failover.
+Queries on the client's ``connection``, e.g. the SDK's own ``run_query``,
+always go to the connection's own coordinator.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from application_sdk.observability.logger_adaptor import get_logger
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.clients.pool import is_healthy
+from app.constants import COORDINATOR_RETRY_INTERVAL
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Connection, CursorResult
+
+logger = get_logger(__name__)
+
+
+def get_coordinators(credentials: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """
+    Return the host and port of every coordinator of a connection, its own
+    ``host`` and ``port`` first.
+
+    ``extra.coordinators`` is a list, or a comma separated string, of
+    ``host:port`` endpoints. Endpoints without a port use the port of the
+    connection.
+    """
+    port = str(credentials.get("port"))
+    coordinators = [(str(credentials.get("host")), port)]
+    endpoints = credentials.get("extra", {}).get("coordinators") or []
+    if isinstance(endpoints, str):
+        endpoints = endpoints.split(",")
+    for endpoint in endpoints:
+        endpoint = endpoint.strip()
+        if not endpoint:
+            continue
+        host, _, endpoint_port = endpoint.rpartition(":")
+        if not host:
+            host, endpoint_port = endpoint, port
+        if (host, endpoint_port) not in coordinators:
+            coordinators.append((host, endpoint_port))
+    return coordinators
+
+
+@dataclass
+class CoordinatorState:
+    """Load and health of a coordinator, shared by the clients of a worker."""
+
+    outstanding: int = 0
+    healthy: bool = True
+    failed_at: float = 0.0
+    checking: bool = False
+
+
+# States of the coordinators of the worker process, keyed on the pool key of
+# their credentials
+_states: Dict[str, CoordinatorState] = {}
+_states_lock = threading.Lock()
+
+
+def get_coordinator_state(key: str) -> CoordinatorState:
+    """Return the shared state of the coordinator with pool key ``key``."""
+    with _states_lock:
+        return _states.setdefault(key, CoordinatorState())
+
+
+@dataclass
+class Coordinator:
+    """A coordinator endpoint and the engine connected to it."""
+
+    host: str
+    port: str
+    engine: Engine
+    state: CoordinatorState
+
+    @property
+    def endpoint(self) -> str:
+        return f"{self.host}:{self.port}"
+
+
+class CoordinatorRouter:
+    """
+    Least outstanding queries routing, with failover, across coordinators.
+    """
+
+    def __init__(
+        self,
+        coordinators: List[Coordinator],
+        retry_interval: float = COORDINATOR_RETRY_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.coordinators = coordinators
+        self.retry_interval = retry_interval
+        self.clock = clock
+
+    def get_candidates(self) -> List[Coordinator]:
+        """
+        Return the coordinators a query is tried on, in order: the healthy
+        ones by fewest outstanding queries.
+
+        Unhealthy coordinators due for a retry are health checked in the
+        background, see :meth:`recheck`, and rejoin once they pass. If no
+        coordinator is healthy, all are tried.
+        """
+        now = self.clock()
+        with _states_lock:
+            for coordinator in self.coordinators:
+                state = coordinator.state
+                if (
+                    state.healthy
+                    or state.checking
+                    or now - state.failed_at < self.retry_interval
+                ):
+                    continue
+                state.checking = True
+                threading.Thread(
+                    target=self.recheck, args=(coordinator,), daemon=True
+                ).start()
+
+            healthy = [
+                coordinator
+                for coordinator in self.coordinators
+                if coordinator.state.healthy
+            ]
+            if not healthy:
+                return list(self.coordinators)
+            return sorted(
+                healthy, key=lambda coordinator: coordinator.state.outstanding
+            )
+
+    def recheck(self, coordinator: Coordinator) -> None:
+        """
+        Health check an unhealthy coordinator, returning it to rotation if it
+        passes and restarting its retry interval if not.
+        """
+        healthy = is_healthy(coordinator.engine)
+        with _states_lock:
+            state = coordinator.state
+            if healthy:
+                logger.info(f"Coordinator {coordinator.endpoint} is back")
+                state.healthy = True
+            else:
+                state.failed_at = self.clock()
+            state.checking = False
+
+    def execute(
+        self, query: str
+    ) -> Tuple[Coordinator, "Connection", "CursorResult[Any]"]:
+        """
+        Run a query on the first candidate coordinator that accepts it.
+
+        If a query fails and its coordinator then fails a health check, the
+        coordinator is taken out of rotation and the query is run on the
+        next candidate. Other errors, e.g. of invalid SQL, are raised. The
+        coordinator counts the query as outstanding until :meth:`release`.
+        """
+        error: Optional[Exception] = None
+        for coordinator in self.get_candidates():
+            self.acquire(coordinator)
+            connection = None
+            try:
+                connection = coordinator.engine.connect()
+                return coordinator, connection, connection.execute(text(query))
+            except Exception as e:
+                if connection is not None:
+                    connection.close()
+                self.release(coordinator)
+                if is_healthy(coordinator.engine):
+                    raise
+                logger.warning(
+                    f"Coordinator {coordinator.endpoint} is unreachable, "
+                    f"failing over: {e}"
+                )
+                with _states_lock:
+                    coordinator.state.healthy = False
+                    coordinator.state.failed_at = self.clock()
+                error = e
+        raise error or ValueError("No coordinators configured")
+
+    def acquire(self, coordinator: Coordinator) -> None:
+        """Count a query as outstanding on ``coordinator``."""
+        with _states_lock:
+            coordinator.state.outstanding += 1
+
+    def release(self, coordinator: Coordinator) -> None:
+        """Count a query of ``coordinator`` as finished."""
+        with _states_lock:
+            coordinator.state.outstanding -= 1
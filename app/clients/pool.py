@@ -0,0 +1,178 @@
+"""Process wide pool of SQLAlchemy engines shared by all clients of a worker.
+
+Every activity, handler call and preflight check loads its own ``SQLClient``.
+Without pooling each of them creates a new engine, and with it new HTTP
+connections and TLS handshakes to the coordinator. The pool hands out one
+engine per set of credentials instead, so clients loaded with the same
+credentials share the engine and its keep-alive connections.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict
+
+from application_sdk.observability.logger_adaptor import get_logger
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.constants import (
+    SQL_ENGINE_POOL_HEALTH_CHECK_INTERVAL,
+    SQL_ENGINE_POOL_IDLE_TIMEOUT,
+    SQL_ENGINE_POOL_MAX_SIZE,
+)
+
+logger = get_logger(__name__)
+
+
+def get_pool_key(credentials: Dict[str, Any]) -> str:
+    """Return the pool key of a set of credentials.
+
+    The key is a digest, so secrets are not kept around as dictionary keys.
+    """
+    return hashlib.sha256(
+        json.dumps(credentials, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+@dataclass
+class PooledEngine:
+    """An engine in the pool with its bookkeeping."""
+
+    key: str
+    engine: Engine
+    references: int = 0
+    last_used: float = 0.0
+    last_checked: float = 0.0
+    retired: bool = False
+
+
+class EnginePool:
+    """
+    Reference counted SQLAlchemy engines keyed by credentials.
+
+    Engines are created on first use and shared afterwards. Engines nobody
+    holds are disposed once they have been idle for ``idle_timeout`` seconds,
+    or when more than ``max_size`` engines are pooled, least recently used
+    first. An engine that has not been checked for ``health_check_interval``
+    seconds runs ``SELECT 1`` before it is handed out again and is replaced
+    if that fails.
+    """
+
+    def __init__(
+        self,
+        max_size: int = SQL_ENGINE_POOL_MAX_SIZE,
+        idle_timeout: float = SQL_ENGINE_POOL_IDLE_TIMEOUT,
+        health_check_interval: float = SQL_ENGINE_POOL_HEALTH_CHECK_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.clock = clock
+        self._engines: Dict[str, PooledEngine] = {}
+        self._held: Dict[int, PooledEngine] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._engines)
+
+    async def acquire(self, key: str, create_engine: Callable[[], Engine]) -> Engine:
+        """
+        Return the engine pooled under ``key``, creating it if needed.
+
+        Every acquired engine must be given back with :meth:`release`. The
+        health check runs in the default executor without holding the lock,
+        so a slow or unreachable coordinator neither blocks the event loop
+        nor other acquisitions.
+        """
+        with self._lock:
+            now = self.clock()
+            self._evict(now)
+
+            pooled = self._engines.get(key)
+            check = (
+                pooled is not None
+                and now - pooled.last_checked >= self.health_check_interval
+            )
+            if pooled is None:
+                pooled = PooledEngine(key=key, engine=create_engine(), last_checked=now)
+                self._engines[key] = pooled
+            elif check:
+                # concurrent acquisitions of the engine skip the check
+                pooled.last_checked = now
+
+            pooled.references += 1
+            pooled.last_used = now
+            self._held[id(pooled.engine)] = pooled
+            self._evict(now)
+
+        if check and not await asyncio.get_running_loop().run_in_executor(
+            None, self._is_healthy, pooled.engine
+        ):
+            logger.warning("Pooled SQL engine failed its health check")
+            with self._lock:
+                self._retire(pooled)
+            self.release(pooled.engine)
+            return await self.acquire(key, create_engine)
+        return pooled.engine
+
+    def release(self, engine: Engine) -> None:
+        """Give back an engine returned by :meth:`acquire`."""
+        with self._lock:
+            pooled = self._held.get(id(engine))
+            if pooled is None or pooled.engine is not engine:
+                return
+            pooled.references -= 1
+            pooled.last_used = self.clock()
+            if pooled.references == 0:
+                del self._held[id(engine)]
+                if pooled.retired:
+                    pooled.engine.dispose()
+
+    def dispose(self) -> None:
+        """Dispose every pooled engine, e.g. when the worker shuts down."""
+        with self._lock:
+            for pooled in list(self._engines.values()):
+                self._retire(pooled)
+
+    def _retire(self, pooled: PooledEngine) -> None:
+        """Remove an engine from the pool, disposing it once nobody holds it."""
+        if self._engines.get(pooled.key) is pooled:
+            del self._engines[pooled.key]
+        pooled.retired = True
+        if pooled.references == 0:
+            pooled.engine.dispose()
+
+    def _evict(self, now: float) -> None:
+        idle = sorted(
+            (pooled for pooled in self._engines.values() if pooled.references == 0),
+            key=lambda pooled: pooled.last_used,
+        )
+        excess = len(self._engines) - self.max_size
+        for pooled in idle:
+            if excess > 0 or now - pooled.last_used >= self.idle_timeout:
+                self._retire(pooled)
+                excess -= 1
+
+    @staticmethod
+    def _is_healthy(engine: Engine) -> bool:
+        return is_healthy(engine)
+
+
+def is_healthy(engine: Engine) -> bool:
+    """Whether an engine can run ``SELECT 1``."""
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1")).fetchall()
+        return True
+    except Exception as e:
+        logger.warning(f"SQL engine health check failed: {e}")
+        return False
+
+
+#: Engine pool shared by all SQL clients of the worker process
+engine_pool = EnginePool()
@@ -0,0 +1,167 @@
+"""Metrics and trace spans of extraction queries and transformed chunks.
+
+Everything is recorded with the SDK metrics and traces adaptors, so it is
+exported like the metrics of the ``observability`` decorator in ``main.py``.
+Every query records histograms of its latency, time to first row, rows and
+bytes fetched, labelled with its SQL file, catalog and Presto query id, and a
+``CLIENT`` span. Every transformed chunk records an ``INTERNAL`` span. Spans
+of a workflow run share the run id as their trace id.
+"""
+
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from application_sdk.observability.logger_adaptor import get_logger
+from application_sdk.observability.metrics_adaptor import MetricType, get_metrics
+from application_sdk.observability.traces_adaptor import get_traces
+
+logger = get_logger(__name__)
+
+
+def record_span(
+    name: str,
+    kind: str,
+    trace_id: Optional[str],
+    started_at: float,
+    attributes: Dict[str, Any],
+    error: Optional[Exception] = None,
+    events: Optional[List[Dict[str, Any]]] = None,
+) -> None:
+    """
+    Record a span that started at ``started_at`` and ends now.
+
+    Failing to record a span is logged, it never fails the work it traces.
+    """
+    try:
+        get_traces().record_trace(
+            name=name,
+            trace_id=trace_id or str(uuid.uuid4()),
+            span_id=str(uuid.uuid4()),
+            kind=kind,
+            status_code="ERROR" if error else "OK",
+            status_message=str(error) if error else None,
+            attributes=attributes,
+            events=events,
+            duration_ms=(time.time() - started_at) * 1000,
+        )
+    except Exception as e:
+        logger.warning(f"Could not record the {name} span: {e}")
+
+
+@contextmanager
+def span(
+    name: str, trace_id: Optional[str], attributes: Dict[str, Any]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Record an ``INTERNAL`` span around a block.
+
+    The block can add attributes to the yielded dictionary, e.g. the number
+    of rows it processed.
+    """
+    started_at = time.time()
+    error = None
+    try:
+        yield attributes
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        record_span(name, "INTERNAL", trace_id, started_at, attributes, error)
+
+
+class QueryObservation:
+    """
+    Latency, time to first row, rows and bytes fetched of a query.
+
+    The SQL client adds every fetched batch and records the query when its
+    results are exhausted or it fails. Bytes are the in-memory size of the
+    fetched batches. Time to first row and bytes are only recorded for
+    queries whose batches were added.
+    """
+
+    def __init__(
+        self,
+        sql_file: str = "unknown",
+        catalog: str = "all",
+        trace_id: Optional[str] = None,
+    ):
+        self.sql_file = sql_file
+        self.catalog = catalog
+        self.trace_id = trace_id
+        self.query_id: Optional[str] = None
+        self.rows = 0
+        self.bytes = 0
+        self.first_row_seconds: Optional[float] = None
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+
+    def add_batch(self, rows: int, nbytes: int) -> None:
+        """Add a fetched batch of ``rows`` rows taking ``nbytes`` bytes."""
+        if self.first_row_seconds is None:
+            self.first_row_seconds = time.perf_counter() - self._start
+        self.rows += rows
+        self.bytes += nbytes
+
+    def get_labels(self) -> Dict[str, str]:
+        return {
+            "sql_file": self.sql_file,
+            "catalog": self.catalog,
+            "query_id": self.query_id or "unknown",
+        }
+
+    def record(self, error: Optional[Exception] = None) -> None:
+        """Record the metrics and the span of the query."""
+        latency = time.perf_counter() - self._start
+        labels = {**self.get_labels(), "status": "error" if error else "ok"}
+        histograms = [
+            (
+                "sql_query_latency",
+                latency,
+                "s",
+                "Time to run a query and fetch its rows",
+            ),
+            ("sql_query_rows", self.rows, "count", "Number of rows fetched by a query"),
+        ]
+        events = []
+        if self.first_row_seconds is not None:
+            histograms += [
+                (
+                    "sql_query_time_to_first_row",
+                    self.first_row_seconds,
+                    "s",
+                    "Time until the first rows of a query were fetched",
+                ),
+                ("sql_query_bytes", self.bytes, "bytes", "Bytes fetched by a query"),
+            ]
+            events.append(
+                {
+                    "name": "first_row",
+                    "timestamp": self.started_at + self.first_row_seconds,
+                }
+            )
+
+        try:
+            metrics = get_metrics()
+            for name, value, unit, description in histograms:
+                metrics.record_metric(
+                    name=name,
+                    value=value,
+                    metric_type=MetricType.HISTOGRAM,
+                    labels=labels,
+                    description=description,
+                    unit=unit,
+                )
+        except Exception as e:
+            logger.warning(f"Could not record the metrics of {self.sql_file}: {e}")
+
+        record_span(
+            "sql_query",
+            "CLIENT",
+            self.trace_id,
+            self.started_at,
+            {**labels, "rows": self.rows, "bytes": self.bytes},
+            error=error,
+            events=events or None,
+        )
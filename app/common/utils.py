@@ -0,0 +1,407 @@
+"""Shared helpers for the Presto metadata extraction application."""
+
+import hashlib
+import json
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import quote
+
+import yaml
+from application_sdk.common.error_codes import CommonError
+from application_sdk.common.utils import prepare_filters
+from application_sdk.observability.logger_adaptor import get_logger
+
+from app.constants import (
+    CAPABILITY_PROBING,
+    DEFERRED_VIEW_DEFINITIONS,
+    FETCH_FORMAT,
+    INCREMENTAL_EXTRACTION,
+    MULTI_CATALOG_EXTRACTION,
+    PIPELINED_EXTRACTION,
+    RESUMABLE_EXTRACTION,
+)
+
+logger = get_logger(__name__)
+
+# A constant ``NULL as <name>`` item on its own line of a select list
+NULL_COLUMN_PATTERN = re.compile(
+    r"^[ \t]*NULL as (\w+),?[ \t]*\n", re.IGNORECASE | re.MULTILINE
+)
+
+# The view definition select item of the table queries, either a column of
+# the joined views or a CASE with a correlated subquery
+VIEW_DEFINITION_PATTERN = re.compile(
+    r"^([ \t]*)(?:v\.view_definition|CASE\b.*?\bEND as view_definition),",
+    re.IGNORECASE | re.MULTILINE | re.DOTALL,
+)
+
+# The join of information_schema.views and its indented conditions
+VIEW_JOIN_PATTERN = re.compile(
+    r"^LEFT JOIN \S*information_schema\.views v\n(?:[ \t]+.*\n)*",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# Formats batches of streamed queries are fetched in, see get_fetch_format
+FETCH_FORMATS = ("arrow", "pandas")
+
+# Workflow metadata that changes the extracted rows of a partition. Outputs of
+# a previous run are only reused if these settings did not change since.
+INCREMENTAL_SETTINGS_KEYS = (
+    "temp-table-regex",
+    "exclude_empty_tables",
+    "exclude_views",
+)
+
+
+def quote_identifier(identifier: str) -> str:
+    """Quote a Presto identifier, e.g. a catalog name."""
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def quote_literal(value: str) -> str:
+    """Escape a value for use inside a single quoted Presto string literal."""
+    return value.replace("'", "''")
+
+
+def quote_literal_list(values: Iterable[str]) -> str:
+    """Return values as comma separated string literals, e.g. for an IN list."""
+    return ", ".join(f"'{quote_literal(value)}'" for value in values)
+
+
+def quote_like_prefix(prefix: str) -> str:
+    """Escape a prefix for a single quoted ``LIKE '...%' ESCAPE '\\'`` pattern."""
+    for character in ("\\", "%", "_"):
+        prefix = prefix.replace(character, "\\" + character)
+    return quote_literal(prefix)
+
+
+def get_include_schema_names(workflow_args: Dict[str, Any]) -> Optional[List[str]]:
+    """Return the schemas the include filter is limited to, if it names them.
+
+    Only include filters naming every schema exactly (``^name$``) are turned
+    into a list, any wildcard or regex leaves the schemas unrestricted.
+
+    Args:
+        workflow_args: Workflow arguments holding the ``metadata`` filters.
+
+    Returns:
+        Optional[List[str]]: The sorted schema names, or None if the include
+        filter does not limit the schemas to a fixed set.
+    """
+    include_filter = json.loads(
+        workflow_args.get("metadata", {}).get("include-filter") or "{}"
+    )
+    schema_names = set()
+    for schema_patterns in include_filter.values():
+        if not isinstance(schema_patterns, list) or not schema_patterns:
+            return None
+        for schema_pattern in schema_patterns:
+            if not (schema_pattern.startswith("^") and schema_pattern.endswith("$")):
+                return None
+            schema_name = schema_pattern[1:-1]
+            if re.escape(schema_name) != schema_name:
+                return None
+            schema_names.add(schema_name)
+    return sorted(schema_names) or None
+
+
+def prepare_query(
+    query: Optional[str],
+    workflow_args: Dict[str, Any],
+    temp_table_regex_sql: Optional[str] = "",
+    include_schemas_sql: Optional[str] = "",
+    **params: str,
+) -> Optional[str]:
+    """Prepare a SQL query with the workflow filters and app specific parameters.
+
+    Renders the same placeholders as the SDK ``prepare_query``, but escapes
+    the regexes for Presto string literals, plus:
+
+    - ``{include_schemas_sql}``: ``include_schemas_sql`` rendered with the
+      schemas of :func:`get_include_schema_names`, empty if there are none
+    - any additional ``params``, e.g. ``catalog_name``
+
+    Args:
+        query: The SQL query template.
+        workflow_args: Workflow arguments holding the ``metadata`` filters.
+        temp_table_regex_sql: SQL fragment excluding temporary tables.
+        include_schemas_sql: SQL fragment limiting the schemas read.
+        **params: Already escaped values for the extra placeholders.
+
+    Returns:
+        Optional[str]: The prepared query, or None if it could not be prepared.
+    """
+    if not query:
+        logger.warning("SQL query is not set.")
+        return None
+
+    metadata = workflow_args.get("metadata", {})
+    try:
+        include_regex, exclude_regex = prepare_filters(
+            metadata.get("include-filter") or "{}",
+            metadata.get("exclude-filter") or "{}",
+        )
+        schema_names = get_include_schema_names(workflow_args)
+    except (CommonError, json.JSONDecodeError) as e:
+        logger.error(
+            f"Error preparing query [{query}]: {e}",
+            error_code=CommonError.QUERY_PREPARATION_ERROR.code,
+        )
+        return None
+
+    temp_table_regex = metadata.get("temp-table-regex")
+    if temp_table_regex and temp_table_regex_sql:
+        temp_table_regex_sql = temp_table_regex_sql.format(
+            exclude_table_regex=quote_literal(temp_table_regex)
+        )
+    else:
+        temp_table_regex_sql = ""
+
+    if schema_names and include_schemas_sql:
+        include_schemas_sql = include_schemas_sql.format(
+            schema_names=quote_literal_list(schema_names)
+        )
+    else:
+        include_schemas_sql = ""
+
+    return query.format(
+        normalized_include_regex=quote_literal(include_regex),
+        normalized_exclude_regex=quote_literal(exclude_regex),
+        temp_table_regex_sql=temp_table_regex_sql,
+        include_schemas_sql=include_schemas_sql,
+        exclude_empty_tables=metadata.get("exclude_empty_tables", False),
+        exclude_views=metadata.get("exclude_views", False),
+        **params,
+    )
+
+
+def get_partition_path(partition: Dict[str, str]) -> str:
+    """Return the relative output path of a catalog/schema partition."""
+    return "/".join(
+        quote(partition[key], safe="") for key in ("catalog_name", "schema_name")
+    )
+
+
+def get_partition_chunk_prefix(partition: Dict[str, str]) -> str:
+    """
+    Return the prefix of the transformed chunks a partition writes itself,
+    which no other partition shares.
+    """
+    return hashlib.sha256(get_partition_path(partition).encode()).hexdigest()[:16]
+
+
+def filter_partitions(
+    partitions: List[Dict[str, str]], workflow_args: Dict[str, Any]
+) -> List[Dict[str, str]]:
+    """Apply the workflow include/exclude filters to catalog/schema partitions.
+
+    Args:
+        partitions: Partitions with ``catalog_name`` and ``schema_name`` keys.
+        workflow_args: Workflow arguments holding the ``metadata`` filters.
+
+    Returns:
+        List[Dict[str, str]]: The partitions selected by the filters, sorted.
+    """
+    metadata = workflow_args.get("metadata", {})
+    include_regex, exclude_regex = prepare_filters(
+        metadata.get("include-filter") or "{}",
+        metadata.get("exclude-filter") or "{}",
+    )
+    include_pattern = re.compile(include_regex)
+    exclude_pattern = re.compile(exclude_regex)
+
+    selected = []
+    for partition in partitions:
+        if partition["schema_name"] == "information_schema":
+            continue
+        qualified_name = f"{partition['catalog_name']}.{partition['schema_name']}"
+        if include_pattern.search(qualified_name) and not exclude_pattern.search(
+            qualified_name
+        ):
+            selected.append(partition)
+    return sorted(selected, key=lambda p: (p["catalog_name"], p["schema_name"]))
+
+
+def get_metadata_flag(workflow_args: Dict[str, Any], key: str, default: bool) -> bool:
+    """
+    Return the boolean workflow setting ``key``, ``default`` if it is unset.
+
+    Settings sent by the UI or the HTTP API may be strings, which are true
+    only if they are ``"true"``, like the environment variables.
+    """
+    value = workflow_args.get("metadata", {}).get(key)
+    if value is None:
+        return default
+    if isinstance(value, str):
+        return value.strip().lower() == "true"
+    return bool(value)
+
+
+def is_incremental_extraction(workflow_args: Dict[str, Any]) -> bool:
+    """Whether unchanged partitions are carried forward from the previous run."""
+    return get_metadata_flag(
+        workflow_args, "incremental-extraction", INCREMENTAL_EXTRACTION
+    )
+
+
+def is_resumable_extraction(workflow_args: Dict[str, Any]) -> bool:
+    """Whether monolithic extraction checkpoints after every partition."""
+    return get_metadata_flag(
+        workflow_args, "resumable-extraction", RESUMABLE_EXTRACTION
+    )
+
+
+def is_deferred_view_definitions(workflow_args: Dict[str, Any]) -> bool:
+    """Whether view definitions are fetched after table extraction."""
+    return get_metadata_flag(
+        workflow_args, "deferred-view-definitions", DEFERRED_VIEW_DEFINITIONS
+    )
+
+
+def is_multi_catalog_extraction(workflow_args: Dict[str, Any]) -> bool:
+    """Whether databases and procedures of every selected catalog are extracted."""
+    return get_metadata_flag(
+        workflow_args, "multi-catalog-extraction", MULTI_CATALOG_EXTRACTION
+    )
+
+
+def is_pipelined_extraction(workflow_args: Dict[str, Any]) -> bool:
+    """Whether streamed batches are transformed by the extraction activity."""
+    return get_metadata_flag(
+        workflow_args, "pipelined-extraction", PIPELINED_EXTRACTION
+    )
+
+
+def is_capability_probing(workflow_args: Dict[str, Any]) -> bool:
+    """Whether extraction skips the queries a catalog cannot answer."""
+    return get_metadata_flag(workflow_args, "capability-probing", CAPABILITY_PROBING)
+
+
+def get_fetch_format(
+    workflow_args: Dict[str, Any], fetch_format: Optional[str] = None
+) -> str:
+    """Return the format streamed queries fetch their batches in.
+
+    ``fetch_format`` if given, else the ``"fetch-format"`` of the workflow,
+    else ``FETCH_FORMAT``.
+
+    Raises:
+        ValueError: If the format is not one of ``FETCH_FORMATS``.
+    """
+    fetch_format = (
+        fetch_format
+        or workflow_args.get("metadata", {}).get("fetch-format")
+        or FETCH_FORMAT
+    )
+    if fetch_format not in FETCH_FORMATS:
+        raise ValueError(f"Unknown fetch format: {fetch_format}")
+    return fetch_format
+
+
+def get_extraction_state_key(workflow_args: Dict[str, Any]) -> str:
+    """Return the state store key of the incremental extraction state.
+
+    The state is kept per connection, so every run of a workflow extracting
+    the same connection shares it.
+    """
+    connection_qualified_name = workflow_args.get("connection", {}).get(
+        "connection_qualified_name"
+    )
+    return f"incremental_extraction_{connection_qualified_name or workflow_args['workflow_id']}"
+
+
+def get_capabilities_key(workflow_args: Dict[str, Any]) -> str:
+    """Return the state store key of the probed catalog capabilities.
+
+    Capabilities are kept per connection, like the incremental extraction
+    state.
+    """
+    connection_qualified_name = workflow_args.get("connection", {}).get(
+        "connection_qualified_name"
+    )
+    return f"capabilities_{connection_qualified_name or workflow_args['workflow_id']}"
+
+
+def get_incremental_settings(workflow_args: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the workflow settings an incremental extraction depends on."""
+    metadata = workflow_args.get("metadata", {})
+    settings = {key: metadata.get(key) for key in INCREMENTAL_SETTINGS_KEYS}
+    # Raw table outputs with and without view definitions are not
+    # interchangeable. Only recorded when enabled, so the states of runs
+    # from before the setting existed still match.
+    if is_deferred_view_definitions(workflow_args):
+        settings["deferred-view-definitions"] = True
+    return settings
+
+
+def get_schema_fingerprints(
+    catalog_name: str, rows: List[Dict[str, Any]]
+) -> Dict[Tuple[str, str], str]:
+    """Turn the rows of ``extract_schema_fingerprint.sql`` into fingerprints.
+
+    Args:
+        catalog_name: Catalog the rows were read from.
+        rows: One row per schema, column names in any case.
+
+    Returns:
+        Dict[Tuple[str, str], str]: Fingerprint per (catalog, schema).
+    """
+    fingerprints = {}
+    for row in rows:
+        values = {key.lower(): value for key, value in row.items()}
+        schema_name = values.pop("schema_name")
+        fingerprints[(catalog_name, schema_name)] = hashlib.sha256(
+            json.dumps(values, sort_keys=True, default=str).encode()
+        ).hexdigest()
+    return fingerprints
+
+
+def get_template_columns(template_path: str) -> Set[str]:
+    """Return the lowercased names a transformer template may read.
+
+    Every identifier in a ``source_query`` or ``source_columns`` counts, so
+    SQL keywords and function names are included too. That is harmless for
+    projecting raw columns, which only needs to keep every column read.
+    """
+    with open(template_path) as template_file:
+        template = yaml.safe_load(template_file)
+
+    names = set()
+    for column in template.get("columns", []):
+        names.update(name.lower() for name in column.get("source_columns") or [])
+        if isinstance(column.get("source_query"), str):
+            names.update(
+                name.lower()
+                for name in re.findall(
+                    r"[A-Za-z_][A-Za-z0-9_]*", column["source_query"]
+                )
+            )
+    return names
+
+
+def get_null_columns(query: Optional[str]) -> Set[str]:
+    """Return the lowercased names of the constant NULL columns of a query."""
+    return {name.lower() for name in NULL_COLUMN_PATTERN.findall(query or "")}
+
+
+def prune_null_columns(query: str) -> str:
+    """Remove the constant ``NULL as <name>`` columns from a query.
+
+    They carry no data, so they are filled back in at transform time instead
+    of being sent by the coordinator for every row. A comma left dangling in
+    front of ``FROM`` by the last removed column is dropped too.
+    """
+    query = NULL_COLUMN_PATTERN.sub("", query)
+    return re.sub(r",(\s*\bFROM\b)", r"\1", query, flags=re.IGNORECASE)
+
+
+def remove_view_definitions(query: str) -> str:
+    """Replace the view definitions of a table query with a NULL column.
+
+    The join of ``information_schema.views`` or the correlated subquery
+    reading it is dropped, so views are not read at all. The resulting
+    ``NULL as view_definition`` is pruned like any other NULL column when
+    projection pruning is enabled.
+    """
+    query = VIEW_DEFINITION_PATTERN.sub(r"\1NULL as view_definition,", query)
+    return VIEW_JOIN_PATTERN.sub("", query)
@@ -0,0 +1,197 @@
+"""Constants for the Presto metadata extraction application.
+
+Every value can be overridden through the environment, mirroring
+``application_sdk.constants``.
+"""
+
+import os
+
+#: Extraction mode used when the workflow metadata does not set one.
+#: ``monolithic`` runs one query per entity type across every catalog,
+#: ``per-schema`` fans table and column extraction out per catalog/schema.
+EXTRACTION_MODE = os.getenv("ATLAN_EXTRACTION_MODE", "monolithic")
+
+#: Maximum number of per-schema extraction activities in flight at once
+MAX_CONCURRENT_SCHEMAS = int(os.getenv("ATLAN_MAX_CONCURRENT_SCHEMAS", "8"))
+
+#: Whether per-schema extraction adapts the number of activities in flight,
+#: up to ``MAX_CONCURRENT_SCHEMAS``, to the load of the cluster when the
+#: workflow metadata does not say otherwise
+ADAPTIVE_CONCURRENCY = (
+    os.getenv("ATLAN_ADAPTIVE_CONCURRENCY", "false").lower() == "true"
+)
+
+#: Seconds between two samples of the cluster load
+ADAPTIVE_CONCURRENCY_SAMPLE_INTERVAL = float(
+    os.getenv("ATLAN_ADAPTIVE_CONCURRENCY_SAMPLE_INTERVAL", "15")
+)
+
+#: Queued queries above which the cluster counts as busy
+ADAPTIVE_CONCURRENCY_MAX_QUEUED_QUERIES = int(
+    os.getenv("ATLAN_ADAPTIVE_CONCURRENCY_MAX_QUEUED_QUERIES", "0")
+)
+
+#: Running queries per active worker above which the cluster counts as busy
+ADAPTIVE_CONCURRENCY_MAX_RUNNING_QUERIES_PER_WORKER = int(
+    os.getenv("ATLAN_ADAPTIVE_CONCURRENCY_MAX_RUNNING_QUERIES_PER_WORKER", "4")
+)
+
+#: Query used for monolithic table extraction when the workflow metadata does
+#: not set one. ``set-based`` joins pre-aggregated column counts and view
+#: definitions, ``correlated`` runs the original per-table subqueries.
+TABLE_EXTRACTION_QUERY = os.getenv("ATLAN_TABLE_EXTRACTION_QUERY", "set-based")
+
+#: Query used for column extraction when the workflow metadata does not set
+#: one. ``system-jdbc`` reads ``system.jdbc.columns``, ``information-schema``
+#: joins ``information_schema.columns`` with ``information_schema.tables`` and
+#: ``auto`` uses system.jdbc when a capability probe shows it is readable.
+COLUMN_EXTRACTION_QUERY = os.getenv(
+    "ATLAN_COLUMN_EXTRACTION_QUERY", "information-schema"
+)
+
+#: Whether extraction queries are streamed in fixed-size batches, each written
+#: to its own output chunk, when the workflow metadata does not say otherwise
+STREAMING_EXTRACTION = (
+    os.getenv("ATLAN_STREAMING_EXTRACTION", "false").lower() == "true"
+)
+
+#: Number of rows fetched and written per chunk by streaming extraction
+STREAMING_BATCH_SIZE = int(os.getenv("ATLAN_STREAMING_BATCH_SIZE", "25000"))
+
+#: Format streamed batches are fetched in when the workflow metadata does not
+#: set one. ``arrow`` transposes the driver rows straight into Arrow record
+#: batches written with pyarrow, ``pandas`` builds pandas DataFrames first.
+FETCH_FORMAT = os.getenv("ATLAN_FETCH_FORMAT", "pandas")
+
+#: Bytes of fetched result batches an extraction activity keeps in memory
+#: while they wait to be written, when the workflow metadata does not set a
+#: budget. Batches beyond it are spilled to local temporary files.
+ACTIVITY_MEMORY_BUDGET_MB = int(os.getenv("ATLAN_ACTIVITY_MEMORY_BUDGET_MB", "256"))
+
+#: Directory of the spill files of extraction activities, the system
+#: temporary directory when unset
+SPILL_DIRECTORY = os.getenv("ATLAN_SPILL_DIRECTORY") or None
+
+#: Whether the constant NULL columns of extraction queries are left out of
+#: the query, and filled in at transform time, when the workflow metadata
+#: does not say otherwise
+PROJECTION_PRUNING = os.getenv("ATLAN_PROJECTION_PRUNING", "false").lower() == "true"
+
+#: Parquet compression of raw extraction chunks when the workflow metadata does
+#: not set one, any codec supported by pyarrow, e.g. ``snappy``, which the SDK
+#: writes, or ``zstd``
+RAW_OUTPUT_COMPRESSION = os.getenv("ATLAN_RAW_OUTPUT_COMPRESSION", "snappy")
+
+#: Maximum number of rows per Parquet row group of raw extraction chunks
+RAW_OUTPUT_ROW_GROUP_SIZE = int(os.getenv("ATLAN_RAW_OUTPUT_ROW_GROUP_SIZE", "25000"))
+
+#: Whether runs skip catalog/schema partitions whose fingerprint did not change
+#: since the previous run of the connection, when the workflow metadata does
+#: not say otherwise. Incremental extraction always runs per schema.
+INCREMENTAL_EXTRACTION = (
+    os.getenv("ATLAN_INCREMENTAL_EXTRACTION", "false").lower() == "true"
+)
+
+#: Whether monolithic table and column extraction runs partition by partition
+#: in one activity, heartbeating a checkpoint after every catalog/schema so a
+#: retried attempt resumes after the last completed one, when the workflow
+#: metadata does not say otherwise
+RESUMABLE_EXTRACTION = (
+    os.getenv("ATLAN_RESUMABLE_EXTRACTION", "false").lower() == "true"
+)
+
+#: Whether table extraction leaves view definitions out and fetches them in
+#: a separate pass, stored once per content hash, when the workflow metadata
+#: does not say otherwise
+DEFERRED_VIEW_DEFINITIONS = (
+    os.getenv("ATLAN_DEFERRED_VIEW_DEFINITIONS", "false").lower() == "true"
+)
+
+#: Number of schemas whose view definitions are fetched with one query
+VIEW_DEFINITION_SCHEMA_BATCH_SIZE = int(
+    os.getenv("ATLAN_VIEW_DEFINITION_SCHEMA_BATCH_SIZE", "50")
+)
+
+#: Whether databases and procedures are extracted for every catalog selected
+#: by the workflow filters, rather than the catalog of the connection, when
+#: the workflow metadata does not say otherwise
+MULTI_CATALOG_EXTRACTION = (
+    os.getenv("ATLAN_MULTI_CATALOG_EXTRACTION", "false").lower() == "true"
+)
+
+#: Maximum number of catalogs queried at once by multi-catalog extraction
+MAX_CONCURRENT_CATALOGS = int(os.getenv("ATLAN_MAX_CONCURRENT_CATALOGS", "4"))
+
+#: Whether streamed extraction batches are transformed and written as soon
+#: as they are fetched, in the extraction activity, when the workflow metadata
+#: does not say otherwise
+PIPELINED_EXTRACTION = (
+    os.getenv("ATLAN_PIPELINED_EXTRACTION", "false").lower() == "true"
+)
+
+#: Maximum number of batches waiting between two stages of pipelined
+#: extraction
+PIPELINE_QUEUE_SIZE = int(os.getenv("ATLAN_PIPELINE_QUEUE_SIZE", "2"))
+
+#: Whether the information_schema relations every catalog supports are
+#: probed, and extraction queries a catalog cannot answer are skipped, when
+#: the workflow metadata does not say otherwise
+CAPABILITY_PROBING = os.getenv("ATLAN_CAPABILITY_PROBING", "false").lower() == "true"
+
+#: Seconds a probed capability of a catalog is trusted before it is probed
+#: again
+CAPABILITY_CACHE_TTL = float(os.getenv("ATLAN_CAPABILITY_CACHE_TTL", "86400"))
+
+#: Seconds a capability probe may take before it is cancelled and the
+#: relation recorded as unsupported
+CAPABILITY_PROBE_TIMEOUT = float(os.getenv("ATLAN_CAPABILITY_PROBE_TIMEOUT", "30"))
+
+#: Seconds above which a supported relation is too slow to be extracted
+CAPABILITY_SLOW_PROBE_SECONDS = float(
+    os.getenv("ATLAN_CAPABILITY_SLOW_PROBE_SECONDS", "10")
+)
+
+#: Maximum number of SQL engines, one per set of credentials, kept in the
+#: worker's engine pool
+SQL_ENGINE_POOL_MAX_SIZE = int(os.getenv("ATLAN_SQL_ENGINE_POOL_MAX_SIZE", "8"))
+
+#: Seconds an unused pooled engine is kept before it is disposed
+SQL_ENGINE_POOL_IDLE_TIMEOUT = float(
+    os.getenv("ATLAN_SQL_ENGINE_POOL_IDLE_TIMEOUT", "300")
+)
+
+#: Seconds after which a pooled engine is health checked before it is reused
+SQL_ENGINE_POOL_HEALTH_CHECK_INTERVAL = float(
+    os.getenv("ATLAN_SQL_ENGINE_POOL_HEALTH_CHECK_INTERVAL", "60")
+)
+
+#: Maximum number of connections, and keep-alive HTTP connections to the
+#: coordinator, per pooled engine
+SQL_ENGINE_POOL_CONNECTIONS = int(os.getenv("ATLAN_SQL_ENGINE_POOL_CONNECTIONS", "16"))
+
+#: Seconds an unreachable coordinator is kept out of rotation before it is
+#: health checked again
+COORDINATOR_RETRY_INTERVAL = float(os.getenv("ATLAN_COORDINATOR_RETRY_INTERVAL", "30"))
+
+#: Seconds the catalogs and schemas listed by the schema browser are cached
+METADATA_CACHE_TTL = float(os.getenv("ATLAN_METADATA_CACHE_TTL", "300"))
+
+#: Maximum number of schema browser results, one per set of credentials,
+#: kept in the metadata cache
+METADATA_CACHE_MAX_SIZE = int(os.getenv("ATLAN_METADATA_CACHE_MAX_SIZE", "64"))
+
+#: Number of catalogs or schemas returned per schema browser page, unless the
+#: request asks for fewer
+METADATA_PAGE_SIZE = int(os.getenv("ATLAN_METADATA_PAGE_SIZE", "100"))
+
+#: Seconds each preflight check may take before it is cancelled and fails
+PREFLIGHT_CHECK_TIMEOUT = float(os.getenv("ATLAN_PREFLIGHT_CHECK_TIMEOUT", "30"))
+
+#: Number of tables at which the preflight tables check stops counting
+PREFLIGHT_TABLES_CHECK_LIMIT = int(
+    os.getenv("ATLAN_PREFLIGHT_TABLES_CHECK_LIMIT", "100000")
+)
+
+#: Maximum number of compiled transformer projections, one per entity type
+#: and raw schema, kept per worker process
+TEMPLATE_CACHE_MAX_SIZE = int(os.getenv("ATLAN_TEMPLATE_CACHE_MAX_SIZE", "256"))
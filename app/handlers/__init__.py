@@ -0,0 +1,493 @@
+import asyncio
+import json
+import re
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from application_sdk.clients.sql import BaseSQLClient
+from application_sdk.common.utils import read_sql_files
+from application_sdk.constants import SQL_QUERIES_PATH, SQL_SERVER_MIN_VERSION
+from application_sdk.handlers.sql import BaseSQLHandler
+from application_sdk.observability.logger_adaptor import get_logger
+from application_sdk.server.fastapi.models import MetadataType
+from packaging import version
+
+from app.clients import SQLClient
+from app.clients.pool import get_pool_key
+from app.common.utils import (
+    prepare_query,
+    quote_identifier,
+    quote_like_prefix,
+    quote_literal,
+    quote_literal_list,
+)
+from app.constants import (
+    METADATA_PAGE_SIZE,
+    PREFLIGHT_CHECK_TIMEOUT,
+    PREFLIGHT_TABLES_CHECK_LIMIT,
+)
+from app.handlers.cache import MetadataCache, metadata_cache
+
+logger = get_logger(__name__)
+
+queries = read_sql_files(queries_prefix=SQL_QUERIES_PATH)
+
+# Fields of a /workflows/v1/metadata request that are not credentials
+METADATA_REQUEST_KEYS = ("type", "database", "refresh", "cursor", "prefix", "limit")
+
+
+@dataclass(frozen=True)
+class MetadataRequest:
+    """
+    A request served by the handler: the pool key of its credentials, the
+    client loaded with them and, for /workflows/v1/metadata requests, their
+    other fields.
+    """
+
+    cache_key: str
+    parameters: Dict[str, Any] = field(default_factory=dict)
+    sql_client: Optional[BaseSQLClient] = field(default=None, compare=False)
+
+
+@dataclass(frozen=True)
+class MetadataPage:
+    """
+    A page of catalogs or schemas: the names after ``cursor`` starting with
+    ``prefix``, at most ``limit`` of them.
+    """
+
+    cursor: str = ""
+    prefix: str = ""
+    limit: int = METADATA_PAGE_SIZE
+
+
+def get_metadata_page(parameters: Dict[str, Any]) -> MetadataPage:
+    """Return the page requested by the parameters of a metadata request."""
+    limit = int(parameters.get("limit") or METADATA_PAGE_SIZE)
+    return MetadataPage(
+        cursor=parameters.get("cursor") or "",
+        prefix=parameters.get("prefix") or "",
+        limit=max(1, min(limit, METADATA_PAGE_SIZE)),
+    )
+
+
+# Request being served by the current task. The handler is shared by all
+# requests, which call load and then fetch_metadata, so what load reads from
+# a request, and the client it loads, is kept per task rather than on the
+# handler.
+_metadata_request: ContextVar[Optional[MetadataRequest]] = ContextVar(
+    "metadata_request", default=None
+)
+
+
+class SQLHandler(BaseSQLHandler):
+    """
+    Handler for the Presto application.
+
+    The schema browser lists catalogs and, once a catalog is expanded, its
+    schemas, one page at a time. Metadata requests of type ``database`` and
+    ``schema`` accept:
+
+    - ``cursor``: last name of the previous page, the page starts after it
+    - ``prefix``: only names starting with it are listed
+    - ``limit``: page size, at most ``METADATA_PAGE_SIZE``
+
+    If there is a next page, the last entry of the page has a
+    ``NEXT_CURSOR``, the ``cursor`` of the next page. Results are cached per
+    set of credentials in :data:`app.handlers.cache.metadata_cache`. Requests
+    with ``refresh`` set bypass the cached result and replace it.
+
+    Every request loads its own client, created by ``sql_client_factory``,
+    so a concurrent request with other credentials cannot swap the engine
+    between the load and the queries of another. Clients loaded with the
+    same credentials share the pooled engine.
+
+    Preflight checks run concurrently, each on its own connection of the
+    pooled engine, and fail once they take longer than
+    ``preflight_check_timeout`` seconds.
+    """
+
+    list_catalogs_sql: Optional[str] = queries.get("LIST_CATALOGS")
+    list_schemas_sql: Optional[str] = queries.get("LIST_SCHEMAS")
+    preflight_catalogs_sql: Optional[str] = queries.get("PREFLIGHT_CATALOGS")
+    preflight_schemas_sql: Optional[str] = queries.get("PREFLIGHT_SCHEMAS")
+    extract_include_schemas_sql: Optional[str] = queries.get("EXTRACT_INCLUDE_SCHEMAS")
+
+    next_cursor_key: str = "NEXT_CURSOR"
+
+    preflight_check_timeout: float = PREFLIGHT_CHECK_TIMEOUT
+    tables_check_limit: int = PREFLIGHT_TABLES_CHECK_LIMIT
+
+    metadata_cache: MetadataCache = metadata_cache
+
+    def __init__(
+        self,
+        sql_client: Optional[BaseSQLClient] = None,
+        sql_client_factory: Optional[Callable[[], BaseSQLClient]] = None,
+    ):
+        super().__init__(sql_client)
+        if sql_client_factory is None:
+            sql_client_factory = type(sql_client) if sql_client else SQLClient
+        self.sql_client_factory = sql_client_factory
+
+    @property
+    def sql_client(self) -> BaseSQLClient:
+        """The client loaded by the current request, else the handler's own."""
+        request = _metadata_request.get()
+        if request is not None and request.sql_client is not None:
+            return request.sql_client
+        return self._sql_client
+
+    @sql_client.setter
+    def sql_client(self, sql_client: BaseSQLClient) -> None:
+        self._sql_client = sql_client
+
+    async def load(self, credentials: Dict[str, Any]) -> None:
+        credentials = dict(credentials)
+        parameters: Dict[str, Any] = {}
+        if "type" in credentials:
+            # Metadata requests carry their parameters next to the credentials,
+            # keep them out of the client so the pooled engine is shared
+            parameters = {
+                key: credentials.pop(key, None) for key in METADATA_REQUEST_KEYS
+            }
+        _metadata_request.set(
+            MetadataRequest(
+                get_pool_key(credentials), parameters, self.sql_client_factory()
+            )
+        )
+        await super().load(credentials)
+
+    async def fetch_metadata(
+        self,
+        metadata_type: Optional[MetadataType] = None,
+        database: Optional[str] = None,
+    ) -> List[Dict[str, str]]:
+        request = _metadata_request.get()
+        if request is None:
+            return await super().fetch_metadata(metadata_type, database)
+
+        page = get_metadata_page(request.parameters)
+        if metadata_type == MetadataType.DATABASE:
+            fetch = partial(self.fetch_databases, page)
+        elif metadata_type == MetadataType.SCHEMA and database:
+            fetch = partial(self.fetch_schemas, database, page)
+        else:
+            fetch = partial(super().fetch_metadata, metadata_type, database)
+        key = json.dumps(
+            [
+                request.cache_key,
+                metadata_type,
+                database,
+                page.cursor,
+                page.prefix,
+                page.limit,
+            ]
+        )
+        return await self.metadata_cache.get(
+            key, fetch, refresh=bool(request.parameters.get("refresh"))
+        )
+
+    async def fetch_databases(
+        self, page: MetadataPage = MetadataPage()
+    ) -> List[Dict[str, str]]:
+        """Fetch one page of catalogs, the first one by default."""
+        if self.list_catalogs_sql is None:
+            raise ValueError("list_catalogs_sql is not defined")
+
+        query = self.list_catalogs_sql.format(
+            cursor=quote_literal(page.cursor),
+            prefix=quote_like_prefix(page.prefix),
+            limit=page.limit + 1,
+        )
+        return self.get_page_results(
+            [
+                {self.database_result_key: row["catalog_name"]}
+                for row in await self.run_query(query)
+            ],
+            page,
+            self.database_result_key,
+        )
+
+    async def fetch_schemas(
+        self, database: str, page: MetadataPage = MetadataPage()
+    ) -> List[Dict[str, str]]:
+        """Fetch one page of schemas of a catalog, the first one by default."""
+        if self.list_schemas_sql is None:
+            raise ValueError("list_schemas_sql is not defined")
+
+        query = self.list_schemas_sql.format(
+            catalog_name=quote_identifier(database),
+            cursor=quote_literal(page.cursor),
+            prefix=quote_like_prefix(page.prefix),
+            limit=page.limit + 1,
+        )
+        return self.get_page_results(
+            [
+                {
+                    self.database_result_key: database,
+                    self.schema_result_key: row["schema_name"],
+                }
+                for row in await self.run_query(query)
+            ],
+            page,
+            self.schema_result_key,
+        )
+
+    def get_page_results(
+        self, results: List[Dict[str, str]], page: MetadataPage, name_key: str
+    ) -> List[Dict[str, str]]:
+        """
+        Return the first ``page.limit`` results, listed one past the limit.
+        If there are more, the last one gets a ``next_cursor_key`` holding its
+        ``name_key``, the cursor of the next page.
+        """
+        if len(results) <= page.limit:
+            return results
+        results = results[: page.limit]
+        results[-1] = {
+            **results[-1],
+            self.next_cursor_key: results[-1][name_key],
+        }
+        return results
+
+    async def run_query(self, query: str) -> List[Dict[str, Any]]:
+        """Run a query returning few rows and return them as dictionaries."""
+        rows: List[Dict[str, Any]] = []
+        async for batch in self.sql_client.run_query_batches(
+            query, batch_size=METADATA_PAGE_SIZE
+        ):
+            rows.extend(batch.to_dict(orient="records"))
+        return rows
+
+    async def preflight_check(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run the preflight checks concurrently, each bounded by a deadline.
+
+        The checks share the pooled engine of the credentials, and with it
+        its keep-alive HTTP session to the coordinator, but each query checks
+        out its own DB-API connection: a connection runs one statement at a
+        time. A check past its deadline has its query cancelled on the
+        coordinator and its connection closed, see ``SQLClient.start_query``.
+        """
+        logger.info("Starting preflight check")
+        results: Dict[str, Any] = {}
+        try:
+            (
+                results["databaseSchemaCheck"],
+                results["tablesCheck"],
+                results["versionCheck"],
+            ) = await asyncio.gather(
+                self.run_check(
+                    "Schemas and Databases check",
+                    self.check_schemas_and_databases(payload),
+                ),
+                self.run_check("Tables check", self.tables_check(payload)),
+                self.run_check("Client version check", self.check_client_version()),
+            )
+
+            failed_checks = {
+                name: result
+                for name, result in results.items()
+                if not result["success"]
+            }
+            if failed_checks:
+                raise ValueError(
+                    "Preflight check failed, "
+                    + ", ".join(
+                        f"{name}: {result}" for name, result in failed_checks.items()
+                    )
+                )
+
+            logger.info("Preflight check completed successfully")
+        except Exception as exc:
+            logger.error(f"Error during preflight check {exc}", exc_info=True)
+            results["error"] = f"Preflight check failed: {str(exc)}"
+        return results
+
+    async def run_check(
+        self, name: str, check: Awaitable[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Await a preflight check, failing it once its deadline has passed."""
+        try:
+            return await asyncio.wait_for(check, self.preflight_check_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"{name} did not finish within {self.preflight_check_timeout:g} seconds"
+            )
+            return {
+                "success": False,
+                "successMessage": "",
+                "failureMessage": f"{name} timed out after "
+                f"{self.preflight_check_timeout:g} seconds",
+            }
+
+    async def check_schemas_and_databases(
+        self, payload: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Check that the catalogs and schemas of the include filter exist.
+
+        Only the catalogs and schemas named by the filter are looked up, the
+        schemas of every catalog concurrently, instead of listing all of them.
+        """
+        logger.info("Starting schema and database check")
+        try:
+            include_filter = json.loads(
+                payload.get("metadata", {}).get("include-filter") or "{}"
+            )
+            allowed_databases: Set[str] = set()
+            allowed_schemas: Set[str] = set()
+            if include_filter and self.preflight_catalogs_sql:
+                rows = await self.run_query(
+                    self.preflight_catalogs_sql.format(
+                        catalog_names=quote_literal_list(
+                            database.strip("^$") for database in include_filter
+                        )
+                    )
+                )
+                allowed_databases = {row["catalog_name"] for row in rows}
+
+            schema_filters = {
+                database.strip("^$"): [schema.strip("^$") for schema in schemas]
+                for database, schemas in include_filter.items()
+                if isinstance(schemas, list)
+                and schemas
+                and database.strip("^$") in allowed_databases
+            }
+            if schema_filters and self.preflight_schemas_sql:
+                schema_rows = await asyncio.gather(
+                    *(
+                        self.run_query(
+                            self.preflight_schemas_sql.format(
+                                catalog_name=quote_identifier(database),
+                                schema_names=quote_literal_list(schemas),
+                            )
+                        )
+                        for database, schemas in schema_filters.items()
+                    )
+                )
+                for database, rows in zip(schema_filters, schema_rows):
+                    allowed_schemas.update(
+                        f"{database}.{row['schema_name']}" for row in rows
+                    )
+
+            check_success, missing_object_name = self.validate_filters(
+                include_filter, allowed_databases, allowed_schemas
+            )
+            return {
+                "success": check_success,
+                "successMessage": (
+                    "Schemas and Databases check successful" if check_success else ""
+                ),
+                "failureMessage": (
+                    f"Schemas and Databases check failed for {missing_object_name}"
+                    if not check_success
+                    else ""
+                ),
+            }
+        except Exception as exc:
+            logger.error("Error during schema and database check", exc_info=True)
+            return {
+                "success": False,
+                "successMessage": "",
+                "failureMessage": "Schemas and Databases check failed",
+                "error": str(exc),
+            }
+
+    async def tables_check(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Check that tables match the filters, counting at most
+        ``tables_check_limit`` of them.
+        """
+        logger.info("Starting tables check")
+        query = prepare_query(
+            self.tables_check_sql,
+            payload,
+            temp_table_regex_sql=self.extract_temp_table_regex_table_sql,
+            include_schemas_sql=self.extract_include_schemas_sql,
+            limit=str(self.tables_check_limit),
+        )
+        if not query:
+            raise ValueError("tables_check_sql is not defined")
+        try:
+            count = sum(row["count"] for row in await self.run_query(query))
+            at_least = "at least " if count >= self.tables_check_limit else ""
+            return {
+                "success": True,
+                "successMessage": f"Tables check successful. Table count: {at_least}{count}",
+                "failureMessage": "",
+            }
+        except Exception as exc:
+            logger.error("Error during tables check", exc_info=True)
+            return {
+                "success": False,
+                "successMessage": "",
+                "failureMessage": "Tables check failed",
+                "error": str(exc),
+            }
+
+    async def check_client_version(self) -> Dict[str, Any]:
+        """
+        Check that every coordinator and worker meets the minimum version.
+
+        The oldest version reported by ``client_version_sql`` is compared with
+        ``ATLAN_SQL_SERVER_MIN_VERSION``; the check is skipped if neither is
+        known.
+        """
+        logger.info("Checking client version")
+        try:
+            versions = []
+            if self.client_version_sql:
+                for row in await self.run_query(self.client_version_sql):
+                    version_string = str(next(iter(row.values())))
+                    version_match = re.search(r"(\d+\.\d+(?:\.\d+)?)", version_string)
+                    if version_match:
+                        versions.append(version_match.group(1))
+                    else:
+                        logger.warning(
+                            f"Could not extract version number from: {version_string}"
+                        )
+
+            if not versions:
+                logger.info("Client version could not be determined")
+                return {
+                    "success": True,
+                    "successMessage": "Client version check skipped - version could not be determined",
+                    "failureMessage": "",
+                }
+
+            client_version = min(versions, key=version.parse)
+            if not SQL_SERVER_MIN_VERSION:
+                return {
+                    "success": True,
+                    "successMessage": f"Client version: {client_version} (no minimum version requirement)",
+                    "failureMessage": "",
+                }
+
+            is_valid = version.parse(client_version) >= version.parse(
+                SQL_SERVER_MIN_VERSION
+            )
+            return {
+                "success": is_valid,
+                "successMessage": (
+                    f"Client version {client_version} meets minimum required version {SQL_SERVER_MIN_VERSION}"
+                    if is_valid
+                    else ""
+                ),
+                "failureMessage": (
+                    f"Client version {client_version} does not meet minimum required version {SQL_SERVER_MIN_VERSION}"
+                    if not is_valid
+                    else ""
+                ),
+            }
+        except Exception as exc:
+            logger.error(f"Error during client version check: {exc}", exc_info=True)
+            return {
+                "success": False,
+                "successMessage": "",
+                "failureMessage": "Client version check failed",
+                "error": str(exc),
+            }
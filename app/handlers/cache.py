@@ -0,0 +1,123 @@
+"""Process wide cache of the schema browser metadata.
+
+``/workflows/v1/metadata`` lists every catalog and schema the credentials can
+see, which on large clusters takes tens of seconds, and the frontend asks for
+it every time the include/exclude dropdowns are opened. The cache keeps the
+result per set of credentials and request, so repeated opens and several
+users configuring the same connection are answered from memory.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List
+
+from application_sdk.observability.logger_adaptor import get_logger
+
+from app.constants import METADATA_CACHE_MAX_SIZE, METADATA_CACHE_TTL
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class CachedMetadata:
+    """A cached metadata result with the time it was fetched."""
+
+    metadata: List[Dict[str, Any]]
+    fetched_at: float
+
+
+class MetadataCache:
+    """
+    LRU cache of metadata results with a time to live.
+
+    Results are kept for ``ttl`` seconds. Once more than ``max_size`` results
+    are cached the least recently used one is dropped. Concurrent misses for
+    the same key share a single fetch.
+    """
+
+    def __init__(
+        self,
+        max_size: int = METADATA_CACHE_MAX_SIZE,
+        ttl: float = METADATA_CACHE_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: "OrderedDict[str, CachedMetadata]" = OrderedDict()
+        self._fetches: Dict[str, "asyncio.Future[List[Dict[str, Any]]]"] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[List[Dict[str, Any]]]],
+        refresh: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the metadata cached under ``key``, fetching it if needed.
+
+        Args:
+            key: Cache key, see :func:`app.clients.pool.get_pool_key`.
+            fetch: Coroutine function fetching the metadata from the source.
+            refresh: Fetch again even if a cached result is still fresh.
+
+        Returns:
+            List[Dict[str, Any]]: The metadata.
+        """
+        if not refresh:
+            cached = self._entries.get(key)
+            if cached and self.clock() - cached.fetched_at < self.ttl:
+                self._entries.move_to_end(key)
+                return cached.metadata
+            fetching = self._fetches.get(key)
+            if fetching:
+                return await asyncio.shield(fetching)
+
+        future: "asyncio.Future[List[Dict[str, Any]]]" = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._fetches[key] = future
+        try:
+            metadata = await fetch()
+            future.set_result(metadata)
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the error as retrieved, no other request may be waiting
+            future.exception()
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            if self._fetches.get(key) is future:
+                del self._fetches[key]
+
+        self._entries[key] = CachedMetadata(metadata, self.clock())
+        self._entries.move_to_end(key)
+        self._evict()
+        return metadata
+
+    def invalidate(self, key: str) -> None:
+        """Drop the result cached under ``key``."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        self._entries.clear()
+
+    def _evict(self) -> None:
+        now = self.clock()
+        for key, cached in list(self._entries.items()):
+            if now - cached.fetched_at >= self.ttl:
+                del self._entries[key]
+        while len(self._entries) > self.max_size:
+            key, _ = self._entries.popitem(last=False)
+            logger.debug(f"Evicted cached metadata {key}")
+
+
+#: Metadata cache shared by all requests the application server handles
+metadata_cache = MetadataCache()
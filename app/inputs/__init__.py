@@ -0,0 +1,71 @@
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional, Set
+
+from application_sdk.inputs.parquet import ParquetInput as BaseParquetInput
+
+if TYPE_CHECKING:
+    import daft
+
+
+def project(
+    dataframe: "daft.DataFrame",
+    columns: Optional[Set[str]] = None,
+    null_columns: Optional[Set[str]] = None,
+) -> "daft.DataFrame":
+    """
+    Select ``columns`` of a DataFrame, matched case-insensitively, or every
+    column if none of them exist, and add the missing ``null_columns``.
+    """
+    import daft
+
+    if columns:
+        columns = {column.lower() for column in columns}
+        selected = [
+            column for column in dataframe.column_names if column.lower() in columns
+        ]
+        if selected:
+            dataframe = dataframe.select(*selected)
+
+    present = {column.lower() for column in dataframe.column_names}
+    missing = sorted({column.lower() for column in null_columns or []} - present)
+    if missing:
+        dataframe = dataframe.with_columns(
+            {column: daft.lit(None) for column in missing}
+        )
+    return dataframe
+
+
+class ParquetInput(BaseParquetInput):
+    """
+    Parquet input that reads only the columns it is asked for.
+
+    Column names are matched case-insensitively. daft pushes the projection
+    down into the Parquet scan, so other columns are never decoded.
+    ``null_columns`` missing from a file are added as Null-typed columns,
+    the type constant NULL columns have when they are extracted.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        chunk_size: Optional[int] = 100000,
+        input_prefix: Optional[str] = None,
+        file_names: Optional[List[str]] = None,
+        columns: Optional[Set[str]] = None,
+        null_columns: Optional[Set[str]] = None,
+    ):
+        super().__init__(
+            path=path,
+            chunk_size=chunk_size,
+            input_prefix=input_prefix,
+            file_names=file_names,
+        )
+        self.columns = {column.lower() for column in columns} if columns else None
+        self.null_columns = {column.lower() for column in null_columns or []}
+
+    def project(self, dataframe: "daft.DataFrame") -> "daft.DataFrame":
+        """Select the requested columns, see :func:`project`."""
+        return project(dataframe, self.columns, self.null_columns)
+
+    async def get_batched_daft_dataframe(self) -> AsyncIterator["daft.DataFrame"]:  # type: ignore
+        async for dataframe in super().get_batched_daft_dataframe():
+            yield self.project(dataframe)
@@ -0,0 +1,102 @@
+from typing import TYPE_CHECKING, Any, Optional
+
+from application_sdk.observability.logger_adaptor import get_logger
+from application_sdk.observability.metrics_adaptor import MetricType
+from application_sdk.outputs.parquet import ParquetOutput as BaseParquetOutput
+
+from app.constants import RAW_OUTPUT_COMPRESSION, RAW_OUTPUT_ROW_GROUP_SIZE
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+logger = get_logger(__name__)
+
+
+class ParquetOutput(BaseParquetOutput):
+    """
+    Parquet output that also writes Arrow tables.
+
+    Arrow chunks are written with the same ``<chunk>.parquet`` naming and
+    counters as pandas chunks, so they are read back by the transformer and
+    carried forward by incremental extraction exactly like them. Both are
+    written with pyarrow, using ``compression`` and at most
+    ``row_group_size`` rows per row group.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        compression: str = RAW_OUTPUT_COMPRESSION,
+        row_group_size: Optional[int] = RAW_OUTPUT_ROW_GROUP_SIZE,
+        **kwargs: Any,
+    ):
+        import pyarrow as pa
+
+        try:
+            available = compression == "none" or pa.Codec.is_available(compression)
+        except ValueError:
+            available = False
+        if not available:
+            raise ValueError(f"Unknown parquet compression: {compression}")
+        super().__init__(*args, **kwargs)
+        self.compression = compression
+        self.row_group_size = row_group_size
+
+    async def write_dataframe(self, dataframe: "pd.DataFrame") -> None:
+        """
+        Write a pandas DataFrame to a Parquet chunk and upload it to the object store.
+        """
+        import pyarrow as pa
+
+        await self.write_arrow_table(
+            pa.Table.from_pandas(dataframe, preserve_index=False), source="pandas"
+        )
+
+    async def write_arrow_table(self, table: "pa.Table", source: str = "arrow") -> None:
+        """
+        Write an Arrow table to a Parquet chunk and upload it to the object store.
+        """
+        import pyarrow.parquet as pq
+
+        try:
+            if table.num_rows == 0:
+                return
+
+            self.chunk_count += 1
+            self.total_record_count += table.num_rows
+            file_path = f"{self.output_path}/{self.chunk_count}.parquet"
+
+            pq.write_table(
+                table,
+                file_path,
+                compression=self.compression,
+                row_group_size=self.row_group_size or None,
+            )
+
+            self.metrics.record_metric(
+                name="parquet_write_records",
+                value=table.num_rows,
+                metric_type=MetricType.COUNTER,
+                labels={"type": source, "mode": self.write_mode},
+                description="Number of records written to Parquet files",
+            )
+            self.metrics.record_metric(
+                name="parquet_chunks_written",
+                value=1,
+                metric_type=MetricType.COUNTER,
+                labels={"type": source, "mode": self.write_mode},
+                description="Number of chunks written to Parquet files",
+            )
+
+            await self.upload_file(file_path)
+        except Exception as e:
+            self.metrics.record_metric(
+                name="parquet_write_errors",
+                value=1,
+                metric_type=MetricType.COUNTER,
+                labels={"type": source, "mode": self.write_mode, "error": str(e)},
+                description="Number of errors while writing to Parquet files",
+            )
+            logger.error(f"Error writing {source} table to parquet: {str(e)}")
+            raise
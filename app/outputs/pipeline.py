@@ -0,0 +1,68 @@
+"""Pipeline of concurrent stages connected by bounded queues.
+
+Pipelined extraction hands every fetched batch to a chain of stages, e.g.
+writing the raw chunk, transforming it and writing the transformed chunk.
+Every stage runs as its own task and takes its input from a queue holding
+at most ``max_queued`` items, so a stage that falls behind holds back the
+stages before it, down to the fetch, instead of letting them run ahead and
+pile batches up in memory. Stages that are CPU bound can run in a thread,
+so they overlap with the network bound fetch.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Sequence
+
+#: A stage of a pipeline, returning what is handed to the next stage
+Stage = Callable[[Any], Awaitable[Any]]
+
+# End of the items of a queue
+_END = object()
+
+
+async def run_pipeline(
+    items: AsyncIterator[Any], stages: Sequence[Stage], max_queued: int = 1
+) -> None:
+    """
+    Pass every item of ``items`` through ``stages``, in order.
+
+    Each stage processes one item at a time and hands its result to the
+    next stage through a queue of at most ``max_queued`` items; what the
+    last stage returns is dropped. Items go through every stage in the
+    order they are fetched. An error of the fetch or of any stage stops all
+    of them and is raised.
+    """
+    if max_queued < 1:
+        raise ValueError(f"Pipeline queues must hold an item, not {max_queued}")
+    queues: List["asyncio.Queue[Any]"] = [
+        asyncio.Queue(maxsize=max_queued) for _ in stages
+    ]
+
+    async def fetch() -> None:
+        async for item in items:
+            await queues[0].put(item)
+        await queues[0].put(_END)
+
+    async def process(index: int, stage: Stage) -> None:
+        output = queues[index + 1] if index + 1 < len(queues) else None
+        while (item := await queues[index].get()) is not _END:
+            result = await stage(item)
+            if output is not None:
+                await output.put(result)
+        if output is not None:
+            await output.put(_END)
+
+    if not stages:
+        async for _ in items:
+            pass
+        return
+
+    tasks = [
+        asyncio.create_task(fetch()),
+        *(asyncio.create_task(process(i, stage)) for i, stage in enumerate(stages)),
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.wait(tasks)
@@ -0,0 +1,224 @@
+"""Memory bounded buffer between an extraction query and its output.
+
+Result batches are fetched from the coordinator while earlier batches are
+still being written and uploaded, so a slow object store never stalls the
+query. The batches waiting to be written are kept in memory up to a byte
+budget; batches beyond it are spilled to Arrow IPC files in a temporary
+directory and memory-mapped when they are read back for writing. Memory is
+bounded by the budget plus the batch being fetched and the batch being
+written, whatever the size of the catalog. The batches of several queries
+running concurrently can be merged into one output with :func:`merge_tables`.
+"""
+
+import asyncio
+import os
+import tempfile
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Optional,
+    Tuple,
+)
+
+from application_sdk.observability.logger_adaptor import get_logger
+from application_sdk.observability.metrics_adaptor import MetricType, get_metrics
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+logger = get_logger(__name__)
+
+
+class SpillBuffer:
+    """
+    FIFO of Arrow tables holding at most ``max_bytes`` in memory.
+
+    Tables that do not fit are written to a temporary directory, created
+    in ``directory`` on the first spill and removed by :meth:`cleanup`.
+    Every spill is counted in the ``spill_buffer_spilled_bytes`` and
+    ``spill_buffer_spilled_batches`` metrics.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        directory: Optional[str] = None,
+        labels: Optional[Dict[str, str]] = None,
+    ):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.labels = labels or {}
+        self.memory_bytes = 0
+        self.peak_memory_bytes = 0
+        self.spilled_bytes = 0
+        self.spilled_batches = 0
+        # (table, None, bytes) in memory, (None, path, bytes) spilled
+        self._entries: (
+            "asyncio.Queue[Tuple[Optional[pa.Table], Optional[str], int]]"
+        ) = asyncio.Queue()
+        self._spill_directory: Optional[tempfile.TemporaryDirectory] = None
+
+    async def put(self, table: "pa.Table") -> None:
+        """Add a table, spilling it to disk if it does not fit in memory."""
+        nbytes = table.nbytes
+        if self.memory_bytes + nbytes <= self.max_bytes:
+            self.memory_bytes += nbytes
+            self.peak_memory_bytes = max(self.peak_memory_bytes, self.memory_bytes)
+            self._entries.put_nowait((table, None, nbytes))
+            return
+
+        if self._spill_directory is None:
+            self._spill_directory = tempfile.TemporaryDirectory(
+                prefix="spill-", dir=self.directory
+            )
+        self.spilled_batches += 1
+        path = os.path.join(self._spill_directory.name, f"{self.spilled_batches}.arrow")
+        await asyncio.get_running_loop().run_in_executor(None, spill, table, path)
+        self.spilled_bytes += nbytes
+        self._entries.put_nowait((None, path, nbytes))
+
+        metrics = get_metrics()
+        metrics.record_metric(
+            name="spill_buffer_spilled_bytes",
+            value=nbytes,
+            metric_type=MetricType.COUNTER,
+            labels=self.labels,
+            description="Bytes of result batches spilled to disk",
+            unit="bytes",
+        )
+        metrics.record_metric(
+            name="spill_buffer_spilled_batches",
+            value=1,
+            metric_type=MetricType.COUNTER,
+            labels=self.labels,
+            description="Number of result batches spilled to disk",
+        )
+
+    async def get(self) -> Optional["pa.Table"]:
+        """
+        Return the oldest table, or None once the buffer is closed and empty.
+        """
+        import pyarrow as pa
+
+        table, path, nbytes = await self._entries.get()
+        if path is None:
+            self.memory_bytes -= nbytes
+            return table
+        table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+        # the mapping stays valid until the table is released
+        os.unlink(path)
+        return table
+
+    def close(self) -> None:
+        """Mark the end of the tables."""
+        self._entries.put_nowait((None, None, 0))
+
+    def cleanup(self) -> None:
+        """Remove the spill files."""
+        if self._spill_directory is not None:
+            self._spill_directory.cleanup()
+            self._spill_directory = None
+
+
+def spill(table: "pa.Table", path: str) -> None:
+    """Write a table to an Arrow IPC file."""
+    import pyarrow as pa
+
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+async def write_buffered(
+    tables: AsyncIterator["pa.Table"],
+    write: Callable[["pa.Table"], Awaitable[None]],
+    max_bytes: int,
+    directory: Optional[str] = None,
+    labels: Optional[Dict[str, str]] = None,
+) -> None:
+    """
+    Write every table of ``tables`` with ``write``, fetching the next
+    tables while earlier ones are written.
+
+    Tables waiting to be written are held in a :class:`SpillBuffer` of
+    ``max_bytes``. An error of the fetch or of a write stops both.
+    """
+    buffer = SpillBuffer(max_bytes, directory=directory, labels=labels)
+
+    async def fetch() -> None:
+        try:
+            async for table in tables:
+                await buffer.put(table)
+        finally:
+            buffer.close()
+
+    fetcher = asyncio.create_task(fetch())
+    try:
+        while (table := await buffer.get()) is not None:
+            await write(table)
+        await fetcher
+    finally:
+        if not fetcher.done():
+            fetcher.cancel()
+            await asyncio.wait([fetcher])
+        buffer.cleanup()
+        if buffer.spilled_batches:
+            logger.info(
+                f"Spilled {buffer.spilled_batches} batches, {buffer.spilled_bytes} "
+                f"bytes, past a memory budget of {max_bytes} bytes"
+            )
+
+
+async def merge_tables(
+    tables: Iterable[Callable[[], AsyncIterator["pa.Table"]]],
+    max_concurrency: int,
+) -> AsyncIterator["pa.Table"]:
+    """
+    Yield the tables of several iterators in the order they are fetched,
+    running at most ``max_concurrency`` of them at a time.
+
+    Every iterator is created by calling one of ``tables`` once a slot is
+    free. An iterator waits while ``max_concurrency`` fetched tables are
+    waiting to be yielded. An error of one iterator stops all of them.
+    """
+    queue: "asyncio.Queue[pa.Table]" = asyncio.Queue(maxsize=max_concurrency)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch(get_tables: Callable[[], AsyncIterator["pa.Table"]]) -> None:
+        async with semaphore:
+            async for table in get_tables():
+                await queue.put(table)
+
+    async def fetch_all() -> None:
+        fetches = [asyncio.create_task(fetch(get_tables)) for get_tables in tables]
+        try:
+            await asyncio.gather(*fetches)
+        finally:
+            for task in fetches:
+                task.cancel()
+            if fetches:
+                await asyncio.wait(fetches)
+
+    fetcher = asyncio.create_task(fetch_all())
+    get: Optional[asyncio.Task] = None
+    try:
+        while True:
+            get = asyncio.create_task(queue.get())
+            await asyncio.wait([get, fetcher], return_when=asyncio.FIRST_COMPLETED)
+            if get.done():
+                yield get.result()
+                continue
+            get.cancel()
+            while not queue.empty():
+                yield queue.get_nowait()
+            await fetcher
+            return
+    finally:
+        if get is not None and not get.done():
+            get.cancel()
+        if not fetcher.done():
+            fetcher.cancel()
+            await asyncio.wait([fetcher])
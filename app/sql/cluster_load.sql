@@ -0,0 +1,30 @@
+/*
+ * File: cluster_load.sql
+ * Purpose: Samples how busy the Presto cluster is
+ *
+ * Returns:
+ *   - running_queries: Queries being planned or executed
+ *   - queued_queries: Queries waiting for resources
+ *   - active_workers: Active nodes executing queries
+ *
+ * Notes:
+ *   - Used to adapt the number of concurrent extraction queries
+ *   - A coordinator that also executes queries counts as a worker when the
+ *     cluster has no other active node
+ */
+SELECT
+    (
+        SELECT count(*)
+        FROM system.runtime.queries
+        WHERE state IN ('PLANNING', 'STARTING', 'RUNNING', 'FINISHING')
+    ) AS running_queries,
+    (
+        SELECT count(*)
+        FROM system.runtime.queries
+        WHERE state IN ('QUEUED', 'WAITING_FOR_RESOURCES', 'DISPATCHING')
+    ) AS queued_queries,
+    (
+        SELECT count(*)
+        FROM system.runtime.nodes
+        WHERE state = 'active' AND NOT coordinator
+    ) AS active_workers
@@ -7,6 +7,14 @@
  *     - Column names, data types, and positions
  *     - Nullability
  *     - Comments (if available)
+ *
+ * Notes:
+ *   - No global ORDER BY, so Presto can stream rows as they are produced;
+ *     streaming extraction sorts every output chunk instead
+ *   - Only catalogs/schemas selected by the workflow include/exclude
+ *     filters are read; when the include filter names exact schemas they
+ *     are also passed as a table_schema IN list, which Presto pushes down
+ *     into the information_schema connector
  */
 SELECT
     c.table_catalog as TABLE_CATALOG,
@@ -57,9 +65,7 @@ JOIN information_schema.tables t
     AND c.table_schema = t.table_schema 
     AND c.table_name = t.table_name
 WHERE t.table_schema != 'information_schema'
-  AND t.table_catalog IN ('tpcds', 'tpch', 'memory')  -- Filter for specific catalogs
-ORDER BY 
-    c.table_catalog,
-    c.table_schema, 
-    c.table_name, 
-    c.ordinal_position
\ No newline at end of file
+  AND regexp_like(t.table_catalog || '.' || t.table_schema, '{normalized_include_regex}')
+  AND NOT regexp_like(t.table_catalog || '.' || t.table_schema, '{normalized_exclude_regex}')
+  {include_schemas_sql}
+  {temp_table_regex_sql}
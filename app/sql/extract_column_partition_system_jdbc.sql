@@ -0,0 +1,65 @@
+/*
+ * File: extract_column_partition_system_jdbc.sql
+ * Purpose: Extracts column metadata for a single catalog/schema partition
+ *          from Presto's system.jdbc tables
+ *
+ * Parameters:
+ *   {catalog_name_literal} - Catalog name, escaped for a string literal
+ *   {schema_name}          - Schema name, escaped for a string literal
+ *
+ * Returns:
+ *   - Same columns and values as extract_column_partition.sql
+ *
+ * Notes:
+ *   - Used by the per-schema extraction mode when the coordinator exposes
+ *     system.jdbc, see extract_column_system_jdbc.sql
+ *   - The catalog and schema equalities are pushed down, so only the
+ *     partition is listed
+ */
+SELECT
+    c.table_cat as TABLE_CATALOG,
+    c.table_schem as TABLE_SCHEMA,
+    c.table_name as TABLE_NAME,
+    c.column_name as COLUMN_NAME,
+    c.ordinal_position as ORDINAL_POSITION,
+    c.type_name as DATA_TYPE,
+    c.is_nullable as IS_NULLABLE,
+    NULL as COLUMN_DEFAULT,
+    NULL as CHARACTER_MAXIMUM_LENGTH,
+    NULL as NUMERIC_PRECISION,
+    NULL as NUMERIC_SCALE,
+    NULL as DATETIME_PRECISION,
+    NULL as CHARACTER_SET_NAME,
+    NULL as COLLATION_NAME,
+    NULL as DOMAIN_CATALOG,
+    NULL as DOMAIN_SCHEMA,
+    NULL as DOMAIN_NAME,
+    NULL as UDT_CATALOG,
+    NULL as UDT_SCHEMA,
+    NULL as UDT_NAME,
+    NULL as SCOPE_CATALOG,
+    NULL as SCOPE_SCHEMA,
+    NULL as SCOPE_NAME,
+    NULL as MAXIMUM_CARDINALITY,
+    NULL as DTD_IDENTIFIER,
+    NULL as IS_SELF_REFERENCING,
+    NULL as IS_IDENTITY,
+    NULL as IDENTITY_GENERATION,
+    NULL as IDENTITY_START,
+    NULL as IDENTITY_INCREMENT,
+    NULL as IDENTITY_MAXIMUM,
+    NULL as IDENTITY_MINIMUM,
+    NULL as IDENTITY_CYCLE,
+    NULL as IS_GENERATED,
+    NULL as GENERATION_EXPRESSION,
+    NULL as IS_UPDATABLE,
+    NULL as CONSTRAINT_TYPE,
+    NULL as CONSTRAINT_NAME,
+    NULL as REMARKS,
+    NULL as PARTITION_ORDER,
+    NULL as IS_PARTITION,
+    NULL as MAX_LENGTH
+FROM system.jdbc.columns c
+WHERE c.table_cat = '{catalog_name_literal}'
+  AND c.table_schem = '{schema_name}'
+  {temp_table_regex_sql}
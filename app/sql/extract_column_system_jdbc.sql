@@ -0,0 +1,67 @@
+/*
+ * File: extract_column_system_jdbc.sql
+ * Purpose: Extracts detailed column metadata from Presto's system.jdbc tables
+ *
+ * Returns:
+ *   - Same columns and values as extract_column.sql
+ *
+ * Notes:
+ *   - system.jdbc.columns lists columns straight from the connector
+ *     metadata in one pass, instead of joining information_schema.columns
+ *     with information_schema.tables per connector
+ *   - Only used when the coordinator exposes system.jdbc, see
+ *     probe_system_jdbc.sql
+ *   - Reads the current catalog, like extract_column.sql; the catalog
+ *     equality is pushed down so other catalogs are not listed
+ *   - No global ORDER BY, streaming extraction sorts every output chunk
+ */
+SELECT
+    c.table_cat as TABLE_CATALOG,
+    c.table_schem as TABLE_SCHEMA,
+    c.table_name as TABLE_NAME,
+    c.column_name as COLUMN_NAME,
+    c.ordinal_position as ORDINAL_POSITION,
+    c.type_name as DATA_TYPE,
+    c.is_nullable as IS_NULLABLE,
+    NULL as COLUMN_DEFAULT,
+    NULL as CHARACTER_MAXIMUM_LENGTH,
+    NULL as NUMERIC_PRECISION,
+    NULL as NUMERIC_SCALE,
+    NULL as DATETIME_PRECISION,
+    NULL as CHARACTER_SET_NAME,
+    NULL as COLLATION_NAME,
+    NULL as DOMAIN_CATALOG,
+    NULL as DOMAIN_SCHEMA,
+    NULL as DOMAIN_NAME,
+    NULL as UDT_CATALOG,
+    NULL as UDT_SCHEMA,
+    NULL as UDT_NAME,
+    NULL as SCOPE_CATALOG,
+    NULL as SCOPE_SCHEMA,
+    NULL as SCOPE_NAME,
+    NULL as MAXIMUM_CARDINALITY,
+    NULL as DTD_IDENTIFIER,
+    NULL as IS_SELF_REFERENCING,
+    NULL as IS_IDENTITY,
+    NULL as IDENTITY_GENERATION,
+    NULL as IDENTITY_START,
+    NULL as IDENTITY_INCREMENT,
+    NULL as IDENTITY_MAXIMUM,
+    NULL as IDENTITY_MINIMUM,
+    NULL as IDENTITY_CYCLE,
+    NULL as IS_GENERATED,
+    NULL as GENERATION_EXPRESSION,
+    NULL as IS_UPDATABLE,
+    NULL as CONSTRAINT_TYPE,
+    NULL as CONSTRAINT_NAME,
+    NULL as REMARKS,
+    NULL as PARTITION_ORDER,
+    NULL as IS_PARTITION,
+    NULL as MAX_LENGTH
+FROM system.jdbc.columns c
+WHERE c.table_cat = CURRENT_CATALOG
+  AND c.table_schem != 'information_schema'
+  AND regexp_like(c.table_cat || '.' || c.table_schem, '{normalized_include_regex}')
+  AND NOT regexp_like(c.table_cat || '.' || c.table_schem, '{normalized_exclude_regex}')
+  {include_schemas_sql}
+  {temp_table_regex_sql}
@@ -0,0 +1,22 @@
+/*
+ * File: extract_database_catalog.sql
+ * Purpose: Extracts basic database metadata of one catalog
+ *
+ * Parameters:
+ *   {catalog_name}         - Quoted catalog identifier
+ *   {catalog_name_literal} - Catalog name, escaped for a string literal
+ *
+ * Returns:
+ *   - Catalog metadata including name and schema count
+ *
+ * Notes:
+ *   - Used by multi-catalog extraction; the result shape matches
+ *     extract_database.sql, which only reads CURRENT_CATALOG
+ *   - Reads the catalog's own information_schema so only that connector
+ *     is scanned
+ */
+SELECT
+    '{catalog_name_literal}' as catalog_name,
+    '{catalog_name_literal}' as database_name,
+    COUNT(*) as schema_count
+FROM {catalog_name}.information_schema.schemata
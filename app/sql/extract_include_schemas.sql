@@ -0,0 +1,16 @@
+/*
+ * File: extract_include_schemas.sql
+ * Purpose: SQL fragment restricting tables to the included schemas
+ *
+ * Parameters:
+ *   {schema_names} - Comma separated string literals of the schema names
+ *
+ * Notes:
+ *   - This is a SQL fragment meant to be included in other queries
+ *   - Only used when the include filter names exact schemas; Presto pushes
+ *     the IN list down so other schemas are never listed
+ *   - Designed to be inserted after a WHERE clause with AND operator
+ *   - Expects the tables table aliased as t; Presto infers the predicate
+ *     for information_schema tables joined on table_schema
+ */
+AND t.table_schema IN ({schema_names})
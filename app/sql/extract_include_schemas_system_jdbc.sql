@@ -0,0 +1,13 @@
+/*
+ * File: extract_include_schemas_system_jdbc.sql
+ * Purpose: SQL fragment restricting system.jdbc columns to the included schemas
+ *
+ * Parameters:
+ *   {schema_names} - Comma separated string literals of the schema names
+ *
+ * Notes:
+ *   - system.jdbc counterpart of extract_include_schemas.sql
+ *   - Designed to be inserted after a WHERE clause with AND operator
+ *   - Expects system.jdbc.columns aliased as c
+ */
+AND c.table_schem IN ({schema_names})
@@ -6,6 +6,9 @@
  *   - Procedure metadata including:
  *     - Procedure schema and name
  *     - Procedure definition (if available)
+ *
+ * Notes:
+ *   - Only schemas selected by the workflow include/exclude filters are read
  */
 SELECT
     CURRENT_CATALOG AS PROCEDURE_CATALOG,
@@ -15,4 +18,6 @@ SELECT
     r.routine_definition AS procedure_definition,
     r.routine_type AS procedure_type
 FROM information_schema.routines r
-WHERE r.routine_schema != 'information_schema'
\ No newline at end of file
+WHERE r.routine_schema != 'information_schema'
+  AND regexp_like(CURRENT_CATALOG || '.' || r.routine_schema, '{normalized_include_regex}')
+  AND NOT regexp_like(CURRENT_CATALOG || '.' || r.routine_schema, '{normalized_exclude_regex}')
\ No newline at end of file
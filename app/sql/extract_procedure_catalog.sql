@@ -0,0 +1,29 @@
+/*
+ * File: extract_procedure_catalog.sql
+ * Purpose: Extracts stored procedure metadata of one catalog
+ *
+ * Parameters:
+ *   {catalog_name}         - Quoted catalog identifier
+ *   {catalog_name_literal} - Catalog name, escaped for a string literal
+ *
+ * Returns:
+ *   - Procedure metadata including:
+ *     - Procedure schema and name
+ *     - Procedure definition (if available)
+ *
+ * Notes:
+ *   - Used by multi-catalog extraction; the result shape matches
+ *     extract_procedure.sql, which only reads CURRENT_CATALOG
+ *   - Only schemas selected by the workflow include/exclude filters are read
+ */
+SELECT
+    '{catalog_name_literal}' AS PROCEDURE_CATALOG,
+    r.routine_schema AS PROCEDURE_SCHEMA,
+    r.routine_name AS PROCEDURE_NAME,
+    NULL AS SOURCE_OWNER,
+    r.routine_definition AS procedure_definition,
+    r.routine_type AS procedure_type
+FROM {catalog_name}.information_schema.routines r
+WHERE r.routine_schema != 'information_schema'
+  AND regexp_like('{catalog_name_literal}' || '.' || r.routine_schema, '{normalized_include_regex}')
+  AND NOT regexp_like('{catalog_name_literal}' || '.' || r.routine_schema, '{normalized_exclude_regex}')
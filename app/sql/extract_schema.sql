@@ -7,6 +7,10 @@
  *
  * Notes:
  *   - Ordered by catalog and schema name
+ *   - Only catalogs/schemas selected by the workflow include/exclude
+ *     filters are read; when the include filter names exact schemas they
+ *     are also passed as a table_schema IN list, which Presto pushes down
+ *     into the information_schema connector
  */
 WITH table_counts AS (
     SELECT 
@@ -14,7 +18,10 @@ WITH table_counts AS (
         table_schema,
         COUNT(CASE WHEN table_type = 'BASE TABLE' THEN 1 END) as table_count,
         COUNT(CASE WHEN table_type = 'VIEW' THEN 1 END) as views_count
-    FROM information_schema.tables
+    FROM information_schema.tables t
+    WHERE regexp_like(t.table_catalog || '.' || t.table_schema, '{normalized_include_regex}')
+      AND NOT regexp_like(t.table_catalog || '.' || t.table_schema, '{normalized_exclude_regex}')
+      {include_schemas_sql}
     GROUP BY table_catalog, table_schema
 )
 SELECT
@@ -28,7 +35,8 @@ LEFT JOIN table_counts tc
     ON tc.table_catalog = s.catalog_name 
     AND tc.table_schema = s.schema_name
 WHERE s.schema_name != 'information_schema'
-  AND s.catalog_name IN ('tpcds', 'tpch', 'memory')  -- Filter for specific catalogs
+  AND regexp_like(s.catalog_name || '.' || s.schema_name, '{normalized_include_regex}')
+  AND NOT regexp_like(s.catalog_name || '.' || s.schema_name, '{normalized_exclude_regex}')
 ORDER BY 
     s.catalog_name,
     s.schema_name
\ No newline at end of file
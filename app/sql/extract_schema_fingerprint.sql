@@ -0,0 +1,60 @@
+/*
+ * File: extract_schema_fingerprint.sql
+ * Purpose: Computes a cheap change fingerprint for every schema of a catalog
+ *
+ * Parameters:
+ *   {catalog_name} - Quoted catalog identifier
+ *
+ * Returns:
+ *   - One row per schema with:
+ *     - Table and column counts
+ *     - Order-insensitive checksums of table names/types, column
+ *       definitions and view definitions
+ *
+ * Notes:
+ *   - Used by incremental extraction: schemas whose fingerprint did not
+ *     change since the previous run are not extracted again
+ *   - Aggregated on the coordinator, so only one row per schema is returned
+ */
+WITH table_fingerprints AS (
+    SELECT
+        t.table_schema,
+        COUNT(*) as table_count,
+        to_hex(checksum(t.table_name || ':' || t.table_type)) as table_checksum
+    FROM {catalog_name}.information_schema.tables t
+    WHERE t.table_schema != 'information_schema'
+    GROUP BY t.table_schema
+),
+column_fingerprints AS (
+    SELECT
+        c.table_schema,
+        COUNT(*) as column_count,
+        to_hex(checksum(
+            c.table_name || ':' || c.column_name || ':'
+            || CAST(c.ordinal_position AS varchar) || ':' || c.data_type
+            || ':' || c.is_nullable
+        )) as column_checksum
+    FROM {catalog_name}.information_schema.columns c
+    WHERE c.table_schema != 'information_schema'
+    GROUP BY c.table_schema
+),
+view_fingerprints AS (
+    SELECT
+        v.table_schema,
+        to_hex(checksum(v.table_name || ':' || v.view_definition)) as view_checksum
+    FROM {catalog_name}.information_schema.views v
+    WHERE v.table_schema != 'information_schema'
+    GROUP BY v.table_schema
+)
+SELECT
+    t.table_schema as schema_name,
+    t.table_count,
+    COALESCE(c.column_count, 0) as column_count,
+    t.table_checksum,
+    c.column_checksum,
+    v.view_checksum
+FROM table_fingerprints t
+LEFT JOIN column_fingerprints c
+    ON c.table_schema = t.table_schema
+LEFT JOIN view_fingerprints v
+    ON v.table_schema = t.table_schema
@@ -7,6 +7,12 @@
  *     - Table name, schema, and type
  *     - Column count
  *     - View definition (if applicable)
+ *
+ * Notes:
+ *   - Only catalogs/schemas selected by the workflow include/exclude
+ *     filters are read; when the include filter names exact schemas they
+ *     are also passed as a table_schema IN list, which Presto pushes down
+ *     into the information_schema connector
  */
 SELECT
     CURRENT_CATALOG as table_catalog,
@@ -44,4 +50,8 @@ SELECT
     NULL as retention_time_in_ms
 FROM information_schema.tables t
 WHERE t.table_schema != 'information_schema'
+  AND regexp_like(CURRENT_CATALOG || '.' || t.table_schema, '{normalized_include_regex}')
+  AND NOT regexp_like(CURRENT_CATALOG || '.' || t.table_schema, '{normalized_exclude_regex}')
+  {include_schemas_sql}
+  {temp_table_regex_sql}
 ORDER BY t.table_schema, t.table_name
\ No newline at end of file
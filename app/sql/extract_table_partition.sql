@@ -0,0 +1,61 @@
+/*
+ * File: extract_table_partition.sql
+ * Purpose: Extracts table metadata for a single catalog/schema partition
+ *
+ * Parameters:
+ *   {catalog_name} - Quoted catalog identifier
+ *   {schema_name}  - Schema name, escaped for a string literal
+ *
+ * Returns:
+ *   - Table metadata including:
+ *     - Table name, schema, and type
+ *     - Column count
+ *     - View definition (if applicable)
+ *
+ * Notes:
+ *   - Used by the per-schema extraction mode; the result shape matches
+ *     extract_table.sql
+ *   - Reads the catalog's own information_schema so only that connector
+ *     is scanned
+ *   - Column counts and view definitions are joined set-based, see
+ *     extract_table_set_based.sql
+ */
+WITH column_counts AS (
+    SELECT
+        c.table_name,
+        COUNT(*) as column_count
+    FROM {catalog_name}.information_schema.columns c
+    WHERE c.table_schema = '{schema_name}'
+    GROUP BY c.table_name
+)
+SELECT
+    t.table_catalog,
+    t.table_schema,
+    t.table_name,
+    t.table_type,
+    COALESCE(cc.column_count, 0) as column_count,
+    v.view_definition,
+    NULL as table_owner,
+    NULL as remarks,
+    NULL as table_type_cat,
+    NULL as self_referencing_col_name,
+    NULL as ref_generation,
+    NULL as partition_strategy,
+    NULL as partition_column_name,
+    NULL as is_external,
+    NULL as is_temporary,
+    NULL as tablespace,
+    NULL as options,
+    NULL as buffer_pool,
+    NULL as table_size_in_bytes,
+    NULL as retention_time_in_ms
+FROM {catalog_name}.information_schema.tables t
+LEFT JOIN column_counts cc
+    ON cc.table_name = t.table_name
+LEFT JOIN {catalog_name}.information_schema.views v
+    ON t.table_type = 'VIEW'
+    AND v.table_schema = t.table_schema
+    AND v.table_name = t.table_name
+WHERE t.table_schema = '{schema_name}'
+  {temp_table_regex_sql}
+ORDER BY t.table_name
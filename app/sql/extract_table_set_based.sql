@@ -0,0 +1,66 @@
+/*
+ * File: extract_table_set_based.sql
+ * Purpose: Extracts table metadata from Trino catalog with set-based joins
+ *
+ * Returns:
+ *   - Table metadata including:
+ *     - Table name, schema, and type
+ *     - Column count
+ *     - View definition (if applicable)
+ *
+ * Notes:
+ *   - Same result as extract_table.sql, but column counts are aggregated
+ *     once and view definitions are joined once instead of running a
+ *     correlated subquery per table, so the cost grows linearly with the
+ *     number of tables
+ *   - Only catalogs/schemas selected by the workflow include/exclude
+ *     filters are read; when the include filter names exact schemas they
+ *     are also passed as a table_schema IN list, which Presto pushes down
+ *     into the information_schema connector
+ */
+WITH column_counts AS (
+    SELECT
+        c.table_schema,
+        c.table_name,
+        COUNT(*) as column_count
+    FROM information_schema.columns c
+    WHERE c.table_schema != 'information_schema'
+      AND regexp_like(CURRENT_CATALOG || '.' || c.table_schema, '{normalized_include_regex}')
+      AND NOT regexp_like(CURRENT_CATALOG || '.' || c.table_schema, '{normalized_exclude_regex}')
+    GROUP BY c.table_schema, c.table_name
+)
+SELECT
+    CURRENT_CATALOG as table_catalog,
+    t.table_schema,
+    t.table_name,
+    t.table_type,
+    COALESCE(cc.column_count, 0) as column_count,
+    v.view_definition,
+    NULL as table_owner,
+    NULL as remarks,
+    NULL as table_type_cat,
+    NULL as self_referencing_col_name,
+    NULL as ref_generation,
+    NULL as partition_strategy,
+    NULL as partition_column_name,
+    NULL as is_external,
+    NULL as is_temporary,
+    NULL as tablespace,
+    NULL as options,
+    NULL as buffer_pool,
+    NULL as table_size_in_bytes,
+    NULL as retention_time_in_ms
+FROM information_schema.tables t
+LEFT JOIN column_counts cc
+    ON cc.table_schema = t.table_schema
+    AND cc.table_name = t.table_name
+LEFT JOIN information_schema.views v
+    ON t.table_type = 'VIEW'
+    AND v.table_schema = t.table_schema
+    AND v.table_name = t.table_name
+WHERE t.table_schema != 'information_schema'
+  AND regexp_like(CURRENT_CATALOG || '.' || t.table_schema, '{normalized_include_regex}')
+  AND NOT regexp_like(CURRENT_CATALOG || '.' || t.table_schema, '{normalized_exclude_regex}')
+  {include_schemas_sql}
+  {temp_table_regex_sql}
+ORDER BY t.table_schema, t.table_name
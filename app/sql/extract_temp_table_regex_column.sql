@@ -9,5 +9,6 @@
  *   - This is a SQL fragment meant to be included in other queries
  *   - Used to exclude columns from tables matching a specific pattern
  *   - Designed to be inserted after a WHERE clause with AND operator
+ *   - Expects the columns table aliased as c
  */
-AND c.relname !~ '{exclude_table_regex}'
\ No newline at end of file
+AND NOT regexp_like(c.table_name, '{exclude_table_regex}')
\ No newline at end of file
@@ -0,0 +1,25 @@
+/*
+ * File: extract_view_definition.sql
+ * Purpose: Extracts the view definitions of a batch of schemas of a catalog
+ *
+ * Parameters:
+ *   {catalog_name} - Quoted catalog identifier
+ *   {schema_names} - Schema names as comma separated string literals
+ *
+ * Returns:
+ *   - Catalog, schema and name of every view with its definition
+ *
+ * Notes:
+ *   - Used when view definitions are deferred: the table queries leave them
+ *     out and they are only read for the schemas the extracted views are in
+ *   - Reads the catalog's own information_schema so only that connector
+ *     is scanned
+ */
+SELECT
+    v.table_catalog,
+    v.table_schema,
+    v.table_name,
+    v.view_definition
+FROM {catalog_name}.information_schema.views v
+WHERE v.table_schema IN ({schema_names})
+ORDER BY v.table_schema, v.table_name
@@ -0,0 +1,23 @@
+/*
+ * File: list_catalogs.sql
+ * Purpose: Lists one page of catalogs for the schema browser
+ *
+ * Parameters:
+ *   {cursor} - Last catalog of the previous page, empty for the first page
+ *   {prefix} - Catalog name prefix, escaped for a LIKE pattern
+ *   {limit}  - Page size plus one, to tell if there is a next page
+ *
+ * Returns:
+ *   - Catalog names, sorted
+ *
+ * Notes:
+ *   - Reads system.metadata.catalogs, which does not touch any connector,
+ *     so the first page is fast regardless of the number of schemas
+ *   - Keyset pagination: the next page starts after the last catalog
+ */
+SELECT catalog_name
+FROM system.metadata.catalogs
+WHERE catalog_name > '{cursor}'
+  AND catalog_name LIKE '{prefix}%' ESCAPE '\'
+ORDER BY catalog_name
+LIMIT {limit}
@@ -0,0 +1,24 @@
+/*
+ * File: list_schemas.sql
+ * Purpose: Lists one page of schemas of a catalog for the schema browser
+ *
+ * Parameters:
+ *   {catalog_name} - Quoted catalog identifier
+ *   {cursor}       - Last schema of the previous page, empty for the first page
+ *   {prefix}       - Schema name prefix, escaped for a LIKE pattern
+ *   {limit}        - Page size plus one, to tell if there is a next page
+ *
+ * Returns:
+ *   - Schema names, sorted
+ *
+ * Notes:
+ *   - Only the schemata of the expanded catalog are listed, never its tables
+ *   - Keyset pagination: the next page starts after the last schema
+ */
+SELECT schema_name
+FROM {catalog_name}.information_schema.schemata
+WHERE schema_name != 'information_schema'
+  AND schema_name > '{cursor}'
+  AND schema_name LIKE '{prefix}%' ESCAPE '\'
+ORDER BY schema_name
+LIMIT {limit}
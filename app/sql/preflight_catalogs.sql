@@ -0,0 +1,16 @@
+/*
+ * File: preflight_catalogs.sql
+ * Purpose: Checks which catalogs named by the include filter exist
+ *
+ * Parameters:
+ *   {catalog_names} - Comma separated string literals of the catalog names
+ *
+ * Returns:
+ *   - The names of the catalogs that exist
+ *
+ * Notes:
+ *   - Reads system.metadata.catalogs, which does not touch any connector
+ */
+SELECT catalog_name
+FROM system.metadata.catalogs
+WHERE catalog_name IN ({catalog_names})
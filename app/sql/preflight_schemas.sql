@@ -0,0 +1,17 @@
+/*
+ * File: preflight_schemas.sql
+ * Purpose: Checks which schemas of a catalog named by the include filter exist
+ *
+ * Parameters:
+ *   {catalog_name} - Quoted catalog identifier
+ *   {schema_names} - Comma separated string literals of the schema names
+ *
+ * Returns:
+ *   - The names of the schemas that exist
+ *
+ * Notes:
+ *   - The IN list is pushed down, so other schemas are never listed
+ */
+SELECT schema_name
+FROM {catalog_name}.information_schema.schemata
+WHERE schema_name IN ({schema_names})
@@ -0,0 +1,22 @@
+/*
+ * File: probe_information_schema.sql
+ * Purpose: Checks whether, and how fast, a catalog answers a query on one of
+ *          its information_schema relations
+ *
+ * Parameters:
+ *   {catalog_name} - Quoted catalog identifier
+ *   {relation}     - information_schema relation, e.g. routines or views
+ *
+ * Returns:
+ *   - At most one row; the query fails if the connector cannot list the
+ *     relation
+ *
+ * Notes:
+ *   - LIMIT 0 would be answered by the planner without the connector, so one
+ *     row is read
+ *   - Used to skip the extraction queries of relations a catalog does not
+ *     support or answers too slowly
+ */
+SELECT 1 AS probe
+FROM {catalog_name}.information_schema.{relation}
+LIMIT 1
@@ -0,0 +1,17 @@
+/*
+ * File: probe_system_jdbc.sql
+ * Purpose: Checks whether the coordinator exposes the system.jdbc tables
+ *
+ * Returns:
+ *   - At most one row; the query fails if system.jdbc.columns cannot be read
+ *
+ * Notes:
+ *   - Used to choose between the system.jdbc and information_schema
+ *     column extraction queries
+ *   - LIMIT 0 would be answered by the planner without the connector, so one
+ *     row is read
+ */
+SELECT table_cat
+FROM system.jdbc.columns
+WHERE table_cat = CURRENT_CATALOG
+LIMIT 1
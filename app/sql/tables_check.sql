@@ -2,13 +2,28 @@
  * File: tables_check.sql
  * Purpose: Counts accessible tables matching filter criteria
  *
- * Returns: Count of tables/views matching the specified criteria
+ * Parameters:
+ *   {limit} - Count at which the check stops
+ *
+ * Returns: Count of tables/views matching the specified criteria, at most
+ *   {limit}
  *
  * Notes:
  *   - Used for validation and performance estimation
  *   - Includes tables and views from all accessible catalogs and schemas
  *   - Excludes system schemas
+ *   - Only counts schemas selected by the workflow include/exclude filters
+ *   - The LIMIT lets Presto stop listing tables once the count is reached,
+ *     instead of counting every table of a large warehouse
  */
 SELECT count(*) as count
-FROM information_schema.tables t
-WHERE t.table_schema != 'information_schema'
\ No newline at end of file
+FROM (
+    SELECT 1
+    FROM information_schema.tables t
+    WHERE t.table_schema != 'information_schema'
+      AND regexp_like(t.table_catalog || '.' || t.table_schema, '{normalized_include_regex}')
+      AND NOT regexp_like(t.table_catalog || '.' || t.table_schema, '{normalized_exclude_regex}')
+      {include_schemas_sql}
+      {temp_table_regex_sql}
+    LIMIT {limit}
+) limited
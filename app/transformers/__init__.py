@@ -0,0 +1,111 @@
+import copy
+import textwrap
+from typing import Any, Dict, List, Optional, Tuple
+
+import daft
+from application_sdk.observability.logger_adaptor import get_logger
+from application_sdk.transformers.query import (
+    QueryBasedTransformer as BaseQueryBasedTransformer,
+)
+
+from app.transformers.cache import TemplateCache, template_cache
+
+logger = get_logger(__name__)
+
+
+class QueryBasedTransformer(BaseQueryBasedTransformer):
+    """
+    Query based transformer that compiles every template once per worker.
+
+    The SQL projection of a template is cached per template content and raw
+    column names, the struct expressions grouping the output columns per
+    output column names, see :mod:`app.transformers.cache`. Both only
+    depend on column names, never on the values of a chunk.
+    """
+
+    template_cache: TemplateCache = template_cache
+
+    def generate_sql_query(
+        self,
+        yaml_path: str,
+        dataframe: daft.DataFrame,
+        default_attributes: Dict[str, Any],
+    ) -> Tuple[str, Optional[List[Dict[str, str]]]]:
+        """
+        Return the cached SQL query of a template for the columns of a DataFrame.
+        """
+        content_hash, sql_template = self.template_cache.load(yaml_path)
+        key = (
+            "sql",
+            content_hash,
+            tuple(dataframe.column_names),
+            tuple(default_attributes),
+        )
+        return self.template_cache.get(
+            key,
+            lambda: self.compile_sql_query(sql_template, dataframe, default_attributes),
+        )
+
+    def compile_sql_query(
+        self,
+        sql_template: Dict[str, Any],
+        dataframe: daft.DataFrame,
+        default_attributes: Dict[str, Any],
+    ) -> Tuple[str, Optional[List[Dict[str, str]]]]:
+        """
+        Build the SQL query of a parsed template, like the SDK transformer.
+
+        The SDK quotes column names in place, so the cached template is
+        copied first.
+        """
+        columns, literal_columns = self.get_sql_column_expressions(
+            copy.deepcopy(sql_template), dataframe, default_attributes
+        )
+        sql_query = textwrap.dedent(
+            f"""
+        SELECT
+            {','.join(columns)}
+        FROM dataframe
+        """
+        )
+        return sql_query, literal_columns or None
+
+    def get_grouped_dataframe_by_prefix(
+        self, dataframe: daft.DataFrame
+    ) -> daft.DataFrame:
+        """
+        Group columns with the same prefix into structs, with the struct
+        expressions cached per column names.
+        """
+        column_names = tuple(dataframe.column_names)
+        expressions = self.template_cache.get(
+            ("struct", column_names),
+            lambda: self.get_grouped_columns(column_names),
+        )
+        return dataframe.select(*expressions)
+
+    def get_grouped_columns(
+        self, column_names: Tuple[str, ...]
+    ) -> List[daft.Expression]:
+        """
+        Return the expressions grouping dotted column names into structs.
+        """
+        path_groups: Dict[str, Any] = {}
+        standalone_columns = []
+        for column in column_names:
+            if "." not in column:
+                standalone_columns.append(column)
+                continue
+
+            path_components = column.split(".")
+            current_level = path_groups
+            for component in path_components[:-1]:
+                current_level = current_level.setdefault(component, {})
+            current_level.setdefault("columns", []).append(
+                (column, path_components[-1])
+            )
+
+        expressions = [daft.col(column) for column in standalone_columns]
+        for prefix, level in path_groups.items():
+            expressions.append(self._build_struct(level, prefix))
+        return expressions
@@ -0,0 +1,99 @@
+"""Process wide cache of compiled transformer templates.
+
+``QueryBasedTransformer`` parses the YAML template of an entity type and turns
+every column into a SQL expression on every transform call, then rebuilds the
+struct expressions grouping the output columns. Chunked extraction transforms
+hundreds of chunks with the same template and the same raw schema, so the
+compiled projection is kept per worker process instead.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+import yaml
+from application_sdk.observability.logger_adaptor import get_logger
+
+from app.constants import TEMPLATE_CACHE_MAX_SIZE
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class CachedTemplate:
+    """A parsed template with the file stats it was read with."""
+
+    stat: Tuple[int, int]
+    content_hash: str
+    template: Dict[str, Any]
+
+
+class TemplateCache:
+    """
+    Cache of parsed templates and of what is compiled from them.
+
+    Templates are cached per path and read again when the modification time
+    or size of the file changes. Compiled values are cached under keys that
+    include the content hash of their template, so a changed template never
+    reuses them; they age out of the LRU once more than ``max_size`` are
+    cached.
+    """
+
+    def __init__(self, max_size: int = TEMPLATE_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self._templates: Dict[str, CachedTemplate] = {}
+        self._compiled: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._compiled)
+
+    def load(self, path: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Return the content hash and the parsed YAML of a template.
+        """
+        stat_result = os.stat(path)
+        stat = (stat_result.st_mtime_ns, stat_result.st_size)
+        with self._lock:
+            cached = self._templates.get(path)
+        if not cached or cached.stat != stat:
+            with open(path, "rb") as template_file:
+                content = template_file.read()
+            cached = CachedTemplate(
+                stat=stat,
+                content_hash=hashlib.sha256(content).hexdigest(),
+                template=yaml.safe_load(content),
+            )
+            with self._lock:
+                self._templates[path] = cached
+            logger.debug(f"Loaded transformer template {path}")
+        return cached.content_hash, cached.template
+
+    def get(self, key: Hashable, compile: Callable[[], Any]) -> Any:
+        """
+        Return the value compiled under ``key``, compiling it if needed.
+        """
+        with self._lock:
+            if key in self._compiled:
+                self._compiled.move_to_end(key)
+                return self._compiled[key]
+
+        value = compile()
+        with self._lock:
+            self._compiled[key] = value
+            while len(self._compiled) > self.max_size:
+                self._compiled.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        """Drop every cached template and compiled value."""
+        with self._lock:
+            self._templates.clear()
+            self._compiled.clear()
+
+
+#: Template cache shared by all transformers of the worker process
+template_cache = TemplateCache()
@@ -0,0 +1,465 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Coroutine,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Type,
+)
+
+from application_sdk.activities.common.models import ActivityStatistics
+from application_sdk.observability.logger_adaptor import get_logger
+from application_sdk.workflows.metadata_extraction.sql import (
+    BaseSQLMetadataExtractionWorkflow,
+)
+from temporalio import workflow
+from temporalio.common import RetryPolicy
+
+from app.activities.metadata_extraction import SQLMetadataExtractionActivities
+from app.common.utils import (
+    get_incremental_settings,
+    get_metadata_flag,
+    get_partition_path,
+    is_incremental_extraction,
+    is_pipelined_extraction,
+)
+from app.constants import (
+    ADAPTIVE_CONCURRENCY,
+    ADAPTIVE_CONCURRENCY_SAMPLE_INTERVAL,
+    EXTRACTION_MODE,
+    MAX_CONCURRENT_SCHEMAS,
+)
+from app.workflows.metadata_extraction.concurrency import AdaptiveLimiter
+
+logger = get_logger(__name__)
+workflow.logger = logger
+
+
+@workflow.defn
+class SQLMetadataExtractionWorkflow(BaseSQLMetadataExtractionWorkflow):
+    """
+    Presto metadata extraction workflow.
+
+    With ``"extraction-mode": "per-schema"`` in the workflow metadata, the
+    catalog/schema partitions are listed first and tables and columns are
+    extracted per partition as concurrent activities. At most
+    ``max-concurrent-schemas`` partition extractions run at a time, shared
+    between tables and columns, and each partition is transformed as soon
+    as it has been fetched.
+
+    With ``"adaptive-concurrency"``, ``max-concurrent-schemas`` is only the
+    ceiling: the cluster load is sampled while partitions are
+    extracted and the number of partition extractions in flight is adapted
+    to it, see :class:`AdaptiveLimiter`.
+
+    ``"incremental-extraction": true`` implies per-schema extraction. The
+    partitions are fingerprinted and compared with the state saved by the
+    previous successful run of the connection: the raw output of unchanged
+    partitions is carried forward from that run, only changed partitions are
+    extracted again, and every partition is transformed as usual. The new
+    state is saved once the run has succeeded.
+
+    With ``"pipelined-extraction"``, extraction activities transform the
+    batches they fetch themselves, and no transform activities are scheduled
+    for their output.
+    """
+
+    activities_cls: Type[SQLMetadataExtractionActivities] = (
+        SQLMetadataExtractionActivities
+    )
+
+    def __init__(self):
+        self._partitions: Optional[List[Dict[str, Any]]] = None
+        self._partitions_lock = asyncio.Lock()
+        self._partition_limiter: Optional[AdaptiveLimiter] = None
+        self._cluster_load_sampler: Optional[asyncio.Task] = None
+        self._cluster_load_sampler_users = 0
+        self._chunk_offsets: Dict[str, int] = {}
+        self._workflow_args: Optional[Dict[str, Any]] = None
+        self._previous_extraction_state: Dict[str, Any] = {}
+        self._partition_statistics: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    @staticmethod
+    def get_activities(
+        activities: SQLMetadataExtractionActivities,
+    ) -> Sequence[Callable[..., Any]]:
+        return [
+            *BaseSQLMetadataExtractionWorkflow.get_activities(activities),
+            activities.fetch_partitions,
+            activities.get_extraction_state,
+            activities.save_extraction_state,
+            activities.carry_forward_partition,
+            activities.get_cluster_load,
+        ]
+
+    @staticmethod
+    def get_extraction_mode(workflow_args: Dict[str, Any]) -> str:
+        if is_incremental_extraction(workflow_args):
+            return "per-schema"
+        return workflow_args.get("metadata", {}).get("extraction-mode") or (
+            EXTRACTION_MODE
+        )
+
+    @staticmethod
+    def is_adaptive_concurrency(workflow_args: Dict[str, Any]) -> bool:
+        return get_metadata_flag(
+            workflow_args, "adaptive-concurrency", ADAPTIVE_CONCURRENCY
+        )
+
+    async def fetch_and_transform(
+        self,
+        fetch_fn: Callable[
+            [Dict[str, Any]], Coroutine[Any, Any, Dict[str, Any] | None]
+        ],
+        workflow_args: Dict[str, Any],
+        retry_policy: RetryPolicy,
+    ) -> None:
+        partitioned_typenames = {
+            self.activities_cls.fetch_tables: "table",
+            self.activities_cls.fetch_columns: "column",
+        }
+        if (
+            fetch_fn not in partitioned_typenames
+            or self.get_extraction_mode(workflow_args) != "per-schema"
+        ):
+            if is_pipelined_extraction(workflow_args):
+                await self.fetch_and_transform_pipelined(
+                    fetch_fn, workflow_args, retry_policy
+                )
+            else:
+                await super().fetch_and_transform(fetch_fn, workflow_args, retry_policy)
+            return
+
+        self._workflow_args = workflow_args
+        partitions = await self.get_partitions(workflow_args, retry_policy)
+        limiter = self.get_partition_limiter(workflow_args)
+        async with self.adapt_concurrency(limiter, workflow_args):
+            await asyncio.gather(
+                *[
+                    self.fetch_and_transform_partition(
+                        fetch_fn,
+                        partition,
+                        limiter,
+                        workflow_args,
+                        retry_policy,
+                        typename=partitioned_typenames[fetch_fn],
+                    )
+                    for partition in partitions
+                ]
+            )
+
+    async def fetch_and_transform_pipelined(
+        self,
+        fetch_fn: Callable[
+            [Dict[str, Any]], Coroutine[Any, Any, Dict[str, Any] | None]
+        ],
+        workflow_args: Dict[str, Any],
+        retry_policy: RetryPolicy,
+    ) -> None:
+        """
+        Fetch with pipelined extraction, transforming the raw chunks in
+        transform activities only if the fetch did not transform them, e.g.
+        for queries that are not streamed.
+        """
+        raw_statistics = await workflow.execute_activity_method(
+            fetch_fn,
+            args=[workflow_args],
+            retry_policy=retry_policy,
+            start_to_close_timeout=self.default_start_to_close_timeout,
+            heartbeat_timeout=self.default_heartbeat_timeout,
+        )
+        if not raw_statistics or raw_statistics.get("transformed"):
+            return
+        activity_statistics = ActivityStatistics.model_validate(raw_statistics)
+        if activity_statistics.chunk_count == 0:
+            return
+        if activity_statistics.typename is None:
+            raise ValueError("Invalid typename")
+
+        batches, chunk_starts = self.get_transform_batches(
+            activity_statistics.chunk_count, activity_statistics.typename
+        )
+        await asyncio.gather(
+            *[
+                workflow.execute_activity_method(
+                    self.activities_cls.transform_data,
+                    {
+                        "typename": activity_statistics.typename,
+                        "file_names": file_names,
+                        "chunk_start": chunk_start,
+                        **workflow_args,
+                    },
+                    retry_policy=retry_policy,
+                    start_to_close_timeout=self.default_start_to_close_timeout,
+                    heartbeat_timeout=self.default_heartbeat_timeout,
+                )
+                for file_names, chunk_start in zip(batches, chunk_starts)
+            ]
+        )
+
+    async def get_partitions(
+        self, workflow_args: Dict[str, Any], retry_policy: RetryPolicy
+    ) -> List[Dict[str, Any]]:
+        """
+        List the catalog/schema partitions once per workflow run, and load
+        the previous extraction state for incremental extraction.
+        """
+        async with self._partitions_lock:
+            if self._partitions is None:
+                if is_incremental_extraction(workflow_args):
+                    self._previous_extraction_state = (
+                        await workflow.execute_activity_method(
+                            self.activities_cls.get_extraction_state,
+                            args=[workflow_args],
+                            retry_policy=retry_policy,
+                            start_to_close_timeout=self.default_start_to_close_timeout,
+                            heartbeat_timeout=self.default_heartbeat_timeout,
+                        )
+                    )
+                self._partitions = await workflow.execute_activity_method(
+                    self.activities_cls.fetch_partitions,
+                    args=[workflow_args],
+                    retry_policy=retry_policy,
+                    start_to_close_timeout=self.default_start_to_close_timeout,
+                    heartbeat_timeout=self.default_heartbeat_timeout,
+                )
+            return self._partitions
+
+    def get_previous_partition_statistics(
+        self, partition: Dict[str, Any], typename: str, workflow_args: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Statistics of the partition in the previous run, if its output can be
+        carried forward: the settings and the partition fingerprint must be
+        unchanged.
+        """
+        previous_state = self._previous_extraction_state
+        if not previous_state or not partition.get("fingerprint"):
+            return None
+        if previous_state.get("settings") != get_incremental_settings(workflow_args):
+            return None
+
+        previous_partition = previous_state.get("partitions", {}).get(
+            get_partition_path(partition)
+        )
+        if (
+            not previous_partition
+            or previous_partition.get("fingerprint") != partition["fingerprint"]
+        ):
+            return None
+        return previous_partition.get("statistics", {}).get(typename)
+
+    def get_extraction_state(self, workflow_args: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        State of this run, describing where the raw output of every
+        fingerprinted partition can be found by the next run.
+        """
+        partitions = {}
+        for partition in self._partitions or []:
+            if not partition.get("fingerprint"):
+                continue
+            partition_path = get_partition_path(partition)
+            partitions[partition_path] = {
+                "fingerprint": partition["fingerprint"],
+                "statistics": self._partition_statistics.get(partition_path, {}),
+            }
+        return {
+            "output_path": workflow_args["output_path"],
+            "settings": get_incremental_settings(workflow_args),
+            "partitions": partitions,
+        }
+
+    def get_partition_limiter(self, workflow_args: Dict[str, Any]) -> AdaptiveLimiter:
+        """
+        Limiter bounding the partition extractions of a workflow run.
+
+        With adaptive concurrency the limit starts at half of
+        ``max-concurrent-schemas`` and adapts to the cluster load, otherwise
+        it stays at ``max-concurrent-schemas``.
+        """
+        if self._partition_limiter is None:
+            max_concurrent_schemas = int(
+                workflow_args.get("metadata", {}).get("max-concurrent-schemas")
+                or MAX_CONCURRENT_SCHEMAS
+            )
+            initial = max_concurrent_schemas
+            if self.is_adaptive_concurrency(workflow_args):
+                initial = max_concurrent_schemas // 2
+            self._partition_limiter = AdaptiveLimiter(
+                max_concurrent_schemas, initial=initial
+            )
+        return self._partition_limiter
+
+    @asynccontextmanager
+    async def adapt_concurrency(
+        self, limiter: AdaptiveLimiter, workflow_args: Dict[str, Any]
+    ) -> AsyncIterator[None]:
+        """
+        Adapt ``limiter`` to the cluster load while the block runs.
+
+        Tables and columns are fetched concurrently and share one sampler,
+        which runs until neither of them has partitions left.
+        """
+        if not self.is_adaptive_concurrency(workflow_args):
+            yield
+            return
+
+        self._cluster_load_sampler_users += 1
+        if self._cluster_load_sampler is None:
+            self._cluster_load_sampler = asyncio.create_task(
+                self.sample_cluster_load(limiter, workflow_args)
+            )
+        try:
+            yield
+        finally:
+            self._cluster_load_sampler_users -= 1
+            sampler = self._cluster_load_sampler
+            if self._cluster_load_sampler_users == 0 and sampler is not None:
+                self._cluster_load_sampler = None
+                sampler.cancel()
+                try:
+                    await sampler
+                except asyncio.CancelledError:
+                    pass
+
+    async def sample_cluster_load(
+        self, limiter: AdaptiveLimiter, workflow_args: Dict[str, Any]
+    ) -> None:
+        """
+        Sample the cluster load every ``ADAPTIVE_CONCURRENCY_SAMPLE_INTERVAL``
+        seconds and adapt the limit to it.
+
+        If the load cannot be sampled, the limit goes back to its ceiling and
+        stays there, as without adaptive concurrency.
+        """
+        while True:
+            try:
+                cluster_load = await workflow.execute_activity_method(
+                    self.activities_cls.get_cluster_load,
+                    args=[workflow_args],
+                    retry_policy=RetryPolicy(maximum_attempts=1),
+                    start_to_close_timeout=self.default_start_to_close_timeout,
+                    heartbeat_timeout=self.default_heartbeat_timeout,
+                )
+            except Exception as e:
+                logger.warning(f"Could not sample the cluster load: {e}")
+                cluster_load = {}
+
+            if not cluster_load:
+                logger.warning("Cluster load unavailable, concurrency is not adapted")
+                await limiter.set_limit(limiter.ceiling)
+                return
+
+            limit = await limiter.update(cluster_load)
+            logger.info(f"Cluster load {cluster_load}, partition limit {limit}")
+            await asyncio.sleep(ADAPTIVE_CONCURRENCY_SAMPLE_INTERVAL)
+
+    async def fetch_and_transform_partition(
+        self,
+        fetch_fn: Callable[
+            [Dict[str, Any]], Coroutine[Any, Any, Dict[str, Any] | None]
+        ],
+        partition: Dict[str, Any],
+        limiter: AdaptiveLimiter,
+        workflow_args: Dict[str, Any],
+        retry_policy: RetryPolicy,
+        typename: str,
+    ) -> None:
+        """
+        Fetch a single catalog/schema partition and transform its chunks,
+        unless the fetch transformed them already.
+
+        The raw output of a partition unchanged since the previous run is
+        carried forward instead of being fetched.
+        """
+        partition_path = get_partition_path(partition)
+        previous_statistics = self.get_previous_partition_statistics(
+            partition, typename, workflow_args
+        )
+        async with limiter:
+            if previous_statistics is not None:
+                raw_statistics = await workflow.execute_activity_method(
+                    self.activities_cls.carry_forward_partition,
+                    args=[
+                        {
+                            **workflow_args,
+                            "partition": partition,
+                            "typename": typename,
+                            "previous_output_path": (
+                                self._previous_extraction_state["output_path"]
+                            ),
+                            "previous_statistics": previous_statistics,
+                        }
+                    ],
+                    retry_policy=retry_policy,
+                    start_to_close_timeout=self.default_start_to_close_timeout,
+                    heartbeat_timeout=self.default_heartbeat_timeout,
+                )
+            else:
+                raw_statistics = await workflow.execute_activity_method(
+                    fetch_fn,
+                    args=[{**workflow_args, "partition": partition}],
+                    retry_policy=retry_policy,
+                    start_to_close_timeout=self.default_start_to_close_timeout,
+                    heartbeat_timeout=self.default_heartbeat_timeout,
+                )
+
+        activity_statistics = ActivityStatistics.model_validate(
+            raw_statistics or {"typename": typename}
+        )
+        self._partition_statistics.setdefault(partition_path, {})[
+            typename
+        ] = activity_statistics.model_dump()
+        if activity_statistics.chunk_count == 0 or raw_statistics.get("transformed"):
+            return
+        if activity_statistics.typename is None:
+            raise ValueError("Invalid typename")
+
+        typename = activity_statistics.typename
+        # Transformed chunks of all partitions share one output directory, so
+        # chunk numbers are handed out sequentially across partitions.
+        chunk_offset = self._chunk_offsets.get(typename, 0)
+        self._chunk_offsets[typename] = chunk_offset + activity_statistics.chunk_count
+
+        await asyncio.gather(
+            *[
+                workflow.execute_activity_method(
+                    self.activities_cls.transform_data,
+                    {
+                        "typename": typename,
+                        "file_names": [f"{typename}/{partition_path}/{i + 1}.json"],
+                        "chunk_start": chunk_offset + i,
+                        **workflow_args,
+                    },
+                    retry_policy=retry_policy,
+                    start_to_close_timeout=self.default_start_to_close_timeout,
+                    heartbeat_timeout=self.default_heartbeat_timeout,
+                )
+                for i in range(activity_statistics.chunk_count)
+            ]
+        )
+
+    @workflow.run
+    async def run(self, workflow_config: Dict[str, Any]) -> None:
+        await super().run(workflow_config)
+
+        workflow_args = self._workflow_args
+        if workflow_args is None or not is_incremental_extraction(workflow_args):
+            return
+        await workflow.execute_activity_method(
+            self.activities_cls.save_extraction_state,
+            args=[
+                {
+                    **workflow_args,
+                    "extraction_state": self.get_extraction_state(workflow_args),
+                }
+            ],
+            retry_policy=RetryPolicy(maximum_attempts=3),
+            start_to_close_timeout=self.default_start_to_close_timeout,
+            heartbeat_timeout=self.default_heartbeat_timeout,
+        )
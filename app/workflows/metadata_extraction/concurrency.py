@@ -0,0 +1,85 @@
+"""Adaptive bound on the partition extractions a workflow run has in flight."""
+
+import asyncio
+from typing import Dict, Optional
+
+from app.constants import (
+    ADAPTIVE_CONCURRENCY_MAX_QUEUED_QUERIES,
+    ADAPTIVE_CONCURRENCY_MAX_RUNNING_QUERIES_PER_WORKER,
+)
+
+
+class AdaptiveLimiter:
+    """
+    Bounds concurrent partition extractions with an AIMD limit.
+
+    The limit grows by one after every cluster load sample showing spare
+    capacity and is halved after a sample showing the cluster is busy, so
+    extraction backs off quickly when analysts need the cluster and speeds up
+    again slowly. It always stays between 1 and ``ceiling``; without samples
+    the limiter behaves like a semaphore of ``initial`` slots.
+
+    The cluster is busy when more than ``max_queued_queries`` queries are
+    queued, or more than ``max_running_queries_per_worker`` queries run per
+    active worker.
+    """
+
+    def __init__(
+        self,
+        ceiling: int,
+        initial: Optional[int] = None,
+        max_queued_queries: int = ADAPTIVE_CONCURRENCY_MAX_QUEUED_QUERIES,
+        max_running_queries_per_worker: int = (
+            ADAPTIVE_CONCURRENCY_MAX_RUNNING_QUERIES_PER_WORKER
+        ),
+    ):
+        self.ceiling = max(1, ceiling)
+        self.limit = min(self.ceiling, max(1, initial or self.ceiling))
+        self.max_queued_queries = max_queued_queries
+        self.max_running_queries_per_worker = max_running_queries_per_worker
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self) -> "AdaptiveLimiter":
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify(self.limit - self.in_flight)
+
+    def is_busy(self, cluster_load: Dict[str, int]) -> bool:
+        """Whether a cluster load sample shows the cluster has no spare capacity."""
+        workers = max(1, cluster_load.get("active_workers", 0))
+        return (
+            cluster_load.get("queued_queries", 0) > self.max_queued_queries
+            or cluster_load.get("running_queries", 0) / workers
+            > self.max_running_queries_per_worker
+        )
+
+    async def update(self, cluster_load: Dict[str, int]) -> int:
+        """
+        Adjust the limit to a cluster load sample.
+
+        Args:
+            cluster_load: Sample returned by the ``get_cluster_load`` activity.
+
+        Returns:
+            int: The new limit.
+        """
+        if self.is_busy(cluster_load):
+            limit = max(1, self.limit // 2)
+        else:
+            limit = min(self.ceiling, self.limit + 1)
+        await self.set_limit(limit)
+        return limit
+
+    async def set_limit(self, limit: int) -> None:
+        """Change the limit, starting waiting extractions if it grew."""
+        async with self._condition:
+            self.limit = limit
+            if self.limit > self.in_flight:
+                self._condition.notify(self.limit - self.in_flight)
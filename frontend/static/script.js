@@ -306,7 +306,8 @@ async function performConnectionTest() {
       protocol: "http",
       verify: "true",
       source: "atlan",
-      isolation_level: "AUTOCOMMIT"
+      isolation_level: "AUTOCOMMIT",
+      coordinators: document.getElementById("coordinators").value
     },
     authType: "basic",
     type: "all",
@@ -367,69 +368,77 @@ let metadataOptions = {
   exclude: new Map(),
 };
 
-function processMetadataResponse(data) {
-  // Group by TABLE_CATALOG instead of database
-  const databases = new Map();
+// Catalogs selected as a whole, filtered with "*" instead of schema names
+let wholeCatalogs = {
+  include: new Set(),
+  exclude: new Set(),
+};
 
-  data.forEach((item) => {
-    if (!databases.has(item.TABLE_CATALOG)) {
-      databases.set(item.TABLE_CATALOG, new Set());
-    }
-    databases.get(item.TABLE_CATALOG).add(item.TABLE_SCHEMA);
-  });
+// Pages already requested since the dropdowns were last populated, shared
+// by the include and exclude dropdowns
+let metadataPages = new Map();
+let refreshMetadata = false;
 
-  return databases;
-}
+async function fetchMetadata(type, { database = "", cursor = "", prefix = "" } = {}) {
+  const activeSection = document.querySelector(".auth-section.active");
+  if (!activeSection) return [];
 
-async function fetchMetadata() {
-  try {
-    const activeSection = document.querySelector(".auth-section.active");
-    if (!activeSection) return false;
+  // Get common values
+  const host = document.getElementById("host").value;
+  const port = document.getElementById("port").value;
+  const catalog = document.getElementById("catalog").value;
+  const schema = document.getElementById("schema").value;
+  const username = activeSection.querySelector("#username").value;
+  const password = document.getElementById("password").value;
 
-    // Get common values
-    const host = document.getElementById("host").value;
-    const port = document.getElementById("port").value;
-    const catalog = document.getElementById("catalog").value;
-    const schema = document.getElementById("schema").value;
-    const username = activeSection.querySelector("#username").value;
-    const password = document.getElementById("password").value;
+  let payload = {
+    host,
+    port,
+    database,
+    extra: {
+      catalog,
+      schema,
+      protocol: "http",
+      verify: "true",
+      source: "atlan",
+      isolation_level: "AUTOCOMMIT",
+      coordinators: document.getElementById("coordinators").value
+    },
+    authType: "basic",
+    type,
+    username,
+    password,
+    refresh: refreshMetadata,
+    cursor,
+    prefix
+  };
 
-    let payload = {
-      host,
-      port,
-      database: catalog,
-      extra: {
-        catalog,
-        schema,
-        protocol: "http",
-        verify: "true",
-        source: "atlan",
-        isolation_level: "AUTOCOMMIT"
-      },
-      authType: "basic",
-      type: "all",
-      username,
-      password
-    };
+  const response = await fetch(`/workflows/v1/metadata`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+    },
+    body: JSON.stringify(payload),
+  });
 
-    const response = await fetch(`/workflows/v1/metadata`, {
-      method: "POST",
-      headers: {
-        "Content-Type": "application/json",
-      },
-      body: JSON.stringify(payload),
-    });
+  if (!response.ok) {
+    throw new Error("Failed to fetch metadata");
+  }
 
-    if (!response.ok) {
-      throw new Error("Failed to fetch metadata");
-    }
+  const data = await response.json();
+  return data.data;
+}
 
-    const data = await response.json();
-    return processMetadataResponse(data.data);
-  } catch (error) {
-    console.error("Error fetching metadata:", error);
-    return new Map();
+function fetchMetadataPage(type, params) {
+  const key = JSON.stringify([type, params]);
+  if (!metadataPages.has(key)) {
+    const page = fetchMetadata(type, params).catch((error) => {
+      metadataPages.delete(key);
+      throw error;
+    });
+    metadataPages.set(key, page);
   }
+  return metadataPages.get(key);
 }
 
 function toggleDropdown(id) {
@@ -450,12 +459,15 @@ function toggleDropdown(id) {
   event.stopPropagation();
 }
 
-function updateDropdownHeader(type, tableCatalog, totalSchemas, selectedCount) {
+function updateDropdownHeader(type) {
   const dropdown = document.getElementById(`${type}Metadata`);
   const header = dropdown.querySelector(".dropdown-header span");
 
-  // Get all selected databases and their schemas
+  // Get all selected catalogs and their schemas
   const selectedDatabases = [];
+  wholeCatalogs[type].forEach((database) => {
+    selectedDatabases.push(`${database} (all schemas)`);
+  });
   metadataOptions[type].forEach((schemas, database) => {
     if (schemas.size > 0) {
       selectedDatabases.push(`${database} (${schemas.size} schemas)`);
@@ -463,17 +475,17 @@ function updateDropdownHeader(type, tableCatalog, totalSchemas, selectedCount) {
   });
 
   if (selectedDatabases.length === 0) {
-    header.textContent = "Select databases and schemas";
+    header.textContent = "Select catalogs and schemas";
   } else if (selectedDatabases.length === 1) {
     header.textContent = selectedDatabases[0];
   } else {
-    // Show first database and count of others
+    // Show first catalog and count of others
     header.textContent = `${selectedDatabases[0]} +${
       selectedDatabases.length - 1
     } more`;
   }
 
-  // Add tooltip for full list when multiple databases are selected
+  // Add tooltip for full list when multiple catalogs are selected
   if (selectedDatabases.length > 1) {
     header.title = selectedDatabases.join("\n");
   } else {
@@ -481,148 +493,234 @@ function updateDropdownHeader(type, tableCatalog, totalSchemas, selectedCount) {
   }
 }
 
-async function populateMetadataDropdowns() {
-  // Show loading state for both dropdowns
-  ["include", "exclude"].forEach((type) => {
-    const dropdown = document.getElementById(`${type}Metadata`);
-    const header = dropdown.querySelector(".dropdown-header span");
-    const content = dropdown.querySelector(".dropdown-content");
-    header.textContent = "Loading...";
-    content.innerHTML = ""; // Clear existing content
-  });
+async function populateMetadataDropdowns(refresh = false) {
+  refreshMetadata = refresh;
+  metadataPages.clear();
 
   // Clear existing selections
-  metadataOptions.include.clear();
-  metadataOptions.exclude.clear();
-
-  // Make single API call
-  const databases = await fetchMetadata();
-
-  // Populate both dropdowns with the same data
   ["include", "exclude"].forEach((type) => {
-    populateDropdown(type, databases);
+    metadataOptions[type].clear();
+    wholeCatalogs[type].clear();
   });
+
+  // Only the first page of catalogs is loaded, schemas follow on expand
+  await Promise.all(["include", "exclude"].map(populateDropdown));
 }
 
-// New helper function to populate a single dropdown
-// New helper function to populate a single dropdown
-function populateDropdown(type, databases) {
+function populateDropdown(type) {
   const dropdown = document.getElementById(`${type}Metadata`);
   const content = dropdown.querySelector(".dropdown-content");
   const header = dropdown.querySelector(".dropdown-header span");
 
-  // Reset content
+  // Show loading state and reset content
+  header.textContent = "Loading...";
   content.innerHTML = "";
 
-  // Update header text based on whether we got data
-  if (databases.size === 0) {
-    header.textContent = "No databases available";
-    return;
+  const catalogList = document.createElement("div");
+  const search = createSearchInput("Search catalogs", (prefix) => {
+    catalogList.innerHTML = "";
+    loadCatalogs(type, catalogList, prefix);
+  });
+  content.appendChild(search);
+  content.appendChild(catalogList);
+
+  return loadCatalogs(type, catalogList, "").then((count) => {
+    header.textContent =
+      count === 0 ? "No catalogs available" : "Select catalogs and schemas";
+  });
+}
+
+function createSearchInput(placeholder, onSearch) {
+  const search = document.createElement("input");
+  search.type = "search";
+  search.className = "metadata-search";
+  search.placeholder = placeholder;
+
+  // Search by prefix once typing pauses
+  let timeout;
+  search.addEventListener("input", () => {
+    clearTimeout(timeout);
+    timeout = setTimeout(() => onSearch(search.value), 300);
+  });
+  return search;
+}
+
+function appendLoadMore(list, text, onLoad) {
+  const button = document.createElement("button");
+  button.type = "button";
+  button.className = "load-more";
+  button.textContent = text;
+  button.addEventListener("click", (e) => {
+    // The button is removed, keep the dropdown from treating this as an
+    // outside click
+    e.stopPropagation();
+    button.remove();
+    onLoad();
+  });
+  list.appendChild(button);
+}
+
+async function loadCatalogs(type, catalogList, prefix, cursor = "") {
+  let page;
+  try {
+    page = await fetchMetadataPage("database", { cursor, prefix });
+  } catch (error) {
+    console.error("Error fetching metadata:", error);
+    page = [];
   }
 
-  // Reset to default text
-  header.textContent = "Select databases and schemas";
-
-  databases.forEach((schemas, tableCatalog) => {
-    // Create database container
-    const dbContainer = document.createElement("div");
-    dbContainer.className = "database-container";
-
-    // Create database header
-    const dbDiv = document.createElement("div");
-    dbDiv.className = "database-item";
-
-    const checkbox = document.createElement("input");
-    checkbox.type = "checkbox";
-    checkbox.id = `${type}-${tableCatalog}`;
-
-    const label = document.createElement("label");
-    label.textContent = tableCatalog;
-    label.htmlFor = `${type}-${tableCatalog}`;
-
-    const schemaCount = document.createElement("span");
-    schemaCount.className = "selected-count";
-    schemaCount.textContent = `0/${schemas.size}`;
-
-    dbDiv.appendChild(checkbox);
-    dbDiv.appendChild(label);
-    dbDiv.appendChild(schemaCount);
-
-    // Create schema list
-    const schemaList = document.createElement("div");
-    schemaList.className = "schema-list";
-
-    schemas.forEach((schemaName) => {
-      const schemaDiv = document.createElement("div");
-      schemaDiv.className = "schema-item";
-
-      const schemaCheckbox = document.createElement("input");
-      schemaCheckbox.type = "checkbox";
-      schemaCheckbox.id = `${type}-${tableCatalog}-${schemaName}`;
-
-      const schemaLabel = document.createElement("label");
-      schemaLabel.textContent = schemaName;
-      schemaLabel.htmlFor = `${type}-${tableCatalog}-${schemaName}`;
-
-      schemaDiv.appendChild(schemaCheckbox);
-      schemaDiv.appendChild(schemaLabel);
-      schemaList.appendChild(schemaDiv);
-
-      schemaCheckbox.addEventListener("change", (e) => {
-        handleSchemaSelection(type, tableCatalog, schemaName, e.target.checked);
-        updateSelectionCount(type, tableCatalog, schemas.size);
-
-        // Uncheck main checkbox if any sub-option is unchecked
-        if (!e.target.checked) {
-          checkbox.checked = false;
-        } else {
-          // Check if all sub-options are selected
-          const allChecked = Array.from(
-            schemaList.querySelectorAll('input[type="checkbox"]')
-          ).every((cb) => cb.checked);
-          checkbox.checked = allChecked;
-        }
-      });
-    });
+  page.forEach((item) => {
+    catalogList.appendChild(createCatalogItem(type, item.TABLE_CATALOG));
+  });
 
-    // Add all elements to the container
-    dbContainer.appendChild(dbDiv);
-    dbContainer.appendChild(schemaList);
-    content.appendChild(dbContainer);
-
-    // Add database checkbox event listener
-    checkbox.addEventListener("change", (e) => {
-      handleDatabaseSelection(
-        type,
-        tableCatalog,
-        Array.from(schemas),
-        e.target.checked
-      );
-      schemaList
-        .querySelectorAll('input[type="checkbox"]')
-        .forEach((cb) => (cb.checked = e.target.checked));
-      updateSelectionCount(type, tableCatalog, schemas.size);
+  // The last catalog of a page followed by more has the next page's cursor
+  const nextCursor = page.length ? page[page.length - 1].NEXT_CURSOR : undefined;
+  if (nextCursor) {
+    appendLoadMore(catalogList, "Load more catalogs", () =>
+      loadCatalogs(type, catalogList, prefix, nextCursor)
+    );
+  }
+  return page.length;
+}
+
+async function loadSchemas(type, tableCatalog, schemaItems, prefix, cursor = "") {
+  let page;
+  try {
+    page = await fetchMetadataPage("schema", {
+      database: tableCatalog,
+      cursor,
+      prefix,
     });
+  } catch (error) {
+    console.error("Error fetching metadata:", error);
+    page = [];
+  }
+
+  page.forEach((item) => {
+    schemaItems.appendChild(
+      createSchemaItem(type, tableCatalog, item.TABLE_SCHEMA, schemaItems)
+    );
+  });
 
-    // Add click event to toggle schema list
-    dbDiv.addEventListener("click", (e) => {
-      if (e.target.type !== "checkbox") {
-        schemaList.classList.toggle("show");
+  const nextCursor = page.length ? page[page.length - 1].NEXT_CURSOR : undefined;
+  if (nextCursor) {
+    appendLoadMore(schemaItems, "Load more schemas", () =>
+      loadSchemas(type, tableCatalog, schemaItems, prefix, nextCursor)
+    );
+  }
+}
+
+function createCatalogItem(type, tableCatalog) {
+  // Create catalog container
+  const dbContainer = document.createElement("div");
+  dbContainer.className = "database-container";
+
+  // Create catalog header
+  const dbDiv = document.createElement("div");
+  dbDiv.className = "database-item";
+
+  const checkbox = document.createElement("input");
+  checkbox.type = "checkbox";
+  checkbox.id = `${type}-${tableCatalog}`;
+  checkbox.checked = wholeCatalogs[type].has(tableCatalog);
+
+  const label = document.createElement("label");
+  label.textContent = tableCatalog;
+  label.htmlFor = `${type}-${tableCatalog}`;
+
+  const schemaCount = document.createElement("span");
+  schemaCount.className = "selected-count";
+
+  dbDiv.appendChild(checkbox);
+  dbDiv.appendChild(label);
+  dbDiv.appendChild(schemaCount);
+
+  // Create schema list, loaded when the catalog is first expanded
+  const schemaList = document.createElement("div");
+  schemaList.className = "schema-list";
+  const schemaItems = document.createElement("div");
+  schemaList.appendChild(
+    createSearchInput("Search schemas", (prefix) => {
+      schemaItems.innerHTML = "";
+      loadSchemas(type, tableCatalog, schemaItems, prefix);
+    })
+  );
+  schemaList.appendChild(schemaItems);
+
+  dbContainer.appendChild(dbDiv);
+  dbContainer.appendChild(schemaList);
+  updateSelectionCount(type, tableCatalog, dbContainer);
+
+  // Add catalog checkbox event listener
+  checkbox.addEventListener("change", (e) => {
+    handleDatabaseSelection(type, tableCatalog, e.target.checked);
+    schemaItems
+      .querySelectorAll('input[type="checkbox"]')
+      .forEach((cb) => (cb.checked = e.target.checked));
+    updateSelectionCount(type, tableCatalog, dbContainer);
+  });
+
+  // Add click event to toggle schema list
+  let schemasLoaded = false;
+  dbDiv.addEventListener("click", (e) => {
+    if (e.target.type !== "checkbox") {
+      schemaList.classList.toggle("show");
+      if (!schemasLoaded) {
+        schemasLoaded = true;
+        loadSchemas(type, tableCatalog, schemaItems, "");
       }
-    });
+    }
   });
+
+  return dbContainer;
+}
+
+function createSchemaItem(type, tableCatalog, tableSchema, schemaItems) {
+  const schemaDiv = document.createElement("div");
+  schemaDiv.className = "schema-item";
+
+  const schemaCheckbox = document.createElement("input");
+  schemaCheckbox.type = "checkbox";
+  schemaCheckbox.id = `${type}-${tableCatalog}-${tableSchema}`;
+  schemaCheckbox.value = tableSchema;
+  schemaCheckbox.checked =
+    wholeCatalogs[type].has(tableCatalog) ||
+    Boolean(metadataOptions[type].get(tableCatalog)?.has(tableSchema));
+
+  const schemaLabel = document.createElement("label");
+  schemaLabel.textContent = tableSchema;
+  schemaLabel.htmlFor = `${type}-${tableCatalog}-${tableSchema}`;
+
+  schemaDiv.appendChild(schemaCheckbox);
+  schemaDiv.appendChild(schemaLabel);
+
+  schemaCheckbox.addEventListener("change", (e) => {
+    const dbContainer = schemaItems.closest(".database-container");
+    if (!e.target.checked && wholeCatalogs[type].has(tableCatalog)) {
+      // Not every schema may be loaded, keep the loaded ones still checked
+      const checkedSchemas = Array.from(
+        schemaItems.querySelectorAll('input[type="checkbox"]:checked')
+      ).map((cb) => cb.value);
+      handleDatabaseSelection(type, tableCatalog, false);
+      checkedSchemas.forEach((schema) =>
+        handleSchemaSelection(type, tableCatalog, schema, true)
+      );
+      dbContainer.querySelector(".database-item input").checked = false;
+    } else {
+      handleSchemaSelection(type, tableCatalog, tableSchema, e.target.checked);
+    }
+    updateSelectionCount(type, tableCatalog, dbContainer);
+  });
+
+  return schemaDiv;
 }
-function handleDatabaseSelection(type, tableCatalog, schemas, isSelected) {
-  if (!metadataOptions[type].has(tableCatalog)) {
-    metadataOptions[type].set(tableCatalog, new Set());
-  }
 
+function handleDatabaseSelection(type, tableCatalog, isSelected) {
+  metadataOptions[type].delete(tableCatalog);
   if (isSelected) {
-    schemas.forEach((schema) => {
-      metadataOptions[type].get(tableCatalog).add(schema);
-    });
+    wholeCatalogs[type].add(tableCatalog);
   } else {
-    metadataOptions[type].get(tableCatalog).clear();
+    wholeCatalogs[type].delete(tableCatalog);
   }
 
   // Update the header with the new selection
@@ -644,78 +742,37 @@ function handleSchemaSelection(type, tableCatalog, tableSchema, isSelected) {
   updateDropdownHeader(type);
 }
 
-function updateSelectionCount(type, tableCatalog, totalSchemas) {
-  const selectedCount = metadataOptions[type].get(tableCatalog)?.size || 0;
-
-  // Find the count span using more compatible selectors
-  const dbContainer = document.querySelector(`#${type}Metadata`);
-  const dbItems = dbContainer.querySelectorAll(".database-item");
-  let countSpan;
-
-  // Find the matching database item
-  dbItems.forEach((item) => {
-    const label = item.querySelector("label");
-    if (label && label.textContent === tableCatalog) {
-      countSpan = item.querySelector(".selected-count");
-    }
-  });
-
-  if (countSpan) {
-    countSpan.textContent = `${selectedCount}/${totalSchemas}`;
+function updateSelectionCount(type, tableCatalog, dbContainer) {
+  const countSpan = dbContainer.querySelector(".selected-count");
+  if (wholeCatalogs[type].has(tableCatalog)) {
+    countSpan.textContent = "all";
+  } else {
+    const selectedCount = metadataOptions[type].get(tableCatalog)?.size || 0;
+    countSpan.textContent = selectedCount ? `${selectedCount} selected` : "";
   }
-
-  // Update header
-  let totalSelected = 0;
-  metadataOptions[type].forEach((schemas) => {
-    totalSelected += schemas.size;
-  });
-  updateDropdownHeader(type, null, null, totalSelected);
 }
 
 // Add these new functions for preflight checks
 function formatFilters(metadataOptions) {
-  const formatFilter = (selections) => {
+  const formatFilter = (type) => {
     const filter = {};
-    selections.forEach((schemas, database) => {
+    // Add ^ to start and $ to end of catalog and schema names
+    wholeCatalogs[type].forEach((database) => {
+      filter[`^${database}$`] = "*";
+    });
+    metadataOptions[type].forEach((schemas, database) => {
       if (schemas.size > 0) {
-        // Add ^ to start and $ to end of database name
-        const dbPattern = `^${database}$`;
-
-        // Find the database container
-        let totalSchemas = 0;
-        document
-          .querySelectorAll(
-            `#includeMetadata .database-container, #excludeMetadata .database-container`
-          )
-          .forEach((container) => {
-            const label = container.querySelector("label");
-            if (label && label.textContent === database) {
-              totalSchemas = container
-                .querySelector(".schema-list")
-                .querySelectorAll(".schema-item").length;
-            }
-          });
-
-        // Check if all schemas for this database are selected
-        const allSchemasSelected = schemas.size === totalSchemas;
-
-        if (allSchemasSelected) {
-          // If all schemas are selected, use "*" instead of individual schema patterns
-          filter[dbPattern] = "*";
-        } else {
-          // Otherwise, add ^ to start and $ to end of each schema name
-          filter[dbPattern] = Array.from(schemas).map(
-            (schema) => `^${schema}$`
-          );
-        }
+        filter[`^${database}$`] = Array.from(schemas).map(
+          (schema) => `^${schema}$`
+        );
       }
     });
     return JSON.stringify(filter);
   };
 
   return {
-    "include-filter": formatFilter(metadataOptions.include),
-    "exclude-filter": formatFilter(metadataOptions.exclude),
+    "include-filter": formatFilter("include"),
+    "exclude-filter": formatFilter("exclude"),
   };
 }
 
@@ -755,7 +812,8 @@ async function runPreflightChecks() {
           protocol: "http",
           verify: "true",
           source: "atlan",
-          isolation_level: "AUTOCOMMIT"
+          isolation_level: "AUTOCOMMIT",
+          coordinators: document.getElementById("coordinators").value
         },
         authType: "basic",
         type: "all",
@@ -877,7 +935,8 @@ async function handleRunWorkflow() {
             protocol: "http",
             verify: "true",
             source: "atlan",
-            isolation_level: "AUTOCOMMIT"
+            isolation_level: "AUTOCOMMIT",
+            coordinators: document.getElementById("coordinators").value
           },
           authType: "basic",
           type: "all",
@@ -10,9 +10,12 @@ from application_sdk.observability.decorators.observability_decorator import (
 from application_sdk.observability.logger_adaptor import get_logger
 from application_sdk.observability.metrics_adaptor import get_metrics
 from application_sdk.observability.traces_adaptor import get_traces
-from application_sdk.transformers.query import QueryBasedTransformer
 
+from app.activities.metadata_extraction import SQLMetadataExtractionActivities
 from app.clients import SQLClient
+from app.handlers import SQLHandler
+from app.transformers import QueryBasedTransformer
+from app.workflows.metadata_extraction import SQLMetadataExtractionWorkflow
 
 logger = get_logger(__name__)
 metrics = get_metrics()
@@ -25,17 +28,21 @@ async def main():
     application = BaseSQLMetadataExtractionApplication(
         name=APPLICATION_NAME,
         client_class=SQLClient,
+        handler_class=SQLHandler,
         transformer_class=QueryBasedTransformer,  # type: ignore
     )
 
     # Setup the workflow
-    await application.setup_workflow()
+    await application.setup_workflow(
+        workflow_classes=[SQLMetadataExtractionWorkflow],
+        activities_class=SQLMetadataExtractionActivities,
+    )
 
     # Start the worker
     await application.start_worker()
 
     # Setup the application server
-    await application.setup_server()
+    await application.setup_server(workflow_class=SQLMetadataExtractionWorkflow)
 
     # Start the application server
     await application.start_server()
@@ -0,0 +1,375 @@
+"""Per-stage performance budgets of the pipeline, checked on scalene profiles.
+
+Usage:
+    python -m tests.benchmark.budgets profile --tables 20000 --profiles profiles
+    python -m tests.benchmark.budgets compare --profiles profiles
+    python -m tests.benchmark.budgets update --profiles profiles
+
+``profile`` runs every stage of :mod:`tests.benchmark.pipeline` (client
+connect, the extraction query and the transform of every entity type) under
+scalene, one process per stage, and writes ``<profiles>/<stage>.json``.
+
+``update`` stores a summary of every profile as the baseline of its stage in
+``--baselines``: CPU seconds, ``max_footprint_mb`` and the figures of the
+functions that use the most CPU or allocate the most memory.
+
+``compare`` diffs the profiles against the baselines and exits with status 1
+when a stage breaks its budget. Budgets are read from
+``<baselines>/budgets.json``, a ``default`` budget with per stage overrides
+under ``stages``, see :class:`Budget`. A stage breaks its budget when its CPU
+seconds or ``max_footprint_mb`` grew by more than the allowed fraction (and
+by more than the noise floor), or when its ``max_footprint_mb`` is above the
+absolute limit. The report lists the functions that changed the most for
+every stage that broke its budget.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List, Optional, Tuple
+
+from tests.benchmark.pipeline import STAGES
+
+BASELINES = ".github/scalene"
+PIPELINE_SCRIPT = os.path.join(os.path.dirname(__file__), "pipeline.py")
+CPU_METRICS = ["n_cpu_percent_python", "n_cpu_percent_c", "n_sys_percent"]
+TOP_FUNCTIONS = 15
+
+
+@dataclass
+class Budget:
+    """Budget of a stage.
+
+    Attributes:
+        max_cpu_regression: Allowed growth of CPU seconds, as a fraction.
+        max_footprint_regression: Allowed growth of ``max_footprint_mb``, as
+            a fraction.
+        min_cpu_seconds: Growth of CPU seconds below this is noise.
+        min_footprint_mb: Growth of ``max_footprint_mb`` below this is noise.
+        max_footprint_mb: Limit of ``max_footprint_mb``, regardless of the
+            baseline, or None for no limit.
+    """
+
+    max_cpu_regression: float = 0.25
+    max_footprint_regression: float = 0.15
+    min_cpu_seconds: float = 0.5
+    min_footprint_mb: float = 16.0
+    max_footprint_mb: Optional[float] = None
+
+
+def get_budget(budgets: Dict[str, Any], stage: str, **overrides: Any) -> Budget:
+    """Return the budget of a stage.
+
+    Stage budgets override the default budget, and ``overrides`` that are
+    not None override the default budget, not the stage budgets.
+    """
+    names = {field.name for field in fields(Budget)}
+    values = {
+        **budgets.get("default", {}),
+        **{key: value for key, value in overrides.items() if value is not None},
+        **budgets.get("stages", {}).get(stage, {}),
+    }
+    unknown = set(values) - names
+    if unknown:
+        raise ValueError(f"Unknown budget settings for {stage}: {sorted(unknown)}")
+    return Budget(**values)
+
+
+def normalize_path(path: str) -> str:
+    """Return a path that is the same on every machine.
+
+    Installed packages are named from their ``site-packages`` directory and
+    files of the repository relative to it.
+    """
+    if "site-packages/" in path:
+        return path.split("site-packages/", 1)[1]
+    if os.path.isabs(path) and path.startswith(os.getcwd() + os.sep):
+        return os.path.relpath(path)
+    return path
+
+
+def summarize_profile(stage: str, profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Summarize a scalene JSON profile.
+
+    Scalene reports CPU time as a percentage of the elapsed time, so the CPU
+    seconds of a function are its CPU percentages times the elapsed time.
+
+    Returns:
+        Dict[str, Any]: The stage, elapsed time, CPU seconds and
+        ``max_footprint_mb`` of the profile, and per function its CPU seconds
+        and allocated MB for the functions using the most of either.
+    """
+    elapsed = profile.get("elapsed_time_sec", 0)
+    functions: Dict[str, Dict[str, float]] = {}
+    for path, file_data in profile.get("files", {}).items():
+        for function in file_data.get("functions", []):
+            name = f"{normalize_path(path)}:{function.get('line', '')}"
+            figures = functions.setdefault(name, {"cpu_seconds": 0.0, "malloc_mb": 0.0})
+            cpu_percent = sum(function.get(metric, 0) for metric in CPU_METRICS)
+            figures["cpu_seconds"] += elapsed * cpu_percent / 100
+            figures["malloc_mb"] += function.get("n_malloc_mb", 0)
+
+    top = set()
+    for figure in ("cpu_seconds", "malloc_mb"):
+        ranked = sorted(functions, key=lambda name: functions[name][figure])
+        top.update(name for name in ranked[-TOP_FUNCTIONS:] if functions[name][figure])
+
+    return {
+        "stage": stage,
+        "elapsed_time_sec": elapsed,
+        "cpu_seconds": sum(figures["cpu_seconds"] for figures in functions.values()),
+        "max_footprint_mb": profile.get("max_footprint_mb", 0),
+        "functions": {name: functions[name] for name in sorted(top)},
+    }
+
+
+def compare_stage(
+    summary: Dict[str, Any], baseline: Optional[Dict[str, Any]], budget: Budget
+) -> List[str]:
+    """Check a stage against its budget.
+
+    Returns:
+        List[str]: One message per broken budget, empty if the stage is
+        within budget. Without a baseline only the footprint limit is checked.
+    """
+    stage = summary["stage"]
+    footprint = summary["max_footprint_mb"]
+    regressions = []
+    if budget.max_footprint_mb is not None and footprint > budget.max_footprint_mb:
+        regressions.append(
+            f"{stage}: max_footprint_mb {footprint:.1f} MB, "
+            f"limit {budget.max_footprint_mb:.1f} MB"
+        )
+    if not baseline:
+        return regressions
+
+    checks = [
+        (
+            "CPU time",
+            "s",
+            summary["cpu_seconds"],
+            baseline["cpu_seconds"],
+            budget.max_cpu_regression,
+            budget.min_cpu_seconds,
+        ),
+        (
+            "max_footprint_mb",
+            " MB",
+            footprint,
+            baseline["max_footprint_mb"],
+            budget.max_footprint_regression,
+            budget.min_footprint_mb,
+        ),
+    ]
+    for name, unit, value, before, max_regression, noise in checks:
+        if value - before > noise and value > before * (1 + max_regression):
+            regressions.append(
+                f"{stage}: {name} {value:.1f}{unit}, baseline {before:.1f}{unit} "
+                f"(+{get_change(value, before):.0%}, budget +{max_regression:.0%})"
+            )
+    return regressions
+
+
+def get_change(value: float, before: float) -> float:
+    if before:
+        return (value - before) / before
+    return float("inf") if value else 0.0
+
+
+def get_function_changes(
+    summary: Dict[str, Any], baseline: Dict[str, Any], figure: str, count: int = 5
+) -> List[Tuple[str, float, float]]:
+    """Return the functions whose ``figure`` grew the most since the baseline.
+
+    Returns:
+        List[Tuple[str, float, float]]: Function, baseline and current value.
+    """
+    empty = {"cpu_seconds": 0.0, "malloc_mb": 0.0}
+    changes = []
+    for name in set(summary["functions"]) | set(baseline["functions"]):
+        value = summary["functions"].get(name, empty)[figure]
+        before = baseline["functions"].get(name, empty)[figure]
+        if value > before:
+            changes.append((name, before, value))
+    changes.sort(key=lambda change: change[2] - change[1], reverse=True)
+    return changes[:count]
+
+
+def format_report(
+    summaries: List[Dict[str, Any]],
+    baselines: Dict[str, Dict[str, Any]],
+    regressions: Dict[str, List[str]],
+) -> str:
+    """Return a readable report of the profiles against their baselines."""
+    lines = [
+        f"{'stage':<18} {'CPU s':>8} {'baseline':>9} {'change':>8} "
+        f"{'footprint MB':>13} {'baseline':>9} {'change':>8}  status"
+    ]
+    for summary in summaries:
+        stage = summary["stage"]
+        baseline = baselines.get(stage)
+        status = "over budget" if regressions.get(stage) else "ok"
+        if not baseline:
+            lines.append(
+                f"{stage:<18} {summary['cpu_seconds']:>8.1f} {'-':>9} {'-':>8} "
+                f"{summary['max_footprint_mb']:>13.1f} {'-':>9} {'-':>8}  "
+                f"{status}, no baseline"
+            )
+            continue
+        lines.append(
+            f"{stage:<18} {summary['cpu_seconds']:>8.1f} "
+            f"{baseline['cpu_seconds']:>9.1f} "
+            f"{get_change(summary['cpu_seconds'], baseline['cpu_seconds']):>+8.0%} "
+            f"{summary['max_footprint_mb']:>13.1f} "
+            f"{baseline['max_footprint_mb']:>9.1f} "
+            f"{get_change(summary['max_footprint_mb'], baseline['max_footprint_mb']):>+8.0%}"
+            f"  {status}"
+        )
+
+    for summary in summaries:
+        stage = summary["stage"]
+        if not regressions.get(stage):
+            continue
+        lines.append("")
+        lines.extend(f"Regression: {regression}" for regression in regressions[stage])
+        baseline = baselines.get(stage)
+        if not baseline:
+            continue
+        for figure, unit in (("cpu_seconds", "s"), ("malloc_mb", " MB")):
+            changes = get_function_changes(summary, baseline, figure)
+            if changes:
+                lines.append(f"  Largest {figure} growth:")
+            for name, before, value in changes:
+                lines.append(f"    {name}: {before:.2f}{unit} -> {value:.2f}{unit}")
+    return "\n".join(lines)
+
+
+def read_json(path: str) -> Dict[str, Any]:
+    with open(path) as file:
+        return json.load(file)
+
+
+def write_json(path: str, data: Dict[str, Any]) -> None:
+    with open(path, "w") as file:
+        json.dump(data, file, indent=2)
+        file.write("\n")
+
+
+def read_summaries(profiles: str) -> List[Dict[str, Any]]:
+    """Summarize the profiles of every stage found in a directory."""
+    return [
+        summarize_profile(stage, read_json(os.path.join(profiles, f"{stage}.json")))
+        for stage in STAGES
+        if os.path.exists(os.path.join(profiles, f"{stage}.json"))
+    ]
+
+
+def read_baselines(baselines: str) -> Dict[str, Dict[str, Any]]:
+    return {
+        stage: read_json(os.path.join(baselines, f"{stage}.json"))
+        for stage in STAGES
+        if os.path.exists(os.path.join(baselines, f"{stage}.json"))
+    }
+
+
+def profile_stages(
+    profiles: str, pipeline_args: List[str], directory: Optional[str] = None
+) -> None:
+    """Profile every stage with scalene into ``<profiles>/<stage>.json``."""
+    os.makedirs(profiles, exist_ok=True)
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        for stage in STAGES:
+            subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "scalene",
+                    "--cli",
+                    "--json",
+                    "--profile-all",
+                    "--outfile",
+                    os.path.join(profiles, f"{stage}.json"),
+                    PIPELINE_SCRIPT,
+                    "---",
+                    "--stage",
+                    stage,
+                    "--directory",
+                    directory or temporary_directory,
+                    *pipeline_args,
+                ],
+                check=True,
+                env={**os.environ, "PYTHONPATH": os.getcwd()},
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["profile", "compare", "update"])
+    parser.add_argument("--profiles", default="profiles")
+    parser.add_argument("--baselines", default=BASELINES)
+    parser.add_argument("--max-cpu-regression", type=float)
+    parser.add_argument("--max-footprint-regression", type=float)
+    parser.add_argument("--directory", help="Catalog directory of the profiled runs")
+    parser.add_argument("--tables", type=int, default=20000)
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument("--schemas", type=int, default=20)
+    parser.add_argument("--metadata", default="{}", help="Workflow metadata as JSON")
+    args = parser.parse_args()
+
+    if args.command == "profile":
+        profile_stages(
+            args.profiles,
+            [
+                "--tables",
+                str(args.tables),
+                "--columns",
+                str(args.columns),
+                "--schemas",
+                str(args.schemas),
+                "--metadata",
+                args.metadata,
+            ],
+            args.directory,
+        )
+        return
+
+    summaries = read_summaries(args.profiles)
+    if not summaries:
+        parser.error(f"No stage profiles in {args.profiles}")
+
+    if args.command == "update":
+        os.makedirs(args.baselines, exist_ok=True)
+        for summary in summaries:
+            write_json(
+                os.path.join(args.baselines, f"{summary['stage']}.json"), summary
+            )
+        print(f"Updated {len(summaries)} baselines in {args.baselines}")
+        return
+
+    budgets_path = os.path.join(args.baselines, "budgets.json")
+    budgets = read_json(budgets_path) if os.path.exists(budgets_path) else {}
+    baselines = read_baselines(args.baselines)
+    regressions = {
+        summary["stage"]: compare_stage(
+            summary,
+            baselines.get(summary["stage"]),
+            get_budget(
+                budgets,
+                summary["stage"],
+                max_cpu_regression=args.max_cpu_regression,
+                max_footprint_regression=args.max_footprint_regression,
+            ),
+        )
+        for summary in summaries
+    }
+    print(format_report(summaries, baselines, regressions))
+    if any(regressions.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""Synthetic Presto catalog backed by SQLite for offline benchmarks.
+
+The catalog mimics the parts of Presto's ``information_schema`` read by the
+extraction queries in ``app/sql``. SQLite evaluates correlated subqueries
+once per outer row, like Presto does for metadata tables, so differences in
+query shape show up the same way they do against a real coordinator.
+Presto's ``regexp_like`` is registered as a SQLite function so the filter
+predicates of the queries run unchanged. ``system.jdbc.columns`` is a plain
+table holding the same columns, attached as ``system_jdbc``.
+:class:`CatalogSQLClient` runs prepared queries against the catalog, so the
+activities can extract from it like from a coordinator.
+"""
+
+import os
+import re
+import sqlite3
+from typing import Any, AsyncIterator, Dict, Optional, Sequence
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import StaticPool
+
+from app.clients import SQLClient
+from app.common.observability import QueryObservation
+from app.common.utils import prepare_query, quote_identifier
+
+CATALOG_NAME = "synthetic"
+
+INFORMATION_SCHEMA_DDL = [
+    """
+    CREATE TABLE information_schema.schemata (
+        catalog_name TEXT,
+        schema_name TEXT
+    )
+    """,
+    """
+    CREATE TABLE information_schema.tables (
+        table_catalog TEXT,
+        table_schema TEXT,
+        table_name TEXT,
+        table_type TEXT
+    )
+    """,
+    """
+    CREATE TABLE information_schema.columns (
+        table_catalog TEXT,
+        table_schema TEXT,
+        table_name TEXT,
+        column_name TEXT,
+        ordinal_position INTEGER,
+        column_default TEXT,
+        is_nullable TEXT,
+        data_type TEXT
+    )
+    """,
+    """
+    CREATE TABLE information_schema.views (
+        table_catalog TEXT,
+        table_schema TEXT,
+        table_name TEXT,
+        view_definition TEXT
+    )
+    """,
+]
+
+SYSTEM_JDBC_DDL = """
+CREATE TABLE system_jdbc.columns (
+    table_cat TEXT,
+    table_schem TEXT,
+    table_name TEXT,
+    column_name TEXT,
+    ordinal_position INTEGER,
+    type_name TEXT,
+    is_nullable TEXT
+)
+"""
+
+DATA_TYPES = ["bigint", "varchar", "double", "boolean", "date", "timestamp(3)"]
+
+
+def connect_catalog(directory: Optional[str] = None) -> sqlite3.Connection:
+    """Connect to a synthetic catalog.
+
+    Args:
+        directory: Directory of a catalog created with ``directory`` set, or
+            None for a new in-memory catalog.
+
+    Returns:
+        sqlite3.Connection: Connection with the ``information_schema`` and
+        ``system_jdbc`` attached.
+    """
+    connection = sqlite3.connect(":memory:", check_same_thread=False)
+    for schema in ("information_schema", "system_jdbc"):
+        database = ":memory:"
+        if directory:
+            database = os.path.join(directory, f"{schema}.db")
+        connection.execute(f"ATTACH DATABASE ? AS {schema}", (database,))
+    connection.create_function("regexp_like", 2, regexp_like, deterministic=True)
+    return connection
+
+
+def regexp_like(value: str, pattern: str) -> bool:
+    """SQLite implementation of Presto's ``regexp_like``."""
+    return re.search(pattern, value) is not None
+
+
+def create_engine_for_catalog(connection: sqlite3.Connection) -> Engine:
+    """Wrap a catalog connection in a SQLAlchemy engine."""
+    return create_engine("sqlite://", creator=lambda: connection, poolclass=StaticPool)
+
+
+def create_synthetic_catalog(
+    table_count: int,
+    columns_per_table: int = 8,
+    schema_count: int = 20,
+    view_ratio: float = 0.1,
+    catalog_name: str = CATALOG_NAME,
+    directory: Optional[str] = None,
+    other_catalog_names: Sequence[str] = (),
+) -> sqlite3.Connection:
+    """Create a catalog with ``table_count`` tables and views.
+
+    Args:
+        table_count: Number of tables and views in the catalog.
+        columns_per_table: Number of columns of every table and view.
+        schema_count: Number of schemas the tables are spread over.
+        view_ratio: Fraction of the tables that are views.
+        catalog_name: Name of the catalog.
+        directory: Directory to store the catalog in, in memory if None.
+        other_catalog_names: Catalogs with the same tables that, like on
+            Presto, are listed in ``system.jdbc`` but not in the
+            ``information_schema`` of the catalog.
+
+    Returns:
+        sqlite3.Connection: Connection with the ``information_schema`` attached.
+    """
+    connection = connect_catalog(directory)
+    for ddl in [*INFORMATION_SCHEMA_DDL, SYSTEM_JDBC_DDL]:
+        connection.execute(ddl)
+    connection.executemany(
+        "INSERT INTO information_schema.schemata VALUES (?, ?)",
+        [(catalog_name, f"schema_{i}") for i in range(schema_count)],
+    )
+
+    view_every = round(1 / view_ratio) if view_ratio else 0
+    tables, columns, views = [], [], []
+    for i in range(table_count):
+        if len(columns) >= 100000:
+            insert_rows(connection, tables, columns, views, other_catalog_names)
+            tables, columns, views = [], [], []
+
+        schema_name = f"schema_{i % schema_count}"
+        table_name = f"table_{i}"
+        is_view = bool(view_every) and i % view_every == 0
+        tables.append(
+            (catalog_name, schema_name, table_name, "VIEW" if is_view else "BASE TABLE")
+        )
+        if is_view:
+            views.append(
+                (
+                    catalog_name,
+                    schema_name,
+                    table_name,
+                    f"SELECT * FROM {schema_name}.table_{i + 1}",
+                )
+            )
+        for position in range(1, columns_per_table + 1):
+            columns.append(
+                (
+                    catalog_name,
+                    schema_name,
+                    table_name,
+                    f"column_{position}",
+                    position,
+                    None,
+                    "YES",
+                    DATA_TYPES[position % len(DATA_TYPES)],
+                )
+            )
+
+    insert_rows(connection, tables, columns, views, other_catalog_names)
+    connection.commit()
+    return connection
+
+
+def insert_rows(
+    connection: sqlite3.Connection,
+    tables,
+    columns,
+    views,
+    other_catalog_names: Sequence[str] = (),
+) -> None:
+    connection.executemany(
+        "INSERT INTO information_schema.tables VALUES (?, ?, ?, ?)", tables
+    )
+    connection.executemany(
+        "INSERT INTO information_schema.columns VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        columns,
+    )
+    connection.executemany(
+        "INSERT INTO information_schema.views VALUES (?, ?, ?, ?)", views
+    )
+    connection.executemany(
+        "INSERT INTO system_jdbc.columns VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+            (catalog_name,) + column[1:5] + (column[7], column[6])
+            for column in columns
+            for catalog_name in (column[0], *other_catalog_names)
+        ],
+    )
+
+
+def render_query(
+    query: Optional[str],
+    workflow_args: Optional[Dict[str, Any]] = None,
+    catalog_name: str = CATALOG_NAME,
+    **fragments: Optional[str],
+) -> str:
+    """Prepare an extraction query and translate it to SQLite.
+
+    Args:
+        query: Query from ``app/sql``.
+        workflow_args: Workflow arguments used to prepare the query.
+        catalog_name: Catalog the query runs in.
+        **fragments: SQL fragments, e.g. ``temp_table_regex_sql``.
+
+    Returns:
+        str: The query, runnable against :func:`create_synthetic_catalog`.
+    """
+    prepared_query = prepare_query(query, workflow_args or {}, **fragments)
+    if prepared_query is None:
+        raise ValueError("Query could not be prepared")
+    return translate_query(prepared_query, catalog_name)
+
+
+def translate_query(query: str, catalog_name: str = CATALOG_NAME) -> str:
+    """Translate a prepared extraction query to SQLite.
+
+    The catalog is the only one attached, so partition queries reading
+    ``"<catalog>".information_schema`` read the attached schema.
+    """
+    return (
+        query.replace("CURRENT_CATALOG", f"'{catalog_name}'")
+        .replace(
+            f"{quote_identifier(catalog_name)}.information_schema.",
+            "information_schema.",
+        )
+        .replace("system.jdbc.", "system_jdbc.")
+    )
+
+
+class CatalogSQLClient(SQLClient):
+    """SQL client running prepared Presto queries against a synthetic catalog."""
+
+    def __init__(self, directory: str, catalog_name: str = CATALOG_NAME):
+        super().__init__()
+        self.directory = directory
+        self.catalog_name = catalog_name
+        self.engine = self.create_engine()
+
+    def create_engine(self) -> Engine:
+        """Create an engine on the catalog, also when loaded from the engine pool."""
+        return create_engine_for_catalog(connect_catalog(self.directory))
+
+    async def run_query_batches(
+        self,
+        query: str,
+        batch_size: int,
+        observation: Optional[QueryObservation] = None,
+    ) -> AsyncIterator:
+        async for batch in super().run_query_batches(
+            translate_query(query, self.catalog_name), batch_size, observation
+        ):
+            yield batch
+
+    async def run_query_arrow_batches(
+        self,
+        query: str,
+        batch_size: int,
+        observation: Optional[QueryObservation] = None,
+    ) -> AsyncIterator:
+        async for batch in super().run_query_arrow_batches(
+            translate_query(query, self.catalog_name), batch_size, observation
+        ):
+            yield batch
@@ -0,0 +1,150 @@
+"""Benchmark peak memory of column extraction.
+
+Usage:
+    python -m tests.benchmark.column_extraction --tables 50000 --columns 20
+
+Extracts ``extract_column.sql`` from a synthetic catalog with the SDK query
+executor and with streaming extraction at several batch sizes, and reports
+wall time, rows/sec and the peak RSS of every run. Each run happens in a
+fresh process so the peaks do not influence each other. Uploads to the
+object store are disabled, the benchmark measures extraction only.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import resource
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from unittest.mock import AsyncMock, patch
+
+from application_sdk.common.utils import read_sql_files
+
+from app.activities.metadata_extraction import SQLMetadataExtractionActivities
+from app.clients import SQLClient
+from tests.benchmark.catalog import (
+    CATALOG_NAME,
+    connect_catalog,
+    create_engine_for_catalog,
+    create_synthetic_catalog,
+    render_query,
+)
+
+queries = read_sql_files(queries_prefix="app/sql")
+
+
+def get_rss_mb() -> float:
+    with open("/proc/self/statm") as statm:
+        resident_pages = int(statm.read().split()[1])
+    return resident_pages * resource.getpagesize() / 1024 / 1024
+
+
+def get_peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def extract_columns(
+    directory: str, output_path: str, batch_size: Optional[int]
+) -> int:
+    sql_client = SQLClient()
+    sql_client.engine = create_engine_for_catalog(connect_catalog(directory))
+    query = render_query(queries["EXTRACT_COLUMN"], catalog_name=CATALOG_NAME)
+    workflow_args: Dict[str, Any] = {
+        "output_prefix": output_path,
+        "output_path": output_path,
+    }
+
+    activities = SQLMetadataExtractionActivities()
+    if batch_size is None:
+        statistics = await activities.query_executor(
+            sql_engine=sql_client.engine,
+            sql_query=query,
+            workflow_args=workflow_args,
+            output_suffix="raw/column",
+            typename="column",
+        )
+    else:
+        statistics = await activities.streaming_query_executor(
+            sql_client=sql_client,
+            sql_query=query,
+            workflow_args=workflow_args,
+            output_suffix="raw/column",
+            typename="column",
+            batch_size=batch_size,
+        )
+    return statistics.total_record_count if statistics else 0
+
+
+def run_extraction(
+    directory: str, batch_size: Optional[int], results: "multiprocessing.Queue"
+) -> None:
+    baseline_rss = get_rss_mb()
+    with tempfile.TemporaryDirectory() as output_path, patch(
+        "application_sdk.outputs.objectstore.ObjectStoreOutput."
+        "push_file_to_object_store",
+        new=AsyncMock(),
+    ):
+        start = time.perf_counter()
+        rows = asyncio.run(extract_columns(directory, output_path, batch_size))
+        seconds = time.perf_counter() - start
+    results.put((rows, seconds, baseline_rss, get_peak_rss_mb()))
+
+
+def run_benchmark(
+    table_count: int, columns_per_table: int, batch_sizes: List[int]
+) -> List[Tuple[str, int, float, float, float]]:
+    """Extract columns once per mode, each run in a new process.
+
+    Returns:
+        List[Tuple[str, int, float, float, float]]: Mode, rows, seconds, RSS
+        before the extraction and peak RSS (MB) for every run.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        create_synthetic_catalog(
+            table_count,
+            columns_per_table=columns_per_table,
+            catalog_name=CATALOG_NAME,
+            directory=directory,
+        ).close()
+
+        modes: List[Tuple[str, Optional[int]]] = [("sdk", None)]
+        modes += [(f"stream-{batch_size}", batch_size) for batch_size in batch_sizes]
+        for name, batch_size in modes:
+            queue = context.Queue()
+            process = context.Process(
+                target=run_extraction, args=(directory, batch_size, queue)
+            )
+            process.start()
+            rows, seconds, baseline_rss, peak_rss = queue.get()
+            process.join()
+            results.append((name, rows, seconds, baseline_rss, peak_rss))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tables", type=int, default=50000)
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[5000, 25000, 100000]
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'mode':<14} {'rows':>9} {'seconds':>9} {'rows/sec':>10} "
+        f"{'base MB':>9} {'peak MB':>9} {'growth MB':>10}"
+    )
+    for name, rows, seconds, baseline_rss, peak_rss in run_benchmark(
+        args.tables, args.columns, args.batch_sizes
+    ):
+        print(
+            f"{name:<14} {rows:>9} {seconds:>9.2f} {rows / seconds:>10.0f} "
+            f"{baseline_rss:>9.1f} {peak_rss:>9.1f} {peak_rss - baseline_rss:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark the column extraction queries against a synthetic catalog.
+
+Usage:
+    python -m tests.benchmark.column_query --tables 10000
+
+Runs ``extract_column.sql`` (information_schema join) and
+``extract_column_system_jdbc.sql`` against the SQLite catalog from
+:mod:`tests.benchmark.catalog` and reports query time and rows/sec. The
+stand-in only models the cost of the join; on a coordinator most of the
+difference comes from the connectors listing tables for
+``information_schema.tables``, which this benchmark cannot reproduce.
+"""
+
+import argparse
+import time
+from typing import List, Tuple
+
+from application_sdk.common.utils import read_sql_files
+
+from tests.benchmark.catalog import create_synthetic_catalog, render_query
+
+queries = read_sql_files(queries_prefix="app/sql")
+
+COLUMN_QUERIES = {
+    "information-schema": queries["EXTRACT_COLUMN"],
+    "system-jdbc": queries["EXTRACT_COLUMN_SYSTEM_JDBC"],
+}
+
+
+def run_benchmark(
+    table_count: int, repeat: int = 1
+) -> List[Tuple[str, int, float, float]]:
+    """Run every column query ``repeat`` times and keep the fastest run.
+
+    Returns:
+        List[Tuple[str, int, float, float]]: Query name, rows, seconds and
+        rows/sec for every query.
+    """
+    connection = create_synthetic_catalog(table_count)
+    results = []
+    for name, query in COLUMN_QUERIES.items():
+        sql = render_query(query)
+        best = float("inf")
+        rows = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            rows = len(connection.execute(sql).fetchall())
+            best = min(best, time.perf_counter() - start)
+        results.append((name, rows, best, rows / best if best else float("inf")))
+    connection.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tables", type=int, nargs="+", default=[10000])
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'tables':>8} {'query':<20} {'rows':>8} {'seconds':>10} {'rows/sec':>12}")
+    for table_count in args.tables:
+        for name, rows, seconds, rows_per_second in run_benchmark(
+            table_count, args.repeat
+        ):
+            print(
+                f"{table_count:>8} {name:<20} {rows:>8} {seconds:>10.3f} "
+                f"{rows_per_second:>12.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Benchmark the Arrow and pandas fetch formats of streaming extraction.
+
+Usage:
+    python -m tests.benchmark.fetch_format --tables 50000 --columns 20
+
+Streams ``extract_column.sql`` from a synthetic catalog into Parquet chunks
+once per fetch format and reads the chunks back with daft, like the
+transformer does. Reports wall time, CPU time and the peak RSS of every run,
+each in a fresh process. Uploads to the object store are disabled.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple
+from unittest.mock import AsyncMock, patch
+
+from application_sdk.common.utils import read_sql_files
+
+from app.activities.metadata_extraction import SQLMetadataExtractionActivities
+from app.clients import SQLClient
+from tests.benchmark.catalog import (
+    CATALOG_NAME,
+    connect_catalog,
+    create_engine_for_catalog,
+    create_synthetic_catalog,
+    render_query,
+)
+from tests.benchmark.column_extraction import get_peak_rss_mb, get_rss_mb
+
+queries = read_sql_files(queries_prefix="app/sql")
+
+FETCH_FORMATS = ["pandas", "arrow"]
+
+
+def get_cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+async def extract_columns(
+    directory: str, output_path: str, fetch_format: str, batch_size: int
+) -> int:
+    import daft
+
+    sql_client = SQLClient()
+    sql_client.engine = create_engine_for_catalog(connect_catalog(directory))
+    workflow_args: Dict[str, Any] = {
+        "output_prefix": output_path,
+        "output_path": output_path,
+    }
+
+    await SQLMetadataExtractionActivities().streaming_query_executor(
+        sql_client=sql_client,
+        sql_query=render_query(queries["EXTRACT_COLUMN"], catalog_name=CATALOG_NAME),
+        workflow_args=workflow_args,
+        output_suffix="raw/column",
+        typename="column",
+        batch_size=batch_size,
+        fetch_format=fetch_format,
+    )
+    chunks = os.path.join(output_path, "raw", "column", "*.parquet")
+    return daft.read_parquet(chunks).count_rows()
+
+
+def run_extraction(
+    directory: str,
+    fetch_format: str,
+    batch_size: int,
+    results: "multiprocessing.Queue",
+) -> None:
+    baseline_rss = get_rss_mb()
+    with tempfile.TemporaryDirectory() as output_path, patch(
+        "application_sdk.outputs.objectstore.ObjectStoreOutput."
+        "push_file_to_object_store",
+        new=AsyncMock(),
+    ):
+        start, start_cpu = time.perf_counter(), get_cpu_seconds()
+        rows = asyncio.run(
+            extract_columns(directory, output_path, fetch_format, batch_size)
+        )
+        seconds = time.perf_counter() - start
+        cpu_seconds = get_cpu_seconds() - start_cpu
+    results.put((rows, seconds, cpu_seconds, baseline_rss, get_peak_rss_mb()))
+
+
+def run_benchmark(
+    table_count: int, columns_per_table: int, batch_size: int
+) -> List[Tuple[str, int, float, float, float, float]]:
+    """Extract columns once per fetch format, each run in a new process.
+
+    Returns:
+        List[Tuple[str, int, float, float, float, float]]: Fetch format, rows,
+        seconds, CPU seconds, RSS before the extraction and peak RSS (MB)
+        for every run.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        create_synthetic_catalog(
+            table_count,
+            columns_per_table=columns_per_table,
+            catalog_name=CATALOG_NAME,
+            directory=directory,
+        ).close()
+
+        for fetch_format in FETCH_FORMATS:
+            queue = context.Queue()
+            process = context.Process(
+                target=run_extraction, args=(directory, fetch_format, batch_size, queue)
+            )
+            process.start()
+            rows, seconds, cpu_seconds, baseline_rss, peak_rss = queue.get()
+            process.join()
+            results.append(
+                (fetch_format, rows, seconds, cpu_seconds, baseline_rss, peak_rss)
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tables", type=int, default=50000)
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=25000)
+    args = parser.parse_args()
+
+    print(
+        f"{'format':<8} {'rows':>9} {'seconds':>9} {'cpu sec':>9} "
+        f"{'rows/sec':>10} {'base MB':>9} {'peak MB':>9} {'growth MB':>10}"
+    )
+    results = run_benchmark(args.tables, args.columns, args.batch_size)
+    for fetch_format, rows, seconds, cpu_seconds, baseline_rss, peak_rss in results:
+        print(
+            f"{fetch_format:<8} {rows:>9} {seconds:>9.2f} {cpu_seconds:>9.2f} "
+            f"{rows / seconds:>10.0f} {baseline_rss:>9.1f} {peak_rss:>9.1f} "
+            f"{peak_rss - baseline_rss:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
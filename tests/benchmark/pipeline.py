@@ -0,0 +1,329 @@
+"""Benchmark the full extraction pipeline against a synthetic catalog.
+
+Usage:
+    python -m tests.benchmark.pipeline --tables 10000 --columns 20
+    python -m tests.benchmark.pipeline --tables 10000 --output results.json
+    python -m tests.benchmark.pipeline --tables 10000 --baseline results.json
+    python -m tests.benchmark.pipeline --stage extract-column --directory catalog
+
+Loads a client through the engine pool, extracts schemas, tables and columns
+with the extraction activities through
+:class:`tests.benchmark.catalog.CatalogSQLClient`, then transforms the raw
+chunks with the application's ``QueryBasedTransformer``, exactly like a
+workflow run but offline. Every stage runs in a fresh process and reports
+rows, wall time, rows/sec and peak RSS.
+
+With ``--baseline`` the results are compared with those of an earlier run
+saved with ``--output``, and the command exits with status 1 when a stage
+got slower, or grew its memory, by more than ``--max-regression``.
+
+``--stage`` runs a single stage in the current process, for profilers like
+scalene that profile one process at a time. The catalog and the raw chunks
+are kept in ``--directory``, so run an extract stage before its transform
+stage, see :mod:`tests.benchmark.budgets`.
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+from unittest.mock import AsyncMock, patch
+
+from application_sdk.activities.metadata_extraction.sql import (
+    BaseSQLMetadataExtractionActivitiesState,
+)
+
+from app.activities.metadata_extraction import SQLMetadataExtractionActivities
+from app.transformers import QueryBasedTransformer
+from tests.benchmark.catalog import (
+    CATALOG_NAME,
+    CatalogSQLClient,
+    create_synthetic_catalog,
+)
+from tests.benchmark.column_extraction import get_peak_rss_mb, get_rss_mb
+
+TYPENAMES = ["schema", "table", "column"]
+STAGES = ["client-connect"] + [
+    f"{step}-{typename}" for typename in TYPENAMES for step in ("extract", "transform")
+]
+
+
+def get_activities(directory: str) -> SQLMetadataExtractionActivities:
+    state = BaseSQLMetadataExtractionActivitiesState.model_construct(
+        sql_client=CatalogSQLClient(directory),
+        transformer=QueryBasedTransformer(connector_name="presto", tenant_id="default"),
+    )
+    activities = SQLMetadataExtractionActivities()
+    activities._get_state = AsyncMock(return_value=state)
+    return activities
+
+
+def get_workflow_args(output_path: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    # CatalogSQLClient only serves streamed queries
+    return {
+        "metadata": {"streaming-extraction": True, **metadata},
+        "output_prefix": output_path,
+        "output_path": output_path,
+        "workflow_id": "benchmark",
+        "workflow_run_id": "run",
+        "connection": {
+            "connection_name": "benchmark",
+            "connection_qualified_name": "default/presto/benchmark",
+        },
+    }
+
+
+async def extract(
+    activities: SQLMetadataExtractionActivities,
+    workflow_args: Dict[str, Any],
+    typename: str,
+) -> Dict[str, int]:
+    fetch = getattr(activities, f"fetch_{typename}s")
+    statistics = await fetch(workflow_args)
+    return {
+        "rows": statistics.total_record_count if statistics else 0,
+        "chunks": statistics.chunk_count if statistics else 0,
+    }
+
+
+async def transform(
+    activities: SQLMetadataExtractionActivities,
+    workflow_args: Dict[str, Any],
+    typename: str,
+    chunks: int,
+) -> Dict[str, int]:
+    statistics = await activities.transform_data(
+        {
+            **workflow_args,
+            "typename": typename,
+            "file_names": [f"{typename}/{i + 1}.json" for i in range(chunks)],
+            "chunk_start": 0,
+        }
+    )
+    return {"rows": statistics.total_record_count, "chunks": chunks}
+
+
+async def connect(directory: str) -> Dict[str, int]:
+    sql_client = CatalogSQLClient(directory)
+    await sql_client.load({"catalog": directory})
+    await sql_client.probe("SELECT 1")
+    await sql_client.close()
+    return {"rows": 0, "chunks": 0}
+
+
+async def execute(
+    directory: str, output_path: str, stage: str, metadata: Dict[str, Any]
+) -> Dict[str, int]:
+    if stage == "client-connect":
+        return await connect(directory)
+
+    step, typename = stage.split("-", 1)
+    activities = get_activities(directory)
+    workflow_args = get_workflow_args(output_path, metadata)
+    if step == "extract":
+        return await extract(activities, workflow_args, typename)
+    chunks = len(glob.glob(os.path.join(output_path, "raw", typename, "*.parquet")))
+    return await transform(activities, workflow_args, typename, chunks)
+
+
+def run_stage(
+    directory: str, output_path: str, stage: str, metadata: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Run one stage in this process.
+
+    A transform stage transforms the raw chunks its extract stage left in
+    ``output_path``.
+
+    Returns:
+        Dict[str, Any]: The stage name, rows, chunks, seconds, rows/sec, RSS
+        before the stage and peak RSS (MB).
+    """
+    baseline_rss = get_rss_mb()
+    with patch(
+        "application_sdk.outputs.objectstore.ObjectStoreOutput."
+        "push_file_to_object_store",
+        new=AsyncMock(),
+    ), patch(
+        "application_sdk.outputs.objectstore.ObjectStoreOutput."
+        "push_files_to_object_store",
+        new=AsyncMock(),
+    ):
+        start = time.perf_counter()
+        counts = asyncio.run(execute(directory, output_path, stage, metadata))
+        seconds = time.perf_counter() - start
+    return {
+        "stage": stage,
+        **counts,
+        "seconds": seconds,
+        "rows_per_sec": counts["rows"] / seconds,
+        "base_rss_mb": baseline_rss,
+        "peak_rss_mb": get_peak_rss_mb(),
+    }
+
+
+def run_stage_process(
+    directory: str,
+    output_path: str,
+    stage: str,
+    metadata: Dict[str, Any],
+    results: "multiprocessing.Queue",
+) -> None:
+    results.put(run_stage(directory, output_path, stage, metadata))
+
+
+def create_catalog(
+    directory: str, table_count: int, columns_per_table: int, schema_count: int
+) -> None:
+    create_synthetic_catalog(
+        table_count,
+        columns_per_table=columns_per_table,
+        schema_count=schema_count,
+        catalog_name=CATALOG_NAME,
+        directory=directory,
+    ).close()
+
+
+def run_benchmark(
+    table_count: int,
+    columns_per_table: int,
+    schema_count: int,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """Run every stage, each in a new process.
+
+    Returns:
+        List[Dict[str, Any]]: The results of :func:`run_stage` per stage.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = []
+    with tempfile.TemporaryDirectory() as directory, tempfile.TemporaryDirectory(
+        dir=directory
+    ) as output_path:
+        create_catalog(directory, table_count, columns_per_table, schema_count)
+
+        for stage in STAGES:
+            queue = context.Queue()
+            process = context.Process(
+                target=run_stage_process,
+                args=(directory, output_path, stage, metadata or {}, queue),
+            )
+            process.start()
+            results.append(queue.get())
+            process.join()
+    return results
+
+
+def find_regressions(
+    results: List[Dict[str, Any]],
+    baseline: List[Dict[str, Any]],
+    max_regression: float,
+) -> List[str]:
+    """Compare results with a baseline run of the same catalog.
+
+    Returns:
+        List[str]: One message per stage whose rows/sec dropped, or whose
+        memory growth rose, by more than ``max_regression``.
+    """
+    baseline_stages = {result["stage"]: result for result in baseline}
+    regressions = []
+    for result in results:
+        before = baseline_stages.get(result["stage"])
+        if not before:
+            continue
+        if result["rows_per_sec"] < before["rows_per_sec"] * (1 - max_regression):
+            regressions.append(
+                f"{result['stage']}: {result['rows_per_sec']:.0f} rows/sec, "
+                f"baseline {before['rows_per_sec']:.0f}"
+            )
+        growth = result["peak_rss_mb"] - result["base_rss_mb"]
+        baseline_growth = before["peak_rss_mb"] - before["base_rss_mb"]
+        if growth > max(baseline_growth, 1) * (1 + max_regression):
+            regressions.append(
+                f"{result['stage']}: {growth:.1f} MB peak growth, "
+                f"baseline {baseline_growth:.1f} MB"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tables", type=int, default=10000)
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument("--schemas", type=int, default=20)
+    parser.add_argument(
+        "--metadata",
+        type=json.loads,
+        default={},
+        help="Workflow metadata as JSON, e.g. '{\"fetch-format\": \"arrow\"}'",
+    )
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare with results of an earlier run")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    parser.add_argument(
+        "--stage", choices=STAGES, help="Run only this stage, in this process"
+    )
+    parser.add_argument(
+        "--directory",
+        help="Catalog and output directory of --stage, created if missing",
+    )
+    parser.add_argument(
+        "--list-stages", action="store_true", help="Print the stage names and exit"
+    )
+    args = parser.parse_args()
+
+    if args.list_stages:
+        print("\n".join(STAGES))
+        return
+
+    if args.stage:
+        if not args.directory:
+            parser.error("--stage requires --directory")
+        os.makedirs(args.directory, exist_ok=True)
+        if not os.path.exists(os.path.join(args.directory, "information_schema.db")):
+            create_catalog(args.directory, args.tables, args.columns, args.schemas)
+        results = [
+            run_stage(
+                args.directory,
+                os.path.join(args.directory, "output"),
+                args.stage,
+                args.metadata,
+            )
+        ]
+    else:
+        results = run_benchmark(args.tables, args.columns, args.schemas, args.metadata)
+
+    print(
+        f"{'stage':<18} {'rows':>9} {'chunks':>7} {'seconds':>9} {'rows/sec':>10} "
+        f"{'base MB':>9} {'peak MB':>9} {'growth MB':>10}"
+    )
+    for result in results:
+        print(
+            f"{result['stage']:<18} {result['rows']:>9} {result['chunks']:>7} "
+            f"{result['seconds']:>9.2f} {result['rows_per_sec']:>10.0f} "
+            f"{result['base_rss_mb']:>9.1f} {result['peak_rss_mb']:>9.1f} "
+            f"{result['peak_rss_mb'] - result['base_rss_mb']:>10.1f}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            regressions = find_regressions(
+                results, json.load(baseline), args.max_regression
+            )
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
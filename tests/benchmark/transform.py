@@ -0,0 +1,83 @@
+"""Benchmark the transformer template cache.
+
+Usage:
+    python -m tests.benchmark.transform --chunks 200
+
+Transforms the same raw column chunk ``--chunks`` times with the SDK
+transformer, which compiles its template on every call, and with the cached
+transformer of the application. Reports the time spent building the
+transformation of every chunk and the time including its execution.
+"""
+
+import argparse
+import os
+import time
+from typing import List, Tuple
+
+import daft
+from application_sdk.transformers.query import (
+    QueryBasedTransformer as BaseQueryBasedTransformer,
+)
+
+from app.transformers import QueryBasedTransformer
+
+RAW_COLUMNS = os.path.join(
+    os.path.dirname(__file__),
+    "..",
+    "unit",
+    "transformers",
+    "query",
+    "resources",
+    "raw",
+    "column.json",
+)
+
+
+def transform_chunks(transformer, chunks: int, execute: bool) -> float:
+    dataframe = daft.read_json(RAW_COLUMNS).collect()
+    start = time.perf_counter()
+    for _ in range(chunks):
+        transformed = transformer.transform_metadata(
+            typename="COLUMN",
+            dataframe=dataframe,
+            workflow_id="workflow",
+            workflow_run_id="run",
+            connection_qualified_name="default/presto/1",
+            connection_name="benchmark",
+        )
+        if execute:
+            transformed.collect()
+    return time.perf_counter() - start
+
+
+def run_benchmark(chunks: int) -> List[Tuple[str, float, float]]:
+    """Transform the chunks with both transformers.
+
+    Returns:
+        List[Tuple[str, float, float]]: Transformer, milliseconds per chunk to
+        build the transformation and to build and execute it.
+    """
+    results = []
+    for name, transformer_class in (
+        ("sdk", BaseQueryBasedTransformer),
+        ("cached", QueryBasedTransformer),
+    ):
+        transformer = transformer_class(connector_name="presto", tenant_id="default")
+        build = transform_chunks(transformer, chunks, execute=False)
+        execute = transform_chunks(transformer, chunks, execute=True)
+        results.append((name, build / chunks * 1000, execute / chunks * 1000))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'transformer':<12} {'build ms':>10} {'execute ms':>11}")
+    for name, build_ms, execute_ms in run_benchmark(args.chunks):
+        print(f"{name:<12} {build_ms:>10.2f} {execute_ms:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
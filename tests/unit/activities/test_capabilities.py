@@ -0,0 +1,106 @@
+import asyncio
+import time
+from unittest.mock import MagicMock, patch
+
+from app.activities.metadata_extraction.capabilities import (
+    Capability,
+    get_typename_relations,
+    load_capabilities,
+    probe_capability,
+    save_capabilities,
+)
+from app.clients import SQLClient
+
+MODULE = "app.activities.metadata_extraction.capabilities"
+
+
+def test_capability_is_usable_when_supported_and_fast():
+    assert Capability(supported=True, seconds=1, checked_at=0).is_usable(10)
+    assert not Capability(supported=True, seconds=11, checked_at=0).is_usable(10)
+    assert not Capability(supported=False, seconds=0, checked_at=0).is_usable(10)
+
+
+def test_capability_expires_after_ttl():
+    capability = Capability(supported=True, seconds=1, checked_at=100)
+
+    assert not capability.is_expired(150, ttl=60)
+    assert capability.is_expired(200, ttl=60)
+
+
+def test_table_relations_leave_out_deferred_view_definitions():
+    assert get_typename_relations({}, "table") == ("tables", "columns", "views")
+    assert get_typename_relations(
+        {"metadata": {"deferred-view-definitions": True}}, "table"
+    ) == ("tables", "columns")
+    assert get_typename_relations({}, "column") == ("columns",)
+
+
+def test_capabilities_round_trip():
+    capabilities = {
+        "hive": {"routines": Capability(supported=False, seconds=2, checked_at=1)}
+    }
+    with patch(f"{MODULE}.StateStoreOutput.save_state") as save_state:
+        save_capabilities("capabilities_connection", capabilities)
+
+    key, state = save_state.call_args.args
+    assert key == "capabilities_connection"
+    with patch(f"{MODULE}.StateStoreInput.get_state", return_value=state):
+        assert load_capabilities(key) == capabilities
+
+
+def test_load_capabilities_without_state():
+    with patch(
+        f"{MODULE}.StateStoreInput.get_state", side_effect=IOError("State not found")
+    ):
+        assert load_capabilities("capabilities_connection") == {}
+    with patch(
+        f"{MODULE}.StateStoreInput.get_state",
+        return_value={"catalogs": {"hive": {"views": {"unknown": 1}}}},
+    ):
+        assert load_capabilities("capabilities_connection") == {}
+
+
+async def test_probe_capability_records_failures():
+    async def run_query_batches(query, batch_size, observation=None):
+        raise RuntimeError("routines not supported")
+        yield
+
+    sql_client = MagicMock()
+    sql_client.run_query_batches = run_query_batches
+
+    capability = await probe_capability(sql_client, "SELECT 1", timeout=1)
+
+    assert not capability.supported
+    assert capability.checked_at > 0
+
+
+async def test_probe_capability_times_out():
+    async def run_query_batches(query, batch_size, observation=None):
+        await asyncio.sleep(1)
+        yield
+
+    sql_client = MagicMock()
+    sql_client.run_query_batches = run_query_batches
+
+    capability = await probe_capability(sql_client, "SELECT 1", timeout=0.01)
+
+    assert not capability.supported
+    assert capability.seconds < 1
+
+
+async def test_probe_capability_timeout_cancels_the_probe_query():
+    connection, result = MagicMock(), MagicMock()
+
+    def slow_execute(query: str):
+        time.sleep(0.2)
+        return None, connection, result
+
+    sql_client = SQLClient()
+    sql_client.engine = MagicMock()
+    sql_client.execute_query = slow_execute
+
+    capability = await probe_capability(sql_client, "SELECT 1", timeout=0.05)
+
+    assert not capability.supported
+    result.cursor.cancel.assert_called_once()
+    connection.close.assert_called_once()
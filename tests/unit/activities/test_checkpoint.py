@@ -0,0 +1,90 @@
+import asyncio
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from app.activities.metadata_extraction.checkpoint import (
+    Checkpoint,
+    checkpoint_heartbeater,
+    get_checkpoint_key,
+    load_checkpoint,
+    save_checkpoint,
+)
+
+ACTIVITY = "app.activities.metadata_extraction.checkpoint.activity"
+
+
+def get_activity(heartbeat_details=(), heartbeat_timeout=None) -> MagicMock:
+    activity = MagicMock()
+    activity.in_activity.return_value = True
+    activity.info.return_value.heartbeat_details = list(heartbeat_details)
+    activity.info.return_value.heartbeat_timeout = heartbeat_timeout
+    return activity
+
+
+def test_get_checkpoint_key_depends_on_parts():
+    assert get_checkpoint_key("table", {"a": 1}) == get_checkpoint_key(
+        "table", {"a": 1}
+    )
+    assert get_checkpoint_key("table", {"a": 1}) != get_checkpoint_key(
+        "column", {"a": 1}
+    )
+
+
+def test_load_checkpoint_outside_activity():
+    assert load_checkpoint("key") == Checkpoint(key="key")
+
+
+def test_load_checkpoint_of_previous_attempt():
+    details = {
+        "key": "key",
+        "completed": ["tpch/tiny"],
+        "chunk_count": 2,
+        "total_record_count": 10,
+    }
+    with patch(ACTIVITY, get_activity([details])):
+        checkpoint = load_checkpoint("key")
+
+    assert checkpoint == Checkpoint(**details)
+
+
+def test_load_checkpoint_ignores_other_work():
+    with patch(ACTIVITY, get_activity([{"key": "other", "chunk_count": 2}])):
+        assert load_checkpoint("key") == Checkpoint(key="key")
+    with patch(ACTIVITY, get_activity([{"key": "key", "unknown": 1}])):
+        assert load_checkpoint("key") == Checkpoint(key="key")
+
+
+def test_save_checkpoint_heartbeats():
+    activity = get_activity()
+    with patch(ACTIVITY, activity):
+        save_checkpoint(Checkpoint(key="key", completed=["tpch/tiny"]))
+
+    activity.heartbeat.assert_called_once_with(
+        {
+            "key": "key",
+            "completed": ["tpch/tiny"],
+            "chunk_count": 0,
+            "total_record_count": 0,
+        }
+    )
+
+
+async def test_checkpoint_heartbeater_sends_latest_checkpoint():
+    previous = {"key": "key", "completed": [], "chunk_count": 0}
+    activity = get_activity([previous], heartbeat_timeout=timedelta(seconds=0.03))
+
+    @checkpoint_heartbeater
+    async def fetch():
+        await asyncio.sleep(0.05)
+        assert activity.heartbeat.call_args.args == (previous,)
+        save_checkpoint(Checkpoint(key="key", completed=["tpch/tiny"]))
+        activity.heartbeat.reset_mock()
+        await asyncio.sleep(0.05)
+        return "done"
+
+    with patch(ACTIVITY, activity):
+        assert await fetch() == "done"
+
+    assert activity.heartbeat.call_count >= 1
+    for call in activity.heartbeat.call_args_list:
+        assert call.args[0]["completed"] == ["tpch/tiny"]
@@ -0,0 +1,908 @@
+import json
+import time
+from typing import Any, Dict
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+from application_sdk.activities.common.models import ActivityStatistics
+from application_sdk.activities.metadata_extraction.sql import (
+    BaseSQLMetadataExtractionActivitiesState,
+)
+from application_sdk.transformers.query import QueryBasedTransformer
+
+from app.activities.metadata_extraction import SQLMetadataExtractionActivities
+from app.activities.metadata_extraction.checkpoint import get_checkpoint_key
+from app.activities.metadata_extraction.pipelined import PipelinedStatistics
+from app.common.utils import get_partition_chunk_prefix
+from tests.benchmark.catalog import (
+    CATALOG_NAME,
+    CatalogSQLClient,
+    create_synthetic_catalog,
+)
+
+
+@pytest.fixture
+def workflow_args() -> Dict[str, Any]:
+    return {
+        "metadata": {"streaming-extraction": True},
+        "output_prefix": "/tmp/prefix",
+        "output_path": "/tmp/prefix/workflow/run",
+    }
+
+
+@pytest.fixture
+def state() -> BaseSQLMetadataExtractionActivitiesState:
+    sql_client = MagicMock()
+    sql_client.engine = MagicMock()
+    sql_client.probe = AsyncMock(return_value=False)
+    handler = MagicMock()
+    handler.database_result_key = "TABLE_CATALOG"
+    handler.schema_result_key = "TABLE_SCHEMA"
+    return BaseSQLMetadataExtractionActivitiesState.model_construct(
+        sql_client=sql_client, handler=handler
+    )
+
+
+@pytest.fixture
+def activities(
+    state: BaseSQLMetadataExtractionActivitiesState,
+) -> SQLMetadataExtractionActivities:
+    activities = SQLMetadataExtractionActivities()
+    activities._get_state = AsyncMock(return_value=state)
+    statistics = ActivityStatistics(
+        total_record_count=3, chunk_count=1, typename="table"
+    )
+    activities.query_executor = AsyncMock(return_value=statistics)
+    activities.streaming_query_executor = AsyncMock(return_value=statistics)
+    return activities
+
+
+async def test_query_executor_runs_on_the_routed_engine(
+    state: BaseSQLMetadataExtractionActivitiesState,
+    workflow_args: Dict[str, Any],
+):
+    routed_engine = MagicMock()
+    routed_engine.__aenter__ = AsyncMock(return_value="routed")
+    state.sql_client.routed_engine = MagicMock(return_value=routed_engine)
+    activities = SQLMetadataExtractionActivities()
+    activities._get_state = AsyncMock(return_value=state)
+
+    with patch(
+        "application_sdk.activities.metadata_extraction.sql."
+        "BaseSQLMetadataExtractionActivities.query_executor"
+    ) as query_executor:
+        await activities.query_executor(
+            state.sql_client.engine, "SELECT 1", workflow_args, "raw/table", "table"
+        )
+        await activities.query_executor(
+            "other", "SELECT 1", workflow_args, "raw/table", "table"
+        )
+
+    assert [call.args[0] for call in query_executor.call_args_list] == [
+        "routed",
+        "other",
+    ]
+    routed_engine.__aexit__.assert_awaited_once()
+
+
+async def test_fetch_partitions_lists_filtered_schemas(
+    activities: SQLMetadataExtractionActivities,
+    state: BaseSQLMetadataExtractionActivitiesState,
+    workflow_args: Dict[str, Any],
+):
+    state.handler.prepare_metadata = AsyncMock(
+        return_value=[
+            {"TABLE_CATALOG": "tpch", "TABLE_SCHEMA": "tiny"},
+            {"TABLE_CATALOG": "tpch", "TABLE_SCHEMA": "information_schema"},
+            {"TABLE_CATALOG": "hive", "TABLE_SCHEMA": "raw"},
+        ]
+    )
+
+    partitions = await activities.fetch_partitions(workflow_args)
+
+    assert partitions == [
+        {"catalog_name": "hive", "schema_name": "raw"},
+        {"catalog_name": "tpch", "schema_name": "tiny"},
+    ]
+
+
+async def test_fetch_tables_for_partition(
+    activities: SQLMetadataExtractionActivities,
+    workflow_args: Dict[str, Any],
+):
+    workflow_args["partition"] = {"catalog_name": "hive", "schema_name": "o'brien"}
+
+    statistics = await activities.fetch_tables(workflow_args)
+
+    assert statistics.chunk_count == 1
+    kwargs = activities.streaming_query_executor.call_args.kwargs
+    assert kwargs["output_suffix"] == "raw/table/hive/o%27brien"
+    assert kwargs["typename"] == "table"
+    assert kwargs["observation"].sql_file == "extract_table_partition.sql"
+    assert kwargs["observation"].catalog == "hive"
+    assert 'FROM "hive".information_schema.tables t' in kwargs["sql_query"]
+    assert "WHERE t.table_schema = 'o''brien'" in kwargs["sql_query"]
+
+
+async def test_fetch_columns_for_partition(
+    activities: SQLMetadataExtractionActivities,
+    workflow_args: Dict[str, Any],
+):
+    workflow_args["partition"] = {"catalog_name": "tpch", "schema_name": "tiny"}
+
+    await activities.fetch_columns(workflow_args)
+
+    kwargs = activities.streaming_query_executor.call_args.kwargs
+    assert kwargs["output_suffix"] == "raw/column/tpch/tiny"
+    assert kwargs["typename"] == "column"
+    assert 'FROM "tpch".information_schema.columns c' in kwargs["sql_query"]
+    assert "c.table_schema = 'tiny'" in kwargs["sql_query"]
+
+
+async def test_fetch_tables_without_partition_uses_monolithic_query(
+    activities: SQLMetadataExtractionActivities,
+    workflow_args: Dict[str, Any],
+):
+    await activities.fetch_tables(workflow_args)
+
+    kwargs = activities.streaming_query_executor.call_args.kwargs
+    assert kwargs["output_suffix"] == "raw/table"
+    assert "CURRENT_CATALOG as table_catalog" in kwargs["sql_query"]
+
+
+async def test_fetch_tables_uses_set_based_query_by_default(
+    activities: SQLMetadataExtractionActivities,
+    workflow_args: Dict[str, Any],
+):
+    await activities.fetch_tables(workflow_args)
+
+    kwargs = activities.streaming_query_executor.call_args.kwargs
+    assert "WITH column_counts AS" in kwargs["sql_query"]
+
+
+async def test_fetch_tables_with_correlated_query(
+    activities: SQLMetadataExtractionActivities,
+    workflow_args: Dict[str, Any],
+):
+    workflow_args["metadata"]["table-extraction-query"] = "correlated"
+
+    await activities.fetch_tables(workflow_args)
+
+    kwargs = activities.streaming_query_executor.call_args.kwargs
+    assert "column_counts" not in kwargs["sql_query"]
+    assert "SELECT COUNT(*)" in kwargs["sql_query"]
+
+
+async def test_fetch_tables_with_unknown_query_fails(
+    activities: SQLMetadataExtractionActivities,
+    workflow_args: Dict[str, Any],
+):
+    workflow_args["metadata"]["table-extraction-query"] = "nested-loop"
+
+    with pytest.raises(ValueError):
+        await activities.fetch_tables(workflow_args)
+
+
+async def test_fetch_columns_streams_in_batches(
+    activities: SQLMetadataExtractionActivities,
+    workflow_args: Dict[str, Any],
+):
+    workflow_args["metadata"]["streaming-batch-size"] = 500
+
+    await activities.fetch_columns(workflow_args)
+
+    activities.query_executor.assert_not_called()
+    kwargs = activities.streaming_query_executor.call_args.kwargs
+    assert kwargs["batch_size"] == 500
+    assert kwargs["fetch_format"] == "pandas"
+    assert kwargs["output_suffix"] == "raw/column"
+    assert "ORDER BY" not in kwargs["sql_query"].split("*/")[-1]
+
+
+async def test_fetch_columns_is_not_streamed_by_default(
+    activities: SQLMetadataExtractionActivities,
+    workflow_args: Dict[str, Any],
+):
+    del workflow_args["metadata"]["streaming-extraction"]
+
+    await activities.fetch_columns(workflow_args)
+
+    activities.streaming_query_executor.assert_not_called()
+    assert activities.query_executor.call_args.kwargs["output_suffix"] == "raw/column"
+
+
+async def test_fetch_columns_without_projection_pruning_by_default(
+    activities: SQLMetadataExtractionActivities,
+    workflow_args: Dict[str, Any],
+):
+    await activities.fetch_columns(workflow_args)
+
+    kwargs = activities.streaming_query_executor.call_args.kwargs
+    assert "NULL as REMARKS" in kwargs["sql_query"]
+
+
+async def test_fetch_columns_with_projection_pruning(
+    activities: SQLMetadataExtractionActivities,
+    workflow_args: Dict[str, Any],
+):
+    workflow_args["metadata"]["projection-pruning"] = True
+
+    await activities.fetch_columns(workflow_args)
+
+    kwargs = activities.streaming_query_executor.call_args.kwargs
+    assert "NULL as" not in kwargs["sql_query"]
+
+
+async def test_fetch_columns_without_streaming_uses_sdk_executor(
+    activities: SQLMetadataExtractionActivities,
+    workflow_args: Dict[str, Any],
+):
+    workflow_args["metadata"]["streaming-extraction"] = False
+
+    await activities.fetch_columns(workflow_args)
+
+    activities.streaming_query_executor.assert_not_called()
+    assert activities.query_executor.call_args.kwargs["output_suffix"] == "raw/column"
+
+
+@pytest.mark.parametrize("fetch_format", ["arrow", "pandas"])
+async def test_streaming_query_executor_writes_sorted_chunks(tmp_path, fetch_format):
+    batches = [
+        pd.DataFrame(
+            {
+                "TABLE_CATALOG": ["tpch"] * 3,
+                "TABLE_SCHEMA": ["tiny"] * 3,
+                "TABLE_NAME": ["orders", "lineitem", "lineitem"],
+                "ORDINAL_POSITION": [1, 2, 1],
+            }
+        ),
+        pd.DataFrame(
+            {
+                "TABLE_CATALOG": ["tpch"],
+                "TABLE_SCHEMA": ["sf1"],
+                "TABLE_NAME": ["nation"],
+                "ORDINAL_POSITION": [1],
+            }
+        ),
+    ]
+
+    async def run_query_batches(query, batch_size, observation=None):
+        for batch in batches:
+            yield batch
+
+    async def run_query_arrow_batches(query, batch_size, observation=None):
+        for batch in batches:
+            yield pa.RecordBatch.from_pandas(batch)
+
+    sql_client = MagicMock()
+    sql_client.run_query_batches = run_query_batches
+    sql_client.run_query_arrow_batches = run_query_arrow_batches
+    workflow_args = {"output_prefix": str(tmp_path), "output_path": str(tmp_path)}
+
+    with patch(
+        "application_sdk.outputs.objectstore.ObjectStoreOutput."
+        "push_file_to_object_store",
+        new=AsyncMock(),
+    ):
+        statistics = await SQLMetadataExtractionActivities().streaming_query_executor(
+            sql_client=sql_client,
+            sql_query="SELECT 1",
+            workflow_args=workflow_args,
+            output_suffix="raw/column",
+            typename="column",
+            batch_size=3,
+            fetch_format=fetch_format,
+        )
+
+    assert statistics.chunk_count == 2
+    assert statistics.total_record_count == 4
+    first_chunk = pd.read_parquet(tmp_path / "raw" / "column" / "1.parquet")
+    assert list(zip(first_chunk["TABLE_NAME"], first_chunk["ORDINAL_POSITION"])) == [
+        ("lineitem", 1),
+        ("lineitem", 2),
+        ("orders", 1),
+    ]
+
+
+async def test_streaming_query_executor_with_unknown_fetch_format_fails():
+    with pytest.raises(ValueError):
+        await SQLMetadataExtractionActivities().streaming_query_executor(
+            sql_client=MagicMock(),
+            sql_query="SELECT 1",
+            workflow_args={},
+            output_suffix="raw/column",
+            typename="column",
+            batch_size=3,
+            fetch_format="json",
+        )
+
+
+async def test_fetch_partitions_with_fingerprints(
+    activities: SQLMetadataExtractionActivities,
+    state: BaseSQLMetadataExtractionActivitiesState,
+    workflow_args: Dict[str, Any],
+):
+    workflow_args["metadata"]["incremental-extraction"] = True
+    state.handler.prepare_metadata = AsyncMock(
+        return_value=[
+            {"TABLE_CATALOG": "tpch", "TABLE_SCHEMA": "tiny"},
+            {"TABLE_CATALOG": "tpch", "TABLE_SCHEMA": "empty"},
+        ]
+    )
+    queries = []
+
+    async def run_query_batches(query, batch_size, observation=None):
+        queries.append(query)
+        yield pd.DataFrame(
+            {
+                "SCHEMA_NAME": ["tiny"],
+                "TABLE_COUNT": [8],
+                "COLUMN_COUNT": [61],
+                "TABLE_CHECKSUM": ["ab12"],
+                "COLUMN_CHECKSUM": ["cd34"],
+                "VIEW_CHECKSUM": [None],
+            }
+        )
+
+    state.sql_client.run_query_batches = run_query_batches
+
+    partitions = await activities.fetch_partitions(workflow_args)
+
+    assert len(queries) == 1
+    assert 'FROM "tpch".information_schema.columns c' in queries[0]
+    assert partitions[0]["schema_name"] == "empty"
+    assert partitions[0]["fingerprint"] is None
+    assert len(partitions[1]["fingerprint"]) == 64
+
+
+async def test_get_extraction_state_without_previous_run(
+    workflow_args: Dict[str, Any],
+):
+    workflow_args["workflow_id"] = "workflow"
+
+    with patch(
+        "app.activities.metadata_extraction.StateStoreInput.get_state",
+        side_effect=IOError("State not found"),
+    ):
+        state = await SQLMetadataExtractionActivities().get_extraction_state(
+            workflow_args
+        )
+
+    assert state == {}
+
+
+async def test_carry_forward_partition_copies_previous_chunks(tmp_path):
+    previous_path = tmp_path / "workflow" / "previous" / "raw" / "table" / "tpch"
+    (previous_path / "tiny").mkdir(parents=True)
+    for chunk in (1, 2):
+        (previous_path / "tiny" / f"{chunk}.parquet").write_bytes(b"chunk")
+    workflow_args = {
+        "output_prefix": str(tmp_path),
+        "output_path": str(tmp_path / "workflow" / "current"),
+        "partition": {"catalog_name": "tpch", "schema_name": "tiny"},
+        "typename": "table",
+        "previous_output_path": str(tmp_path / "workflow" / "previous"),
+        "previous_statistics": {
+            "total_record_count": 30,
+            "chunk_count": 2,
+            "typename": "table",
+        },
+    }
+
+    with patch(
+        "app.activities.metadata_extraction.ObjectStoreOutput."
+        "push_file_to_object_store",
+        new=AsyncMock(),
+    ) as push_file_to_object_store:
+        statistics = await SQLMetadataExtractionActivities().carry_forward_partition(
+            workflow_args
+        )
+
+    assert statistics == ActivityStatistics(
+        total_record_count=30, chunk_count=2, typename="table"
+    )
+    current_path = tmp_path / "workflow" / "current" / "raw" / "table" / "tpch"
+    assert sorted(path.name for path in (current_path / "tiny").iterdir()) == [
+        "1.parquet",
+        "2.parquet",
+    ]
+    assert push_file_to_object_store.await_count == 2
+
+
+async def test_fetch_schemas_pushes_filters_down(
+    activities: SQLMetadataExtractionActivities,
+    workflow_args: Dict[str, Any],
+):
+    workflow_args["metadata"]["include-filter"] = json.dumps({"^tpch$": ["^tiny$"]})
+
+    await activities.fetch_schemas(workflow_args)
+
+    kwargs = activities.streaming_query_executor.call_args.kwargs
+    assert kwargs["output_suffix"] == "raw/schema"
+    assert r"'tpch\.tiny$')" in kwargs["sql_query"]
+    assert "AND t.table_schema IN ('tiny')" in kwargs["sql_query"]
+    assert "'tpcds'" not in kwargs["sql_query"]
+
+
+async def test_fetch_columns_uses_system_jdbc_when_probe_succeeds(
+    activities: SQLMetadataExtractionActivities,
+    state: BaseSQLMetadataExtractionActivitiesState,
+    workflow_args: Dict[str, Any],
+):
+    state.sql_client.probe.return_value = True
+    workflow_args["metadata"]["column-extraction-query"] = "auto"
+    workflow_args["metadata"]["include-filter"] = json.dumps({"^tpch$": ["^tiny$"]})
+
+    await activities.fetch_columns(workflow_args)
+
+    assert "system.jdbc.columns" in state.sql_client.probe.call_args.args[0]
+    query = activities.streaming_query_executor.call_args.kwargs["sql_query"]
+    assert "FROM system.jdbc.columns c" in query
+    assert "AND c.table_schem IN ('tiny')" in query
+
+
+async def test_fetch_columns_for_partition_with_system_jdbc(
+    activities: SQLMetadataExtractionActivities,
+    state: BaseSQLMetadataExtractionActivitiesState,
+    workflow_args: Dict[str, Any],
+):
+    workflow_args["metadata"]["column-extraction-query"] = "system-jdbc"
+    workflow_args["partition"] = {"catalog_name": "hive", "schema_name": "o'brien"}
+
+    await activities.fetch_columns(workflow_args)
+
+    state.sql_client.probe.assert_not_called()
+    query = activities.streaming_query_executor.call_args.kwargs["sql_query"]
+    assert "WHERE c.table_cat = 'hive'" in query
+    assert "AND c.table_schem = 'o''brien'" in query
+
+
+async def test_fetch_columns_with_information_schema_by_default(
+    activities: SQLMetadataExtractionActivities,
+    state: BaseSQLMetadataExtractionActivitiesState,
+    workflow_args: Dict[str, Any],
+):
+    await activities.fetch_columns(workflow_args)
+
+    state.sql_client.probe.assert_not_called()
+    query = activities.streaming_query_executor.call_args.kwargs["sql_query"]
+    assert "FROM information_schema.columns c" in query
+
+
+async def test_get_cluster_load(
+    activities: SQLMetadataExtractionActivities,
+    state: BaseSQLMetadataExtractionActivitiesState,
+    workflow_args: Dict[str, Any],
+):
+    async def run_query_batches(query, batch_size, observation=None):
+        assert "system.runtime.queries" in query
+        yield pd.DataFrame(
+            [{"RUNNING_QUERIES": 3, "QUEUED_QUERIES": 1, "ACTIVE_WORKERS": 2}]
+        )
+
+    async def failing_query_batches(query, batch_size, observation=None):
+        raise RuntimeError("Access denied: system.runtime.queries")
+        yield
+
+    state.sql_client.run_query_batches = run_query_batches
+    assert await activities.get_cluster_load(workflow_args) == {
+        "running_queries": 3,
+        "queued_queries": 1,
+        "active_workers": 2,
+    }
+
+    state.sql_client.run_query_batches = failing_query_batches
+    assert await activities.get_cluster_load(workflow_args) == {}
+
+
+async def test_transform_data_reads_template_columns(tmp_path):
+    raw_path = tmp_path / "raw" / "table"
+    raw_path.mkdir(parents=True)
+    pd.DataFrame(
+        {
+            "table_catalog": ["tpch"],
+            "table_schema": ["tiny"],
+            "table_name": ["orders"],
+            "table_type": ["BASE TABLE"],
+            "unused_payload": ["x" * 1000],
+        }
+    ).to_parquet(raw_path / "1.parquet")
+    transformer = QueryBasedTransformer(connector_name="presto", tenant_id="default")
+    state = BaseSQLMetadataExtractionActivitiesState.model_construct(
+        transformer=transformer
+    )
+    activities = SQLMetadataExtractionActivities()
+    activities._get_state = AsyncMock(return_value=state)
+    workflow_args = {
+        "output_prefix": str(tmp_path),
+        "output_path": str(tmp_path),
+        "typename": "table",
+        "workflow_id": "workflow",
+        "workflow_run_id": "run",
+        "file_names": ["table/1.json"],
+        "connection": {"connection_qualified_name": "default/presto/1"},
+    }
+
+    with (
+        patch.object(
+            transformer, "transform_metadata", wraps=transformer.transform_metadata
+        ) as transform_metadata,
+        patch(
+            "application_sdk.outputs.objectstore.ObjectStoreOutput."
+            "push_file_to_object_store",
+            new=AsyncMock(),
+        ),
+        patch("app.common.observability.get_traces") as get_traces,
+    ):
+        statistics = await activities.transform_data(workflow_args)
+
+    assert statistics.total_record_count == 1
+    trace = get_traces.return_value.record_trace.call_args.kwargs
+    assert trace["name"] == "transform_chunk"
+    assert trace["trace_id"] == "run"
+    assert trace["attributes"] == {"typename": "table", "chunk": 1, "rows": 1}
+    dataframe = transform_metadata.call_args.kwargs["dataframe"]
+    assert "unused_payload" not in dataframe.column_names
+    assert "table_name" in dataframe.column_names
+    # pruned NULL columns the template reads are filled in
+    assert "remarks" in dataframe.column_names
+    assert "table_owner" not in dataframe.column_names
+
+
+async def test_fetch_columns_resumes_after_completed_partitions(
+    activities: SQLMetadataExtractionActivities,
+    state: BaseSQLMetadataExtractionActivitiesState,
+    tmp_path,
+):
+    workflow_args = {
+        "metadata": {
+            "resumable-extraction": True,
+            "streaming-batch-size": 10,
+            "fetch-format": "arrow",
+        },
+        "output_prefix": str(tmp_path),
+        "output_path": str(tmp_path),
+    }
+    state.handler.prepare_metadata = AsyncMock(
+        return_value=[
+            {"TABLE_CATALOG": "tpch", "TABLE_SCHEMA": "tiny"},
+            {"TABLE_CATALOG": "tpch", "TABLE_SCHEMA": "sf1"},
+        ]
+    )
+    queries = []
+
+    async def run_query_arrow_batches(query, batch_size, observation=None):
+        queries.append(query)
+        yield pa.RecordBatch.from_pandas(
+            pd.DataFrame({"TABLE_SCHEMA": ["tiny"], "TABLE_NAME": ["orders"]})
+        )
+
+    state.sql_client.run_query_arrow_batches = run_query_arrow_batches
+    activity = MagicMock()
+    activity.in_activity.return_value = True
+    activity.info.return_value.heartbeat_timeout = None
+    activity.info.return_value.heartbeat_details = [
+        {
+            "key": get_checkpoint_key(
+                "column",
+                activities.fetch_column_partition_sql,
+                workflow_args["metadata"],
+                str(tmp_path),
+            ),
+            "completed": ["tpch/sf1"],
+            "chunk_count": 2,
+            "total_record_count": 15,
+        }
+    ]
+
+    with (
+        patch("app.activities.metadata_extraction.checkpoint.activity", activity),
+        patch(
+            "application_sdk.outputs.objectstore.ObjectStoreOutput."
+            "push_file_to_object_store",
+            new=AsyncMock(),
+        ),
+    ):
+        statistics = await activities.fetch_columns(workflow_args)
+
+    assert len(queries) == 1
+    assert "c.table_schema = 'tiny'" in queries[0]
+    assert statistics.chunk_count == 3
+    assert statistics.total_record_count == 16
+    assert (tmp_path / "raw" / "column" / "3.parquet").exists()
+    checkpoint = activity.heartbeat.call_args.args[0]
+    assert checkpoint["completed"] == ["tpch/sf1", "tpch/tiny"]
+    assert checkpoint["chunk_count"] == 3
+
+
+async def test_deferred_view_definitions_are_joined_back_when_transformed(tmp_path):
+    create_synthetic_catalog(
+        table_count=20, schema_count=1, view_ratio=0.5, directory=str(tmp_path)
+    ).close()
+    state = BaseSQLMetadataExtractionActivitiesState.model_construct(
+        sql_client=CatalogSQLClient(str(tmp_path)),
+        transformer=QueryBasedTransformer(connector_name="presto", tenant_id="default"),
+    )
+    activities = SQLMetadataExtractionActivities()
+    activities._get_state = AsyncMock(return_value=state)
+    output_path = tmp_path / "output"
+    workflow_args = {
+        "metadata": {
+            "deferred-view-definitions": True,
+            "streaming-extraction": True,
+        },
+        "output_prefix": str(output_path),
+        "output_path": str(output_path),
+        "partition": {"catalog_name": CATALOG_NAME, "schema_name": "schema_0"},
+        "workflow_id": "workflow",
+        "workflow_run_id": "run",
+        "connection": {"connection_qualified_name": "default/presto/1"},
+    }
+
+    with patch(
+        "application_sdk.outputs.objectstore.ObjectStoreOutput."
+        "push_file_to_object_store",
+        new=AsyncMock(),
+    ):
+        statistics = await activities.fetch_tables(workflow_args)
+        raw_chunk = pd.read_parquet(
+            output_path / "raw" / "table" / CATALOG_NAME / "schema_0" / "1.parquet"
+        )
+        await activities.transform_data(
+            {
+                **workflow_args,
+                "typename": "table",
+                "file_names": [
+                    f"table/{CATALOG_NAME}/schema_0/{chunk + 1}.json"
+                    for chunk in range(statistics.chunk_count)
+                ],
+            }
+        )
+
+    assert (
+        "view_definition" not in raw_chunk.columns
+        or raw_chunk["view_definition"].isna().all()
+    )
+    assert len(list((output_path / "view_definitions").iterdir())) == 10
+    index = json.loads(
+        (output_path / "raw" / "table" / CATALOG_NAME / "schema_0")
+        .joinpath("view_definitions.json")
+        .read_text()
+    )
+    assert len(index["views"]) == 10
+    transformed = [
+        json.loads(line)
+        for path in (output_path / "transformed" / "table").glob("*.json")
+        for line in path.read_text().splitlines()
+    ]
+    definitions = {
+        entity["attributes"]["name"]: entity["attributes"].get("definition")
+        for entity in transformed
+    }
+    assert len(definitions) == 20
+    assert definitions["table_2"] == (
+        "CREATE OR REPLACE VIEW table_2 AS SELECT * FROM schema_0.table_3"
+    )
+    assert not definitions["table_1"]
+
+
+async def test_capability_probing_skips_unsupported_procedures(
+    activities: SQLMetadataExtractionActivities,
+    state: BaseSQLMetadataExtractionActivitiesState,
+    workflow_args: Dict[str, Any],
+):
+    workflow_args["metadata"]["capability-probing"] = True
+    workflow_args["workflow_id"] = "workflow"
+    state.sql_client.get_catalog_name.return_value = "hive"
+    queries = []
+
+    async def run_query_batches(query, batch_size, observation=None):
+        queries.append(query)
+        raise RuntimeError("routines not supported")
+        yield
+
+    state.sql_client.run_query_batches = run_query_batches
+
+    with (
+        patch(
+            "app.activities.metadata_extraction.capabilities.StateStoreInput."
+            "get_state",
+            side_effect=IOError("State not found"),
+        ),
+        patch(
+            "app.activities.metadata_extraction.capabilities.StateStoreOutput."
+            "save_state"
+        ) as save_state,
+    ):
+        statistics = await activities.fetch_procedures(workflow_args)
+
+    assert statistics is None
+    activities.streaming_query_executor.assert_not_called()
+    assert len(queries) == 1
+    assert 'FROM "hive".information_schema.routines' in queries[0]
+    key, saved = save_state.call_args.args
+    assert key == "capabilities_workflow"
+    assert saved["catalogs"]["hive"]["routines"]["supported"] is False
+
+
+async def test_capability_probing_reuses_stored_probes(
+    activities: SQLMetadataExtractionActivities,
+    state: BaseSQLMetadataExtractionActivitiesState,
+    workflow_args: Dict[str, Any],
+):
+    workflow_args["metadata"]["capability-probing"] = True
+    workflow_args["workflow_id"] = "workflow"
+    workflow_args["partition"] = {"catalog_name": "tpch", "schema_name": "tiny"}
+    state.sql_client.run_query_batches = MagicMock()
+    now = time.time()
+    stored = {
+        "catalogs": {
+            "tpch": {
+                relation: {"supported": True, "seconds": 0.5, "checked_at": now}
+                for relation in ("tables", "columns", "views")
+            },
+            "slow": {
+                "tables": {"supported": True, "seconds": 90, "checked_at": now},
+                "columns": {"supported": True, "seconds": 0.5, "checked_at": now},
+                "views": {"supported": True, "seconds": 0.5, "checked_at": now},
+            },
+        }
+    }
+
+    with patch(
+        "app.activities.metadata_extraction.capabilities.StateStoreInput.get_state",
+        return_value=stored,
+    ):
+        await activities.fetch_tables(workflow_args)
+        workflow_args["partition"] = {"catalog_name": "slow", "schema_name": "raw"}
+        statistics = await activities.fetch_tables(workflow_args)
+
+    state.sql_client.run_query_batches.assert_not_called()
+    assert activities.streaming_query_executor.call_count == 1
+    assert statistics is None
+
+
+async def test_capability_probing_skips_tables_of_catalogs_without_views(
+    activities: SQLMetadataExtractionActivities,
+    state: BaseSQLMetadataExtractionActivitiesState,
+    workflow_args: Dict[str, Any],
+):
+    workflow_args["metadata"]["capability-probing"] = True
+    workflow_args["workflow_id"] = "workflow"
+    workflow_args["partition"] = {"catalog_name": "hive", "schema_name": "raw"}
+    queries = []
+
+    async def run_query_batches(query, batch_size, observation=None):
+        queries.append(query)
+        if "information_schema.views" in query:
+            raise RuntimeError("views not supported")
+        yield
+
+    state.sql_client.run_query_batches = run_query_batches
+
+    with (
+        patch(
+            "app.activities.metadata_extraction.capabilities.StateStoreInput."
+            "get_state",
+            side_effect=IOError("State not found"),
+        ),
+        patch(
+            "app.activities.metadata_extraction.capabilities.StateStoreOutput."
+            "save_state"
+        ),
+    ):
+        statistics = await activities.fetch_tables(workflow_args)
+
+    assert statistics is None
+    activities.streaming_query_executor.assert_not_called()
+    assert len(queries) == 3
+    assert 'FROM "hive".information_schema.views' in queries[2]
+
+
+async def test_fetch_procedures_of_every_selected_catalog(
+    activities: SQLMetadataExtractionActivities,
+    state: BaseSQLMetadataExtractionActivitiesState,
+    tmp_path,
+):
+    workflow_args = {
+        "metadata": {"multi-catalog-extraction": True, "fetch-format": "arrow"},
+        "output_prefix": str(tmp_path),
+        "output_path": str(tmp_path),
+    }
+    state.handler.prepare_metadata = AsyncMock(
+        return_value=[
+            {"TABLE_CATALOG": "hive", "TABLE_SCHEMA": "raw"},
+            {"TABLE_CATALOG": "hive", "TABLE_SCHEMA": "staging"},
+            {"TABLE_CATALOG": "mysql", "TABLE_SCHEMA": "sales"},
+        ]
+    )
+    queries = []
+
+    async def run_query_arrow_batches(query, batch_size, observation=None):
+        queries.append((observation.catalog, query))
+        yield pa.RecordBatch.from_pydict(
+            {
+                "PROCEDURE_CATALOG": [observation.catalog],
+                "PROCEDURE_NAME": ["refresh"],
+            }
+        )
+
+    state.sql_client.run_query_arrow_batches = run_query_arrow_batches
+
+    with patch(
+        "application_sdk.outputs.objectstore.ObjectStoreOutput."
+        "push_file_to_object_store",
+        new=AsyncMock(),
+    ):
+        statistics = await activities.fetch_procedures(workflow_args)
+
+    assert statistics.total_record_count == 2
+    assert statistics.typename == "procedure"
+    assert sorted(catalog for catalog, _ in queries) == ["hive", "mysql"]
+    for catalog, query in queries:
+        assert f'FROM "{catalog}".information_schema.routines r' in query
+        assert f"'{catalog}' AS PROCEDURE_CATALOG" in query
+    activities.streaming_query_executor.assert_not_called()
+
+
+async def test_pipelined_extraction_transforms_chunks_as_they_are_fetched(tmp_path):
+    create_synthetic_catalog(
+        table_count=20, schema_count=1, view_ratio=0.5, directory=str(tmp_path)
+    ).close()
+    transformer = QueryBasedTransformer(connector_name="presto", tenant_id="default")
+    state = BaseSQLMetadataExtractionActivitiesState.model_construct(
+        sql_client=CatalogSQLClient(str(tmp_path)), transformer=transformer
+    )
+    activities = SQLMetadataExtractionActivities()
+    activities._get_state = AsyncMock(return_value=state)
+    output_path = tmp_path / "output"
+    partition = {"catalog_name": CATALOG_NAME, "schema_name": "schema_0"}
+    workflow_args = {
+        "metadata": {
+            "streaming-extraction": True,
+            "pipelined-extraction": True,
+            "streaming-batch-size": 8,
+        },
+        "output_prefix": str(output_path),
+        "output_path": str(output_path),
+        "partition": partition,
+        "workflow_id": "workflow",
+        "workflow_run_id": "run",
+        "connection": {"connection_qualified_name": "default/presto/1"},
+    }
+
+    with (
+        patch.object(
+            transformer, "transform_metadata", wraps=transformer.transform_metadata
+        ) as transform_metadata,
+        patch(
+            "application_sdk.outputs.objectstore.ObjectStoreOutput."
+            "push_file_to_object_store",
+            new=AsyncMock(),
+        ),
+    ):
+        statistics = await activities.fetch_tables(workflow_args)
+
+    assert isinstance(statistics, PipelinedStatistics)
+    assert statistics.chunk_count == 3
+    assert statistics.total_record_count == 20
+    assert transform_metadata.call_count == 3
+    dataframe = transform_metadata.call_args.kwargs["dataframe"]
+    assert "remarks" in dataframe.column_names
+    prefix = get_partition_chunk_prefix(partition)
+    assert sorted(
+        path.name for path in (output_path / "transformed" / "table").glob("*.json")
+    ) == [f"{prefix}-{chunk}.json" for chunk in (1, 2, 3)]
+    transformed = [
+        json.loads(line)
+        for path in (output_path / "transformed" / "table").glob("*.json")
+        for line in path.read_text().splitlines()
+    ]
+    assert sorted(entity["attributes"]["name"] for entity in transformed) == sorted(
+        f"table_{i}" for i in range(20)
+    )
+    assert (
+        output_path / "raw" / "table" / CATALOG_NAME / "schema_0" / "3.parquet"
+    ).exists()
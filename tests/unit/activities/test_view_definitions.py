@@ -0,0 +1,99 @@
+from unittest.mock import AsyncMock, patch
+
+import daft
+
+from app.activities.metadata_extraction.view_definitions import (
+    add_view_definitions,
+    get_definition_hash,
+    get_definitions,
+    get_view_keys,
+    read_index,
+    store_definition,
+    write_index,
+)
+
+PUSH_FILE = (
+    "application_sdk.outputs.objectstore.ObjectStoreOutput.push_file_to_object_store"
+)
+
+
+async def test_store_definition_stores_every_content_once(tmp_path):
+    with patch(PUSH_FILE, new=AsyncMock()) as push_file:
+        first = await store_definition(str(tmp_path), "SELECT 1")
+        second = await store_definition(str(tmp_path), "SELECT 1")
+        other = await store_definition(str(tmp_path), "SELECT 2")
+
+    assert first == second == get_definition_hash("SELECT 1")
+    assert other != first
+    assert push_file.call_count == 2
+    assert (tmp_path / "view_definitions" / f"{first}.sql").read_text() == "SELECT 1"
+
+
+async def test_index_round_trip(tmp_path):
+    index = {("hive", "raw", "v1"): "ab", ("hive", "raw", "v2"): "ab"}
+    with patch(PUSH_FILE, new=AsyncMock()):
+        await write_index(str(tmp_path), str(tmp_path / "raw" / "table"), index)
+
+    assert read_index(str(tmp_path), str(tmp_path / "raw" / "table")) == index
+
+
+def test_read_index_without_index_has_no_views(tmp_path):
+    with patch(
+        "application_sdk.inputs.objectstore.ObjectStoreInput."
+        "download_file_from_object_store",
+        side_effect=Exception("not found"),
+    ):
+        assert read_index(str(tmp_path), str(tmp_path / "raw" / "table")) == {}
+
+
+async def test_get_definitions_reads_every_definition_once(tmp_path):
+    with patch(PUSH_FILE, new=AsyncMock()):
+        definition_hash = await store_definition(str(tmp_path), "SELECT 1")
+    index = {("hive", "raw", "v1"): definition_hash, ("hive", "raw", "v2"): "cd"}
+    cache = {"cd": "SELECT 2"}
+
+    with patch(
+        "app.activities.metadata_extraction.view_definitions.read_definition",
+        return_value="SELECT 1",
+    ) as read_definition:
+        definitions = get_definitions(
+            str(tmp_path),
+            index,
+            [("hive", "raw", "v1"), ("hive", "raw", "v2"), ("hive", "raw", "t")],
+            cache,
+        )
+
+    assert definitions == {
+        ("hive", "raw", "v1"): "SELECT 1",
+        ("hive", "raw", "v2"): "SELECT 2",
+    }
+    read_definition.assert_called_once_with(str(tmp_path), definition_hash)
+
+
+def test_add_view_definitions_joins_definitions_of_views():
+    dataframe = daft.from_pydict(
+        {
+            "table_catalog": ["hive", "hive"],
+            "table_schema": ["raw", "raw"],
+            "table_name": ["orders", "orders_view"],
+            "table_type": ["BASE TABLE", "VIEW"],
+            "view_definition": [None, None],
+        }
+    )
+
+    assert get_view_keys(dataframe) == [("hive", "raw", "orders_view")]
+    joined = add_view_definitions(
+        dataframe, {("hive", "raw", "orders_view"): "SELECT * FROM orders"}
+    ).to_pydict()
+
+    definitions = dict(zip(joined["table_name"], joined["view_definition"]))
+    assert definitions == {"orders": None, "orders_view": "SELECT * FROM orders"}
+    assert list(joined).count("view_definition") == 1
+
+
+def test_add_view_definitions_without_views_adds_a_null_column():
+    dataframe = daft.from_pydict({"table_name": ["orders"]})
+
+    joined = add_view_definitions(dataframe, {}).to_pydict()
+
+    assert joined["view_definition"] == [None]
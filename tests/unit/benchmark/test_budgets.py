@@ -0,0 +1,191 @@
+import json
+
+import pytest
+
+from tests.benchmark.budgets import (
+    Budget,
+    compare_stage,
+    format_report,
+    get_budget,
+    main,
+    summarize_profile,
+)
+
+
+def get_profile(elapsed, footprint, functions):
+    return {
+        "elapsed_time_sec": elapsed,
+        "max_footprint_mb": footprint,
+        "files": {
+            path: {
+                "functions": [
+                    {
+                        "line": name,
+                        "n_cpu_percent_python": cpu_percent,
+                        "n_cpu_percent_c": 0,
+                        "n_sys_percent": 0,
+                        "n_malloc_mb": malloc_mb,
+                    }
+                ]
+            }
+            for path, name, cpu_percent, malloc_mb in functions
+        },
+    }
+
+
+def get_summary(stage, cpu_seconds, footprint, functions=None):
+    return {
+        "stage": stage,
+        "elapsed_time_sec": cpu_seconds,
+        "cpu_seconds": cpu_seconds,
+        "max_footprint_mb": footprint,
+        "functions": functions or {},
+    }
+
+
+def test_summarize_profile():
+    summary = summarize_profile(
+        "transform-table",
+        get_profile(
+            10.0,
+            500.0,
+            [
+                (
+                    "/home/runner/.venv/lib/python3.11/site-packages/daft/sql.py",
+                    "sql",
+                    40.0,
+                    100.0,
+                ),
+                ("app/transformers/__init__.py", "compile", 10.0, 0.0),
+                ("app/idle.py", "idle", 0.0, 0.0),
+            ],
+        ),
+    )
+
+    assert summary["cpu_seconds"] == pytest.approx(5.0)
+    assert summary["max_footprint_mb"] == 500.0
+    assert summary["functions"] == {
+        "daft/sql.py:sql": {"cpu_seconds": pytest.approx(4.0), "malloc_mb": 100.0},
+        "app/transformers/__init__.py:compile": {
+            "cpu_seconds": pytest.approx(1.0),
+            "malloc_mb": 0.0,
+        },
+    }
+
+
+def test_get_budget():
+    budgets = {
+        "default": {"max_cpu_regression": 0.1, "max_footprint_mb": 1000},
+        "stages": {"extract-column": {"max_footprint_mb": 2000}},
+    }
+
+    assert get_budget(budgets, "extract-table") == Budget(
+        max_cpu_regression=0.1, max_footprint_mb=1000
+    )
+    assert get_budget(
+        budgets, "extract-column", max_cpu_regression=0.5, max_footprint_regression=None
+    ) == Budget(max_cpu_regression=0.5, max_footprint_mb=2000)
+    with pytest.raises(ValueError):
+        get_budget({"stages": {"extract-table": {"max_cpu": 1}}}, "extract-table")
+
+
+@pytest.mark.parametrize(
+    "cpu_seconds, footprint, regressions",
+    [
+        (10.0, 100.0, 0),
+        (12.4, 114.0, 0),
+        (13.0, 100.0, 1),
+        (10.0, 120.0, 1),
+        (13.0, 120.0, 2),
+    ],
+)
+def test_compare_stage_with_baseline(cpu_seconds, footprint, regressions):
+    baseline = get_summary("extract-column", 10.0, 100.0)
+    summary = get_summary("extract-column", cpu_seconds, footprint)
+
+    assert len(compare_stage(summary, baseline, Budget())) == regressions
+
+
+def test_compare_stage_ignores_noise():
+    baseline = get_summary("client-connect", 0.1, 10.0)
+    summary = get_summary("client-connect", 0.4, 20.0)
+
+    assert compare_stage(summary, baseline, Budget()) == []
+
+
+def test_compare_stage_footprint_limit():
+    summary = get_summary("extract-column", 10.0, 1500.0)
+
+    assert compare_stage(summary, None, Budget()) == []
+    assert compare_stage(summary, None, Budget(max_footprint_mb=1024)) == [
+        "extract-column: max_footprint_mb 1500.0 MB, limit 1024.0 MB"
+    ]
+
+
+def test_format_report_lists_grown_functions():
+    baseline = get_summary(
+        "transform-column",
+        10.0,
+        100.0,
+        {"app/a.py:f": {"cpu_seconds": 1.0, "malloc_mb": 10.0}},
+    )
+    summary = get_summary(
+        "transform-column",
+        20.0,
+        100.0,
+        {
+            "app/a.py:f": {"cpu_seconds": 9.0, "malloc_mb": 10.0},
+            "app/b.py:g": {"cpu_seconds": 2.0, "malloc_mb": 5.0},
+        },
+    )
+    regressions = {
+        "transform-column": compare_stage(summary, baseline, Budget()),
+        "extract-table": [],
+    }
+
+    report = format_report(
+        [summary, get_summary("extract-table", 1.0, 50.0)],
+        {"transform-column": baseline},
+        regressions,
+    )
+
+    assert "Regression: transform-column: CPU time 20.0s, baseline 10.0s" in report
+    assert "app/a.py:f: 1.00s -> 9.00s" in report
+    assert "app/b.py:g: 0.00 MB -> 5.00 MB" in report
+    assert "ok, no baseline" in report
+
+
+def test_update_and_compare(tmp_path, monkeypatch, capsys):
+    profiles = tmp_path / "profiles"
+    baselines = tmp_path / "baselines"
+    profiles.mkdir()
+
+    def run(command, footprint):
+        (profiles / "extract-table.json").write_text(
+            json.dumps(get_profile(10.0, footprint, [("app/a.py", "f", 50.0, 1.0)]))
+        )
+        monkeypatch.setattr(
+            "sys.argv",
+            [
+                "budgets",
+                command,
+                "--profiles",
+                str(profiles),
+                "--baselines",
+                str(baselines),
+            ],
+        )
+        main()
+
+    run("update", 100.0)
+    assert (
+        json.loads((baselines / "extract-table.json").read_text())["max_footprint_mb"]
+        == 100.0
+    )
+
+    run("compare", 110.0)
+
+    with pytest.raises(SystemExit) as exit_info:
+        run("compare", 200.0)
+    assert exit_info.value.code == 1
+    assert "over budget" in capsys.readouterr().out
@@ -0,0 +1,73 @@
+from unittest.mock import AsyncMock, patch
+
+from tests.benchmark.catalog import create_synthetic_catalog
+from tests.benchmark.pipeline import (
+    extract,
+    find_regressions,
+    get_activities,
+    get_workflow_args,
+    run_stage,
+    transform,
+)
+
+
+def get_result(stage, rows_per_sec, growth):
+    return {
+        "stage": stage,
+        "rows_per_sec": rows_per_sec,
+        "base_rss_mb": 100.0,
+        "peak_rss_mb": 100.0 + growth,
+    }
+
+
+def test_find_regressions():
+    baseline = [
+        get_result("extract-column", 1000, 50),
+        get_result("transform-column", 1000, 50),
+    ]
+    results = [
+        get_result("extract-column", 850, 55),
+        get_result("transform-column", 700, 80),
+        get_result("extract-table", 10, 500),
+    ]
+
+    regressions = find_regressions(results, baseline, max_regression=0.2)
+
+    assert len(regressions) == 2
+    assert all(regression.startswith("transform-column") for regression in regressions)
+
+
+async def test_pipeline_extracts_and_transforms_the_synthetic_catalog(tmp_path):
+    create_synthetic_catalog(
+        table_count=20, schema_count=2, directory=str(tmp_path)
+    ).close()
+    activities = get_activities(str(tmp_path))
+    workflow_args = get_workflow_args(str(tmp_path / "output"), {})
+
+    with patch(
+        "application_sdk.outputs.objectstore.ObjectStoreOutput."
+        "push_file_to_object_store",
+        new=AsyncMock(),
+    ):
+        extracted = await extract(activities, workflow_args, "column")
+        transformed = await transform(
+            activities, workflow_args, "column", extracted["chunks"]
+        )
+
+    assert extracted == {"rows": 20 * 8, "chunks": 1}
+    assert transformed["rows"] == 20 * 8
+
+
+def test_run_stage_connects_and_transforms_extracted_chunks(tmp_path):
+    create_synthetic_catalog(
+        table_count=20, schema_count=2, directory=str(tmp_path)
+    ).close()
+    output_path = str(tmp_path / "output")
+
+    connected = run_stage(str(tmp_path), output_path, "client-connect", {})
+    extracted = run_stage(str(tmp_path), output_path, "extract-table", {})
+    transformed = run_stage(str(tmp_path), output_path, "transform-table", {})
+
+    assert connected["stage"] == "client-connect"
+    assert extracted["rows"] == transformed["rows"] == 20
+    assert transformed["chunks"] == extracted["chunks"] == 1
@@ -0,0 +1,225 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import StaticPool
+
+from app.clients import SQLClient
+from app.clients.coordinators import (
+    Coordinator,
+    CoordinatorRouter,
+    CoordinatorState,
+    get_coordinators,
+)
+from app.clients.pool import EnginePool
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def create_sqlite_engine(database: str = "") -> Engine:
+    return create_engine(
+        f"sqlite://{database}",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+
+def get_coordinator(host: str, reachable: bool = True) -> Coordinator:
+    database = "" if reachable else "/nonexistent/directory/presto.db"
+    return Coordinator(host, "8080", create_sqlite_engine(database), CoordinatorState())
+
+
+def wait_for_recheck(coordinator: Coordinator) -> None:
+    deadline = time.monotonic() + 5
+    while coordinator.state.checking and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_get_coordinators_lists_the_connection_first():
+    credentials = {
+        "host": "presto-1",
+        "port": 8080,
+        "extra": {"coordinators": "presto-2:8443, presto-3,presto-1:8080,"},
+    }
+
+    assert get_coordinators(credentials) == [
+        ("presto-1", "8080"),
+        ("presto-2", "8443"),
+        ("presto-3", "8080"),
+    ]
+    assert get_coordinators({"host": "presto-1", "port": "8080"}) == [
+        ("presto-1", "8080")
+    ]
+
+
+def test_queries_go_to_the_least_loaded_coordinator():
+    coordinators = [get_coordinator(f"presto-{i}") for i in range(3)]
+    router = CoordinatorRouter(coordinators)
+
+    used = []
+    for _ in range(3):
+        coordinator, connection, result = router.execute("SELECT 1")
+        assert result.fetchall() == [(1,)]
+        used.append(coordinator.host)
+    assert used == ["presto-0", "presto-1", "presto-2"]
+
+    router.release(coordinators[1])
+    assert router.execute("SELECT 1")[0] is coordinators[1]
+    assert [coordinator.state.outstanding for coordinator in coordinators] == [
+        1,
+        1,
+        1,
+    ]
+
+
+def test_unreachable_coordinators_fail_over_and_rejoin():
+    clock = FakeClock()
+    coordinators = [
+        get_coordinator("presto-0", reachable=False),
+        get_coordinator("presto-1"),
+    ]
+    router = CoordinatorRouter(coordinators, retry_interval=30, clock=clock)
+
+    coordinator, _, result = router.execute("SELECT 1")
+
+    assert coordinator is coordinators[1]
+    assert result.fetchall() == [(1,)]
+    assert not coordinators[0].state.healthy
+    assert coordinators[0].state.outstanding == 0
+    assert router.get_candidates() == [coordinators[1]]
+
+    coordinators[0].engine = create_sqlite_engine()
+    clock.now = 31
+    assert router.get_candidates() == [coordinators[1]]
+    wait_for_recheck(coordinators[0])
+    assert coordinators[0].state.healthy
+    assert router.get_candidates() == [coordinators[0], coordinators[1]]
+
+
+def test_coordinators_are_rechecked_off_the_query_path():
+    clock = FakeClock()
+    coordinators = [get_coordinator("presto-0"), get_coordinator("presto-1")]
+    coordinators[0].state.healthy = False
+    router = CoordinatorRouter(coordinators, retry_interval=30, clock=clock)
+    clock.now = 31
+    checked = threading.Event()
+
+    def slow_is_healthy(engine: Engine) -> bool:
+        checked.wait(5)
+        return False
+
+    with patch("app.clients.coordinators.is_healthy", side_effect=slow_is_healthy):
+        assert router.get_candidates() == [coordinators[1]]
+        assert router.get_candidates() == [coordinators[1]]
+        assert coordinators[0].state.checking
+        checked.set()
+        wait_for_recheck(coordinators[0])
+
+    assert not coordinators[0].state.healthy
+    assert coordinators[0].state.failed_at == 31
+
+
+def test_query_errors_of_healthy_coordinators_are_raised():
+    coordinators = [get_coordinator("presto-0"), get_coordinator("presto-1")]
+    router = CoordinatorRouter(coordinators)
+
+    with pytest.raises(Exception, match="no such table"):
+        router.execute("SELECT * FROM missing")
+
+    assert all(coordinator.state.healthy for coordinator in coordinators)
+    assert coordinators[0].state.outstanding == 0
+
+
+async def test_sql_client_routes_across_coordinators():
+    pool = EnginePool()
+    credentials = {
+        "username": "admin",
+        "host": "presto-1",
+        "port": "8080",
+        "extra": {
+            "catalog": "system",
+            "schema": "information_schema",
+            "coordinators": "presto-2:8080",
+        },
+    }
+    with patch("app.clients.engine_pool", new=pool):
+        sql_client = SQLClient()
+        await sql_client.load(credentials)
+
+        coordinators = sql_client._router.coordinators
+        assert [coordinator.endpoint for coordinator in coordinators] == [
+            "presto-1:8080",
+            "presto-2:8080",
+        ]
+        assert sql_client.engine is coordinators[0].engine
+        assert coordinators[1].engine.url.host == "presto-2"
+        assert len(pool) == 2
+
+        await sql_client.close()
+
+    assert sql_client._router is None
+    assert pool._held == {}
+
+
+async def test_streamed_queries_release_their_coordinator():
+    coordinators = [get_coordinator("presto-0"), get_coordinator("presto-1")]
+    sql_client = SQLClient()
+    sql_client.engine = coordinators[0].engine
+    sql_client._router = CoordinatorRouter(coordinators)
+
+    batches = [
+        batch
+        async for batch in sql_client.run_query_arrow_batches(
+            "SELECT 1 AS id", batch_size=10
+        )
+    ]
+
+    assert batches[0].column("id").to_pylist() == [1]
+    assert [coordinator.state.outstanding for coordinator in coordinators] == [0, 0]
+
+
+async def test_cancelled_queries_release_their_coordinator():
+    coordinators = [get_coordinator("presto-0")]
+    connect = coordinators[0].engine.connect
+
+    def slow_connect():
+        time.sleep(0.2)
+        return connect()
+
+    coordinators[0].engine.connect = slow_connect
+    sql_client = SQLClient()
+    sql_client.engine = coordinators[0].engine
+    sql_client._router = CoordinatorRouter(coordinators)
+
+    async def fetch():
+        async for _ in sql_client.run_query_batches("SELECT 1", batch_size=10):
+            pass
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(fetch(), 0.05)
+
+    assert coordinators[0].state.outstanding == 0
+
+
+async def test_routed_engine_is_the_least_loaded_coordinator():
+    coordinators = [get_coordinator("presto-0"), get_coordinator("presto-1")]
+    coordinators[0].state.outstanding = 1
+    sql_client = SQLClient()
+    sql_client.engine = coordinators[0].engine
+    sql_client._router = CoordinatorRouter(coordinators)
+
+    async with sql_client.routed_engine() as engine:
+        assert engine is coordinators[1].engine
+        assert coordinators[1].state.outstanding == 1
+
+    assert coordinators[1].state.outstanding == 0
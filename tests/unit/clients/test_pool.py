@@ -0,0 +1,145 @@
+import asyncio
+import threading
+import time
+from typing import List
+from unittest.mock import patch
+
+import pytest
+import requests
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+from app.clients import SQLClient
+from app.clients.pool import EnginePool, get_pool_key
+
+CREDENTIALS = {
+    "username": "admin",
+    "host": "presto.example.com",
+    "port": "8080",
+    "extra": {"catalog": "system", "schema": "information_schema"},
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def pool(clock: FakeClock) -> EnginePool:
+    return EnginePool(
+        max_size=2, idle_timeout=300, health_check_interval=60, clock=clock
+    )
+
+
+def create_sqlite_engine() -> Engine:
+    return create_engine("sqlite://")
+
+
+async def test_engines_are_shared_per_key(pool: EnginePool):
+    first = await pool.acquire("a", create_sqlite_engine)
+    second = await pool.acquire("a", create_sqlite_engine)
+    other = await pool.acquire("b", create_sqlite_engine)
+
+    assert first is second
+    assert other is not first
+    assert len(pool) == 2
+
+
+async def test_idle_engines_are_evicted(pool: EnginePool, clock: FakeClock):
+    engine = await pool.acquire("a", create_sqlite_engine)
+    held = await pool.acquire("b", create_sqlite_engine)
+    pool.release(engine)
+
+    clock.now = 301
+    await pool.acquire("c", create_sqlite_engine)
+
+    # "b" is idle as long but still held, so it is kept
+    assert await pool.acquire("b", create_sqlite_engine) is held
+    assert await pool.acquire("a", create_sqlite_engine) is not engine
+
+
+async def test_least_recently_used_engines_are_evicted_over_max_size(
+    pool: EnginePool, clock: FakeClock
+):
+    engines: List[Engine] = []
+    for key in ("a", "b", "c"):
+        clock.now += 1
+        engines.append(await pool.acquire(key, create_sqlite_engine))
+        pool.release(engines[-1])
+
+    assert len(pool) == 2
+    assert await pool.acquire("a", create_sqlite_engine) is not engines[0]
+    assert await pool.acquire("c", create_sqlite_engine) is engines[2]
+
+
+async def test_unhealthy_engines_are_replaced(pool: EnginePool, clock: FakeClock):
+    engine = await pool.acquire("a", create_sqlite_engine)
+    pool.release(engine)
+
+    clock.now = 61
+    with patch.object(EnginePool, "_is_healthy", return_value=False):
+        replacement = await pool.acquire("a", create_sqlite_engine)
+
+    assert replacement is not engine
+    assert len(pool) == 1
+
+
+async def test_health_checks_do_not_block_the_event_loop_or_the_pool(
+    pool: EnginePool, clock: FakeClock
+):
+    engine = await pool.acquire("a", create_sqlite_engine)
+    pool.release(engine)
+    clock.now = 61
+    checking = threading.Event()
+
+    def slow_health_check(engine: Engine) -> bool:
+        checking.set()
+        time.sleep(0.2)
+        return True
+
+    with patch.object(EnginePool, "_is_healthy", side_effect=slow_health_check):
+        check = asyncio.create_task(pool.acquire("a", create_sqlite_engine))
+        while not checking.is_set():
+            await asyncio.sleep(0.01)
+        started = time.monotonic()
+        other = await pool.acquire("b", create_sqlite_engine)
+        assert time.monotonic() - started < 0.1
+        assert not check.done()
+        assert await check is engine
+
+    assert other is not engine
+
+
+def test_get_pool_key_depends_on_every_credential():
+    assert get_pool_key(CREDENTIALS) == get_pool_key(
+        dict(reversed(CREDENTIALS.items()))
+    )
+    assert get_pool_key(CREDENTIALS) != get_pool_key({**CREDENTIALS, "port": "8443"})
+
+
+async def test_sql_clients_share_pooled_engine(pool: EnginePool):
+    with patch("app.clients.engine_pool", new=pool):
+        first, second = SQLClient(), SQLClient()
+        await first.load(CREDENTIALS)
+        await second.load(CREDENTIALS)
+
+        assert first.engine is second.engine
+        first_cursor = first.connection.connection.dbapi_connection.cursor()
+        second_cursor = second.connection.connection.dbapi_connection.cursor()
+        assert isinstance(first_cursor._requests_session, requests.Session)
+        assert first_cursor._requests_session is second_cursor._requests_session
+
+        await first.close()
+        await second.close()
+
+    assert first.engine is None
+    assert pool._held == {}
@@ -0,0 +1,142 @@
+import asyncio
+import sqlite3
+import time
+from unittest.mock import MagicMock, patch
+
+import pyarrow as pa
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from app.clients import SQLClient, get_arrow_type, get_query_id
+from app.common.observability import QueryObservation
+
+
+@pytest.fixture
+def sql_client() -> SQLClient:
+    connection = sqlite3.connect(":memory:", check_same_thread=False)
+    connection.execute("CREATE TABLE t (id INTEGER, name TEXT)")
+    connection.executemany(
+        "INSERT INTO t VALUES (?, ?)", [(i, f"name_{i}") for i in range(10)]
+    )
+    connection.commit()
+    sql_client = SQLClient()
+    sql_client.engine = create_engine(
+        "sqlite://", creator=lambda: connection, poolclass=StaticPool
+    )
+    return sql_client
+
+
+async def test_run_query_batches_yields_bounded_batches(sql_client: SQLClient):
+    batches = [
+        batch
+        async for batch in sql_client.run_query_batches(
+            "SELECT id, name FROM t ORDER BY id", batch_size=4
+        )
+    ]
+
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    assert list(batches[0].columns) == ["id", "name"]
+    assert batches[2]["id"].tolist() == [8, 9]
+
+
+async def test_run_query_batches_requires_engine():
+    with pytest.raises(ValueError):
+        async for _ in SQLClient().run_query_batches("SELECT 1", batch_size=1):
+            pass
+
+
+async def test_run_query_arrow_batches_yields_bounded_record_batches(
+    sql_client: SQLClient,
+):
+    batches = [
+        batch
+        async for batch in sql_client.run_query_arrow_batches(
+            "SELECT id, name, NULL AS remarks FROM t ORDER BY id", batch_size=4
+        )
+    ]
+
+    assert [batch.num_rows for batch in batches] == [4, 4, 2]
+    assert batches[0].schema.names == ["id", "name", "remarks"]
+    assert batches[2].column("id").to_pylist() == [8, 9]
+    assert batches[0].column("remarks").null_count == 4
+
+
+def test_get_arrow_type_uses_presto_type_names():
+    assert get_arrow_type("varchar(10)") == pa.string()
+    assert get_arrow_type("bigint") == pa.int64()
+    assert get_arrow_type("unknown") == pa.null()
+    assert get_arrow_type("timestamp(3)") is None
+    assert get_arrow_type(None) is None
+
+
+async def test_probe_caches_outcome(sql_client: SQLClient):
+    assert await sql_client.probe("SELECT id FROM t LIMIT 0")
+    assert not await sql_client.probe("SELECT id FROM missing LIMIT 0")
+
+    sql_client.engine = None
+    # cached, the queries are not run again
+    assert await sql_client.probe("SELECT id FROM t LIMIT 0")
+    assert not await sql_client.probe("SELECT id FROM missing LIMIT 0")
+
+
+@pytest.mark.parametrize("method", ["run_query_batches", "run_query_arrow_batches"])
+async def test_run_query_batches_observe_the_query(sql_client: SQLClient, method):
+    observation = QueryObservation(sql_file="extract_table.sql")
+
+    with patch.object(observation, "record") as record:
+        async for _ in getattr(sql_client, method)(
+            "SELECT id, name FROM t", batch_size=4, observation=observation
+        ):
+            pass
+
+    record.assert_called_once_with(None)
+    assert observation.rows == 10
+    assert observation.bytes > 0
+    assert observation.first_row_seconds is not None
+    # sqlite cursors have no Presto query id
+    assert observation.query_id is None
+
+
+async def test_run_query_arrow_batches_observes_failures(sql_client: SQLClient):
+    observation = QueryObservation()
+
+    with patch.object(observation, "record") as record, pytest.raises(Exception):
+        async for _ in sql_client.run_query_arrow_batches(
+            "SELECT * FROM missing", batch_size=4, observation=observation
+        ):
+            pass
+
+    assert record.call_args.args[0] is not None
+
+
+def test_get_query_id():
+    cursor = MagicMock(spec=["last_query_id"])
+    cursor.last_query_id = "20250101_000000_00001_abcde"
+
+    assert get_query_id(cursor) == "20250101_000000_00001_abcde"
+    assert get_query_id(object()) is None
+
+
+async def test_cancelling_a_query_cancels_it_and_closes_its_connection():
+    sql_client = SQLClient()
+    connection, result = MagicMock(), MagicMock()
+    result.keys.return_value = ["id"]
+
+    def slow_fetchmany(batch_size: int):
+        time.sleep(0.2)
+        return [(1,)]
+
+    result.fetchmany = slow_fetchmany
+    sql_client.engine = MagicMock()
+    sql_client.execute_query = MagicMock(return_value=(None, connection, result))
+
+    async def fetch():
+        async for _ in sql_client.run_query_batches("SELECT 1", batch_size=1):
+            pass
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(fetch(), 0.1)
+
+    result.cursor.cancel.assert_called()
+    connection.close.assert_called_once()
@@ -0,0 +1,92 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.common.observability import QueryObservation, span
+
+
+@pytest.fixture
+def metrics():
+    with patch("app.common.observability.get_metrics") as get_metrics:
+        yield get_metrics.return_value
+
+
+@pytest.fixture
+def traces():
+    with patch("app.common.observability.get_traces") as get_traces:
+        yield get_traces.return_value
+
+
+def get_recorded(metrics: MagicMock):
+    return {
+        call.kwargs["name"]: call.kwargs
+        for call in metrics.record_metric.call_args_list
+    }
+
+
+def test_query_observation_records_histograms_and_span(metrics, traces):
+    observation = QueryObservation(
+        sql_file="extract_column.sql", catalog="hive", trace_id="run"
+    )
+    observation.query_id = "20250101_000000_00001_abcde"
+    observation.add_batch(rows=3, nbytes=300)
+    observation.add_batch(rows=2, nbytes=200)
+
+    observation.record()
+
+    recorded = get_recorded(metrics)
+    assert set(recorded) == {
+        "sql_query_latency",
+        "sql_query_time_to_first_row",
+        "sql_query_rows",
+        "sql_query_bytes",
+    }
+    assert recorded["sql_query_rows"]["value"] == 5
+    assert recorded["sql_query_bytes"]["value"] == 500
+    assert recorded["sql_query_rows"]["labels"] == {
+        "sql_file": "extract_column.sql",
+        "catalog": "hive",
+        "query_id": "20250101_000000_00001_abcde",
+        "status": "ok",
+    }
+    trace = traces.record_trace.call_args.kwargs
+    assert trace["name"] == "sql_query"
+    assert trace["kind"] == "CLIENT"
+    assert trace["trace_id"] == "run"
+    assert trace["status_code"] == "OK"
+    assert trace["attributes"]["rows"] == 5
+    assert trace["events"][0]["name"] == "first_row"
+
+
+def test_query_observation_without_rows_records_latency_and_rows(metrics, traces):
+    QueryObservation().record(RuntimeError("Query failed"))
+
+    recorded = get_recorded(metrics)
+    assert set(recorded) == {"sql_query_latency", "sql_query_rows"}
+    assert recorded["sql_query_rows"]["labels"]["status"] == "error"
+    assert recorded["sql_query_rows"]["labels"]["query_id"] == "unknown"
+    trace = traces.record_trace.call_args.kwargs
+    assert trace["status_code"] == "ERROR"
+    assert trace["status_message"] == "Query failed"
+
+
+def test_query_observation_never_fails_the_query(metrics, traces):
+    metrics.record_metric.side_effect = RuntimeError("exporter down")
+    traces.record_trace.side_effect = RuntimeError("exporter down")
+
+    QueryObservation().record()
+
+
+def test_span_records_attributes_and_errors(traces):
+    with span("transform_chunk", "run", {"chunk": 1}) as attributes:
+        attributes["rows"] = 10
+
+    trace = traces.record_trace.call_args.kwargs
+    assert trace["kind"] == "INTERNAL"
+    assert trace["attributes"] == {"chunk": 1, "rows": 10}
+    assert trace["status_code"] == "OK"
+
+    with pytest.raises(ValueError):
+        with span("transform_chunk", "run", {"chunk": 2}):
+            raise ValueError("bad chunk")
+    assert traces.record_trace.call_args.kwargs["status_code"] == "ERROR"
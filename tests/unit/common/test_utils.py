@@ -0,0 +1,232 @@
+import json
+
+import pytest
+
+from app.common.utils import (
+    filter_partitions,
+    get_extraction_state_key,
+    get_fetch_format,
+    get_include_schema_names,
+    get_metadata_flag,
+    get_null_columns,
+    get_partition_path,
+    get_schema_fingerprints,
+    get_template_columns,
+    prepare_query,
+    prune_null_columns,
+    quote_identifier,
+    quote_like_prefix,
+    quote_literal,
+)
+
+
+def test_prepare_query_renders_partition_params():
+    query = (
+        "SELECT * FROM {catalog_name}.information_schema.tables "
+        "WHERE table_schema = '{schema_name}' "
+        "AND concat(table_catalog, '.', table_schema) ~ '{normalized_include_regex}'"
+    )
+
+    prepared = prepare_query(
+        query,
+        {"metadata": {}},
+        catalog_name=quote_identifier('we"ird{cat}'),
+        schema_name=quote_literal("o'brien"),
+    )
+
+    assert prepared == (
+        'SELECT * FROM "we""ird{cat}".information_schema.tables '
+        "WHERE table_schema = 'o''brien' "
+        "AND concat(table_catalog, '.', table_schema) ~ '.*'"
+    )
+
+
+def test_quote_like_prefix_escapes_wildcards():
+    assert quote_like_prefix("o'b_r%n\\") == "o''b\\_r\\%n\\\\"
+
+
+def test_prepare_query_without_params_matches_sdk():
+    assert prepare_query("SELECT '{normalized_exclude_regex}'", {}) == "SELECT '^$'"
+
+
+def test_prepare_query_escapes_filters_for_presto():
+    query = (
+        "WHERE regexp_like(t.table_schema, '{normalized_include_regex}') "
+        "{include_schemas_sql} {temp_table_regex_sql}"
+    )
+    workflow_args = {
+        "metadata": {
+            "include-filter": json.dumps({"^tpch$": ["^tiny$", "^o'brien$"]}),
+            "temp-table-regex": "^tmp_{2}'",
+        }
+    }
+
+    prepared = prepare_query(
+        query,
+        workflow_args,
+        temp_table_regex_sql="AND NOT regexp_like(t.table_name, '{exclude_table_regex}')",
+        include_schemas_sql="AND t.table_schema IN ({schema_names})",
+    )
+
+    assert prepared == (
+        r"WHERE regexp_like(t.table_schema, 'tpch\.tiny$|tpch\.o''brien$') "
+        "AND t.table_schema IN ('o''brien', 'tiny') "
+        "AND NOT regexp_like(t.table_name, '^tmp_{2}''')"
+    )
+
+
+def test_prepare_query_with_invalid_filter_returns_none():
+    assert prepare_query("SELECT 1", {"metadata": {"include-filter": "{"}}) is None
+
+
+def test_get_include_schema_names_only_for_exact_schemas():
+    def include(include_filter):
+        return {"metadata": {"include-filter": json.dumps(include_filter)}}
+
+    assert get_include_schema_names(
+        include({"^tpch$": ["^tiny$", "^sf1$"], "^memory$": ["^tiny$"]})
+    ) == ["sf1", "tiny"]
+    assert get_include_schema_names(include({})) is None
+    assert get_include_schema_names(include({"^tpch$": "*"})) is None
+    assert get_include_schema_names(include({"^tpch$": ["^sf.*$"]})) is None
+    assert get_include_schema_names(include({"^tpch$": ["tiny"]})) is None
+
+
+def test_get_partition_path_quotes_separators():
+    assert (
+        get_partition_path({"catalog_name": "hive", "schema_name": "a/b c"})
+        == "hive/a%2Fb%20c"
+    )
+
+
+def test_filter_partitions_applies_include_and_exclude_filters():
+    partitions = [
+        {"catalog_name": "tpch", "schema_name": "tiny"},
+        {"catalog_name": "tpch", "schema_name": "sf1"},
+        {"catalog_name": "tpch", "schema_name": "information_schema"},
+        {"catalog_name": "memory", "schema_name": "default"},
+        {"catalog_name": "hive", "schema_name": "raw"},
+    ]
+    workflow_args = {
+        "metadata": {
+            "include-filter": json.dumps({"^tpch$": "*", "^memory$": ["^default$"]}),
+            "exclude-filter": json.dumps({"^tpch$": ["^sf1$"]}),
+        }
+    }
+
+    assert filter_partitions(partitions, workflow_args) == [
+        {"catalog_name": "memory", "schema_name": "default"},
+        {"catalog_name": "tpch", "schema_name": "tiny"},
+    ]
+
+
+def test_get_schema_fingerprints_detects_changes():
+    row = {
+        "SCHEMA_NAME": "tiny",
+        "TABLE_COUNT": 8,
+        "COLUMN_COUNT": 61,
+        "TABLE_CHECKSUM": "ab12",
+        "COLUMN_CHECKSUM": "cd34",
+        "VIEW_CHECKSUM": None,
+    }
+
+    fingerprints = get_schema_fingerprints("tpch", [row])
+    lowercase = get_schema_fingerprints(
+        "tpch", [{key.lower(): value for key, value in row.items()}]
+    )
+    changed = get_schema_fingerprints("tpch", [{**row, "COLUMN_COUNT": 62}])
+
+    assert list(fingerprints) == [("tpch", "tiny")]
+    assert fingerprints == lowercase
+    assert fingerprints != changed
+
+
+def test_get_extraction_state_key_is_per_connection():
+    workflow_args = {
+        "workflow_id": "workflow",
+        "connection": {"connection_qualified_name": "default/presto/1"},
+    }
+
+    assert (
+        get_extraction_state_key(workflow_args)
+        == "incremental_extraction_default/presto/1"
+    )
+    assert (
+        get_extraction_state_key({"workflow_id": "workflow"})
+        == "incremental_extraction_workflow"
+    )
+
+
+def test_get_template_columns(tmp_path):
+    template_path = tmp_path / "column.yaml"
+    template_path.write_text(
+        """
+columns:
+  - name: attributes.name
+    source_query: column_name
+  - name: attributes.qualifiedName
+    source_query: concat(connection_qualified_name, '/', table_catalog)
+    source_columns: [connection_qualified_name, TABLE_CATALOG]
+  - name: attributes.isPartition
+    source_query: True
+"""
+    )
+
+    columns = get_template_columns(str(template_path))
+
+    assert {"column_name", "connection_qualified_name", "table_catalog"} <= columns
+    assert "remarks" not in columns
+
+
+def test_prune_null_columns():
+    query = (
+        "SELECT\n"
+        "    t.table_name,\n"
+        "    NULL as remarks,\n"
+        "    t.table_type,\n"
+        "    NULL AS TABLE_OWNER\n"
+        "FROM information_schema.tables t\n"
+    )
+
+    assert get_null_columns(query) == {"remarks", "table_owner"}
+    assert prune_null_columns(query) == (
+        "SELECT\n"
+        "    t.table_name,\n"
+        "    t.table_type\n"
+        "FROM information_schema.tables t\n"
+    )
+
+
+def test_get_fetch_format_prefers_the_given_format():
+    workflow_args = {"metadata": {"fetch-format": "arrow"}}
+
+    assert get_fetch_format({}) == "pandas"
+    assert get_fetch_format(workflow_args) == "arrow"
+    assert get_fetch_format(workflow_args, "pandas") == "pandas"
+    with pytest.raises(ValueError, match="Unknown fetch format: json"):
+        get_fetch_format({"metadata": {"fetch-format": "json"}})
+
+
+def test_get_metadata_flag_defaults_only_when_unset():
+    workflow_args = {"metadata": {"on": True, "off": False, "empty": ""}}
+
+    assert get_metadata_flag(workflow_args, "on", False) is True
+    assert get_metadata_flag(workflow_args, "off", True) is False
+    assert get_metadata_flag(workflow_args, "empty", True) is False
+    assert get_metadata_flag(workflow_args, "unset", True) is True
+    assert get_metadata_flag({}, "unset", False) is False
+
+
+def test_get_metadata_flag_parses_strings():
+    for value, expected in [
+        ("false", False),
+        ("False", False),
+        ("0", False),
+        ("", False),
+        ("true", True),
+        ("True", True),
+    ]:
+        workflow_args = {"metadata": {"incremental-extraction": value}}
+        assert get_metadata_flag(workflow_args, "incremental-extraction", True) is (
+            expected
+        )
@@ -0,0 +1,418 @@
+import asyncio
+import json
+import time
+from typing import Any, Dict, List
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pandas as pd
+import pytest
+from application_sdk.handlers.sql import BaseSQLHandler
+
+from app.clients import SQLClient
+from app.handlers import MetadataPage, SQLHandler, get_metadata_page
+from app.handlers.cache import MetadataCache
+
+CREDENTIALS = {
+    "username": "admin",
+    "host": "presto.example.com",
+    "port": "8080",
+    "type": "all",
+    "database": "",
+}
+
+METADATA = [{"TABLE_CATALOG": "tpch", "TABLE_SCHEMA": "tiny"}]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock: FakeClock) -> MetadataCache:
+    return MetadataCache(max_size=2, ttl=300, clock=clock)
+
+
+def counting_fetch(calls: List[str], key: str):
+    async def fetch() -> List[Dict[str, Any]]:
+        calls.append(key)
+        await asyncio.sleep(0)
+        return [{"key": key}]
+
+    return fetch
+
+
+async def test_cached_metadata_expires(cache: MetadataCache, clock: FakeClock):
+    calls: List[str] = []
+
+    await cache.get("a", counting_fetch(calls, "a"))
+    clock.now = 299
+    await cache.get("a", counting_fetch(calls, "a"))
+    clock.now = 300
+    await cache.get("a", counting_fetch(calls, "a"))
+
+    assert calls == ["a", "a"]
+
+
+async def test_least_recently_used_metadata_is_evicted(cache: MetadataCache):
+    calls: List[str] = []
+
+    for key in ["a", "b", "a", "c", "a", "b"]:
+        await cache.get(key, counting_fetch(calls, key))
+
+    assert calls == ["a", "b", "c", "b"]
+    assert len(cache) == 2
+
+
+async def test_refresh_replaces_cached_metadata(cache: MetadataCache):
+    calls: List[str] = []
+
+    await cache.get("a", counting_fetch(calls, "a"))
+    await cache.get("a", counting_fetch(calls, "a"), refresh=True)
+    await cache.get("a", counting_fetch(calls, "a"))
+
+    assert calls == ["a", "a"]
+
+
+async def test_concurrent_misses_share_one_fetch(cache: MetadataCache):
+    calls: List[str] = []
+
+    results = await asyncio.gather(
+        *(cache.get("a", counting_fetch(calls, "a")) for _ in range(5))
+    )
+
+    assert calls == ["a"]
+    assert all(result == [{"key": "a"}] for result in results)
+
+
+async def test_failed_fetches_are_not_cached(cache: MetadataCache):
+    failing = AsyncMock(side_effect=RuntimeError("coordinator unavailable"))
+
+    with pytest.raises(RuntimeError):
+        await cache.get("a", failing)
+    assert await cache.get("a", AsyncMock(return_value=METADATA)) == METADATA
+
+
+async def test_handler_caches_metadata_per_credentials(cache: MetadataCache):
+    sql_client = AsyncMock()
+    handler = SQLHandler(sql_client=sql_client, sql_client_factory=lambda: sql_client)
+    handler.metadata_cache = cache
+
+    with patch.object(
+        BaseSQLHandler, "prepare_metadata", AsyncMock(return_value=METADATA)
+    ) as prepare_metadata:
+        for credentials in [
+            CREDENTIALS,
+            CREDENTIALS,
+            {**CREDENTIALS, "username": "other"},
+            {**CREDENTIALS, "refresh": True},
+        ]:
+            await handler.load(credentials)
+            assert await handler.fetch_metadata("all", "") == METADATA
+
+    assert prepare_metadata.await_count == 3
+    # the refresh flag is not passed on to the client
+    assert "refresh" not in sql_client.load.await_args.args[0]
+
+
+async def test_concurrent_requests_keep_their_own_cache_keys(cache: MetadataCache):
+    handler = SQLHandler(sql_client=AsyncMock())
+    handler.metadata_cache = cache
+    loaded = asyncio.Barrier(2)
+
+    async def request(credentials: Dict[str, Any]) -> List[Dict[str, Any]]:
+        await handler.load(credentials)
+        # both requests are loaded before either fetches
+        await loaded.wait()
+        return await handler.fetch_metadata("all", "")
+
+    with patch.object(
+        BaseSQLHandler, "prepare_metadata", AsyncMock(return_value=METADATA)
+    ) as prepare_metadata:
+        await handler.load(CREDENTIALS)
+        await handler.fetch_metadata("all", "")
+        await asyncio.gather(
+            request(CREDENTIALS),
+            request({**CREDENTIALS, "username": "other", "refresh": True}),
+        )
+
+    # the cached metadata is served despite the refresh of the other request,
+    # which is cached under its own credentials
+    assert prepare_metadata.await_count == 2
+    assert len(cache) == 2
+
+
+async def test_concurrent_requests_query_with_their_own_credentials(
+    cache: MetadataCache,
+):
+    def create_sql_client() -> AsyncMock:
+        sql_client = AsyncMock()
+
+        async def run_query_batches(query: str, batch_size: int):
+            username = sql_client.load.await_args.args[0]["username"]
+            yield pd.DataFrame([{"catalog_name": f"{username}_catalog"}])
+
+        sql_client.run_query_batches = run_query_batches
+        return sql_client
+
+    handler = SQLHandler(sql_client=AsyncMock(), sql_client_factory=create_sql_client)
+    handler.metadata_cache = cache
+    loaded = asyncio.Barrier(2)
+
+    async def request(username: str) -> List[Dict[str, Any]]:
+        await handler.load({**CREDENTIALS, "username": username, "type": "database"})
+        # both requests are loaded before either queries
+        await loaded.wait()
+        return await handler.fetch_metadata("database", "")
+
+    catalogs = await asyncio.gather(request("admin"), request("other"))
+
+    assert catalogs == [
+        [{"TABLE_CATALOG": "admin_catalog"}],
+        [{"TABLE_CATALOG": "other_catalog"}],
+    ]
+
+
+def run_query_returning(rows: List[Dict[str, Any]]):
+    async def run_query_batches(query: str, batch_size: int):
+        yield pd.DataFrame(rows)
+
+    return MagicMock(side_effect=run_query_batches)
+
+
+async def test_handler_lists_one_page_of_catalogs(cache: MetadataCache):
+    sql_client = AsyncMock()
+    sql_client.run_query_batches = run_query_returning(
+        [{"catalog_name": "tpcds"}, {"catalog_name": "tpch"}]
+    )
+    handler = SQLHandler(sql_client=sql_client, sql_client_factory=lambda: sql_client)
+    handler.metadata_cache = cache
+
+    await handler.load(
+        {**CREDENTIALS, "type": "database", "cursor": "system", "prefix": "tp_"}
+    )
+    catalogs = await handler.fetch_metadata("database", "")
+
+    query = sql_client.run_query_batches.call_args.args[0]
+    assert catalogs == [{"TABLE_CATALOG": "tpcds"}, {"TABLE_CATALOG": "tpch"}]
+    assert "FROM system.metadata.catalogs" in query
+    assert "catalog_name > 'system'" in query
+    assert r"catalog_name LIKE 'tp\_%'" in query
+    assert "LIMIT 101" in query
+    # request parameters are not credentials, the pooled engine is shared
+    assert sql_client.load.await_args.args[0] == {
+        key: value
+        for key, value in CREDENTIALS.items()
+        if key not in ("type", "database")
+    }
+
+
+async def test_handler_lists_one_page_of_schemas(cache: MetadataCache):
+    sql_client = AsyncMock()
+    sql_client.run_query_batches = run_query_returning([{"schema_name": "o'brien"}])
+    handler = SQLHandler(sql_client=sql_client, sql_client_factory=lambda: sql_client)
+    handler.metadata_cache = cache
+
+    await handler.load(
+        {**CREDENTIALS, "type": "schema", "database": 'we"ird', "limit": 10}
+    )
+    schemas = await handler.fetch_metadata("schema", 'we"ird')
+
+    query = sql_client.run_query_batches.call_args.args[0]
+    assert schemas == [{"TABLE_CATALOG": 'we"ird', "TABLE_SCHEMA": "o'brien"}]
+    assert 'FROM "we""ird".information_schema.schemata' in query
+    assert "schema_name > ''" in query
+    assert "LIMIT 11" in query
+
+
+async def test_concurrent_requests_list_their_own_pages(cache: MetadataCache):
+    sql_client = AsyncMock()
+    sql_client.run_query_batches = run_query_returning([{"catalog_name": "tpch"}])
+    handler = SQLHandler(sql_client=sql_client, sql_client_factory=lambda: sql_client)
+    handler.metadata_cache = cache
+    loaded = asyncio.Barrier(2)
+
+    async def request(cursor: str) -> None:
+        await handler.load({**CREDENTIALS, "type": "database", "cursor": cursor})
+        await loaded.wait()
+        await handler.fetch_metadata("database", "")
+
+    await asyncio.gather(request("hive"), request("system"))
+
+    queries = [call.args[0] for call in sql_client.run_query_batches.call_args_list]
+    assert sorted(
+        cursor
+        for cursor in ("hive", "system")
+        for query in queries
+        if f"catalog_name > '{cursor}'" in query
+    ) == ["hive", "system"]
+
+
+async def test_handler_lists_the_page_it_is_given():
+    sql_client = AsyncMock()
+    sql_client.run_query_batches = run_query_returning([])
+    handler = SQLHandler(sql_client=sql_client)
+
+    await handler.fetch_schemas("tpch", MetadataPage(cursor="sf1", limit=5))
+    query = sql_client.run_query_batches.call_args.args[0]
+    assert "schema_name > 'sf1'" in query
+    assert "LIMIT 6" in query
+
+    await handler.fetch_databases()
+    assert "LIMIT 101" in sql_client.run_query_batches.call_args.args[0]
+
+
+async def test_page_followed_by_more_has_the_next_cursor():
+    sql_client = AsyncMock()
+    sql_client.run_query_batches = run_query_returning(
+        [{"schema_name": name} for name in ("sf1", "sf10", "tiny")]
+    )
+    handler = SQLHandler(sql_client=sql_client)
+
+    schemas = await handler.fetch_schemas("tpch", MetadataPage(limit=2))
+    assert schemas == [
+        {"TABLE_CATALOG": "tpch", "TABLE_SCHEMA": "sf1"},
+        {"TABLE_CATALOG": "tpch", "TABLE_SCHEMA": "sf10", "NEXT_CURSOR": "sf10"},
+    ]
+
+    sql_client.run_query_batches = run_query_returning(
+        [{"catalog_name": name} for name in ("hive", "tpch")]
+    )
+    catalogs = await handler.fetch_databases(MetadataPage(limit=2))
+    assert len(catalogs) == 2
+    assert all("NEXT_CURSOR" not in catalog for catalog in catalogs)
+
+
+def test_metadata_page_is_bounded():
+    assert get_metadata_page({}) == MetadataPage("", "", 100)
+    assert get_metadata_page({"cursor": "a", "prefix": "b", "limit": "10"}) == (
+        MetadataPage("a", "b", 10)
+    )
+    assert get_metadata_page({"limit": 1000}).limit == 100
+    assert get_metadata_page({"limit": -1}).limit == 1
+
+
+def run_query_by_source(rows_by_source: Dict[str, List[Dict[str, Any]]]):
+    async def run_query_batches(query: str, batch_size: int):
+        for source, rows in rows_by_source.items():
+            if source in query:
+                yield pd.DataFrame(rows)
+
+    return MagicMock(side_effect=run_query_batches)
+
+
+async def test_preflight_checks_run_concurrently_with_deadlines():
+    handler = SQLHandler(sql_client=AsyncMock())
+    handler.preflight_check_timeout = 0.5
+    check = {"success": True, "successMessage": "ok", "failureMessage": ""}
+
+    async def slow_check(*args):
+        await asyncio.sleep(0.3)
+        return check
+
+    async def stuck_check(*args):
+        await asyncio.sleep(60)
+
+    with (
+        patch.object(SQLHandler, "check_schemas_and_databases", side_effect=slow_check),
+        patch.object(SQLHandler, "tables_check", side_effect=slow_check),
+        patch.object(SQLHandler, "check_client_version", side_effect=stuck_check),
+    ):
+        start = asyncio.get_running_loop().time()
+        results = await handler.preflight_check({"metadata": {}})
+        seconds = asyncio.get_running_loop().time() - start
+
+    assert seconds < 1
+    assert results["databaseSchemaCheck"] == check
+    assert results["tablesCheck"] == check
+    assert results["versionCheck"]["success"] is False
+    assert "timed out" in results["versionCheck"]["failureMessage"]
+    assert "versionCheck" in results["error"]
+
+
+async def test_preflight_deadline_cancels_the_query_and_closes_its_connection():
+    connections = []
+
+    def slow_execute(query: str):
+        time.sleep(0.3)
+        connection = MagicMock()
+        connections.append(connection)
+        return None, connection, MagicMock()
+
+    sql_client = SQLClient()
+    sql_client.engine = MagicMock()
+    sql_client.execute_query = slow_execute
+    handler = SQLHandler(sql_client=sql_client)
+    handler.preflight_check_timeout = 0.1
+
+    results = await handler.preflight_check(
+        {"metadata": {"include-filter": json.dumps({"^tpch$": "*"})}}
+    )
+
+    assert "timed out" in results["versionCheck"]["failureMessage"]
+    assert len(connections) == 3
+    for connection in connections:
+        connection.close.assert_called_once()
+
+
+async def test_schema_check_looks_up_only_filtered_schemas():
+    sql_client = AsyncMock()
+    sql_client.run_query_batches = run_query_by_source(
+        {
+            "system.metadata.catalogs": [{"catalog_name": "tpch"}],
+            '"tpch".information_schema.schemata': [{"schema_name": "tiny"}],
+        }
+    )
+    handler = SQLHandler(sql_client=sql_client)
+
+    def check(include_filter):
+        return handler.check_schemas_and_databases(
+            {"metadata": {"include-filter": json.dumps(include_filter)}}
+        )
+
+    assert (await check({"^tpch$": ["^tiny$"]}))["success"] is True
+    assert (await check({"^tpch$": "*"}))["success"] is True
+    assert (await check({"^tpch$": ["^tiny$", "^sf1$"]}))[
+        "failureMessage"
+    ] == "Schemas and Databases check failed for tpch.sf1 schema"
+    assert (await check({"^hive$": "*"}))[
+        "failureMessage"
+    ] == "Schemas and Databases check failed for hive database"
+    queries = [call.args[0] for call in sql_client.run_query_batches.call_args_list]
+    assert "IN ('tiny', 'sf1')" in queries[-2]
+
+
+async def test_tables_check_reports_a_lower_bound_at_the_limit():
+    sql_client = AsyncMock()
+    sql_client.run_query_batches = run_query_returning([{"count": 10}])
+    handler = SQLHandler(sql_client=sql_client)
+    handler.tables_check_limit = 10
+
+    result = await handler.tables_check({"metadata": {}})
+
+    assert (
+        result["successMessage"] == "Tables check successful. Table count: at least 10"
+    )
+    assert "LIMIT 10" in sql_client.run_query_batches.call_args.args[0]
+
+
+async def test_client_version_check_uses_the_oldest_node():
+    sql_client = AsyncMock()
+    sql_client.run_query_batches = run_query_returning(
+        [{"node_version": "0.287"}, {"node_version": "0.283-edge"}]
+    )
+    handler = SQLHandler(sql_client=sql_client)
+
+    with patch("app.handlers.SQL_SERVER_MIN_VERSION", "0.285"):
+        result = await handler.check_client_version()
+
+    assert result["success"] is False
+    assert "0.283 does not meet" in result["failureMessage"]
@@ -0,0 +1,42 @@
+import pandas as pd
+
+from app.inputs import ParquetInput
+
+
+async def test_get_batched_daft_dataframe_projects_columns(tmp_path):
+    pd.DataFrame(
+        {"TABLE_NAME": ["orders"], "column_name": ["id"], "remarks": [None]}
+    ).to_parquet(tmp_path / "1.parquet")
+    parquet_input = ParquetInput(
+        path=str(tmp_path), chunk_size=None, columns={"table_name", "COLUMN_NAME"}
+    )
+
+    dataframes = [df async for df in parquet_input.get_batched_daft_dataframe()]
+
+    assert [df.column_names for df in dataframes] == [["TABLE_NAME", "column_name"]]
+
+
+async def test_get_batched_daft_dataframe_without_matching_columns(tmp_path):
+    pd.DataFrame({"id": [1]}).to_parquet(tmp_path / "1.parquet")
+    parquet_input = ParquetInput(path=str(tmp_path), chunk_size=None, columns={"name"})
+
+    dataframes = [df async for df in parquet_input.get_batched_daft_dataframe()]
+
+    assert [df.column_names for df in dataframes] == [["id"]]
+
+
+async def test_get_batched_daft_dataframe_fills_missing_null_columns(tmp_path):
+    pd.DataFrame({"column_name": ["id"], "REMARKS": [None]}).to_parquet(
+        tmp_path / "1.parquet"
+    )
+    parquet_input = ParquetInput(
+        path=str(tmp_path),
+        chunk_size=None,
+        columns={"column_name", "remarks", "is_partition"},
+        null_columns={"remarks", "is_partition"},
+    )
+
+    dataframes = [df async for df in parquet_input.get_batched_daft_dataframe()]
+
+    assert dataframes[0].column_names == ["column_name", "REMARKS", "is_partition"]
+    assert dataframes[0].to_pydict()["is_partition"] == [None]
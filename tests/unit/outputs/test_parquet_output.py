@@ -0,0 +1,59 @@
+from unittest.mock import AsyncMock, patch
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from app.outputs import ParquetOutput
+
+
+@pytest.fixture(autouse=True)
+def object_store():
+    with patch(
+        "application_sdk.outputs.objectstore.ObjectStoreOutput."
+        "push_file_to_object_store",
+        new=AsyncMock(),
+    ) as push_file:
+        yield push_file
+
+
+async def test_write_arrow_table_uses_compression_and_row_group_size(tmp_path):
+    parquet_output = ParquetOutput(
+        output_path=str(tmp_path), compression="zstd", row_group_size=4
+    )
+
+    await parquet_output.write_arrow_table(pa.table({"id": list(range(10))}))
+
+    metadata = pq.ParquetFile(tmp_path / "1.parquet").metadata
+    assert metadata.num_row_groups == 3
+    assert metadata.row_group(0).num_rows == 4
+    assert metadata.row_group(0).column(0).compression == "ZSTD"
+    assert parquet_output.total_record_count == 10
+
+
+async def test_write_dataframe_writes_chunks_like_arrow_tables(tmp_path):
+    parquet_output = ParquetOutput(output_path=str(tmp_path), compression="snappy")
+
+    await parquet_output.write_dataframe(pd.DataFrame({"id": [1, 2]}))
+    await parquet_output.write_dataframe(pd.DataFrame({"id": []}))
+    await parquet_output.write_dataframe(pd.DataFrame({"id": [3]}))
+
+    assert parquet_output.chunk_count == 2
+    assert pq.read_table(tmp_path / "2.parquet").column("id").to_pylist() == [3]
+    metadata = pq.ParquetFile(tmp_path / "1.parquet").metadata
+    assert metadata.row_group(0).column(0).compression == "SNAPPY"
+
+
+async def test_chunks_are_compressed_like_the_sdk_by_default(tmp_path):
+    parquet_output = ParquetOutput(output_path=str(tmp_path))
+
+    await parquet_output.write_arrow_table(pa.table({"id": [1, 2]}))
+
+    metadata = pq.ParquetFile(tmp_path / "1.parquet").metadata
+    assert metadata.row_group(0).column(0).compression == "SNAPPY"
+
+
+def test_unknown_compression_fails(tmp_path):
+    with pytest.raises(ValueError):
+        ParquetOutput(output_path=str(tmp_path), compression="json")
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from app.outputs.pipeline import run_pipeline
+
+
+async def fetch(items, fetched):
+    for item in items:
+        fetched.append(item)
+        yield item
+
+
+async def test_run_pipeline_passes_items_through_every_stage_in_order():
+    fetched, written = [], []
+
+    async def double(item):
+        await asyncio.sleep(0.001 * (item % 3))
+        return item * 2
+
+    async def write(item):
+        written.append(item)
+
+    await run_pipeline(fetch(range(10), fetched), [double, write], max_queued=2)
+
+    assert written == [item * 2 for item in range(10)]
+
+
+async def test_run_pipeline_holds_back_the_fetch_of_a_slow_stage():
+    fetched, written = [], []
+    release = asyncio.Event()
+
+    async def write(item):
+        await release.wait()
+        written.append(item)
+
+    pipeline = asyncio.create_task(
+        run_pipeline(fetch(range(100), fetched), [write], max_queued=2)
+    )
+    await asyncio.sleep(0.01)
+
+    # one item in the stage, two queued and one waiting to be queued
+    assert len(fetched) == 4
+    release.set()
+    await pipeline
+    assert written == list(range(100))
+
+
+async def test_run_pipeline_error_stops_every_stage():
+    fetched = []
+    transformed = []
+
+    async def transform(item):
+        if item == 3:
+            raise ValueError("bad chunk")
+        transformed.append(item)
+        return item
+
+    async def write(item):
+        await asyncio.sleep(0)
+
+    with pytest.raises(ValueError, match="bad chunk"):
+        await run_pipeline(fetch(range(100), fetched), [transform, write], max_queued=1)
+
+    assert transformed == [0, 1, 2]
+    assert len(fetched) < 10
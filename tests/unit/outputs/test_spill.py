@@ -0,0 +1,143 @@
+import asyncio
+import os
+from unittest.mock import patch
+
+import pyarrow as pa
+import pytest
+
+from app.outputs.spill import SpillBuffer, merge_tables, write_buffered
+
+
+def get_table(start: int) -> pa.Table:
+    return pa.table({"id": list(range(start, start + 100))})
+
+
+async def test_spill_buffer_spills_tables_past_its_budget(tmp_path):
+    tables = [get_table(i * 100) for i in range(3)]
+    buffer = SpillBuffer(
+        tables[0].nbytes, directory=str(tmp_path), labels={"typename": "column"}
+    )
+
+    with patch("app.outputs.spill.get_metrics") as get_metrics:
+        for table in tables:
+            await buffer.put(table)
+        buffer.close()
+
+    assert buffer.memory_bytes == tables[0].nbytes
+    assert buffer.spilled_batches == 2
+    assert buffer.spilled_bytes == tables[1].nbytes + tables[2].nbytes
+    metric = get_metrics.return_value.record_metric.call_args_list[0].kwargs
+    assert metric["name"] == "spill_buffer_spilled_bytes"
+    assert metric["labels"] == {"typename": "column"}
+
+    read = []
+    while (table := await buffer.get()) is not None:
+        read.append(table)
+    assert read == tables
+    assert buffer.memory_bytes == 0
+
+    buffer.cleanup()
+    assert os.listdir(tmp_path) == []
+
+
+async def test_write_buffered_writes_tables_in_order(tmp_path):
+    tables = [get_table(i * 100) for i in range(5)]
+    written = []
+
+    async def fetch():
+        for table in tables:
+            yield table
+
+    async def write(table):
+        await asyncio.sleep(0.01)
+        written.append(table)
+
+    with patch("app.outputs.spill.get_metrics"):
+        await write_buffered(fetch(), write, max_bytes=0, directory=str(tmp_path))
+
+    assert written == tables
+    assert os.listdir(tmp_path) == []
+
+
+async def test_write_buffered_raises_fetch_errors(tmp_path):
+    written = []
+
+    async def fetch():
+        yield get_table(0)
+        raise RuntimeError("query failed")
+
+    async def write(table):
+        written.append(table)
+
+    with pytest.raises(RuntimeError, match="query failed"):
+        await write_buffered(fetch(), write, max_bytes=1 << 20)
+
+    assert len(written) == 1
+
+
+async def test_write_buffered_stops_fetching_when_a_write_fails():
+    closed = asyncio.Event()
+
+    async def fetch():
+        try:
+            while True:
+                yield get_table(0)
+                await asyncio.sleep(0)
+        finally:
+            closed.set()
+
+    async def write(table):
+        raise OSError("disk full")
+
+    with pytest.raises(OSError, match="disk full"):
+        await write_buffered(fetch(), write, max_bytes=1 << 20)
+
+    assert closed.is_set()
+
+
+async def test_merge_tables_yields_every_table_of_every_iterator():
+    running = 0
+    max_running = 0
+
+    def fetch(start):
+        async def tables():
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            for i in range(3):
+                await asyncio.sleep(0.01)
+                yield get_table(start + i * 100)
+            running -= 1
+
+        return tables
+
+    merged = [
+        table async for table in merge_tables([fetch(i * 1000) for i in range(4)], 2)
+    ]
+
+    assert sorted(table["id"][0].as_py() for table in merged) == sorted(
+        i * 1000 + j * 100 for i in range(4) for j in range(3)
+    )
+    assert max_running == 2
+
+
+async def test_merge_tables_raises_errors_and_stops_other_iterators():
+    closed = asyncio.Event()
+
+    async def failing():
+        yield get_table(0)
+        raise RuntimeError("catalog failed")
+
+    async def endless():
+        try:
+            while True:
+                await asyncio.sleep(0.01)
+                yield get_table(100)
+        finally:
+            closed.set()
+
+    with pytest.raises(RuntimeError, match="catalog failed"):
+        async for _ in merge_tables([failing, endless], 2):
+            pass
+
+    assert closed.is_set()
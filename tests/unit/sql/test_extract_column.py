@@ -0,0 +1,79 @@
+import json
+
+from application_sdk.common.utils import read_sql_files
+
+from app.common.utils import get_null_columns, prune_null_columns, quote_literal
+from tests.benchmark.catalog import CATALOG_NAME, create_synthetic_catalog, render_query
+
+queries = read_sql_files(queries_prefix="app/sql")
+
+
+def test_system_jdbc_column_query_matches_information_schema_query():
+    connection = create_synthetic_catalog(
+        table_count=200, schema_count=5, other_catalog_names=["other"]
+    )
+    workflow_args = {
+        "metadata": {
+            "include-filter": json.dumps(
+                {
+                    "^synthetic$": ["^schema_1$", "^schema_2$"],
+                    "^other$": ["^schema_1$", "^schema_2$"],
+                }
+            ),
+            "temp-table-regex": "^table_1",
+        }
+    }
+
+    information_schema = connection.execute(
+        render_query(
+            queries["EXTRACT_COLUMN"],
+            workflow_args,
+            temp_table_regex_sql=queries["EXTRACT_TEMP_TABLE_REGEX_COLUMN"],
+            include_schemas_sql=queries["EXTRACT_INCLUDE_SCHEMAS"],
+        )
+    ).fetchall()
+    system_jdbc = connection.execute(
+        render_query(
+            queries["EXTRACT_COLUMN_SYSTEM_JDBC"],
+            workflow_args,
+            temp_table_regex_sql=queries["EXTRACT_TEMP_TABLE_REGEX_COLUMN"],
+            include_schemas_sql=queries["EXTRACT_INCLUDE_SCHEMAS_SYSTEM_JDBC"],
+        )
+    ).fetchall()
+
+    assert information_schema
+    assert sorted(system_jdbc) == sorted(information_schema)
+
+
+def test_system_jdbc_column_partition_query_reads_one_schema():
+    connection = create_synthetic_catalog(table_count=100, schema_count=5)
+
+    columns = connection.execute(
+        render_query(
+            queries["EXTRACT_COLUMN_PARTITION_SYSTEM_JDBC"],
+            catalog_name_literal=quote_literal(CATALOG_NAME),
+            schema_name=quote_literal("schema_3"),
+        )
+    ).fetchall()
+
+    assert len(columns) == 20 * 8
+    assert {(row[0], row[1]) for row in columns} == {(CATALOG_NAME, "schema_3")}
+
+
+def test_pruned_column_queries_only_select_extracted_columns():
+    connection = create_synthetic_catalog(table_count=50, schema_count=5)
+
+    for name in ("EXTRACT_COLUMN", "EXTRACT_COLUMN_SYSTEM_JDBC"):
+        query = render_query(queries[name])
+        columns = connection.execute(prune_null_columns(query)).description
+
+        assert len(get_null_columns(query)) == 35
+        assert [column[0].lower() for column in columns] == [
+            "table_catalog",
+            "table_schema",
+            "table_name",
+            "column_name",
+            "ordinal_position",
+            "data_type",
+            "is_nullable",
+        ]
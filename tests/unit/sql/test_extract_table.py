@@ -0,0 +1,96 @@
+from application_sdk.common.utils import read_sql_files
+
+from app.common.utils import (
+    get_null_columns,
+    prepare_query,
+    prune_null_columns,
+    quote_identifier,
+    quote_literal,
+    quote_literal_list,
+    remove_view_definitions,
+)
+from tests.benchmark.catalog import (
+    CATALOG_NAME,
+    create_synthetic_catalog,
+    render_query,
+    translate_query,
+)
+
+queries = read_sql_files(queries_prefix="app/sql")
+
+
+def test_set_based_table_query_matches_correlated_query():
+    connection = create_synthetic_catalog(table_count=300, view_ratio=0.2)
+
+    correlated = connection.execute(render_query(queries["EXTRACT_TABLE"])).fetchall()
+    set_based = connection.execute(
+        render_query(queries["EXTRACT_TABLE_SET_BASED"])
+    ).fetchall()
+
+    assert len(set_based) == 300
+    assert set_based == correlated
+    # views carry their definition, every table its column count
+    assert all(row[4] == 8 for row in set_based)
+    assert all((row[3] == "VIEW") == (row[5] is not None) for row in set_based)
+
+
+def test_pruned_table_queries_keep_the_other_columns():
+    connection = create_synthetic_catalog(table_count=100, view_ratio=0.2)
+
+    for name in ("EXTRACT_TABLE", "EXTRACT_TABLE_SET_BASED"):
+        query = render_query(queries[name])
+        full = connection.execute(query)
+        pruned = connection.execute(prune_null_columns(query))
+
+        null_columns = get_null_columns(query)
+        names = [column[0] for column in full.description]
+        assert [column[0] for column in pruned.description] == [
+            name for name in names if name.lower() not in null_columns
+        ]
+        kept = [i for i, name in enumerate(names) if name.lower() not in null_columns]
+        assert pruned.fetchall() == [
+            tuple(row[i] for i in kept) for row in full.fetchall()
+        ]
+
+
+def test_table_queries_without_view_definitions_keep_the_other_columns():
+    connection = create_synthetic_catalog(table_count=100, view_ratio=0.2)
+
+    for name, params in (
+        ("EXTRACT_TABLE", {}),
+        ("EXTRACT_TABLE_SET_BASED", {}),
+        (
+            "EXTRACT_TABLE_PARTITION",
+            {
+                "catalog_name": quote_identifier(CATALOG_NAME),
+                "schema_name": quote_literal("schema_3"),
+            },
+        ),
+    ):
+        query = translate_query(prepare_query(queries[name], {}, **params) or "")
+        deferred = remove_view_definitions(query)
+
+        assert "information_schema.views" not in deferred
+        full = connection.execute(query).fetchall()
+        assert full
+        assert connection.execute(deferred).fetchall() == [
+            row[:5] + (None,) + row[6:] for row in full
+        ]
+
+
+def test_view_definition_query_reads_the_views_of_a_batch_of_schemas():
+    connection = create_synthetic_catalog(
+        table_count=100, schema_count=4, view_ratio=0.2
+    )
+
+    query = prepare_query(
+        queries["EXTRACT_VIEW_DEFINITION"],
+        {},
+        catalog_name=quote_identifier(CATALOG_NAME),
+        schema_names=quote_literal_list(["schema_0", "schema_3"]),
+    )
+    views = connection.execute(translate_query(query or "")).fetchall()
+
+    assert len(views) == 10
+    assert {row[1] for row in views} == {"schema_0", "schema_3"}
+    assert all(row[3].startswith("SELECT * FROM") for row in views)
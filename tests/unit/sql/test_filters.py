@@ -0,0 +1,70 @@
+import json
+
+from application_sdk.common.utils import read_sql_files
+
+from tests.benchmark.catalog import create_synthetic_catalog, render_query
+
+queries = read_sql_files(queries_prefix="app/sql")
+
+
+def test_extraction_queries_apply_workflow_filters():
+    connection = create_synthetic_catalog(table_count=100, schema_count=5)
+    workflow_args = {
+        "metadata": {
+            "include-filter": json.dumps(
+                {"^synthetic$": ["^schema_1$", "^schema_2$", "^schema_3$"]}
+            ),
+            "exclude-filter": json.dumps({"^synthetic$": ["^schema_3$"]}),
+            "temp-table-regex": "^table_1",
+        }
+    }
+
+    tables = connection.execute(
+        render_query(
+            queries["EXTRACT_TABLE_SET_BASED"],
+            workflow_args,
+            temp_table_regex_sql=queries["EXTRACT_TEMP_TABLE_REGEX_TABLE"],
+            include_schemas_sql=queries["EXTRACT_INCLUDE_SCHEMAS"],
+        )
+    ).fetchall()
+    columns = connection.execute(
+        render_query(
+            queries["EXTRACT_COLUMN"],
+            workflow_args,
+            temp_table_regex_sql=queries["EXTRACT_TEMP_TABLE_REGEX_COLUMN"],
+            include_schemas_sql=queries["EXTRACT_INCLUDE_SCHEMAS"],
+        )
+    ).fetchall()
+    schemas = connection.execute(
+        render_query(
+            queries["EXTRACT_SCHEMA"],
+            workflow_args,
+            include_schemas_sql=queries["EXTRACT_INCLUDE_SCHEMAS"],
+        )
+    ).fetchall()
+
+    assert {row[1] for row in tables} == {"schema_1", "schema_2"}
+    assert not any(row[2].startswith("table_1") for row in tables)
+    assert len(tables) == 35
+    assert {(row[1], row[2]) for row in columns} == {(row[1], row[2]) for row in tables}
+    assert [row[1] for row in schemas] == ["schema_1", "schema_2"]
+
+
+def test_tables_check_counts_filtered_tables_up_to_the_limit():
+    connection = create_synthetic_catalog(table_count=100, schema_count=5)
+    workflow_args = {
+        "metadata": {"include-filter": json.dumps({"^synthetic$": ["^schema_1$"]})}
+    }
+
+    def count_tables(limit: int) -> int:
+        return connection.execute(
+            render_query(
+                queries["TABLES_CHECK"],
+                workflow_args,
+                include_schemas_sql=queries["EXTRACT_INCLUDE_SCHEMAS"],
+                limit=str(limit),
+            )
+        ).fetchone()[0]
+
+    assert count_tables(limit=1000) == 20
+    assert count_tables(limit=5) == 5
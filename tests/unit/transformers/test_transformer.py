@@ -0,0 +1,110 @@
+import glob
+import os
+from unittest.mock import patch
+
+import daft
+import pytest
+from application_sdk.transformers.query import (
+    QueryBasedTransformer as BaseQueryBasedTransformer,
+)
+
+from app.transformers import QueryBasedTransformer
+from app.transformers.cache import TemplateCache
+
+RAW_RESOURCES = os.path.join(os.path.dirname(__file__), "query", "resources", "raw")
+TRANSFORM_ARGS = {
+    "workflow_id": "workflow",
+    "workflow_run_id": "run",
+    "connection_qualified_name": "default/presto/1",
+    "connection_name": "dev",
+}
+
+
+@pytest.fixture
+def transformer() -> QueryBasedTransformer:
+    transformer = QueryBasedTransformer(connector_name="presto", tenant_id="default")
+    transformer.template_cache = TemplateCache()
+    return transformer
+
+
+def transform(transformer, typename, dataframe):
+    rows = transformer.transform_metadata(
+        typename=typename, dataframe=dataframe, **TRANSFORM_ARGS
+    ).to_pylist()
+    for row in rows:
+        row["attributes"].pop("lastSyncRunAt", None)
+    return rows
+
+
+def test_transform_matches_sdk_transformer(transformer: QueryBasedTransformer):
+    sdk_transformer = BaseQueryBasedTransformer(
+        connector_name="presto", tenant_id="default"
+    )
+    raw_files = glob.glob(os.path.join(RAW_RESOURCES, "*.json"))
+    assert raw_files
+
+    for raw_file in raw_files:
+        typename = os.path.basename(raw_file).removesuffix(".json").upper()
+        dataframe = daft.read_json(raw_file)
+
+        expected = transform(sdk_transformer, typename, dataframe)
+        assert transform(transformer, typename, dataframe) == expected
+        # a second chunk is transformed with the cached projection
+        assert transform(transformer, typename, dataframe) == expected
+
+
+def test_projection_is_compiled_once_per_schema(transformer: QueryBasedTransformer):
+    dataframe = daft.read_json(os.path.join(RAW_RESOURCES, "table.json"))
+
+    with patch.object(
+        transformer,
+        "get_sql_column_expressions",
+        wraps=transformer.get_sql_column_expressions,
+    ) as get_sql_column_expressions:
+        for _ in range(3):
+            transform(transformer, "TABLE", dataframe)
+        assert get_sql_column_expressions.call_count == 1
+
+        transform(transformer, "TABLE", dataframe.exclude("remarks"))
+        assert get_sql_column_expressions.call_count == 2
+
+
+def test_changed_template_is_compiled_again(
+    transformer: QueryBasedTransformer, tmp_path
+):
+    template_path = tmp_path / "database.yaml"
+    template_path.write_text(
+        "columns:\n"
+        "  - name: attributes.name\n"
+        "    source_query: catalog_name\n"
+    )
+    transformer.entity_class_definitions = {"DATABASE": str(template_path)}
+    dataframe = daft.from_pydict({"catalog_name": ["tpch"]})
+
+    assert transform(transformer, "DATABASE", dataframe) == [
+        {"attributes": {"name": "tpch"}}
+    ]
+
+    template_path.write_text(
+        "columns:\n"
+        "  - name: attributes.name\n"
+        "    source_query: upper(catalog_name)\n"
+        "    source_columns: [catalog_name]\n"
+    )
+    os.utime(template_path, ns=(0, 0))
+
+    assert transform(transformer, "DATABASE", dataframe) == [
+        {"attributes": {"name": "TPCH"}}
+    ]
+
+
+def test_template_cache_evicts_least_recently_used():
+    cache = TemplateCache(max_size=2)
+    cache.get("a", lambda: 1)
+    cache.get("b", lambda: 2)
+    cache.get("a", lambda: 3)
+    cache.get("c", lambda: 4)
+
+    assert len(cache) == 2
+    assert cache.get("a", lambda: 5) == 1
+    assert cache.get("b", lambda: 6) == 6
@@ -0,0 +1,43 @@
+import asyncio
+
+from app.workflows.metadata_extraction.concurrency import AdaptiveLimiter
+
+IDLE = {"running_queries": 2, "queued_queries": 0, "active_workers": 2}
+
+
+async def test_limit_grows_additively_and_shrinks_multiplicatively():
+    limiter = AdaptiveLimiter(
+        ceiling=8, initial=4, max_queued_queries=0, max_running_queries_per_worker=4
+    )
+
+    assert await limiter.update(IDLE) == 5
+    assert await limiter.update({**IDLE, "queued_queries": 1}) == 2
+    assert await limiter.update({**IDLE, "running_queries": 9}) == 1
+    assert await limiter.update({**IDLE, "queued_queries": 1}) == 1
+    for _ in range(10):
+        await limiter.update(IDLE)
+    assert limiter.limit == 8
+
+
+async def test_limit_bounds_extractions_in_flight():
+    limiter = AdaptiveLimiter(ceiling=4, initial=1)
+    release = asyncio.Event()
+    in_flight = []
+
+    async def extract():
+        async with limiter:
+            in_flight.append(limiter.in_flight)
+            await release.wait()
+
+    tasks = [asyncio.create_task(extract()) for _ in range(4)]
+    await asyncio.sleep(0)
+    assert limiter.in_flight == 1
+
+    await limiter.set_limit(3)
+    await asyncio.sleep(0)
+    assert limiter.in_flight == 3
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert max(in_flight) == 3
+    assert limiter.in_flight == 0
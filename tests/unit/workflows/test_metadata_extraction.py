@@ -0,0 +1,298 @@
+import asyncio
+from typing import Any, Callable, Dict, List
+from unittest.mock import patch
+
+import pytest
+from temporalio.common import RetryPolicy
+
+from app.activities.metadata_extraction import SQLMetadataExtractionActivities
+from app.workflows.metadata_extraction import SQLMetadataExtractionWorkflow
+
+PARTITIONS = [
+    {"catalog_name": "hive", "schema_name": "raw"},
+    {"catalog_name": "tpch", "schema_name": "sf1"},
+    {"catalog_name": "tpch", "schema_name": "tiny"},
+]
+
+
+class FakeActivities:
+    """Records activity executions in place of ``workflow.execute_activity_method``."""
+
+    def __init__(self, chunk_counts: Dict[str, int]):
+        self.chunk_counts = chunk_counts
+        self.partitions: List[Dict[str, Any]] = PARTITIONS
+        self.extraction_state: Dict[str, Any] = {}
+        self.cluster_load: Dict[str, int] = {}
+        self.transformed = False
+        self.calls: List[Any] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, activity, arg=None, *, args=None, **kwargs):
+        workflow_args = args[0] if args else arg
+        self.calls.append((activity.__name__, workflow_args))
+
+        if activity is SQLMetadataExtractionActivities.fetch_partitions:
+            return self.partitions
+        if activity is SQLMetadataExtractionActivities.get_extraction_state:
+            return self.extraction_state
+        if activity is SQLMetadataExtractionActivities.get_cluster_load:
+            return self.cluster_load
+        if activity is SQLMetadataExtractionActivities.transform_data:
+            return {"total_record_count": 1, "chunk_count": 1}
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0)
+        self.in_flight -= 1
+        if activity is SQLMetadataExtractionActivities.carry_forward_partition:
+            return workflow_args["previous_statistics"]
+        typename = "table" if activity.__name__ == "fetch_tables" else "column"
+        statistics = {
+            "total_record_count": 10,
+            "chunk_count": self.chunk_counts[workflow_args["partition"]["schema_name"]],
+            "typename": typename,
+        }
+        if self.transformed:
+            statistics["transformed"] = True
+        return statistics
+
+    def get_calls(self, name: str) -> List[Dict[str, Any]]:
+        return [args for called, args in self.calls if called == name]
+
+
+@pytest.fixture
+def workflow_args() -> Dict[str, Any]:
+    return {
+        "metadata": {"extraction-mode": "per-schema", "max-concurrent-schemas": 2},
+        "output_prefix": "/tmp/prefix",
+        "output_path": "/tmp/prefix/workflow/run",
+    }
+
+
+async def run_fetch_and_transform(
+    workflow_args: Dict[str, Any], fake: Callable[..., Any]
+) -> SQLMetadataExtractionWorkflow:
+    extraction_workflow = SQLMetadataExtractionWorkflow()
+    retry_policy = RetryPolicy(maximum_attempts=1)
+    with patch(
+        "app.workflows.metadata_extraction.workflow.execute_activity_method",
+        new=fake,
+    ):
+        await asyncio.gather(
+            extraction_workflow.fetch_and_transform(
+                SQLMetadataExtractionActivities.fetch_tables,
+                workflow_args,
+                retry_policy,
+            ),
+            extraction_workflow.fetch_and_transform(
+                SQLMetadataExtractionActivities.fetch_columns,
+                workflow_args,
+                retry_policy,
+            ),
+        )
+    return extraction_workflow
+
+
+async def test_per_schema_fan_out(workflow_args: Dict[str, Any]):
+    fake = FakeActivities({"raw": 1, "sf1": 2, "tiny": 0})
+
+    await run_fetch_and_transform(workflow_args, fake)
+
+    # partitions are listed once and shared by tables and columns
+    assert len(fake.get_calls("fetch_partitions")) == 1
+    table_partitions = [args["partition"] for args in fake.get_calls("fetch_tables")]
+    assert sorted(table_partitions, key=str) == sorted(PARTITIONS, key=str)
+    assert len(fake.get_calls("fetch_columns")) == len(PARTITIONS)
+    assert fake.max_in_flight <= 2
+
+
+async def test_per_schema_transform_chunks_are_numbered_across_partitions(
+    workflow_args: Dict[str, Any],
+):
+    fake = FakeActivities({"raw": 1, "sf1": 2, "tiny": 0})
+
+    await run_fetch_and_transform(workflow_args, fake)
+
+    table_transforms = [
+        args for args in fake.get_calls("transform_data") if args["typename"] == "table"
+    ]
+    assert sorted(args["chunk_start"] for args in table_transforms) == [0, 1, 2]
+    assert sorted(args["file_names"][0] for args in table_transforms) == [
+        "table/hive/raw/1.json",
+        "table/tpch/sf1/1.json",
+        "table/tpch/sf1/2.json",
+    ]
+
+
+async def test_monolithic_mode_does_not_fan_out(workflow_args: Dict[str, Any]):
+    workflow_args["metadata"] = {}
+    calls = []
+
+    async def execute_activity_method(activity, arg=None, *, args=None, **kwargs):
+        calls.append((activity.__name__, args[0] if args else arg))
+        return None
+
+    await run_fetch_and_transform(workflow_args, execute_activity_method)
+
+    assert sorted(name for name, _ in calls) == ["fetch_columns", "fetch_tables"]
+    assert all("partition" not in args for _, args in calls)
+
+
+async def test_pipelined_partitions_are_not_transformed_again(
+    workflow_args: Dict[str, Any],
+):
+    workflow_args["metadata"]["pipelined-extraction"] = True
+    fake = FakeActivities({"raw": 1, "sf1": 2, "tiny": 0})
+    fake.transformed = True
+
+    extraction_workflow = await run_fetch_and_transform(workflow_args, fake)
+
+    assert len(fake.get_calls("fetch_tables")) == len(PARTITIONS)
+    assert fake.get_calls("transform_data") == []
+    # raw statistics are still kept for incremental extraction
+    assert extraction_workflow._partition_statistics["tpch/sf1"]["table"] == {
+        "total_record_count": 10,
+        "chunk_count": 2,
+        "typename": "table",
+    }
+
+
+async def test_pipelined_monolithic_fetch_falls_back_to_transform_activities(
+    workflow_args: Dict[str, Any],
+):
+    workflow_args["metadata"] = {"pipelined-extraction": True}
+    calls = []
+
+    async def execute_activity_method(activity, arg=None, *, args=None, **kwargs):
+        calls.append((activity.__name__, args[0] if args else arg))
+        if activity is SQLMetadataExtractionActivities.fetch_tables:
+            return {"chunk_count": 3, "typename": "table", "transformed": True}
+        if activity is SQLMetadataExtractionActivities.fetch_columns:
+            # e.g. a resumable extraction, whose chunks are not transformed
+            return {"chunk_count": 2, "typename": "column"}
+        return {"total_record_count": 1, "chunk_count": 1}
+
+    await run_fetch_and_transform(workflow_args, execute_activity_method)
+
+    transforms = [args for name, args in calls if name == "transform_data"]
+    assert [args["typename"] for args in transforms] == ["column", "column"]
+    assert [args["file_names"] for args in transforms] == [
+        ["column/1.json"],
+        ["column/2.json"],
+    ]
+
+
+async def test_incremental_extraction_carries_forward_unchanged_partitions(
+    workflow_args: Dict[str, Any],
+):
+    workflow_args["metadata"] = {"incremental-extraction": True}
+    fake = FakeActivities({"raw": 1, "sf1": 2, "tiny": 0})
+    fake.partitions = [
+        {**PARTITIONS[0], "fingerprint": "unchanged"},
+        {**PARTITIONS[1], "fingerprint": "changed"},
+        {**PARTITIONS[2], "fingerprint": None},
+    ]
+    previous_statistics = {
+        "table": {"total_record_count": 5, "chunk_count": 3, "typename": "table"},
+        "column": {"total_record_count": 9, "chunk_count": 1, "typename": "column"},
+    }
+    fake.extraction_state = {
+        "output_path": "/tmp/prefix/workflow/previous",
+        "settings": {
+            "temp-table-regex": None,
+            "exclude_empty_tables": None,
+            "exclude_views": None,
+        },
+        "partitions": {
+            "hive/raw": {"fingerprint": "unchanged", "statistics": previous_statistics},
+            "tpch/sf1": {"fingerprint": "before", "statistics": previous_statistics},
+        },
+    }
+
+    extraction_workflow = await run_fetch_and_transform(workflow_args, fake)
+
+    carried = fake.get_calls("carry_forward_partition")
+    assert sorted(args["typename"] for args in carried) == ["column", "table"]
+    assert all(args["partition"] == fake.partitions[0] for args in carried)
+    assert all(
+        args["previous_output_path"] == "/tmp/prefix/workflow/previous"
+        for args in carried
+    )
+    fetched = [
+        args["partition"]["schema_name"] for args in fake.get_calls("fetch_tables")
+    ]
+    assert sorted(fetched) == ["sf1", "tiny"]
+    table_files = sorted(
+        args["file_names"][0]
+        for args in fake.get_calls("transform_data")
+        if args["typename"] == "table"
+    )
+    assert table_files == [
+        "table/hive/raw/1.json",
+        "table/hive/raw/2.json",
+        "table/hive/raw/3.json",
+        "table/tpch/sf1/1.json",
+        "table/tpch/sf1/2.json",
+    ]
+
+    state = extraction_workflow.get_extraction_state(workflow_args)
+    assert state["output_path"] == workflow_args["output_path"]
+    assert sorted(state["partitions"]) == ["hive/raw", "tpch/sf1"]
+    assert state["partitions"]["hive/raw"]["statistics"] == previous_statistics
+    assert state["partitions"]["tpch/sf1"]["fingerprint"] == "changed"
+    assert state["partitions"]["tpch/sf1"]["statistics"]["table"]["chunk_count"] == 2
+
+
+async def test_incremental_extraction_with_changed_settings_extracts_all(
+    workflow_args: Dict[str, Any],
+):
+    workflow_args["metadata"] = {"incremental-extraction": True, "exclude_views": True}
+    fake = FakeActivities({"raw": 1, "sf1": 2, "tiny": 0})
+    fake.partitions = [{**PARTITIONS[0], "fingerprint": "unchanged"}]
+    fake.extraction_state = {
+        "output_path": "/tmp/prefix/workflow/previous",
+        "settings": {
+            "temp-table-regex": None,
+            "exclude_empty_tables": None,
+            "exclude_views": None,
+        },
+        "partitions": {"hive/raw": {"fingerprint": "unchanged", "statistics": {}}},
+    }
+
+    await run_fetch_and_transform(workflow_args, fake)
+
+    assert fake.get_calls("carry_forward_partition") == []
+    assert len(fake.get_calls("fetch_tables")) == 1
+
+
+async def test_adaptive_concurrency_backs_off_when_the_cluster_is_busy(
+    workflow_args: Dict[str, Any],
+):
+    workflow_args["metadata"]["adaptive-concurrency"] = True
+    workflow_args["metadata"]["max-concurrent-schemas"] = 4
+    fake = FakeActivities({"raw": 1, "sf1": 2, "tiny": 0})
+    fake.cluster_load = {"running_queries": 3, "queued_queries": 2, "active_workers": 2}
+
+    extraction_workflow = await run_fetch_and_transform(workflow_args, fake)
+
+    # the sampler is shared by tables and columns
+    assert len(fake.get_calls("get_cluster_load")) == 1
+    assert extraction_workflow.get_partition_limiter(workflow_args).limit == 1
+    assert fake.max_in_flight <= 2
+
+
+async def test_adaptive_concurrency_without_cluster_load_uses_the_ceiling(
+    workflow_args: Dict[str, Any],
+):
+    workflow_args["metadata"]["adaptive-concurrency"] = True
+    fake = FakeActivities({"raw": 1, "sf1": 2, "tiny": 0})
+
+    extraction_workflow = await run_fetch_and_transform(workflow_args, fake)
+
+    assert extraction_workflow.get_partition_limiter(workflow_args).limit == 2
+    # the cluster load is not sampled by default
+    del workflow_args["metadata"]["adaptive-concurrency"]
+    fake = FakeActivities({"raw": 1, "sf1": 2, "tiny": 0})
+    await run_fetch_and_transform(workflow_args, fake)
+    assert fake.get_calls("get_cluster_load") == []